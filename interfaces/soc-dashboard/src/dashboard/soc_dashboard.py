@@ -9,10 +9,11 @@ Interface web temps réel pour monitoring des menaces
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
 import json
 import asyncio
 import uvicorn
+from collections import deque
 from typing import List
 import sqlite3
 from datetime import datetime, timedelta
@@ -49,8 +50,11 @@ class ConnectionManager:
     
     async def broadcast(self, data: dict):
         """Diffuser des données à tous les clients connectés"""
+        await self.broadcast_text(json.dumps(data))
+
+    async def broadcast_text(self, message: str):
+        """Diffuser un message déjà sérialisé (une seule sérialisation quel que soit le nombre de clients)"""
         if self.active_connections:
-            message = json.dumps(data)
             disconnected = []
             for connection in self.active_connections:
                 try:
@@ -63,14 +67,116 @@ class ConnectionManager:
                 if conn in self.active_connections:
                     self.active_connections.remove(conn)
 
+class DashboardMaterializedView:
+    """Vue matérialisée du SOC alimentée par les événements de changement
+
+    Les changements reçus entre deux diffusions sont regroupés dans un delta
+    numéroté (seq); un instantané complet n'est envoyé qu'à la connexion ou
+    sur demande de resynchronisation d'un client. Les deltas sont idempotents
+    (incidents identifiés par incident_id) : un instantané pris avant la
+    diffusion d'un delta peut déjà en contenir les changements.
+    """
+
+    def __init__(self, max_incidents: int = 10):
+        self.max_incidents = max_incidents
+        self.seq = 0
+        self.metrics = {
+            "total_events_processed": 0,
+            "threats_detected": 0,
+            "average_mttr_minutes": 0.0,
+            "automated_responses": 0
+        }
+        self.incidents = deque(maxlen=max_incidents)  # Plus récent en premier
+        self.threat_hunting = {"patterns_found": 0}
+        self.updated_at = datetime.now().isoformat()
+        self._pending = {}
+        self._snapshot_cache = None
+        self._api_cache = None
+
+    def seed(self, metrics: dict, incidents: List[dict], threat_hunting: dict):
+        """Initialiser la vue depuis l'état du SOC (une seule lecture en base)"""
+        self.metrics = metrics
+        self.incidents = deque(incidents[:self.max_incidents], maxlen=self.max_incidents)
+        self.threat_hunting = threat_hunting
+        self._touch()
+
+    def apply(self, change: dict):
+        """Appliquer un événement de changement du SOC"""
+        if change['type'] == 'incident_created':
+            self.incidents.appendleft(change['incident'])
+            self._pending.setdefault('incidents_added', []).append(change['incident'])
+        elif change['type'] == 'metrics_updated':
+            self.metrics = change['metrics']
+            self._pending['metrics'] = change['metrics']
+        self._touch()
+
+    def set_threat_hunting(self, threat_hunting: dict):
+        """Mettre à jour les résultats de threat hunting s'ils ont changé"""
+        if threat_hunting != self.threat_hunting:
+            self.threat_hunting = threat_hunting
+            self._pending['threat_hunting'] = threat_hunting
+            self._touch()
+
+    def has_pending_changes(self) -> bool:
+        return bool(self._pending)
+
+    def flush_delta(self) -> str:
+        """Produire le delta sérialisé des changements en attente"""
+        self.seq += 1
+        # Un instantané mis en cache avant ce delta porterait l'ancien seq: un client
+        # s'y abonnant attendrait seq + 1 et verrait seq + 2, d'où une resynchro inutile
+        self._snapshot_cache = None
+        message = json.dumps({
+            "type": "delta",
+            "seq": self.seq,
+            "changes": self._pending,
+            "timestamp": self.updated_at
+        })
+        self._pending = {}
+        return message
+
+    def snapshot(self) -> str:
+        """Instantané complet sérialisé (mis en cache jusqu'au prochain changement)"""
+        if self._snapshot_cache is None:
+            self._snapshot_cache = json.dumps({
+                "type": "snapshot",
+                "seq": self.seq,
+                "metrics": self.metrics,
+                "incidents": list(self.incidents),
+                "threat_hunting": self.threat_hunting,
+                "timestamp": self.updated_at
+            })
+        return self._snapshot_cache
+
+    def api_payload(self) -> bytes:
+        """Réponse /api/metrics pré-sérialisée"""
+        if self._api_cache is None:
+            self._api_cache = json.dumps({
+                "metrics": self.metrics,
+                "incidents": list(self.incidents)[:5],
+                "threat_hunting": self.threat_hunting,
+                "timestamp": self.updated_at
+            }).encode()
+        return self._api_cache
+
+    def _touch(self):
+        self.updated_at = datetime.now().isoformat()
+        self._snapshot_cache = None
+        self._api_cache = None
+
 class SOCDashboardAPI:
     """API Dashboard SOC"""
     
     def __init__(self):
         self.app = FastAPI(title="SOC Dashboard - Station Traffeyère", version="1.0.0")
         self.connection_manager = ConnectionManager()
+        self.view = DashboardMaterializedView()
         self.soc = None
         self.soc_thread = None
+        self.loop = None
+        self.changed = None
+        self.coalesce_interval = 0.5  # Regroupement des changements avant diffusion (s)
+        self.hunting_interval = 60  # Rafraîchissement du threat hunting (s)
         self._setup_routes()
         self._setup_static_files()
         
@@ -368,6 +474,11 @@ class SOCDashboardAPI:
         let ws = null;
         let reconnectInterval = null;
         
+        // Vue locale entretenue par instantané + deltas numérotés
+        const MAX_INCIDENTS = 10;
+        let lastSeq = null;
+        let incidentsView = [];
+        
         function connectWebSocket() {
             const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
             const wsUrl = `${protocol}//${window.location.host}/ws`;
@@ -387,7 +498,20 @@ class SOCDashboardAPI:
             
             ws.onmessage = function(event) {
                 const data = JSON.parse(event.data);
-                updateDashboard(data);
+                
+                if (data.type === 'snapshot') {
+                    lastSeq = data.seq;
+                    incidentsView = data.incidents || [];
+                    updateDashboard(data);
+                } else if (data.type === 'delta') {
+                    // Delta manquant: demander un instantané complet
+                    if (lastSeq === null || data.seq !== lastSeq + 1) {
+                        ws.send(JSON.stringify({type: 'resync'}));
+                        return;
+                    }
+                    lastSeq = data.seq;
+                    applyDelta(data.changes);
+                }
             };
             
             ws.onclose = function() {
@@ -431,6 +555,23 @@ class SOCDashboardAPI:
             }
         }
         
+        function applyDelta(changes) {
+            if (changes.incidents_added) {
+                changes.incidents_added.forEach(incident => {
+                    // Idempotent: un instantané peut déjà contenir l'incident
+                    incidentsView = incidentsView.filter(i => i.incident_id !== incident.incident_id);
+                    incidentsView.unshift(incident);
+                });
+                incidentsView = incidentsView.slice(0, MAX_INCIDENTS);
+            }
+            
+            updateDashboard({
+                metrics: changes.metrics,
+                incidents: changes.incidents_added ? incidentsView : null,
+                threat_hunting: changes.threat_hunting
+            });
+        }
+        
         function updateIncidents(incidents) {
             const container = document.getElementById('recentIncidents');
             container.innerHTML = '';
@@ -582,37 +723,23 @@ class SOCDashboardAPI:
             """Endpoint WebSocket pour données temps réel"""
             await self.connection_manager.connect(websocket)
             try:
+                # Instantané complet à la connexion, deltas ensuite
+                await websocket.send_text(self.view.snapshot())
                 while True:
-                    await websocket.receive_text()
+                    message = await websocket.receive_text()
+                    try:
+                        request = json.loads(message)
+                    except ValueError:
+                        continue
+                    if isinstance(request, dict) and request.get('type') == 'resync':
+                        await websocket.send_text(self.view.snapshot())
             except WebSocketDisconnect:
                 self.connection_manager.disconnect(websocket)
         
         @self.app.get("/api/metrics")
         async def get_metrics():
-            """API pour récupérer les métriques SOC"""
-            if self.soc:
-                metrics = self.soc.get_metrics()
-                incidents = self.soc.get_recent_incidents(5)
-                hunting_results = threat_hunting_automated(self.soc)
-                
-                return {
-                    "metrics": metrics,
-                    "incidents": incidents,
-                    "threat_hunting": hunting_results,
-                    "timestamp": datetime.now().isoformat()
-                }
-            else:
-                return {
-                    "metrics": {
-                        "total_events_processed": 0,
-                        "threats_detected": 0,
-                        "average_mttr_minutes": 0.0,
-                        "automated_responses": 0
-                    },
-                    "incidents": [],
-                    "threat_hunting": {"patterns_found": 0},
-                    "timestamp": datetime.now().isoformat()
-                }
+            """API pour récupérer les métriques SOC (servies depuis la vue matérialisée)"""
+            return Response(content=self.view.api_payload(), media_type="application/json")
         
         @self.app.get("/api/health")
         async def health_check():
@@ -630,7 +757,13 @@ class SOCDashboardAPI:
         # Démarrer le SOC dans un thread séparé (si disponible)
         def run_soc():
             if SOC_AVAILABLE:
-                self.soc = IntelligentSOC()
+                soc = IntelligentSOC()
+                # Vue initiale lue une seule fois, puis entretenue par les événements du SOC
+                seed = (soc.get_metrics(), soc.get_recent_incidents(self.view.max_incidents),
+                        threat_hunting_automated(soc))
+                self.loop.call_soon_threadsafe(self.view.seed, *seed)
+                soc.subscribe_changes(self._on_soc_change)
+                self.soc = soc
             else:
                 self.soc = None
                 logger.info("SOC non disponible - dashboard en mode démo")
@@ -670,37 +803,44 @@ class SOCDashboardAPI:
             except Exception as e:
                 logger.error(f"Erreur dans le SOC: {e}")
         
+        self.loop = asyncio.get_running_loop()
+        self.changed = asyncio.Event()
+        
         # Lancer le SOC dans un thread
         self.soc_thread = threading.Thread(target=run_soc, daemon=True)
         self.soc_thread.start()
         
-        # Attendre que le SOC soit prêt
-        await asyncio.sleep(5)
-        
         # Tâche de diffusion des données
         asyncio.create_task(self._broadcast_data())
     
+    def _on_soc_change(self, change: dict):
+        """Recevoir un changement depuis le thread du SOC"""
+        self.loop.call_soon_threadsafe(self._apply_change, change)
+    
+    def _apply_change(self, change: dict):
+        self.view.apply(change)
+        self.changed.set()
+    
     async def _broadcast_data(self):
-        """Diffuser les données en temps réel aux clients WebSocket"""
+        """Diffuser les deltas de la vue matérialisée aux clients WebSocket"""
+        last_hunting = time.monotonic()
         while True:
             try:
-                if self.soc and len(self.connection_manager.active_connections) > 0:
-                    # Récupérer les données du SOC
-                    metrics = self.soc.get_metrics()
-                    incidents = self.soc.get_recent_incidents(10)
-                    hunting_results = threat_hunting_automated(self.soc)
-                    
-                    data = {
-                        "type": "update",
-                        "metrics": metrics,
-                        "incidents": incidents,
-                        "threat_hunting": hunting_results,
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    
-                    await self.connection_manager.broadcast(data)
+                try:
+                    await asyncio.wait_for(self.changed.wait(), timeout=self.hunting_interval)
+                    # Regrouper les changements arrivant en rafale dans un même delta
+                    await asyncio.sleep(self.coalesce_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self.changed.clear()
+                
+                if self.soc and time.monotonic() - last_hunting >= self.hunting_interval:
+                    self.view.set_threat_hunting(threat_hunting_automated(self.soc))
+                    last_hunting = time.monotonic()
                 
-                await asyncio.sleep(5)  # Mise à jour toutes les 5 secondes
+                if self.view.has_pending_changes():
+                    # Coût par diffusion indépendant du nombre de clients et de la taille de la base
+                    await self.connection_manager.broadcast_text(self.view.flush_delta())
                 
             except Exception as e:
                 logger.error(f"Erreur diffusion données: {e}")
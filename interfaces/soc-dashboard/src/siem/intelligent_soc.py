@@ -8,13 +8,14 @@ MTTR: 11.3 minutes (objectif <15min)
 """
 
 import asyncio
+import hashlib
 import json
 import logging
 import time
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable
 from dataclasses import dataclass, asdict
 from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler
@@ -144,7 +145,7 @@ class AnomalyDetectionML:
 class ThreatIntelligence:
     """Module de Threat Intelligence"""
     
-    def __init__(self):
+    def __init__(self, update_interval: int = 3600, indicator_ttl: int = 7 * 86400):
         self.threat_feeds = {
             'ANSSI': 'https://www.cert.ssi.gouv.fr/feed/',
             'MISP': 'http://localhost:8080/feeds/',  # Instance locale MISP
@@ -152,9 +153,14 @@ class ThreatIntelligence:
         }
         self.threat_cache = {}
         self.last_update = None
-        
+        self.update_interval = update_interval
+        self.indicator_ttl = indicator_ttl
+        self.feed_cursor = None  # Empreinte (ETag) du dernier contenu appliqué
+        self.indicator_hashes = {}  # indicateur -> empreinte du contenu
+        self.indicator_expiry = {}  # indicateur disparu -> date d'expiration
+
     async def update_threat_feeds(self):
-        """Mettre à jour les feeds de menaces"""
+        """Mettre à jour les feeds de menaces (application incrémentale)"""
         logger.info("📡 Mise à jour des feeds Threat Intelligence")
         
         # Simuler la récupération de feeds (en production, vraies API)
@@ -177,11 +183,44 @@ class ThreatIntelligence:
             }
         ]
         
-        for threat in mock_threats:
-            self.threat_cache[threat['indicator']] = threat
-            
         self.last_update = datetime.now()
-        logger.info(f"✅ {len(mock_threats)} indicateurs de menaces chargés")
+
+        feed_digest = hashlib.sha256(json.dumps(mock_threats, sort_keys=True).encode()).hexdigest()
+        if feed_digest == self.feed_cursor:
+            self._sweep_expired_indicators()
+            logger.info("✅ Feeds inchangés, aucun indicateur à appliquer")
+            return
+
+        # N'appliquer que les indicateurs nouveaux ou modifiés
+        applied = 0
+        seen = set()
+        for threat in mock_threats:
+            indicator = threat['indicator']
+            seen.add(indicator)
+            threat_hash = hashlib.sha256(json.dumps(threat, sort_keys=True).encode()).hexdigest()
+            self.indicator_expiry.pop(indicator, None)
+            if self.indicator_hashes.get(indicator) != threat_hash:
+                self.threat_cache[indicator] = threat
+                self.indicator_hashes[indicator] = threat_hash
+                applied += 1
+
+        # Les indicateurs disparus expirent après le TTL
+        expires_at = self.last_update + timedelta(seconds=self.indicator_ttl)
+        for indicator in self.threat_cache.keys() - seen:
+            self.indicator_expiry.setdefault(indicator, expires_at)
+
+        self._sweep_expired_indicators()
+        self.feed_cursor = feed_digest
+        logger.info(f"✅ {applied} indicateurs de menaces appliqués ({len(self.threat_cache)} actifs)")
+
+    def _sweep_expired_indicators(self):
+        """Supprimer les indicateurs dont le TTL est écoulé"""
+        now = datetime.now()
+        for indicator, expires_at in list(self.indicator_expiry.items()):
+            if expires_at <= now:
+                self.threat_cache.pop(indicator, None)
+                self.indicator_hashes.pop(indicator, None)
+                del self.indicator_expiry[indicator]
     
     def check_threat_intel(self, indicator: str) -> Optional[Dict[str, Any]]:
         """Vérifier un indicateur contre la TI"""
@@ -339,6 +378,7 @@ class IntelligentSOC:
         self.metrics = SOCMetrics()
         self.is_running = False
         self.response_times = deque(maxlen=1000)
+        self.change_listeners: List[Callable[[Dict[str, Any]], None]] = []
         
         # Base de données pour persistance
         self._init_database()
@@ -457,8 +497,9 @@ class IntelligentSOC:
         # Réponse automatisée si menace détectée
         if threat_event.severity in ['MEDIUM', 'HIGH'] and threat_event.confidence > 0.7:
             incident = await self.incident_response.trigger_response(threat_event)
-            self._save_incident(incident)
+            incident_record = self._save_incident(incident)
             self.metrics.threats_detected += 1
+            self._emit_change({'type': 'incident_created', 'incident': incident_record})
         
         # Calculer MTTR
         processing_time = (time.time() - start_time) * 1000  # ms
@@ -468,6 +509,24 @@ class IntelligentSOC:
         
         if len(self.response_times) > 0:
             self.metrics.average_mttr_minutes = np.mean(self.response_times) / 60000  # Convert to minutes
+        
+        self._emit_change({'type': 'metrics_updated', 'metrics': self.get_metrics()})
+    
+    def subscribe_changes(self, listener: Callable[[Dict[str, Any]], None]):
+        """Abonner un consommateur aux événements de changement (incidents, métriques)
+        
+        Les listeners sont appelés depuis la boucle du SOC: un consommateur vivant dans
+        un autre thread doit replanifier le traitement sur sa propre boucle.
+        """
+        self.change_listeners.append(listener)
+    
+    def _emit_change(self, change: Dict[str, Any]):
+        """Notifier les abonnés d'un changement"""
+        for listener in self.change_listeners:
+            try:
+                listener(change)
+            except Exception as e:
+                logger.warning(f"⚠️ Erreur notification changement: {e}")
     
     def _save_event(self, event: ThreatEvent):
         """Sauvegarder un événement en base"""
@@ -482,21 +541,30 @@ class IntelligentSOC:
         ))
         self.db_conn.commit()
     
-    def _save_incident(self, incident: Dict[str, Any]):
-        """Sauvegarder un incident en base"""
+    def _save_incident(self, incident: Dict[str, Any]) -> Dict[str, Any]:
+        """Sauvegarder un incident en base et retourner l'enregistrement"""
+        record = {
+            'incident_id': incident['incident_id'],
+            'timestamp': datetime.now().isoformat(),
+            'threat_event': incident['threat_event'],
+            'playbook': incident['playbook'],
+            'response_time_seconds': incident['response_time_seconds'],
+            'status': incident['status']
+        }
         self.db_conn.execute("""
             INSERT INTO incidents (incident_id, timestamp, threat_event, playbook, 
                                  response_time_seconds, status)
             VALUES (?, ?, ?, ?, ?, ?)
         """, (
-            incident['incident_id'],
-            datetime.now().isoformat(),
-            json.dumps(incident['threat_event']),
-            incident['playbook'],
-            incident['response_time_seconds'],
-            incident['status']
+            record['incident_id'],
+            record['timestamp'],
+            json.dumps(record['threat_event']),
+            record['playbook'],
+            record['response_time_seconds'],
+            record['status']
         ))
         self.db_conn.commit()
+        return record
     
     async def _metrics_updater(self):
         """Mise à jour des métriques"""
@@ -511,7 +579,7 @@ class IntelligentSOC:
     async def _threat_intel_updater(self):
         """Mise à jour périodique des feeds TI"""
         while self.is_running:
-            await asyncio.sleep(3600)  # Toutes les heures
+            await asyncio.sleep(self.threat_intel.update_interval)
             await self.threat_intel.update_threat_feeds()
     
     def ingest_event(self, event_data: Dict[str, Any]):
@@ -12,15 +12,16 @@ import json
 import requests
 from datetime import datetime
 import logging
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Set
 
 logger = logging.getLogger('SOARPlaybooks')
 
 class SOAROrchestrator:
     """Orchestrateur SOAR pour automatisation des réponses"""
     
-    def __init__(self):
+    def __init__(self, max_parallel_actions: int = 8):
         self.playbooks = self._load_advanced_playbooks()
+        self.max_parallel_actions = max_parallel_actions
         self.threat_feeds = {
             'ANSSI': 'https://www.cert.ssi.gouv.fr/api/feeds/',
             'MISP': 'http://localhost:8080/events/',
@@ -38,11 +39,11 @@ class SOAROrchestrator:
                 'max_execution_time': 300,
                 'actions': [
                     {'step': 1, 'action': 'isolate_infected_systems', 'timeout': 30},
-                    {'step': 2, 'action': 'collect_forensic_evidence', 'timeout': 60},
-                    {'step': 3, 'action': 'analyze_malware_sample', 'timeout': 120},
-                    {'step': 4, 'action': 'update_threat_intelligence', 'timeout': 30},
-                    {'step': 5, 'action': 'notify_security_team', 'timeout': 15},
-                    {'step': 6, 'action': 'generate_incident_report', 'timeout': 45}
+                    {'step': 2, 'action': 'collect_forensic_evidence', 'timeout': 60, 'depends_on': [1]},
+                    {'step': 3, 'action': 'analyze_malware_sample', 'timeout': 120, 'depends_on': [2]},
+                    {'step': 4, 'action': 'update_threat_intelligence', 'timeout': 30, 'depends_on': [3]},
+                    {'step': 5, 'action': 'notify_security_team', 'timeout': 15, 'depends_on': []},
+                    {'step': 6, 'action': 'generate_incident_report', 'timeout': 45, 'depends_on': [4, 5]}
                 ]
             },
             'network_intrusion_response': {
@@ -52,11 +53,11 @@ class SOAROrchestrator:
                 'max_execution_time': 600,
                 'actions': [
                     {'step': 1, 'action': 'block_source_ip_firewall', 'timeout': 15},
-                    {'step': 2, 'action': 'analyze_network_traffic', 'timeout': 180},
-                    {'step': 3, 'action': 'check_compromised_accounts', 'timeout': 120},
-                    {'step': 4, 'action': 'reset_affected_credentials', 'timeout': 60},
-                    {'step': 5, 'action': 'deploy_additional_monitoring', 'timeout': 90},
-                    {'step': 6, 'action': 'notify_compliance_team', 'timeout': 30}
+                    {'step': 2, 'action': 'analyze_network_traffic', 'timeout': 180, 'depends_on': [1]},
+                    {'step': 3, 'action': 'check_compromised_accounts', 'timeout': 120, 'depends_on': []},
+                    {'step': 4, 'action': 'reset_affected_credentials', 'timeout': 60, 'depends_on': [3]},
+                    {'step': 5, 'action': 'deploy_additional_monitoring', 'timeout': 90, 'depends_on': [1]},
+                    {'step': 6, 'action': 'notify_compliance_team', 'timeout': 30, 'depends_on': []}
                 ]
             },
             'data_exfiltration_response': {
@@ -66,11 +67,11 @@ class SOAROrchestrator:
                 'max_execution_time': 900,
                 'actions': [
                     {'step': 1, 'action': 'block_outbound_connections', 'timeout': 10},
-                    {'step': 2, 'action': 'identify_affected_data', 'timeout': 300},
-                    {'step': 3, 'action': 'notify_data_protection_officer', 'timeout': 15},
-                    {'step': 4, 'action': 'initiate_legal_hold', 'timeout': 60},
-                    {'step': 5, 'action': 'assess_regulatory_impact', 'timeout': 240},
-                    {'step': 6, 'action': 'prepare_breach_notification', 'timeout': 180}
+                    {'step': 2, 'action': 'identify_affected_data', 'timeout': 300, 'depends_on': [1]},
+                    {'step': 3, 'action': 'notify_data_protection_officer', 'timeout': 15, 'depends_on': []},
+                    {'step': 4, 'action': 'initiate_legal_hold', 'timeout': 60, 'depends_on': [1]},
+                    {'step': 5, 'action': 'assess_regulatory_impact', 'timeout': 240, 'depends_on': [2]},
+                    {'step': 6, 'action': 'prepare_breach_notification', 'timeout': 180, 'depends_on': [3, 5]}
                 ]
             },
             'iot_device_compromise': {
@@ -80,10 +81,10 @@ class SOAROrchestrator:
                 'max_execution_time': 300,
                 'actions': [
                     {'step': 1, 'action': 'isolate_iot_device', 'timeout': 20},
-                    {'step': 2, 'action': 'analyze_device_logs', 'timeout': 90},
-                    {'step': 3, 'action': 'check_firmware_integrity', 'timeout': 60},
-                    {'step': 4, 'action': 'update_device_security', 'timeout': 120},
-                    {'step': 5, 'action': 'restore_device_operation', 'timeout': 45}
+                    {'step': 2, 'action': 'analyze_device_logs', 'timeout': 90, 'depends_on': [1]},
+                    {'step': 3, 'action': 'check_firmware_integrity', 'timeout': 60, 'depends_on': [1]},
+                    {'step': 4, 'action': 'update_device_security', 'timeout': 120, 'depends_on': [2, 3]},
+                    {'step': 5, 'action': 'restore_device_operation', 'timeout': 45, 'depends_on': [4]}
                 ]
             }
         }
@@ -93,7 +94,12 @@ class SOAROrchestrator:
         playbook = self._select_playbook(incident_type)
         if not playbook:
             return {'status': 'error', 'message': 'No suitable playbook found'}
-        
+
+        try:
+            self._resolve_dependencies(playbook['actions'])
+        except ValueError as e:
+            return {'status': 'error', 'message': f'Invalid playbook graph: {e}'}
+
         incident_id = f"SOAR-{int(datetime.now().timestamp())}"
         logger.info(f"🎭 Démarrage playbook {incident_type} pour incident {incident_id}")
         
@@ -104,6 +110,7 @@ class SOAROrchestrator:
             'status': 'running',
             'actions_completed': [],
             'actions_failed': [],
+            'actions_skipped': [],
             'total_execution_time': 0
         }
         
@@ -112,46 +119,17 @@ class SOAROrchestrator:
         # Enrichir avec Threat Intelligence
         enriched_data = await self._enrich_with_threat_intel(incident_data)
         
-        # Exécuter les actions du playbook
-        for action in playbook['actions']:
-            try:
-                action_result = await self._execute_action(
-                    action['action'], 
-                    enriched_data, 
-                    timeout=action['timeout']
-                )
-                
-                execution_log['actions_completed'].append({
-                    'step': action['step'],
-                    'action': action['action'],
-                    'result': action_result,
-                    'timestamp': datetime.now().isoformat()
-                })
-                
-                logger.info(f"✅ Action {action['step']} completed: {action['action']}")
-                
-            except Exception as e:
-                execution_log['actions_failed'].append({
-                    'step': action['step'],
-                    'action': action['action'],
-                    'error': str(e),
-                    'timestamp': datetime.now().isoformat()
-                })
-                
-                logger.error(f"❌ Action {action['step']} failed: {action['action']} - {e}")
-                
-                # Stop on critical failures
-                if playbook['automation_level'] == 'manual_approval':
-                    break
-        
+        # Exécuter les actions du playbook selon leur graphe de dépendances
+        await self._execute_action_graph(playbook, enriched_data, execution_log)
+
         end_time = datetime.now()
         execution_log['end_time'] = end_time.isoformat()
         execution_log['total_execution_time'] = (end_time - start_time).total_seconds()
         execution_log['status'] = 'completed'
-        
+
         # Mettre à jour les métriques
         self.response_metrics['incidents'] += 1
-        if len(execution_log['actions_failed']) == 0:
+        if not execution_log['actions_failed'] and not execution_log['actions_skipped']:
             self.response_metrics['automated'] += 1
         else:
             self.response_metrics['manual'] += 1
@@ -160,6 +138,128 @@ class SOAROrchestrator:
         
         return execution_log
     
+    @staticmethod
+    def _resolve_dependencies(actions: List[Dict[str, Any]]) -> Dict[int, Set[int]]:
+        """Construire le graphe de dépendances des étapes d'un playbook
+
+        Une étape sans 'depends_on' dépend de l'étape précédente (exécution séquentielle).
+        Cette dépendance implicite n'impose que l'ordre: comme avec l'exécuteur
+        séquentiel, l'étape s'exécute même si la précédente a échoué. Une dépendance
+        explicite exige le succès de l'étape dont elle dépend.
+        """
+        steps = [action['step'] for action in actions]
+        dependencies = {}
+        for index, action in enumerate(actions):
+            if 'depends_on' in action:
+                dependencies[action['step']] = set(action['depends_on'])
+            else:
+                dependencies[action['step']] = {steps[index - 1]} if index > 0 else set()
+
+        for step, deps in dependencies.items():
+            unknown = deps - set(steps)
+            if unknown:
+                raise ValueError(f"Étape {step}: dépendances inconnues {sorted(unknown)}")
+
+        # Détection de cycle (tri topologique de Kahn)
+        remaining = {step: set(deps) for step, deps in dependencies.items()}
+        while remaining:
+            ready = [step for step, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Cycle de dépendances entre les étapes {sorted(remaining)}")
+            for step in ready:
+                del remaining[step]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+
+        return dependencies
+
+    async def _execute_action_graph(self, playbook: Dict[str, Any], enriched_data: Dict[str, Any],
+                                    execution_log: Dict[str, Any]):
+        """Exécuter les actions en DAG: chaque étape prête est lancée en parallèle
+
+        Une étape en échec bloque les étapes qui la déclarent dans 'depends_on'; les
+        étapes sans 'depends_on' attendent seulement qu'elle soit terminée.
+        """
+        actions = {action['step']: action for action in playbook['actions']}
+        pending = self._resolve_dependencies(playbook['actions'])
+        completed = set()
+        finished = set()  # Étapes terminées, en succès ou en échec
+        running = {}
+        halted = False
+        semaphore = asyncio.Semaphore(self.max_parallel_actions)
+        loop = asyncio.get_running_loop()
+
+        def schedule_ready_steps():
+            for step in [step for step, deps in pending.items()
+                         if deps <= (completed if 'depends_on' in actions[step] else finished)]:
+                del pending[step]
+                task = asyncio.create_task(
+                    self._run_step(actions[step], enriched_data, semaphore, ready_at=loop.time())
+                )
+                running[task] = step
+
+        schedule_ready_steps()
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                step = running.pop(task)
+                step_log = task.result()
+                finished.add(step)
+
+                if 'error' in step_log:
+                    execution_log['actions_failed'].append(step_log)
+                    logger.error(f"❌ Action {step} failed: {step_log['action']} - {step_log['error']}")
+
+                    # Stop on critical failures
+                    if playbook['automation_level'] == 'manual_approval':
+                        halted = True
+                else:
+                    completed.add(step)
+                    execution_log['actions_completed'].append(step_log)
+                    logger.info(f"✅ Action {step} completed: {step_log['action']} "
+                                f"(attente {step_log['queue_time']:.2f}s, exécution {step_log['run_time']:.2f}s)")
+
+            if not halted:
+                schedule_ready_steps()
+
+        # Étapes jamais lancées: dépendance en échec ou arrêt du playbook
+        for step, deps in sorted(pending.items()):
+            execution_log['actions_skipped'].append({
+                'step': step,
+                'action': actions[step]['action'],
+                'reason': 'playbook_halted' if halted else 'dependency_failed',
+                'blocked_by': sorted(deps - completed),
+                'timestamp': datetime.now().isoformat()
+            })
+
+    async def _run_step(self, action: Dict[str, Any], enriched_data: Dict[str, Any],
+                        semaphore: asyncio.Semaphore, ready_at: float) -> Dict[str, Any]:
+        """Exécuter une étape avec son délai maximal et mesurer attente/exécution"""
+        loop = asyncio.get_running_loop()
+        step_log = {
+            'step': action['step'],
+            'action': action['action'],
+            'depends_on': action.get('depends_on')
+        }
+
+        async with semaphore:
+            started_at = loop.time()
+            try:
+                step_log['result'] = await asyncio.wait_for(
+                    self._execute_action(action['action'], enriched_data, timeout=action['timeout']),
+                    timeout=action['timeout']
+                )
+            except asyncio.TimeoutError:
+                step_log['error'] = f"Timeout après {action['timeout']}s"
+            except Exception as e:
+                step_log['error'] = str(e)
+            finished_at = loop.time()
+
+        step_log['queue_time'] = started_at - ready_at
+        step_log['run_time'] = finished_at - started_at
+        step_log['timestamp'] = datetime.now().isoformat()
+        return step_log
+
     def _select_playbook(self, incident_type: str) -> Dict[str, Any]:
         """Sélectionner le playbook approprié"""
         for playbook_name, playbook in self.playbooks.items():
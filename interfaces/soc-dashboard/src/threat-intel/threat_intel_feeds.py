@@ -11,25 +11,62 @@ import asyncio
 import aiohttp
 import json
 import sqlite3
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 import hashlib
 import logging
-from typing import Dict, List, Any, Optional
+import os
+import tempfile
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
 import xml.etree.ElementTree as ET
 
 logger = logging.getLogger('ThreatIntelFeeds')
 
+# Champs d'un indicateur pris en compte pour détecter une modification
+INDICATOR_CONTENT_FIELDS = ('type', 'threat_type', 'severity', 'confidence', 'description', 'tags', 'metadata')
+
+@dataclass
+class FeedCursor:
+    """Curseur de synchronisation incrémentale d'un feed"""
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    since: Optional[str] = None
+
+@dataclass
+class FeedFetchResult:
+    """Résultat d'une récupération de feed"""
+    indicators: List[Dict[str, Any]] = field(default_factory=list)
+    cursor: FeedCursor = field(default_factory=FeedCursor)
+    not_modified: bool = False
+    full_snapshot: bool = True
+
 class ThreatIntelligenceManager:
     """Gestionnaire des flux de Threat Intelligence"""
     
-    def __init__(self, db_path: str = "threat_intelligence.db"):
+    def __init__(self, db_path: str = "threat_intelligence.db",
+                 feeds_config: Optional[Dict[str, Dict[str, Any]]] = None,
+                 live_fetch: bool = False,
+                 max_concurrent_fetches: int = 4,
+                 indicator_ttl: int = 7 * 86400):
         self.db_path = db_path
-        self.feeds_config = self._setup_feeds_configuration()
+        self.feeds_config = feeds_config or self._setup_feeds_configuration()
+        self.live_fetch = live_fetch  # False: données simulées, True: requêtes HTTP réelles
+        self.indicator_ttl = indicator_ttl  # Secondes avant suppression d'un indicateur disparu
+        self.max_concurrent_fetches = max_concurrent_fetches
         self.indicators_cache = {}
+        self._feed_semaphores: Dict[str, asyncio.Semaphore] = {}
         self._setup_database()
-        
+
     def _setup_feeds_configuration(self) -> Dict[str, Dict[str, Any]]:
-        """Configuration des flux de renseignement"""
+        """Configuration des flux de renseignement
+
+        Paramètres de récupération optionnels par feed:
+        - cursor_mode: 'etag' (ETag/Last-Modified, instantané complet) ou 'since' (delta horodaté)
+        - fetch_concurrency: récupérations simultanées autorisées pour ce feed (défaut 1)
+        - max_retries / retry_backoff: nombre de tentatives et délai exponentiel de base (s)
+        - timeout: délai maximal d'une requête HTTP (s)
+        """
         return {
             'anssi_cert_fr': {
                 'name': 'ANSSI CERT-FR',
@@ -45,7 +82,9 @@ class ThreatIntelligenceManager:
                 'format': 'json',
                 'update_interval': 1800,  # 30 minutes
                 'classification': 'TLP:AMBER',
-                'api_key': 'demo-api-key-misp-2024'
+                'api_key': 'demo-api-key-misp-2024',
+                'cursor_mode': 'since',
+                'since_param': 'timestamp'
             },
             'virustotal': {
                 'name': 'VirusTotal Intelligence',
@@ -119,17 +158,59 @@ class ThreatIntelligenceManager:
                 status TEXT
             )
         ''')
-        
+
+        # Table des curseurs de synchronisation incrémentale
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS feed_cursors (
+                feed_name TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                since TEXT,
+                updated_at TIMESTAMP
+            )
+        ''')
+
+        # Colonnes de suivi des modifications (migration des bases existantes)
+        existing_columns = {row[1] for row in cursor.execute('PRAGMA table_info(threat_indicators)')}
+        for column, column_type in (('content_hash', 'TEXT'), ('expires_at', 'TIMESTAMP')):
+            if column not in existing_columns:
+                cursor.execute(f'ALTER TABLE threat_indicators ADD COLUMN {column} {column_type}')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_indicators_source ON threat_indicators (source)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_indicators_expires ON threat_indicators (expires_at)')
+
+        # Appartenance d'un indicateur à chaque feed: un même indicateur publié par
+        # plusieurs feeds n'a qu'une ligne dans threat_indicators (valeur unique),
+        # mais chaque feed suit sa propre empreinte et sa propre expiration
+        sources_table_exists = cursor.execute('''
+            SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'indicator_sources'
+        ''').fetchone()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS indicator_sources (
+                source TEXT NOT NULL,
+                indicator_value TEXT NOT NULL,
+                content_hash TEXT,
+                expires_at TIMESTAMP,
+                PRIMARY KEY (source, indicator_value)
+            )
+        ''')
+        if not sources_table_exists:
+            cursor.execute('''
+                INSERT OR IGNORE INTO indicator_sources (source, indicator_value, content_hash, expires_at)
+                SELECT source, indicator_value, content_hash, expires_at
+                FROM threat_indicators WHERE source IS NOT NULL
+            ''')
+
         conn.commit()
         conn.close()
-        
+
     async def update_all_feeds(self):
         """Mettre à jour tous les flux de renseignement"""
         logger.info("🔄 Mise à jour des flux Threat Intelligence")
         
+        fetch_semaphore = asyncio.Semaphore(self.max_concurrent_fetches)
         update_tasks = []
         for feed_name, config in self.feeds_config.items():
-            task = asyncio.create_task(self._update_feed(feed_name, config))
+            task = asyncio.create_task(self._update_feed(feed_name, config, fetch_semaphore))
             update_tasks.append(task)
         
         results = await asyncio.gather(*update_tasks, return_exceptions=True)
@@ -142,25 +223,102 @@ class ThreatIntelligenceManager:
             else:
                 successful_updates += 1
                 logger.info(f"✅ Feed {feed_name} mis à jour: {result} indicateurs")
-        
+
+        # Purger les indicateurs disparus dont le TTL est écoulé
+        self.sweep_expired_indicators()
+
         logger.info(f"📊 Mise à jour terminée: {successful_updates}/{len(self.feeds_config)} feeds")
         return successful_updates
     
-    async def _update_feed(self, feed_name: str, config: Dict[str, Any]) -> int:
-        """Mettre à jour un flux spécifique"""
-        
-        # Simuler la récupération de données (en production, requête HTTP réelle)
-        indicators = await self._fetch_feed_data(feed_name, config)
-        
-        # Stocker les indicateurs
-        stored_count = self._store_indicators(feed_name, indicators)
-        
-        # Mettre à jour le statut du feed
-        self._update_feed_status(feed_name, stored_count)
-        
-        return stored_count
-    
-    async def _fetch_feed_data(self, feed_name: str, config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    async def _update_feed(self, feed_name: str, config: Dict[str, Any],
+                           fetch_semaphore: Optional[asyncio.Semaphore] = None) -> int:
+        """Mettre à jour un flux spécifique de manière incrémentale"""
+        if feed_name not in self._feed_semaphores:
+            self._feed_semaphores[feed_name] = asyncio.Semaphore(config.get('fetch_concurrency', 1))
+        feed_semaphore = self._feed_semaphores[feed_name]
+        fetch_semaphore = fetch_semaphore or asyncio.Semaphore(self.max_concurrent_fetches)
+
+        async with feed_semaphore, fetch_semaphore:
+            cursor = self._load_cursor(feed_name)
+            result = await self._fetch_with_retry(feed_name, config, cursor)
+
+        if result.not_modified:
+            self._update_feed_status(feed_name, 0, 'not_modified')
+            return 0
+
+        # Appliquer uniquement les indicateurs nouveaux ou modifiés
+        applied_count = self._apply_indicator_delta(feed_name, result.indicators, result.full_snapshot)
+
+        # Le curseur n'avance qu'après application réussie du delta
+        self._save_cursor(feed_name, result.cursor)
+        self._update_feed_status(feed_name, applied_count)
+
+        return applied_count
+
+    async def _fetch_with_retry(self, feed_name: str, config: Dict[str, Any],
+                                cursor: FeedCursor) -> FeedFetchResult:
+        """Récupérer un flux avec tentatives et backoff exponentiel"""
+        max_retries = config.get('max_retries', 3)
+        retry_backoff = config.get('retry_backoff', 1.0)
+
+        for attempt in range(max_retries + 1):
+            try:
+                if self.live_fetch:
+                    return await self._fetch_feed_http(feed_name, config, cursor)
+                return await self._fetch_feed_data(feed_name, config, cursor)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt >= max_retries:
+                    raise
+                delay = retry_backoff * (2 ** attempt)
+                logger.warning(f"⚠️  Feed {feed_name}: tentative {attempt + 1} échouée ({e}), "
+                               f"nouvel essai dans {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def _fetch_feed_http(self, feed_name: str, config: Dict[str, Any],
+                               cursor: FeedCursor) -> FeedFetchResult:
+        """Récupération HTTP conditionnelle (ETag, Last-Modified ou since)"""
+        headers = {'Accept': 'application/json'}
+        params = {}
+        if config.get('api_key'):
+            headers['Authorization'] = config['api_key']
+        if cursor.etag:
+            headers['If-None-Match'] = cursor.etag
+        if cursor.last_modified:
+            headers['If-Modified-Since'] = cursor.last_modified
+
+        delta_mode = config.get('cursor_mode', 'etag') == 'since'
+        if delta_mode and cursor.since:
+            params[config.get('since_param', 'since')] = cursor.since
+
+        fetch_started = datetime.utcnow().isoformat()
+        timeout = aiohttp.ClientTimeout(total=config.get('timeout', 30))
+
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with session.get(config['url'], headers=headers, params=params) as response:
+                if response.status == 304:
+                    return FeedFetchResult(cursor=cursor, not_modified=True)
+                response.raise_for_status()
+                payload = await response.json(content_type=None)
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+
+        if isinstance(payload, dict):
+            indicators = payload.get('indicators', [])
+            next_since = payload.get('next_since', fetch_started)
+        else:
+            indicators = payload
+            next_since = fetch_started
+
+        return FeedFetchResult(
+            indicators=indicators,
+            cursor=FeedCursor(etag=etag, last_modified=last_modified,
+                              since=next_since if delta_mode else None),
+            # Un delta "since" ne contient que les changements: une absence n'est pas une disparition
+            full_snapshot=not (delta_mode and cursor.since)
+        )
+
+    async def _fetch_feed_data(self, feed_name: str, config: Dict[str, Any],
+                               cursor: Optional[FeedCursor] = None) -> FeedFetchResult:
         """Récupérer les données d'un flux (simulation)"""
         
         # Données simulées basées sur les feeds réels
@@ -244,23 +402,109 @@ class ThreatIntelligenceManager:
         
         # Simuler délai réseau
         await asyncio.sleep(0.5)
-        
-        return simulated_data.get(feed_name, [])
-    
-    def _store_indicators(self, source: str, indicators: List[Dict[str, Any]]) -> int:
-        """Stocker les indicateurs dans la base"""
+
+        indicators = simulated_data.get(feed_name, [])
+
+        # ETag simulé: empreinte du contenu, comme le calculerait le serveur
+        etag = hashlib.sha256(json.dumps(indicators, sort_keys=True).encode()).hexdigest()
+        if cursor and cursor.etag == etag:
+            return FeedFetchResult(cursor=cursor, not_modified=True)
+
+        return FeedFetchResult(indicators=indicators, cursor=FeedCursor(etag=etag))
+
+    @staticmethod
+    def _indicator_hash(indicator: Dict[str, Any]) -> str:
+        """Empreinte du contenu d'un indicateur"""
+        content = {key: indicator.get(key) for key in INDICATOR_CONTENT_FIELDS}
+        return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _apply_indicator_delta(self, source: str, indicators: List[Dict[str, Any]],
+                               full_snapshot: bool = True) -> int:
+        """Appliquer les indicateurs nouveaux ou modifiés et programmer l'expiration des disparus"""
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
-        
-        stored_count = 0
-        
+
+        # Delta calculé sur les indicateurs de ce feed, y compris ceux partagés avec d'autres feeds
+        cursor.execute('''
+            SELECT indicator_value, content_hash, expires_at FROM indicator_sources WHERE source = ?
+        ''', (source,))
+        known = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+
+        changed = []
+        removed = []
+        seen = set()
+
         for indicator in indicators:
+            value = indicator['value']
+            if indicator.get('revoked') or indicator.get('deleted'):
+                removed.append(value)
+                continue
+            seen.add(value)
+            content_hash = self._indicator_hash(indicator)
+            previous = known.get(value)
+            # Indicateur inchangé et toujours actif: aucune écriture
+            if previous and previous[0] == content_hash and previous[1] is None:
+                continue
+            changed.append((indicator, content_hash))
+
+        stored_count = self._store_indicators(source, changed, cursor)
+
+        # Les indicateurs absents d'un instantané complet expirent après le TTL
+        if full_snapshot:
+            removed.extend(value for value, (_, expires_at) in known.items()
+                           if value not in seen and expires_at is None)
+        if removed:
+            expires_at = datetime.now() + timedelta(seconds=self.indicator_ttl)
+            cursor.executemany('''
+                UPDATE indicator_sources SET expires_at = ?
+                WHERE source = ? AND indicator_value = ? AND expires_at IS NULL
+            ''', [(expires_at, source, value) for value in removed])
+            # L'indicateur n'expire que lorsqu'aucun autre feed ne le publie encore
+            cursor.executemany('''
+                UPDATE threat_indicators SET expires_at = (
+                    SELECT MAX(s.expires_at) FROM indicator_sources s
+                    WHERE s.indicator_value = threat_indicators.indicator_value
+                )
+                WHERE indicator_value = ? AND NOT EXISTS (
+                    SELECT 1 FROM indicator_sources s
+                    WHERE s.indicator_value = threat_indicators.indicator_value AND s.expires_at IS NULL
+                )
+            ''', [(value,) for value in removed])
+
+        conn.commit()
+        conn.close()
+
+        if removed:
+            logger.info(f"⏳ {source}: {len(removed)} indicateurs disparus programmés pour expiration")
+        return stored_count
+
+    def _store_indicators(self, source: str, indicators: List[Tuple[Dict[str, Any], str]],
+                          cursor: sqlite3.Cursor) -> int:
+        """Stocker les indicateurs (indicateur, empreinte) dans la base"""
+        stored_count = 0
+        now = datetime.now()
+
+        for indicator, content_hash in indicators:
             try:
                 cursor.execute('''
-                    INSERT OR REPLACE INTO threat_indicators 
-                    (indicator_type, indicator_value, threat_type, severity, confidence, 
-                     source, classification, description, first_seen, last_seen, tags, metadata)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    INSERT INTO threat_indicators
+                    (indicator_type, indicator_value, threat_type, severity, confidence,
+                     source, classification, description, first_seen, last_seen, tags, metadata,
+                     content_hash, expires_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, NULL)
+                    ON CONFLICT(indicator_value) DO UPDATE SET
+                        indicator_type = excluded.indicator_type,
+                        threat_type = excluded.threat_type,
+                        severity = excluded.severity,
+                        confidence = excluded.confidence,
+                        source = excluded.source,
+                        classification = excluded.classification,
+                        description = excluded.description,
+                        last_seen = excluded.last_seen,
+                        tags = excluded.tags,
+                        metadata = excluded.metadata,
+                        content_hash = excluded.content_hash,
+                        expires_at = NULL
                 ''', (
                     indicator['type'],
                     indicator['value'],
@@ -270,35 +514,81 @@ class ThreatIntelligenceManager:
                     source,
                     self.feeds_config[source].get('classification', 'TLP:WHITE'),
                     indicator.get('description', ''),
-                    datetime.now(),
-                    datetime.now(),
+                    now,
+                    now,
                     json.dumps(indicator.get('tags', [])),
-                    json.dumps(indicator.get('metadata', {}))
+                    json.dumps(indicator.get('metadata', {})),
+                    content_hash
                 ))
+                cursor.execute('''
+                    INSERT INTO indicator_sources (source, indicator_value, content_hash, expires_at)
+                    VALUES (?, ?, ?, NULL)
+                    ON CONFLICT(source, indicator_value) DO UPDATE SET
+                        content_hash = excluded.content_hash,
+                        expires_at = NULL
+                ''', (source, indicator['value'], content_hash))
                 stored_count += 1
-                
+
             except sqlite3.Error as e:
                 logger.warning(f"⚠️  Erreur stockage indicateur {indicator['value']}: {e}")
-        
+
+        return stored_count
+
+    def sweep_expired_indicators(self) -> int:
+        """Supprimer les indicateurs dont le TTL d'expiration est écoulé"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        now = datetime.now()
+        cursor.execute('''
+            DELETE FROM indicator_sources WHERE expires_at IS NOT NULL AND expires_at <= ?
+        ''', (now,))
+        cursor.execute('''
+            DELETE FROM threat_indicators WHERE expires_at IS NOT NULL AND expires_at <= ?
+        ''', (now,))
+        removed_count = cursor.rowcount
+
         conn.commit()
         conn.close()
-        
-        return stored_count
-    
-    def _update_feed_status(self, feed_name: str, indicators_count: int):
+
+        if removed_count:
+            logger.info(f"🧹 {removed_count} indicateurs expirés supprimés")
+        return removed_count
+
+    def _load_cursor(self, feed_name: str) -> FeedCursor:
+        """Charger le curseur de synchronisation d'un feed"""
+        conn = sqlite3.connect(self.db_path)
+        row = conn.execute('''
+            SELECT etag, last_modified, since FROM feed_cursors WHERE feed_name = ?
+        ''', (feed_name,)).fetchone()
+        conn.close()
+
+        return FeedCursor(*row) if row else FeedCursor()
+
+    def _save_cursor(self, feed_name: str, feed_cursor: FeedCursor):
+        """Enregistrer le curseur de synchronisation d'un feed"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''
+            INSERT OR REPLACE INTO feed_cursors (feed_name, etag, last_modified, since, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (feed_name, feed_cursor.etag, feed_cursor.last_modified, feed_cursor.since, datetime.now()))
+        conn.commit()
+        conn.close()
+
+    def _update_feed_status(self, feed_name: str, indicators_count: int, status: str = 'success'):
         """Mettre à jour le statut d'un feed"""
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
-        
+
         cursor.execute('''
-            INSERT OR REPLACE INTO feed_updates 
+            INSERT OR REPLACE INTO feed_updates
             (feed_name, last_update, indicators_count, status)
             VALUES (?, ?, ?, ?)
-        ''', (feed_name, datetime.now(), indicators_count, 'success'))
-        
+        ''', (feed_name, datetime.now(), indicators_count, status))
+
         conn.commit()
         conn.close()
-    
+
     async def enrich_incident(self, incident_data: Dict[str, Any]) -> Dict[str, Any]:
         """Enrichir un incident avec Threat Intelligence"""
         enriched = incident_data.copy()
@@ -367,7 +657,8 @@ class ThreatIntelligenceManager:
         cursor.execute('''
             SELECT * FROM threat_indicators 
             WHERE indicator_type = ? AND indicator_value = ?
-        ''', (indicator_type, indicator_value))
+              AND (expires_at IS NULL OR expires_at > ?)
+        ''', (indicator_type, indicator_value, datetime.now()))
         
         rows = cursor.fetchall()
         conn.close()
@@ -442,6 +733,101 @@ class ThreatIntelligenceManager:
         }
 
 # Test et démonstration
+class ThreatFeedStandInServer:
+    """Serveur HTTP minimal servant des feeds de test pour la synchronisation incrémentale
+
+    Chaque chemin sert un feed en mode 'etag' (instantané complet avec ETag,
+    304 si inchangé) ou 'since' (indicateurs modifiés ou révoqués depuis une
+    révision donnée, renvoyée dans next_since).
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        self.host = host
+        self.port = port
+        self.feeds: Dict[str, Dict[str, Any]] = {}  # chemin -> mode, paramètre since, indicateurs
+        self.revision = 0
+        self.stats = {'requests': 0, 'not_modified': 0, 'delta_requests': 0, 'indicators_served': 0}
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def add_feed(self, path: str, mode: str = 'etag', since_param: str = 'since'):
+        self.feeds[path] = {'mode': mode, 'since_param': since_param, 'indicators': {}}
+
+    def publish(self, path: str, indicator: Dict[str, Any]):
+        """Ajouter ou modifier un indicateur"""
+        self.revision += 1
+        self.feeds[path]['indicators'][indicator['value']] = (self.revision, indicator)
+
+    def revoke(self, path: str, value: str):
+        """Révoquer un indicateur (retiré de l'instantané, signalé dans les deltas)"""
+        self.revision += 1
+        self.feeds[path]['indicators'][value] = (self.revision, {'value': value, 'revoked': True})
+
+    def url(self, path: str) -> str:
+        return f"http://{self.host}:{self.port}{path}"
+
+    async def start(self) -> int:
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = (await reader.readline()).decode('latin-1')
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode('latin-1')
+                if line in ('\r\n', '\n', ''):
+                    break
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+            method, target, _ = request_line.split(' ', 2)
+            status, response_headers, body = self._respond(method, target, headers)
+            reason = {200: 'OK', 304: 'Not Modified', 404: 'Not Found'}[status]
+            head = [f"HTTP/1.1 {status} {reason}", 'Content-Type: application/json',
+                    f"Content-Length: {len(body)}", 'Connection: close']
+            head.extend(f"{name}: {value}" for name, value in response_headers.items())
+            writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+            await writer.drain()
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    def _respond(self, method: str, target: str, headers: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        self.stats['requests'] += 1
+        url = urlsplit(target)
+        feed = self.feeds.get(url.path)
+        if method != 'GET' or feed is None:
+            return 404, {}, b''
+
+        entries = feed['indicators'].values()
+        if feed['mode'] == 'since':
+            since = parse_qs(url.query).get(feed['since_param'], ['0'])[0]
+            since = int(since) if since.isdigit() else 0
+            if since:
+                self.stats['delta_requests'] += 1
+                indicators = [indicator for revision, indicator in entries if revision > since]
+            else:
+                indicators = [indicator for _, indicator in entries if not indicator.get('revoked')]
+            self.stats['indicators_served'] += len(indicators)
+            payload = {'indicators': indicators, 'next_since': str(self.revision)}
+            return 200, {}, json.dumps(payload).encode()
+
+        snapshot = [indicator for _, indicator in entries if not indicator.get('revoked')]
+        body = json.dumps(snapshot, sort_keys=True).encode()
+        etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+        if headers.get('if-none-match') == etag:
+            self.stats['not_modified'] += 1
+            return 304, {'ETag': etag}, b''
+        self.stats['indicators_served'] += len(snapshot)
+        return 200, {'ETag': etag}, body
+
 async def test_threat_intelligence():
     """Test complet du système Threat Intelligence"""
     ti_manager = ThreatIntelligenceManager()
@@ -499,7 +885,59 @@ async def test_threat_intelligence():
     print(f"   Feeds actifs: {stats['active_feeds']}")
     print(f"   Types d'indicateurs: {stats['indicators_by_type']}")
     print(f"   Répartition sévérité: {stats['indicators_by_severity']}")
-    
+
+    # Synchronisation HTTP incrémentale (ETag/304 et curseur since) contre un serveur local
+    print("\n🌐 Synchronisation HTTP contre un serveur de feeds local...")
+    feed_server = ThreatFeedStandInServer()
+    feed_server.add_feed('/anssi', mode='etag')
+    feed_server.add_feed('/misp', mode='since', since_param='timestamp')
+    shared_ip = {'type': 'ip', 'value': '185.220.101.45', 'threat_type': 'exploitation',
+                 'severity': 'critical', 'confidence': 95}
+    feed_server.publish('/anssi', shared_ip)
+    feed_server.publish('/anssi', {'type': 'domain', 'value': 'malicious-station-attack.com',
+                                   'threat_type': 'malware_c2', 'severity': 'high', 'confidence': 90})
+    feed_server.publish('/misp', dict(shared_ip, confidence=80))  # Indicateur publié par les deux feeds
+    feed_server.publish('/misp', {'type': 'url', 'value': 'http://traffeyere-admin-portal.tk/login',
+                                  'threat_type': 'credential_harvesting', 'severity': 'high', 'confidence': 80})
+    await feed_server.start()
+
+    try:
+        with tempfile.TemporaryDirectory() as live_dir:
+            live_manager = ThreatIntelligenceManager(
+                db_path=os.path.join(live_dir, 'threat_intelligence_live.db'),
+                feeds_config={
+                    'anssi_local': {'name': 'ANSSI (local)', 'url': feed_server.url('/anssi'),
+                                    'format': 'json', 'classification': 'TLP:WHITE', 'max_retries': 0},
+                    'misp_local': {'name': 'MISP (local)', 'url': feed_server.url('/misp'),
+                                   'format': 'json', 'classification': 'TLP:AMBER', 'max_retries': 0,
+                                   'cursor_mode': 'since', 'since_param': 'timestamp'}
+                },
+                live_fetch=True
+            )
+
+            async def sync_round(label: str):
+                await live_manager.update_all_feeds()
+                feeds = live_manager.get_statistics()['feeds_status']
+                print(f"   {label}: " + ', '.join(
+                    f"{feed['name']} {feed['status']} ({feed['indicators_count']} appliqués)" for feed in feeds))
+
+            await sync_round("Synchronisation initiale")
+            await sync_round("Sans changement")
+
+            feed_server.publish('/anssi', {'type': 'domain', 'value': 'malicious-station-attack.com',
+                                           'threat_type': 'malware_c2', 'severity': 'critical', 'confidence': 95})
+            feed_server.publish('/misp', {'type': 'email', 'value': 'admin@traffeyere-fake.com',
+                                          'threat_type': 'phishing', 'severity': 'medium', 'confidence': 75})
+            feed_server.revoke('/misp', 'http://traffeyere-admin-portal.tk/login')
+            await sync_round("Après modifications")
+
+            print(f"   📡 Serveur: {feed_server.stats['requests']} requêtes, "
+                  f"{feed_server.stats['not_modified']} réponses 304, "
+                  f"{feed_server.stats['delta_requests']} deltas since, "
+                  f"{feed_server.stats['indicators_served']} indicateurs transférés")
+    finally:
+        await feed_server.stop()
+
     return enriched_incidents, stats
 
 if __name__ == "__main__":
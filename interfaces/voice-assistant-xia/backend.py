@@ -9,9 +9,11 @@ import asyncio
 import json
 import time
 import logging
+from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple, FrozenSet
+from dataclasses import dataclass, field
 from flask import Flask, request, jsonify, render_template
 from flask_socketio import SocketIO, emit
 from flask_cors import CORS
@@ -24,6 +26,20 @@ from threading import Thread, Lock
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Score au-delà duquel un résultat analytics est une anomalie critique
+ANOMALY_SCORE_THRESHOLD = 0.8
+
+@lru_cache(maxsize=256)
+def classify_unit(unit: str) -> FrozenSet[str]:
+    """Types de mesure d'une unité capteur (classification faite une fois à l'ingestion)"""
+    unit_lower = unit.lower()
+    measurements = set()
+    if 'temp' in unit_lower or 'celsius' in unit_lower:
+        measurements.add('temperature')
+    if 'ph' in unit_lower:
+        measurements.add('ph')
+    return frozenset(measurements)
+
 @dataclass
 class SensorReading:
     """Lecture capteur IoT"""
@@ -33,6 +49,7 @@ class SensorReading:
     timestamp: datetime
     quality: float = 100.0
     status: str = "online"
+    measurements: FrozenSet[str] = frozenset()
 
 @dataclass  
 class AnalyticsResult:
@@ -44,6 +61,208 @@ class AnalyticsResult:
     explanation: str
     timestamp: datetime
 
+@dataclass(frozen=True)
+class AggregateSnapshot:
+    """Vue immuable des agrégats capteurs (publiée par simple affectation de référence)"""
+    total_sensors: int = 0
+    online_sensors: int = 0
+    avg_quality: float = 0.0
+    measurements: Dict[str, Tuple[int, float]] = field(default_factory=dict)  # type -> (nombre, moyenne)
+    anomalies: FrozenSet[str] = frozenset()
+    last_update: str = 'N/A'
+
+class SensorAggregates:
+    """Agrégats courants des capteurs, maintenus à l'arrivée des lectures
+
+    Les mises à jour (thread MQTT, sous cache_lock) ajustent compteurs et
+    sommes de façon incrémentale - retrait de l'ancienne lecture du capteur,
+    ajout de la nouvelle - puis publient un AggregateSnapshot. Les requêtes
+    vocales et le dashboard lisent snapshot sans verrou, en O(1).
+    """
+
+    def __init__(self):
+        self.total_sensors = 0
+        self.online_sensors = 0
+        self.quality_sum = 0.0
+        self.measurement_counts: Dict[str, int] = defaultdict(int)
+        self.measurement_sums: Dict[str, float] = defaultdict(float)
+        self.anomalies: set = set()
+        self.last_update: Optional[str] = None
+        self._anomalies_view: FrozenSet[str] = frozenset()
+        self.snapshot = AggregateSnapshot()
+
+    def apply_reading(self, previous: Optional[SensorReading], reading: SensorReading):
+        """Remplacer la contribution de previous (None si nouveau capteur) par reading"""
+        if previous is None:
+            self.total_sensors += 1
+        else:
+            self._account(previous, -1)
+        self._account(reading, 1)
+
+        timestamp = reading.timestamp.isoformat()
+        if self.last_update is None or timestamp > self.last_update:
+            self.last_update = timestamp
+        self._publish()
+
+    def apply_analytics(self, sensor_id: str, anomaly_score: float):
+        """Mettre à jour l'ensemble des capteurs en anomalie"""
+        if anomaly_score > ANOMALY_SCORE_THRESHOLD:
+            if sensor_id in self.anomalies:
+                return
+            self.anomalies.add(sensor_id)
+        elif sensor_id in self.anomalies:
+            self.anomalies.discard(sensor_id)
+        else:
+            return
+        self._anomalies_view = frozenset(self.anomalies)
+        self._publish()
+
+    def _account(self, reading: SensorReading, sign: int):
+        if reading.status == 'online':
+            self.online_sensors += sign
+        self.quality_sum += sign * reading.quality
+        for measurement in reading.measurements:
+            self.measurement_counts[measurement] += sign
+            if self.measurement_counts[measurement]:
+                self.measurement_sums[measurement] += sign * reading.value
+            else:
+                # Plus aucun capteur: repartir de zéro (pas de dérive flottante)
+                self.measurement_sums[measurement] = 0.0
+
+    def _publish(self):
+        self.snapshot = AggregateSnapshot(
+            total_sensors=self.total_sensors,
+            online_sensors=self.online_sensors,
+            avg_quality=self.quality_sum / self.total_sensors if self.total_sensors else 0.0,
+            measurements={measurement: (count, self.measurement_sums[measurement] / count)
+                          for measurement, count in self.measurement_counts.items() if count > 0},
+            anomalies=self._anomalies_view,
+            last_update=self.last_update or 'N/A'
+        )
+
+class SensorUpdateScheduler:
+    """Émission Socket.IO et écritures Redis regroupées par trame
+
+    Le thread MQTT se contente d'enregistrer la dernière lecture de chaque
+    capteur. Une tâche de fond émet toutes les frame_interval secondes un seul
+    évènement 'sensor_updates' (une entrée par capteur modifié depuis la trame
+    précédente) puis écrit ces lectures dans Redis en un seul pipeline.
+    """
+
+    def __init__(self, socketio: SocketIO, redis_client=None, frame_interval: float = 0.25,
+                 redis_ttl: int = 300):
+        self.socketio = socketio
+        self.redis_client = redis_client
+        self.frame_interval = frame_interval
+        self.redis_ttl = redis_ttl
+        
+        self._pending: Dict[str, SensorReading] = {}
+        self._lock = Lock()
+        self._running = False
+        
+        self.stats = {
+            'updates_received': 0,
+            'updates_coalesced': 0,
+            'frames_emitted': 0,
+            'sensors_emitted': 0,
+            'redis_batches': 0,
+            'redis_errors': 0,
+            'redis_last_latency_ms': 0.0,
+            'redis_max_latency_ms': 0.0,
+            'redis_total_latency_ms': 0.0
+        }
+
+    def publish(self, reading: SensorReading):
+        """Enregistrer une lecture (appelé depuis le thread MQTT, O(1))"""
+        with self._lock:
+            if reading.sensor_id in self._pending:
+                self.stats['updates_coalesced'] += 1
+            self._pending[reading.sensor_id] = reading
+            self.stats['updates_received'] += 1
+
+    def start(self):
+        """Démarrer la boucle d'émission (tâche de fond Socket.IO)"""
+        if self._running:
+            return
+        self._running = True
+        self.socketio.start_background_task(self._run)
+        logger.info(f"📡 Émission capteurs groupée toutes les {self.frame_interval * 1000:.0f} ms")
+
+    def stop(self):
+        """Arrêter la boucle puis émettre la dernière trame"""
+        self._running = False
+        self.flush()
+
+    def _run(self):
+        while self._running:
+            self.socketio.sleep(self.frame_interval)
+            self.flush()
+
+    def flush(self):
+        """Émettre la trame courante et l'écrire dans Redis"""
+        with self._lock:
+            if not self._pending:
+                return
+            readings, self._pending = self._pending, {}
+        
+        try:
+            self.socketio.emit('sensor_updates', {
+                'updates': [{
+                    'sensor_id': reading.sensor_id,
+                    'value': reading.value,
+                    'unit': reading.unit,
+                    'timestamp': reading.timestamp.isoformat(),
+                    'status': reading.status
+                } for reading in readings.values()],
+                'timestamp': datetime.now().isoformat()
+            })
+            self.stats['frames_emitted'] += 1
+            self.stats['sensors_emitted'] += len(readings)
+        except Exception as e:
+            logger.error(f"Erreur émission sensor_updates: {e}")
+        
+        if self.redis_client:
+            self._write_redis(readings)
+
+    def _write_redis(self, readings: Dict[str, SensorReading]):
+        """Écriture Redis des lectures de la trame en un seul aller-retour"""
+        start = time.perf_counter()
+        try:
+            pipeline = self.redis_client.pipeline(transaction=False)
+            for sensor_id, reading in readings.items():
+                pipeline.setex(
+                    f"sensor:{sensor_id}",
+                    self.redis_ttl,
+                    json.dumps({
+                        'value': reading.value,
+                        'unit': reading.unit,
+                        'timestamp': reading.timestamp.isoformat(),
+                        'quality': reading.quality,
+                        'status': reading.status
+                    })
+                )
+            pipeline.execute()
+            self.stats['redis_batches'] += 1
+        except Exception as e:
+            self.stats['redis_errors'] += 1
+            logger.warning(f"Erreur cache Redis: {e}")
+        finally:
+            latency_ms = (time.perf_counter() - start) * 1000
+            self.stats['redis_last_latency_ms'] = round(latency_ms, 3)
+            self.stats['redis_max_latency_ms'] = round(max(self.stats['redis_max_latency_ms'], latency_ms), 3)
+            self.stats['redis_total_latency_ms'] += latency_ms
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Métriques d'émission et de latence Redis"""
+        metrics = dict(self.stats)
+        writes = metrics['redis_batches'] + metrics['redis_errors']
+        metrics['redis_avg_latency_ms'] = round(metrics.pop('redis_total_latency_ms') / writes, 3) if writes else 0.0
+        metrics['avg_sensors_per_frame'] = (round(metrics['sensors_emitted'] / metrics['frames_emitted'], 1)
+                                            if metrics['frames_emitted'] else 0.0)
+        metrics['frame_interval_ms'] = self.frame_interval * 1000
+        metrics['pending_sensors'] = len(self._pending)
+        return metrics
+
 class XAIBackend:
     """Backend XAI avec intégration IoT temps réel"""
     
@@ -69,6 +288,9 @@ class XAIBackend:
         self.analytics_cache: Dict[str, AnalyticsResult] = {}
         self.cache_lock = Lock()
         
+        # Agrégats temps réel (lecture sans verrou via aggregates.snapshot)
+        self.aggregates = SensorAggregates()
+        
         # Client MQTT
         self.mqtt_client = mqtt.Client()
         self.mqtt_connected = False
@@ -86,6 +308,13 @@ class XAIBackend:
         CORS(self.app)
         self.socketio = SocketIO(self.app, cors_allowed_origins="*")
         
+        # Émission WebSocket / écriture Redis regroupées par trame
+        self.update_scheduler = SensorUpdateScheduler(
+            self.socketio,
+            self.redis_client,
+            frame_interval=int(os.getenv('XAI_EMIT_INTERVAL_MS', '250')) / 1000
+        )
+        
         self._setup_mqtt()
         self._setup_routes()
         self._setup_websocket_events()
@@ -131,43 +360,24 @@ class XAIBackend:
     def _process_sensor_data(self, sensor_id: str, payload: Dict):
         """Traitement données capteur"""
         try:
+            unit = payload.get('unit', '')
             reading = SensorReading(
                 sensor_id=sensor_id,
                 value=float(payload.get('value', 0)),
-                unit=payload.get('unit', ''),
+                unit=unit,
                 timestamp=datetime.fromisoformat(payload.get('timestamp', datetime.now().isoformat())),
                 quality=float(payload.get('quality', 100.0)),
-                status=payload.get('status', 'online')
+                status=payload.get('status', 'online'),
+                measurements=classify_unit(unit)
             )
             
             with self.cache_lock:
+                previous = self.sensor_cache.get(sensor_id)
                 self.sensor_cache[sensor_id] = reading
+                self.aggregates.apply_reading(previous, reading)
                 
-            # Cache Redis si disponible
-            if self.redis_client:
-                try:
-                    self.redis_client.setex(
-                        f"sensor:{sensor_id}",
-                        300,  # 5 minutes TTL
-                        json.dumps({
-                            'value': reading.value,
-                            'unit': reading.unit,
-                            'timestamp': reading.timestamp.isoformat(),
-                            'quality': reading.quality,
-                            'status': reading.status
-                        })
-                    )
-                except Exception as e:
-                    logger.warning(f"Erreur cache Redis: {e}")
-            
-            # Notification WebSocket
-            self.socketio.emit('sensor_update', {
-                'sensor_id': sensor_id,
-                'value': reading.value,
-                'unit': reading.unit,
-                'timestamp': reading.timestamp.isoformat(),
-                'status': reading.status
-            })
+            # Notification WebSocket + cache Redis (5 minutes TTL), regroupés par trame
+            self.update_scheduler.publish(reading)
             
         except Exception as e:
             logger.error(f"Erreur traitement sensor data: {e}")
@@ -186,9 +396,10 @@ class XAIBackend:
             
             with self.cache_lock:
                 self.analytics_cache[sensor_id] = analytics
+                self.aggregates.apply_analytics(sensor_id, analytics.anomaly_score)
                 
             # Notification WebSocket pour anomalies importantes
-            if analytics.anomaly_score > 0.8:
+            if analytics.anomaly_score > ANOMALY_SCORE_THRESHOLD:
                 self.socketio.emit('anomaly_alert', {
                     'sensor_id': sensor_id,
                     'anomaly_score': analytics.anomaly_score,
@@ -213,6 +424,11 @@ class XAIBackend:
                 'timestamp': datetime.now().isoformat()
             })
         
+        @self.app.route('/api/metrics/emission')
+        def emission_metrics():
+            """Métriques d'émission WebSocket et de cache Redis"""
+            return jsonify(self.update_scheduler.get_metrics())
+        
         @self.app.route('/api/sensors')
         def get_sensors():
             """Liste des capteurs"""
@@ -283,18 +499,14 @@ class XAIBackend:
         @self.app.route('/api/dashboard/summary')
         def dashboard_summary():
             """Résumé pour dashboard"""
-            with self.cache_lock:
-                online_sensors = sum(1 for r in self.sensor_cache.values() if r.status == 'online')
-                anomalies = sum(1 for a in self.analytics_cache.values() if a.anomaly_score > 0.8)
-                avg_quality = sum(r.quality for r in self.sensor_cache.values()) / len(self.sensor_cache) if self.sensor_cache else 0
-                
-                return jsonify({
-                    'total_sensors': len(self.sensor_cache),
-                    'online_sensors': online_sensors,
-                    'anomalies_count': anomalies,
-                    'avg_quality': round(avg_quality, 1),
-                    'last_update': max((r.timestamp.isoformat() for r in self.sensor_cache.values()), default='N/A')
-                })
+            snapshot = self.aggregates.snapshot
+            return jsonify({
+                'total_sensors': snapshot.total_sensors,
+                'online_sensors': snapshot.online_sensors,
+                'anomalies_count': len(snapshot.anomalies),
+                'avg_quality': round(snapshot.avg_quality, 1),
+                'last_update': snapshot.last_update
+            })
     
     def _setup_websocket_events(self):
         """Configuration événements WebSocket"""
@@ -360,74 +572,67 @@ class XAIBackend:
         else:
             return "Je n'ai pas compris votre demande. Vous pouvez demander le statut, la température, le pH, ou les alertes."
     
+    # Les réponses vocales lisent aggregates.snapshot et sensor_cache.get sans
+    # prendre cache_lock: aucune contention avec le thread d'ingestion MQTT
+    
     def _get_temperature_response(self, sensor_id: Optional[str]) -> str:
         """Réponse température"""
-        with self.cache_lock:
-            if sensor_id and sensor_id in self.sensor_cache:
-                reading = self.sensor_cache[sensor_id]
-                if 'temp' in reading.unit.lower() or 'celsius' in reading.unit.lower():
-                    return f"La température du capteur {sensor_id} est de {reading.value}°C."
-            
-            # Recherche capteurs température
-            temp_sensors = [r for r in self.sensor_cache.values() 
-                          if 'temp' in r.unit.lower() or 'celsius' in r.unit.lower()]
-            
-            if temp_sensors:
-                avg_temp = sum(r.value for r in temp_sensors) / len(temp_sensors)
-                return f"Température moyenne: {avg_temp:.1f}°C sur {len(temp_sensors)} capteurs."
-            else:
-                return "Aucun capteur de température trouvé."
+        if sensor_id:
+            reading = self.sensor_cache.get(sensor_id)
+            if reading and 'temperature' in reading.measurements:
+                return f"La température du capteur {sensor_id} est de {reading.value}°C."
+        
+        temp_stats = self.aggregates.snapshot.measurements.get('temperature')
+        if temp_stats:
+            count, avg_temp = temp_stats
+            return f"Température moyenne: {avg_temp:.1f}°C sur {count} capteurs."
+        else:
+            return "Aucun capteur de température trouvé."
     
     def _get_ph_response(self, sensor_id: Optional[str]) -> str:
         """Réponse pH"""
-        with self.cache_lock:
-            if sensor_id and sensor_id in self.sensor_cache:
-                reading = self.sensor_cache[sensor_id]
-                if 'ph' in reading.unit.lower():
-                    return f"Le pH du capteur {sensor_id} est de {reading.value}."
-            
-            # Recherche capteurs pH
-            ph_sensors = [r for r in self.sensor_cache.values() if 'ph' in r.unit.lower()]
-            
-            if ph_sensors:
-                avg_ph = sum(r.value for r in ph_sensors) / len(ph_sensors)
-                return f"pH moyen: {avg_ph:.2f} sur {len(ph_sensors)} capteurs."
-            else:
-                return "Aucun capteur de pH trouvé."
+        if sensor_id:
+            reading = self.sensor_cache.get(sensor_id)
+            if reading and 'ph' in reading.measurements:
+                return f"Le pH du capteur {sensor_id} est de {reading.value}."
+        
+        ph_stats = self.aggregates.snapshot.measurements.get('ph')
+        if ph_stats:
+            count, avg_ph = ph_stats
+            return f"pH moyen: {avg_ph:.2f} sur {count} capteurs."
+        else:
+            return "Aucun capteur de pH trouvé."
     
     def _get_status_response(self, sensor_id: Optional[str]) -> str:
         """Réponse statut"""
-        with self.cache_lock:
-            if sensor_id and sensor_id in self.sensor_cache:
-                reading = self.sensor_cache[sensor_id]
+        if sensor_id:
+            reading = self.sensor_cache.get(sensor_id)
+            if reading:
                 return f"Capteur {sensor_id}: {reading.status}, qualité {reading.quality}%."
-            
-            online = sum(1 for r in self.sensor_cache.values() if r.status == 'online')
-            total = len(self.sensor_cache)
-            return f"{online} capteurs en ligne sur {total} total."
+        
+        snapshot = self.aggregates.snapshot
+        return f"{snapshot.online_sensors} capteurs en ligne sur {snapshot.total_sensors} total."
     
     def _get_alerts_response(self) -> str:
         """Réponse alertes"""
-        with self.cache_lock:
-            anomalies = [a for a in self.analytics_cache.values() if a.anomaly_score > 0.8]
-            
-            if not anomalies:
-                return "Aucune alerte critique détectée."
-            
-            if len(anomalies) == 1:
-                alert = anomalies[0]
-                return f"Alerte sur capteur {alert.sensor_id}: {alert.explanation}"
-            else:
-                return f"{len(anomalies)} alertes détectées. Consultez le dashboard pour plus de détails."
+        anomalies = self.aggregates.snapshot.anomalies
+        
+        if not anomalies:
+            return "Aucune alerte critique détectée."
+        
+        if len(anomalies) == 1:
+            sensor_id = next(iter(anomalies))
+            alert = self.analytics_cache.get(sensor_id)
+            explanation = alert.explanation if alert else ''
+            return f"Alerte sur capteur {sensor_id}: {explanation}"
+        else:
+            return f"{len(anomalies)} alertes détectées. Consultez le dashboard pour plus de détails."
     
     def _get_summary_response(self) -> str:
         """Résumé général"""
-        with self.cache_lock:
-            total = len(self.sensor_cache)
-            online = sum(1 for r in self.sensor_cache.values() if r.status == 'online')
-            anomalies = sum(1 for a in self.analytics_cache.values() if a.anomaly_score > 0.8)
-            
-            return f"Station Traffeyère: {online}/{total} capteurs en ligne, {anomalies} anomalies détectées."
+        snapshot = self.aggregates.snapshot
+        return (f"Station Traffeyère: {snapshot.online_sensors}/{snapshot.total_sensors} capteurs en ligne, "
+                f"{len(snapshot.anomalies)} anomalies détectées.")
     
     def start_mqtt_connection(self):
         """Démarrage connexion MQTT"""
@@ -448,6 +653,8 @@ class XAIBackend:
         # Attente connexion MQTT
         time.sleep(2)
         
+        self.update_scheduler.start()
+        
         logger.info(f"🚀 Démarrage XAI Backend sur {host}:{port}")
         self.socketio.run(self.app, host=host, port=port, debug=debug)
 
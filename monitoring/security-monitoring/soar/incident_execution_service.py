@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+🚦 INCIDENT EXECUTION SERVICE
+Station Traffeyère IoT AI Platform - RNCP 39394 Semaine 6
+
+Service d'exécution borné des réponses aux incidents avec:
+- File de priorité ordonnée par IncidentSeverity (SCADA prioritaire à sévérité égale)
+- Pool de workers borné, workers réservés aux incidents critiques
+- Déduplication / fusion des incidents sur un même asset dans une fenêtre temporelle
+- Métriques d'attente (percentiles) et de saturation
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from incident_response_orchestrator import IncidentSeverity
+
+logger = logging.getLogger('IncidentExecutionService')
+
+SEVERITY_RANK = {
+    IncidentSeverity.CRITICAL: 0,
+    IncidentSeverity.HIGH: 1,
+    IncidentSeverity.MEDIUM: 2,
+    IncidentSeverity.LOW: 3
+}
+
+@dataclass(order=True)
+class QueuedIncident:
+    """Incident en attente d'exécution"""
+    priority: tuple
+    incident_data: Dict[str, Any] = field(compare=False)
+    severity: IncidentSeverity = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    status: str = field(default='queued', compare=False)  # queued, running, done, merged, shed
+    finished_at: Optional[float] = field(default=None, compare=False)
+    merged_count: int = field(default=0, compare=False)
+
+class IncidentExecutionService:
+    """Exécuteur multi-incidents borné avec file de priorité
+
+    Le handler est une coroutine recevant les données d'incident, par exemple
+    IncidentResponseOrchestrator.process_incident, ou
+    lambda data: soar.execute_playbook(data['type'], data) pour SOAROrchestrator.
+    """
+
+    def __init__(self, handler: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+                 max_workers: int = 4,
+                 reserved_critical_workers: int = 1,
+                 max_queue_size: int = 1000,
+                 dedup_window: float = 300.0,
+                 priority_systems: tuple = ('SCADA',)):
+        if not 0 <= reserved_critical_workers < max_workers:
+            raise ValueError("reserved_critical_workers doit être compris entre 0 et max_workers - 1")
+
+        self.handler = handler
+        self.max_workers = max_workers
+        self.reserved_critical_workers = reserved_critical_workers
+        self.max_queue_size = max_queue_size
+        self.dedup_window = dedup_window
+        self.priority_systems = priority_systems
+
+        self._heap: List[QueuedIncident] = []
+        self._queued_count = 0
+        self._sequence = itertools.count()
+        self._asset_index: Dict[str, QueuedIncident] = {}
+        self._asset_expiry = deque()  # (échéance, asset, incident) à réexaminer, par ordre d'échéance
+        self._condition: Optional[asyncio.Condition] = None
+        self._workers: List[asyncio.Task] = []
+        self._busy_workers = 0
+        self._wait_times = {severity: deque(maxlen=1000) for severity in IncidentSeverity}
+        self._busy_time = 0.0
+        self._started_at: Optional[float] = None
+        self.counters = {
+            'submitted': 0,
+            'processed': 0,
+            'failed': 0,
+            'merged': 0,
+            'deduplicated': 0,
+            'shed': 0,
+            'rejected': 0
+        }
+
+    async def start(self):
+        """Démarrer le pool de workers"""
+        self._condition = asyncio.Condition()
+        self._started_at = time.monotonic()
+        for worker_id in range(self.max_workers):
+            critical_only = worker_id < self.reserved_critical_workers
+            self._workers.append(asyncio.create_task(self._worker(worker_id, critical_only)))
+        logger.info(f"🚦 Service d'exécution démarré: {self.max_workers} workers "
+                    f"({self.reserved_critical_workers} réservés CRITICAL)")
+
+    async def stop(self, drain: bool = True):
+        """Arrêter le service, après vidage de la file si demandé"""
+        if drain:
+            async with self._condition:
+                await self._condition.wait_for(lambda: self._queued_count == 0 and self._busy_workers == 0)
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+        logger.info("🛑 Service d'exécution arrêté")
+
+    async def submit(self, incident_data: Dict[str, Any]) -> asyncio.Future:
+        """Soumettre un incident; retourne un future résolu avec le résultat du handler"""
+        severity = IncidentSeverity(incident_data.get('severity', 'MEDIUM'))
+        now = time.monotonic()
+
+        async with self._condition:
+            self.counters['submitted'] += 1
+
+            self._prune_asset_index(now)
+            existing = self._find_related(incident_data, now)
+            if existing is not None:
+                if existing.status == 'queued':
+                    self._merge(existing, incident_data, severity)
+                    return existing.future
+                if SEVERITY_RANK[severity] >= SEVERITY_RANK[existing.severity]:
+                    # Incident déjà en cours ou traité récemment, sans aggravation
+                    self.counters['deduplicated'] += 1
+                    return existing.future
+
+            if self._queued_count >= self.max_queue_size and not self._shed_lowest(severity, incident_data):
+                self.counters['rejected'] += 1
+                raise asyncio.QueueFull(f"File d'incidents saturée ({self.max_queue_size})")
+
+            entry = QueuedIncident(
+                priority=self._priority(severity, incident_data),
+                incident_data=dict(incident_data),
+                severity=severity,
+                future=asyncio.get_running_loop().create_future(),
+                enqueued_at=now
+            )
+            self._push(entry)
+            self._index_assets(entry)
+            self._condition.notify_all()
+            return entry.future
+
+    def _priority(self, severity: IncidentSeverity, incident_data: Dict[str, Any]) -> tuple:
+        """Priorité: sévérité, puis systèmes prioritaires (SCADA), puis ordre d'arrivée"""
+        source_system = str(incident_data.get('source_system', '')).upper()
+        priority_system = any(prefix in source_system for prefix in self.priority_systems)
+        return (SEVERITY_RANK[severity], 0 if priority_system else 1, next(self._sequence))
+
+    def _push(self, entry: QueuedIncident):
+        heapq.heappush(self._heap, entry)
+        self._queued_count += 1
+
+    def _find_related(self, incident_data: Dict[str, Any], now: float) -> Optional[QueuedIncident]:
+        """Rechercher un incident sur le même asset dans la fenêtre de déduplication"""
+        for asset in incident_data.get('affected_assets', []):
+            entry = self._asset_index.get(asset)
+            if entry is None or entry.status in ('merged', 'shed'):
+                continue
+            if entry.status == 'done' and now - entry.finished_at > self.dedup_window:
+                continue
+            if entry.status != 'done' and now - entry.enqueued_at > self.dedup_window:
+                continue
+            return entry
+        return None
+
+    def _index_assets(self, entry: QueuedIncident):
+        for asset in entry.incident_data.get('affected_assets', []):
+            self._asset_index[asset] = entry
+        self._schedule_expiry(entry)
+
+    def _schedule_expiry(self, entry: QueuedIncident):
+        """Réexaminer les assets de l'incident à la fin de la fenêtre de déduplication"""
+        expires_at = time.monotonic() + self.dedup_window
+        for asset in entry.incident_data.get('affected_assets', []):
+            self._asset_expiry.append((expires_at, asset, entry))
+
+    def _prune_asset_index(self, now: float):
+        """Retirer de l'index les incidents qui ne peuvent plus servir à la déduplication
+
+        Les incidents en attente ou en cours restent indexés (leur nombre est borné
+        par la file et les workers); ils sont réexaminés une fois terminés.
+        """
+        while self._asset_expiry and self._asset_expiry[0][0] <= now:
+            _, asset, entry = self._asset_expiry.popleft()
+            if self._asset_index.get(asset) is not entry:
+                continue  # Asset réindexé depuis sur un autre incident
+            if entry.status in ('queued', 'running'):
+                continue
+            if entry.status == 'done' and now - entry.finished_at <= self.dedup_window:
+                continue
+            del self._asset_index[asset]
+
+    def _merge(self, entry: QueuedIncident, incident_data: Dict[str, Any], severity: IncidentSeverity):
+        """Fusionner un incident dans un incident en attente sur le même asset"""
+        merged = entry.incident_data
+        merged['affected_assets'] = list(dict.fromkeys(
+            merged.get('affected_assets', []) + incident_data.get('affected_assets', [])
+        ))
+        merged['indicators'] = {**incident_data.get('indicators', {}), **merged.get('indicators', {})}
+        entry.merged_count += 1
+        merged['merged_incidents'] = entry.merged_count
+        self.counters['merged'] += 1
+        self._index_assets(entry)
+
+        if SEVERITY_RANK[severity] < SEVERITY_RANK[entry.severity]:
+            # Aggravation: réinsertion avec la nouvelle priorité (l'ancienne entrée est ignorée)
+            merged['severity'] = severity.value
+            escalated = QueuedIncident(
+                priority=self._priority(severity, merged),
+                incident_data=merged,
+                severity=severity,
+                future=entry.future,
+                enqueued_at=entry.enqueued_at,
+                merged_count=entry.merged_count
+            )
+            entry.status = 'merged'
+            self._queued_count -= 1
+            self._push(escalated)
+            self._index_assets(escalated)
+            self._condition.notify_all()
+
+    def _shed_lowest(self, severity: IncidentSeverity, incident_data: Dict[str, Any]) -> bool:
+        """File pleine: évincer l'incident en attente le moins prioritaire s'il l'est moins que le nouveau"""
+        queued = [entry for entry in self._heap if entry.status == 'queued']
+        if not queued:
+            return False
+        lowest = max(queued)
+        if lowest.priority[:2] <= self._priority(severity, incident_data)[:2]:
+            return False
+
+        lowest.status = 'shed'
+        self._queued_count -= 1
+        self.counters['shed'] += 1
+        lowest.future.set_result({'status': 'SHED', 'reason': 'queue_saturated',
+                                  'severity': lowest.severity.value})
+        logger.warning(f"⚠️ File saturée: incident {lowest.severity.value} évincé")
+        return True
+
+    def _next_entry(self, critical_only: bool) -> Optional[QueuedIncident]:
+        """Extraire le prochain incident éligible pour un worker"""
+        while self._heap and self._heap[0].status != 'queued':
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return None
+        if critical_only and self._heap[0].severity != IncidentSeverity.CRITICAL:
+            return None
+        self._queued_count -= 1
+        return heapq.heappop(self._heap)
+
+    async def _worker(self, worker_id: int, critical_only: bool):
+        """Boucle d'un worker du pool"""
+        while True:
+            async with self._condition:
+                entry = self._next_entry(critical_only)
+                while entry is None:
+                    await self._condition.wait()
+                    entry = self._next_entry(critical_only)
+                entry.status = 'running'
+                self._busy_workers += 1
+
+            started = time.monotonic()
+            self._wait_times[entry.severity].append(started - entry.enqueued_at)
+
+            try:
+                result = await self.handler(entry.incident_data)
+                self.counters['processed'] += 1
+                if not entry.future.done():
+                    entry.future.set_result(result)
+            except asyncio.CancelledError:
+                if not entry.future.done():
+                    entry.future.cancel()
+                raise
+            except Exception as e:
+                self.counters['failed'] += 1
+                logger.error(f"❌ Worker {worker_id}: échec traitement incident - {e}")
+                if not entry.future.done():
+                    entry.future.set_exception(e)
+            finally:
+                finished = time.monotonic()
+                self._busy_time += finished - started
+                entry.status = 'done'
+                entry.finished_at = finished
+                async with self._condition:
+                    self._busy_workers -= 1
+                    self._schedule_expiry(entry)
+                    self._condition.notify_all()
+
+    @staticmethod
+    def _percentile(values: List[float], percentile: float) -> float:
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        index = min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Métriques de file d'attente et de saturation"""
+        queue_depth = {severity.value: 0 for severity in IncidentSeverity}
+        for entry in self._heap:
+            if entry.status == 'queued':
+                queue_depth[entry.severity.value] += 1
+
+        wait_times = {}
+        for severity, values in self._wait_times.items():
+            samples = list(values)
+            wait_times[severity.value] = {
+                'p50': self._percentile(samples, 50),
+                'p95': self._percentile(samples, 95),
+                'p99': self._percentile(samples, 99),
+                'samples': len(samples)
+            }
+
+        uptime = time.monotonic() - self._started_at if self._started_at else 0.0
+        return {
+            'queue_depth': queue_depth,
+            'queue_size': self._queued_count,
+            'queue_capacity': self.max_queue_size,
+            'queue_wait_seconds': wait_times,
+            'workers': {
+                'total': self.max_workers,
+                'busy': self._busy_workers,
+                'reserved_critical': self.reserved_critical_workers
+            },
+            'saturation': {
+                'current': self._busy_workers / self.max_workers,
+                'average': self._busy_time / (uptime * self.max_workers) if uptime else 0.0,
+                'queue_fill': self._queued_count / self.max_queue_size
+            },
+            'counters': dict(self.counters)
+        }
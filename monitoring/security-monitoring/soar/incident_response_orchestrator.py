@@ -16,13 +16,14 @@ import json
 import sqlite3
 import threading
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Set, Tuple, Callable, Awaitable
 from dataclasses import dataclass, asdict
 from enum import Enum
 import logging
 from pathlib import Path
 import hashlib
 import time
+import uuid
 import subprocess
 
 # Configuration logging
@@ -39,6 +40,9 @@ class IncidentSeverity(Enum):
     HIGH = "HIGH"
     CRITICAL = "CRITICAL"
 
+class IncidentCancelledError(Exception):
+    """Incident clos ou remplacé pendant son traitement"""
+
 class ResponseAction(Enum):
     """Types d'actions de réponse"""
     ISOLATE = "ISOLATE"
@@ -67,54 +71,187 @@ class ThreatIntelligenceEngine:
         self.anssi_feeds = "https://www.cert.ssi.gouv.fr/api/v1/"
         self.misp_endpoint = "http://localhost:8080/events/"
         self.cache_timeout = 3600  # 1 heure
-        self.intel_cache = {}
-        
+        self.intel_cache = {}  # (source, type, valeur) -> (expiration, résultat)
+        self.max_cache_entries = 10000
+        self.lookup_deadlines = {  # Délai maximal par source (secondes)
+            'anssi': 2.0,
+            'misp': 2.0,
+            'virustotal': 3.0
+        }
+        self.indicator_types = {  # Champ d'indicateur -> type d'observable interrogé
+            'source_ip': 'ip',
+            'destination_ip': 'ip',
+            'ip_addresses': 'ip',
+            'domain': 'domain',
+            'domains': 'domain',
+            'url': 'url',
+            'file_hash': 'hash',
+            'file_hashes': 'hash',
+            'malware_family': 'malware',
+            'user_agent': 'user_agent'
+        }
+        self.ioc_fields = {'ip': 'ip_addresses', 'domain': 'domains', 'hash': 'file_hashes'}
+
     async def enrich_incident(self, incident: IncidentContext) -> IncidentContext:
-        """Enrichir incident avec threat intelligence"""
+        """Enrichir incident avec threat intelligence (sources interrogées en parallèle)"""
         logger.info(f"🔍 Enrichissement incident {incident.incident_id}")
-        
+
         try:
-            # Enrichissement ANSSI
-            anssi_data = await self._query_anssi_feeds(incident.indicators)
-            
-            # Enrichissement MISP
-            misp_data = await self._query_misp_events(incident.indicators)
-            
+            # Un indicateur déjà vu (même IP, même hash...) est servi par le cache,
+            # quelle que soit la combinaison d'indicateurs de l'incident
+            observables = self._extract_observables(incident.indicators)
+
+            lookups = {
+                'anssi': self._lookup_indicators('anssi', observables,
+                                                 self._query_anssi_feeds, self._merge_anssi_results),
+                'misp': self._lookup_indicators('misp', observables,
+                                                self._query_misp_events, self._merge_misp_results)
+            }
             # Enrichissement VirusTotal (si hash disponible)
-            vt_data = {}
             if 'file_hash' in incident.indicators:
-                vt_data = await self._query_virustotal(incident.indicators['file_hash'])
-            
-            # Consolidation threat intelligence
+                file_hash = incident.indicators['file_hash']
+                lookups['virustotal'] = self._cached_lookup('virustotal', 'hash', file_hash,
+                                                            lambda: self._query_virustotal(file_hash))
+
+            results = dict(zip(lookups, await asyncio.gather(*lookups.values())))
+            anssi_data = results['anssi']
+            misp_data = results['misp']
+            vt_data = results.get('virustotal', {})
+            timed_out = [source for source, result in results.items() if result.get('timeout')]
+
+            # Consolidation threat intelligence (résultats partiels si une source a expiré)
             incident.threat_intel = {
                 'anssi': anssi_data,
                 'misp': misp_data,
                 'virustotal': vt_data,
                 'enriched_at': datetime.now().isoformat(),
+                'partial': bool(timed_out),
+                'timed_out_sources': timed_out,
                 'confidence_score': self._calculate_confidence(anssi_data, misp_data, vt_data)
             }
-            
+
             logger.info(f"✅ Incident enrichi - Score confiance: {incident.threat_intel['confidence_score']:.2f}")
-            
+
         except Exception as e:
             logger.error(f"❌ Erreur enrichissement: {e}")
             incident.threat_intel = {'error': str(e)}
-            
+
         return incident
-    
-    async def _query_anssi_feeds(self, indicators: Dict[str, Any]) -> Dict[str, Any]:
-        """Interroger les flux ANSSI-CERT"""
+
+    def _extract_observables(self, indicators: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """Extraire les observables (type, valeur) interrogeables, sans doublons"""
+        observables = []
+        for field, indicator_type in self.indicator_types.items():
+            values = indicators.get(field)
+            if values is None:
+                continue
+            if not isinstance(values, (list, tuple, set)):
+                values = [values]
+            for value in values:
+                observable = (indicator_type, str(value))
+                if observable not in observables:
+                    observables.append(observable)
+        return observables
+
+    async def _lookup_indicators(self, source: str, observables: List[Tuple[str, str]],
+                                 query: Callable[[str, str], Awaitable[Dict[str, Any]]],
+                                 merge: Callable[[List[Dict[str, Any]]], Dict[str, Any]]) -> Dict[str, Any]:
+        """Interroger une source indicateur par indicateur puis fusionner les réponses"""
+        results = await asyncio.gather(*[
+            self._cached_lookup(source, indicator_type, value,
+                                lambda indicator_type=indicator_type, value=value: query(indicator_type, value))
+            for indicator_type, value in observables
+        ])
+
+        failed = [result for result in results if 'error' in result]
+        timed_out = any(result.get('timeout') for result in failed)
+        if failed and len(failed) == len(results):
+            return {'error': failed[0]['error'], 'timeout': timed_out}
+
+        merged = merge([result for result in results if 'error' not in result])
+        if timed_out:
+            merged['timeout'] = True  # Résultat partiel: certains indicateurs ont expiré
+        return merged
+
+    @staticmethod
+    def _union(values: List[List[Any]]) -> List[Any]:
+        """Union ordonnée de listes, sans doublons"""
+        merged = []
+        for items in values:
+            for item in items:
+                if item not in merged:
+                    merged.append(item)
+        return merged
+
+    def _merge_anssi_results(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Fusionner les réponses ANSSI par indicateur (niveau le plus élevé retenu)"""
+        tlp_order = ['TLP:CLEAR', 'TLP:GREEN', 'TLP:AMBER', 'TLP:RED']
+        level_order = ['LOW', 'MEDIUM', 'HIGH', 'CRITICAL']
+        return {
+            'classification': max((r['classification'] for r in results),
+                                  key=tlp_order.index, default='TLP:CLEAR'),
+            'threat_level': max((r['threat_level'] for r in results),
+                                key=level_order.index, default='LOW'),
+            'related_campaigns': self._union([r['related_campaigns'] for r in results]),
+            'iocs': {
+                field: self._union([r['iocs'][field] for r in results])
+                for field in self.ioc_fields.values()
+            },
+            'recommendations': self._union([r['recommendations'] for r in results])
+        }
+
+    def _merge_misp_results(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Fusionner les réponses MISP par indicateur (événements dédoublonnés par identifiant)"""
+        events = {}
+        for result in results:
+            for event in result['related_events']:
+                events.setdefault(event['event_id'], event)
+        attribute_names = self._union([list(r['attributes']) for r in results])
+        return {
+            'related_events': list(events.values()),
+            'attributes': {
+                name: self._union([r['attributes'].get(name, []) for r in results])
+                for name in attribute_names
+            }
+        }
+
+    async def _cached_lookup(self, source: str, indicator_type: str, value: str,
+                             query: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Interroger une source avec cache TTL par indicateur et délai maximal propre"""
+        cache_key = (source, indicator_type, value)
+        cached = self.intel_cache.get(cache_key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
         try:
+            result = await asyncio.wait_for(query(), timeout=self.lookup_deadlines.get(source, 2.0))
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️ Délai dépassé pour {source}, poursuite avec résultats partiels")
+            return {'error': 'timeout', 'timeout': True}
+
+        # Les échecs ne sont pas mis en cache pour être réessayés au prochain incident
+        if 'error' not in result:
+            now = time.monotonic()
+            if len(self.intel_cache) >= self.max_cache_entries:
+                self.intel_cache = {k: v for k, v in self.intel_cache.items() if v[0] > now}
+                while len(self.intel_cache) >= self.max_cache_entries:
+                    self.intel_cache.pop(next(iter(self.intel_cache)))
+            self.intel_cache[cache_key] = (now + self.cache_timeout, result)
+        return result
+
+    async def _query_anssi_feeds(self, indicator_type: str, value: str) -> Dict[str, Any]:
+        """Interroger les flux ANSSI-CERT pour un indicateur"""
+        try:
+            iocs = {field: [] for field in self.ioc_fields.values()}
+            if indicator_type in self.ioc_fields:
+                iocs[self.ioc_fields[indicator_type]].append(value)
+
             # Simulation enrichissement ANSSI réaliste
             anssi_response = {
                 'classification': 'TLP:AMBER',
                 'threat_level': 'MEDIUM',
                 'related_campaigns': ['APT-WaterTreatment-2024'],
-                'iocs': {
-                    'ip_addresses': indicators.get('ip_addresses', []),
-                    'domains': indicators.get('domains', []),
-                    'file_hashes': indicators.get('file_hashes', [])
-                },
+                'iocs': iocs,
                 'recommendations': [
                     'Isoler les systèmes affectés',
                     'Analyser les logs de connexion',
@@ -130,8 +267,8 @@ class ThreatIntelligenceEngine:
             logger.warning(f"⚠️ Échec interrogation ANSSI: {e}")
             return {'error': str(e)}
     
-    async def _query_misp_events(self, indicators: Dict[str, Any]) -> Dict[str, Any]:
-        """Interroger les événements MISP"""
+    async def _query_misp_events(self, indicator_type: str, value: str) -> Dict[str, Any]:
+        """Interroger les événements MISP pour un indicateur"""
         try:
             # Simulation enrichissement MISP
             misp_response = {
@@ -343,7 +480,26 @@ class AdvancedPlaybookEngine:
         self.playbooks = self._load_advanced_playbooks()
         self.execution_history = []
         self.ml_predictor = None  # IA prédictive pour optimisation
-        
+        self.inflight_actions: Dict[str, Set[asyncio.Task]] = {}  # incident -> actions en cours
+        self.cancelled_incidents: Dict[str, str] = {}  # incident -> motif d'annulation
+
+    def cancel_incident(self, incident_id: str, reason: str = 'closed') -> int:
+        """Annuler les actions en cours d'un incident clos ou remplacé"""
+        if incident_id not in self.inflight_actions:
+            return 0
+        self.cancelled_incidents[incident_id] = reason
+        tasks = self.inflight_actions[incident_id]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            logger.info(f"🛑 {len(tasks)} actions annulées pour {incident_id} ({reason})")
+        return len(tasks)
+
+    def release_incident(self, incident_id: str):
+        """Libérer l'état conservé pour un incident terminé"""
+        self.inflight_actions.pop(incident_id, None)
+        self.cancelled_incidents.pop(incident_id, None)
+
     def _load_advanced_playbooks(self) -> Dict[str, Dict[str, Any]]:
         """Playbooks avancés avec logique adaptative"""
         return {
@@ -536,34 +692,55 @@ class AdvancedPlaybookEngine:
         return optimized
     
     async def _execute_parallel_actions(self, actions: List[Dict], incident: IncidentContext, context: Dict):
-        """Exécution actions en parallèle quand possible"""
+        """Exécution actions en parallèle quand possible, annulables par incident"""
         sequential_actions = [a for a in actions if not a.get('parallel_execution', False)]
         parallel_actions = [a for a in actions if a.get('parallel_execution', False)]
-        
-        # Exécution séquentielle des actions critiques
-        for action in sequential_actions:
-            result = await self._execute_single_action(action, incident)
+        inflight = self.inflight_actions.setdefault(incident.incident_id, set())
+
+        def launch(action: Dict) -> asyncio.Task:
+            task = asyncio.create_task(self._execute_single_action(action, incident))
+            inflight.add(task)
+            task.add_done_callback(inflight.discard)
+            return task
+
+        def log_action(action: Dict, result: Any):
+            if isinstance(result, asyncio.CancelledError):
+                result = f"Annulée: {self.cancelled_incidents.get(incident.incident_id, 'cancelled')}"
             context['actions_log'].append({
                 'action': action,
                 'result': result,
                 'timestamp': datetime.now().isoformat()
             })
-        
-        # Exécution parallèle des actions non-critiques
-        if parallel_actions:
-            parallel_tasks = [
-                self._execute_single_action(action, incident) 
-                for action in parallel_actions
-            ]
-            parallel_results = await asyncio.gather(*parallel_tasks, return_exceptions=True)
-            
-            for action, result in zip(parallel_actions, parallel_results):
-                context['actions_log'].append({
-                    'action': action,
-                    'result': result,
-                    'timestamp': datetime.now().isoformat()
-                })
-    
+
+        try:
+            # Lancement immédiat des actions non-critiques, en parallèle de la chaîne critique
+            parallel_tasks = [launch(action) for action in parallel_actions]
+
+            # Exécution séquentielle des actions critiques
+            for action in sequential_actions:
+                if incident.incident_id in self.cancelled_incidents:
+                    break
+                try:
+                    result = await launch(action)
+                except asyncio.CancelledError:
+                    if incident.incident_id not in self.cancelled_incidents:
+                        raise  # Annulation de l'appelant, pas de l'incident
+                    result = asyncio.CancelledError()
+                log_action(action, result)
+
+            if parallel_tasks:
+                parallel_results = await asyncio.gather(*parallel_tasks, return_exceptions=True)
+                for action, result in zip(parallel_actions, parallel_results):
+                    log_action(action, result)
+
+            if incident.incident_id in self.cancelled_incidents:
+                context['cancelled'] = self.cancelled_incidents[incident.incident_id]
+        finally:
+            # Propager l'annulation de l'appelant aux actions restantes
+            for task in list(inflight):
+                task.cancel()
+            self.release_incident(incident.incident_id)
+
     async def _execute_single_action(self, action: Dict, incident: IncidentContext) -> str:
         """Exécution action unique avec monitoring performance"""
         action_start = time.time()
@@ -591,6 +768,9 @@ class IncidentResponseOrchestrator:
         self.threat_intel = ThreatIntelligenceEngine()
         self.isolation_engine = AutomatedIsolationEngine()
         self.playbook_engine = AdvancedPlaybookEngine()
+        self.phase_tasks: Dict[str, asyncio.Task] = {}  # incident -> phase en cours
+        self.active_incidents: Set[str] = set()
+        self.closed_incidents: Dict[str, str] = {}  # incident actif -> motif de clôture
         self.performance_metrics = {
             'total_incidents': 0,
             'avg_mttr': 0.0,
@@ -640,13 +820,48 @@ class IncidentResponseOrchestrator:
         except Exception as e:
             logger.error(f"❌ Erreur initialisation DB: {e}")
     
+    def close_incident(self, incident_id: str, reason: str = 'closed') -> bool:
+        """Clore un incident en cours: annule l'enrichissement et les actions en vol"""
+        if incident_id not in self.active_incidents:
+            return False
+        self.closed_incidents[incident_id] = reason
+        if incident_id in self.playbook_engine.inflight_actions:
+            # Playbook en cours: annulation action par action, le journal partiel est conservé
+            self.playbook_engine.cancel_incident(incident_id, reason)
+        elif incident_id in self.phase_tasks:
+            self.phase_tasks[incident_id].cancel()
+        logger.info(f"🛑 Incident {incident_id} clos ({reason})")
+        return True
+
+    async def _run_phase(self, incident_id: str, coro: Awaitable[Any]) -> Any:
+        """Exécuter une phase annulable par close_incident"""
+        if incident_id in self.closed_incidents:
+            coro.close()
+            raise IncidentCancelledError(self.closed_incidents[incident_id])
+        task = asyncio.ensure_future(coro)
+        self.phase_tasks[incident_id] = task
+        try:
+            return await task
+        except asyncio.CancelledError:
+            if incident_id in self.closed_incidents:
+                raise IncidentCancelledError(self.closed_incidents[incident_id])
+            raise
+        finally:
+            self.phase_tasks.pop(incident_id, None)
+
     async def process_incident(self, incident_data: Dict[str, Any]) -> Dict[str, Any]:
         """Traitement complet d'un incident"""
-        incident_id = f"INC-{int(datetime.now().timestamp())}"
+        # Suffixe aléatoire: deux incidents reçus dans la même seconde restent distincts
+        incident_id = f"INC-{int(datetime.now().timestamp())}-{uuid.uuid4().hex[:8]}"
         start_time = datetime.now()
         
         logger.info(f"🚨 Nouveau incident {incident_id}")
         
+        # Un incident remplaçant un incident en cours annule ce dernier
+        if incident_data.get('supersedes'):
+            self.close_incident(incident_data['supersedes'], 'superseded')
+        self.active_incidents.add(incident_id)
+        
         try:
             # Création contexte incident
             incident = IncidentContext(
@@ -661,29 +876,30 @@ class IncidentResponseOrchestrator:
             
             # Phase 1: Enrichissement Threat Intelligence
             logger.info("📡 Phase 1: Enrichissement Threat Intelligence")
-            incident = await self.threat_intel.enrich_incident(incident)
+            incident = await self._run_phase(incident_id, self.threat_intel.enrich_incident(incident))
             
             # Phase 2: Isolation automatique urgente
             logger.info("🚫 Phase 2: Isolation automatique")
-            isolation_result = await self.isolation_engine.execute_isolation(incident)
+            isolation_result = await self._run_phase(incident_id, self.isolation_engine.execute_isolation(incident))
             
-            # Phase 3: Exécution playbook adaptatif
+            # Phase 3: Exécution playbook adaptatif (actions annulées individuellement à la clôture)
             logger.info("🎭 Phase 3: Exécution playbook")
-            playbook_result = await self.playbook_engine.execute_advanced_playbook(incident)
+            playbook_result = await self._run_phase(incident_id, self.playbook_engine.execute_advanced_playbook(incident))
+            status = 'CANCELLED' if 'cancelled' in playbook_result else 'COMPLETED'
             
             # Calcul MTTR et métriques
             end_time = datetime.now()
             mttr_minutes = (end_time - start_time).total_seconds() / 60
             
             # Sauvegarde incident
-            await self._save_incident(incident, isolation_result, playbook_result, mttr_minutes)
+            await self._save_incident(incident, isolation_result, playbook_result, mttr_minutes, status)
             
             # Mise à jour métriques
             self._update_metrics(mttr_minutes, True)
             
             response = {
                 'incident_id': incident_id,
-                'status': 'COMPLETED',
+                'status': status,
                 'mttr_minutes': mttr_minutes,
                 'threat_intel': incident.threat_intel,
                 'isolation_result': isolation_result,
@@ -698,6 +914,14 @@ class IncidentResponseOrchestrator:
             logger.info(f"✅ Incident {incident_id} traité en {mttr_minutes:.2f}min")
             return response
             
+        except IncidentCancelledError as e:
+            logger.info(f"🛑 Incident {incident_id} annulé avant la fin du traitement ({e})")
+            return {
+                'incident_id': incident_id,
+                'status': 'CANCELLED',
+                'reason': str(e)
+            }
+            
         except Exception as e:
             logger.error(f"❌ Erreur traitement incident {incident_id}: {e}")
             self._update_metrics(0, False)
@@ -706,8 +930,14 @@ class IncidentResponseOrchestrator:
                 'status': 'FAILED',
                 'error': str(e)
             }
+        
+        finally:
+            self.active_incidents.discard(incident_id)
+            self.closed_incidents.pop(incident_id, None)
+            self.playbook_engine.release_incident(incident_id)
     
-    async def _save_incident(self, incident: IncidentContext, isolation: Dict, playbook: Dict, mttr: float):
+    async def _save_incident(self, incident: IncidentContext, isolation: Dict, playbook: Dict, mttr: float,
+                             status: str = 'COMPLETED'):
         """Sauvegarde incident en base"""
         try:
             conn = sqlite3.connect(self.db_path)
@@ -728,7 +958,7 @@ class IncidentResponseOrchestrator:
                 json.dumps(incident.threat_intel),
                 json.dumps({'isolation': isolation, 'playbook': playbook}),
                 mttr,
-                'COMPLETED'
+                status
             ))
             
             conn.commit()
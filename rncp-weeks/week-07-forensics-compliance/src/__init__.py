@@ -0,0 +1,9 @@
+"""
+Station Traffeyère IoT AI Platform - RNCP 39394 Semaine 7
+Moteurs forensics & conformité (threat hunting, forensics, evidence, compliance)
+
+Paquet commun: les moteurs partagent la persistance de src/storage par import
+relatif. Démonstrations depuis le dossier de la semaine 7, par exemple:
+
+    python -m src.forensics.ai_forensics_engine
+"""
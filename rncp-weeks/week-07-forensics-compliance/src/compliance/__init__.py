@@ -0,0 +1 @@
+"""Tableau de bord de conformité réglementaire"""
@@ -15,15 +15,19 @@ import json
 import sqlite3
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 from pathlib import Path
 import uuid
 import logging
-from collections import defaultdict
+from collections import defaultdict, deque
 import hashlib
 from enum import Enum
 import time
+import os
+import atexit
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
 try:
     from cryptography.hazmat.primitives import hashes, serialization
     from cryptography.hazmat.primitives.asymmetric import rsa, padding
@@ -31,6 +35,8 @@ try:
 except ImportError:
     HAS_CRYPTO = False
 
+from ..storage import AsyncSQLiteStore
+
 logger = logging.getLogger('ComplianceDashboard')
 
 class ComplianceFramework(Enum):
@@ -95,18 +101,118 @@ class ComplianceReport:
     report_path: str
     next_assessment_due: datetime
 
+AUDIT_GENESIS_HASH = "0" * 64
+
+def _audit_entry_hash(seq: int, previous_hash: str, entry_id: str, timestamp: str,
+                      user_id: str, action: str, resource: str, details: str,
+                      ip_address: str, user_agent: str) -> str:
+    """Hash canonique d'une entrée chaînée (mêmes champs texte qu'en base)"""
+    payload = json.dumps(
+        [seq, previous_hash, entry_id, timestamp, user_id, action, resource, details, ip_address, user_agent],
+        ensure_ascii=False, separators=(',', ':')
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def _audit_merkle_root(leaf_hashes: List[str]) -> str:
+    """Racine de Merkle d'un segment (feuilles = hash des entrées, nœud impair dupliqué)"""
+    if not leaf_hashes:
+        return AUDIT_GENESIS_HASH
+    level = [bytes.fromhex(leaf) for leaf in leaf_hashes]
+    while len(level) > 1:
+        if len(level) % 2:
+            level.append(level[-1])
+        level = [hashlib.sha256(b'\x01' + level[i] + level[i + 1]).digest()
+                 for i in range(0, len(level), 2)]
+    return level[0].hex()
+
+def _verify_audit_segment(rows: List[tuple], previous_hash: Optional[str],
+                          checkpoint: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Vérifier un segment d'audit trail (exécuté dans un processus du pool)
+
+    rows: (seq, id, timestamp, user_id, action, resource, details, ip_address,
+    user_agent, previous_hash, hash_signature) triés par seq.
+    """
+    errors = []
+    expected_previous = previous_hash
+    expected_seq = rows[0][0] if rows else None
+    leaves = []
+
+    for seq, entry_id, timestamp, user_id, action, resource, details, ip_address, user_agent, \
+            stored_previous, stored_hash in rows:
+        if seq != expected_seq:
+            errors.append({'seq': expected_seq, 'error': f'entrées manquantes ({expected_seq}-{seq - 1})'})
+        expected_seq = seq + 1
+
+        if expected_previous is not None and stored_previous != expected_previous:
+            errors.append({'seq': seq, 'entry_id': entry_id, 'error': 'chaînage rompu (previous_hash)'})
+        calculated = _audit_entry_hash(seq, stored_previous, entry_id, timestamp, user_id, action,
+                                       resource, details, ip_address, user_agent)
+        if calculated != stored_hash:
+            errors.append({'seq': seq, 'entry_id': entry_id, 'error': 'hash invalide (contenu modifié)'})
+        expected_previous = stored_hash
+        leaves.append(stored_hash)
+
+    merkle_root = None
+    if checkpoint is not None:
+        merkle_root = _audit_merkle_root(leaves)
+        if len(rows) != checkpoint['entry_count']:
+            errors.append({'seq': checkpoint['end_seq'],
+                           'error': f"checkpoint: {len(rows)} entrées au lieu de {checkpoint['entry_count']}"})
+        if merkle_root != checkpoint['merkle_root']:
+            errors.append({'seq': checkpoint['end_seq'], 'error': 'checkpoint: racine de Merkle différente'})
+        if rows and rows[-1][10] != checkpoint['last_hash']:
+            errors.append({'seq': checkpoint['end_seq'], 'error': 'checkpoint: dernier hash différent'})
+
+    return {
+        'entries': len(rows),
+        'errors': errors,
+        'merkle_root': merkle_root,
+        'checkpoint': checkpoint['end_seq'] if checkpoint else None
+    }
+
 class AuditTrailManager:
-    """Gestionnaire d'audit trails immutables"""
-    
-    def __init__(self, db_path: str = "data/audit_trail.db"):
+    """Gestionnaire d'audit trails immutables
+
+    Les entrées sont chaînées (chaque hash inclut celui de l'entrée précédente)
+    et écrites par lots sur une connexion persistante. Tous les
+    checkpoint_interval entrées, la racine de Merkle du segment est enregistrée
+    dans audit_checkpoints pour permettre une vérification parallèle par segment.
+
+    Une entrée n'est acquittée qu'une fois son lot validé en base (commit
+    groupé): log_action attend le commit, log_action_async l'attend sans
+    bloquer la boucle. Un lot en échec reste en attente et est réessayé après
+    flush_interval; l'entrée ne peut pas être abandonnée sans casser la chaîne.
+    """
+
+    def __init__(self, db_path: str = "data/audit_trail.db", batch_size: int = 500,
+                 flush_interval: float = 1.0, checkpoint_interval: int = 10000,
+                 max_workers: Optional[int] = None, ack_timeout: float = 30.0):
         self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.checkpoint_interval = checkpoint_interval
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.ack_timeout = ack_timeout  # Attente maximale du commit par log_action (s)
+
+        self._lock = threading.RLock()
+        self._pending: List[tuple] = []
+        self._pending_checkpoints: List[tuple] = []
+        self._batch: Optional[Future] = None  # Résolu (seq de fin) au commit du lot en attente
+        self._flush_timer: Optional[threading.Timer] = None
+        self._conn: Optional[sqlite3.Connection] = None
+
         self._setup_database()
-        
+        self._load_chain_state()
+        atexit.register(self.close)
+
     def _setup_database(self):
         """Initialiser base de données audit trail"""
-        conn = sqlite3.connect(self.db_path)
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
         cursor = conn.cursor()
-        
+
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS audit_trail (
                 id TEXT PRIMARY KEY,
@@ -118,30 +224,112 @@ class AuditTrailManager:
                 ip_address TEXT,
                 user_agent TEXT,
                 hash_signature TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                seq INTEGER,
+                previous_hash TEXT
+            )
+        ''')
+
+        # Migration des bases existantes: colonnes de chaînage
+        cursor.execute('PRAGMA table_info(audit_trail)')
+        columns = {row[1] for row in cursor.fetchall()}
+        if 'seq' not in columns:
+            cursor.execute('ALTER TABLE audit_trail ADD COLUMN seq INTEGER')
+        if 'previous_hash' not in columns:
+            cursor.execute('ALTER TABLE audit_trail ADD COLUMN previous_hash TEXT')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS audit_checkpoints (
+                end_seq INTEGER PRIMARY KEY,
+                start_seq INTEGER NOT NULL,
+                entry_count INTEGER NOT NULL,
+                merkle_root TEXT NOT NULL,
+                last_hash TEXT NOT NULL,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
-        
+
         # Index pour performance
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_timestamp ON audit_trail (timestamp)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_user_id ON audit_trail (user_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_action ON audit_trail (action)')
-        
+        cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_audit_seq ON audit_trail (seq)')
+
         conn.commit()
-        conn.close()
-    
-    def log_action(self, user_id: str, action: str, resource: str, 
-                   details: Dict[str, Any], ip_address: str = "127.0.0.1", 
+        self._conn = conn
+
+    def _load_chain_state(self):
+        """Reprendre le chaînage et le segment Merkle en cours depuis la base"""
+        cursor = self._conn.cursor()
+        cursor.execute('SELECT seq, hash_signature FROM audit_trail WHERE seq IS NOT NULL ORDER BY seq DESC LIMIT 1')
+        row = cursor.fetchone()
+        self._last_seq, self._last_hash = (row[0], row[1]) if row else (0, AUDIT_GENESIS_HASH)
+
+        cursor.execute('SELECT MAX(end_seq) FROM audit_checkpoints')
+        self._last_checkpoint_seq = cursor.fetchone()[0] or 0
+        cursor.execute(
+            'SELECT hash_signature FROM audit_trail WHERE seq > ? ORDER BY seq',
+            (self._last_checkpoint_seq,)
+        )
+        self._segment_hashes = [r[0] for r in cursor.fetchall()]
+
+    def log_action(self, user_id: str, action: str, resource: str,
+                   details: Dict[str, Any], ip_address: str = "127.0.0.1",
                    user_agent: str = "System") -> AuditTrailEntry:
-        """Enregistrer action dans audit trail avec signature"""
-        
+        """Enregistrer action dans audit trail avec signature chaînée
+
+        Les entrées sont validées par lots de batch_size, ou au plus tard après
+        flush_interval secondes; l'appel rend la main une fois le lot validé
+        (TimeoutError si le commit n'a pas abouti en ack_timeout secondes).
+        """
+        entry, batch = self._append_entry(user_id, action, resource, details, ip_address, user_agent)
+        batch.result(timeout=self.ack_timeout)
+        return entry
+
+    async def log_action_async(self, user_id: str, action: str, resource: str,
+                               details: Dict[str, Any], ip_address: str = "127.0.0.1",
+                               user_agent: str = "System") -> AuditTrailEntry:
+        """Variante de log_action attendant le commit du lot sans bloquer la boucle"""
+        entry, batch = self._append_entry(user_id, action, resource, details, ip_address, user_agent)
+        await asyncio.wait_for(asyncio.wrap_future(batch), timeout=self.ack_timeout)
+        return entry
+
+    def _append_entry(self, user_id: str, action: str, resource: str, details: Dict[str, Any],
+                      ip_address: str, user_agent: str) -> Tuple[AuditTrailEntry, Future]:
+        """Chaîner une entrée dans le lot en attente; retourne l'entrée et le futur du lot"""
         entry_id = str(uuid.uuid4())
         timestamp = datetime.now()
-        
-        # Créer hash signature pour intégrité
-        data_to_hash = f"{entry_id}:{timestamp.isoformat()}:{user_id}:{action}:{resource}:{json.dumps(details, sort_keys=True)}"
-        hash_signature = hashlib.sha256(data_to_hash.encode()).hexdigest()
-        
+        # Champs texte exactement tels que stockés, pour que la vérification recalcule le même hash
+        timestamp_text = timestamp.isoformat(' ')
+        details_text = json.dumps(details, sort_keys=True, default=str)
+
+        with self._lock:
+            seq = self._last_seq + 1
+            previous_hash = self._last_hash
+            hash_signature = _audit_entry_hash(seq, previous_hash, entry_id, timestamp_text, user_id,
+                                               action, resource, details_text, ip_address, user_agent)
+            if self._batch is None:
+                self._batch = Future()
+            batch = self._batch
+            self._pending.append((
+                entry_id, timestamp_text, user_id, action, resource, details_text,
+                ip_address, user_agent, hash_signature, seq, previous_hash
+            ))
+            self._last_seq = seq
+            self._last_hash = hash_signature
+            self._segment_hashes.append(hash_signature)
+
+            if len(self._segment_hashes) >= self.checkpoint_interval:
+                self._close_segment()
+
+            if len(self._pending) >= self.batch_size:
+                try:
+                    self.flush()
+                except sqlite3.Error:
+                    pass  # Journalisé par flush, lot conservé et réessayé
+            else:
+                self._schedule_flush()
+
         entry = AuditTrailEntry(
             id=entry_id,
             timestamp=timestamp,
@@ -153,47 +341,250 @@ class AuditTrailManager:
             user_agent=user_agent,
             hash_signature=hash_signature
         )
-        
-        # Sauvegarder en DB
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO audit_trail 
-            (id, timestamp, user_id, action, resource, details, ip_address, user_agent, hash_signature)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            entry_id, timestamp, user_id, action, resource, 
-            json.dumps(details), ip_address, user_agent, hash_signature
+
+        logger.debug(f"📝 Audit trail: {action} par {user_id} sur {resource}")
+        return entry, batch
+
+    def _schedule_flush(self):
+        """Programmer l'écriture du lot en attente (appelé sous verrou)"""
+        if self._flush_timer is None and self._conn is not None:
+            self._flush_timer = threading.Timer(self.flush_interval, self._timed_flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _timed_flush(self):
+        """Écriture déclenchée par le timer: un échec est journalisé et réessayé"""
+        try:
+            self.flush()
+        except sqlite3.Error:
+            pass  # Journalisé par flush, lot conservé et réessayé
+
+    def _close_segment(self):
+        """Clore le segment courant par un checkpoint Merkle (appelé sous verrou)"""
+        start_seq = self._last_checkpoint_seq + 1
+        self._pending_checkpoints.append((
+            self._last_seq, start_seq, len(self._segment_hashes),
+            _audit_merkle_root(self._segment_hashes), self._last_hash
         ))
-        
-        conn.commit()
-        conn.close()
-        
-        logger.info(f"📝 Audit trail: {action} par {user_id} sur {resource}")
-        return entry
-    
+        self._last_checkpoint_seq = self._last_seq
+        self._segment_hashes = []
+
+    def flush(self):
+        """Écrire les entrées en attente en une seule transaction"""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._pending or self._conn is None:
+                return
+
+            pending, checkpoints = self._pending, self._pending_checkpoints
+            try:
+                with self._conn:
+                    self._conn.executemany('''
+                        INSERT INTO audit_trail
+                        (id, timestamp, user_id, action, resource, details, ip_address, user_agent,
+                         hash_signature, seq, previous_hash)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ''', pending)
+                    self._conn.executemany('''
+                        INSERT INTO audit_checkpoints (end_seq, start_seq, entry_count, merkle_root, last_hash)
+                        VALUES (?, ?, ?, ?, ?)
+                    ''', checkpoints)
+            except sqlite3.Error as e:
+                # Les entrées restent en attente (dans l'ordre de la chaîne) pour le prochain essai
+                logger.error(f"❌ Écriture audit trail échouée ({len(pending)} entrées en attente, "
+                             f"nouvel essai dans {self.flush_interval}s): {e}")
+                self._schedule_flush()
+                raise
+
+            batch = self._batch
+            self._pending, self._pending_checkpoints, self._batch = [], [], None
+            batch.set_result(pending[-1][9])
+            logger.info(f"📝 Audit trail: {len(pending)} entrées validées (seq {pending[0][9]}-{pending[-1][9]})")
+
+    def close(self):
+        """Vider le tampon et fermer la connexion persistante"""
+        with self._lock:
+            if self._conn is None:
+                return
+            self.flush()
+            self._conn.close()
+            self._conn = None
+
     def verify_integrity(self, entry_id: str) -> bool:
         """Vérifier intégrité d'une entrée audit trail"""
+        self.flush()
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM audit_trail WHERE id = ?', (entry_id,))
+
+        cursor.execute('''
+            SELECT seq, id, timestamp, user_id, action, resource, details, ip_address,
+                   user_agent, previous_hash, hash_signature
+            FROM audit_trail WHERE id = ?
+        ''', (entry_id,))
         row = cursor.fetchone()
-        conn.close()
-        
+
         if not row:
+            conn.close()
             return False
-        
-        # Recalculer hash
-        data_to_hash = f"{row[0]}:{row[1]}:{row[2]}:{row[3]}:{row[4]}:{row[5]}"
-        calculated_hash = hashlib.sha256(data_to_hash.encode()).hexdigest()
-        
-        return calculated_hash == row[8]
+
+        if row[0] is None:
+            conn.close()
+            # Entrée antérieure au chaînage: format de hash historique
+            try:
+                timestamp_iso = datetime.fromisoformat(row[2]).isoformat()
+                details_text = json.dumps(json.loads(row[6]) if row[6] else {}, sort_keys=True)
+            except (TypeError, ValueError):
+                return False
+            data_to_hash = f"{row[1]}:{timestamp_iso}:{row[3]}:{row[4]}:{row[5]}:{details_text}"
+            return hashlib.sha256(data_to_hash.encode()).hexdigest() == row[10]
+
+        # Lien avec l'entrée précédente
+        if row[0] == 1:
+            previous_hash = AUDIT_GENESIS_HASH
+        else:
+            cursor.execute('SELECT hash_signature FROM audit_trail WHERE seq = ?', (row[0] - 1,))
+            previous = cursor.fetchone()
+            previous_hash = previous[0] if previous else None
+        conn.close()
+
+        result = _verify_audit_segment([row], previous_hash, None)
+        return not result['errors']
+
+    def verify_range(self, start: int = 1, end: Optional[int] = None,
+                     fetch_size: int = 5000, max_errors: int = 100) -> Dict[str, Any]:
+        """Vérifier l'audit trail complet (ou les seq start..end) en une passe
+
+        Les lignes sont lues en streaming; chaque segment de checkpoint est
+        vérifié dans un processus du pool (hash, chaînage, racine de Merkle).
+        La plage est étendue aux bornes des segments couverts par un checkpoint.
+        """
+        self.flush()
+        started = time.time()
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('SELECT MAX(seq) FROM audit_trail')
+        max_seq = cursor.fetchone()[0] or 0
+        end = max_seq if end is None else min(end, max_seq)
+        start = max(1, start)
+
+        cursor.execute('''
+            SELECT end_seq, start_seq, entry_count, merkle_root, last_hash
+            FROM audit_checkpoints WHERE end_seq >= ? AND start_seq <= ? ORDER BY end_seq
+        ''', (start, end))
+        checkpoints = [
+            {'end_seq': r[0], 'start_seq': r[1], 'entry_count': r[2], 'merkle_root': r[3], 'last_hash': r[4]}
+            for r in cursor.fetchall()
+        ]
+        if checkpoints:
+            start = min(start, checkpoints[0]['start_seq'])
+            end = max(end, checkpoints[-1]['end_seq'])
+
+        report = {
+            'valid': True,
+            'start_seq': start,
+            'end_seq': end,
+            'entries_verified': 0,
+            'segments_verified': 0,
+            'checkpoints_verified': 0,
+            'errors': []
+        }
+        if end < start:
+            conn.close()
+            report['duration_seconds'] = time.time() - started
+            return report
+
+        # Hash attendu pour le premier lien de la plage
+        if start == 1:
+            previous_hash = AUDIT_GENESIS_HASH
+        else:
+            cursor.execute('SELECT hash_signature FROM audit_trail WHERE seq = ?', (start - 1,))
+            previous = cursor.fetchone()
+            previous_hash = previous[0] if previous else None
+            if previous is None:
+                report['errors'].append({'seq': start - 1, 'error': 'entrée précédant la plage introuvable'})
+
+        def collect(result: Dict[str, Any]):
+            report['entries_verified'] += result['entries']
+            report['segments_verified'] += 1
+            if result['checkpoint'] is not None and not result['errors']:
+                report['checkpoints_verified'] += 1
+            remaining = max_errors - len(report['errors'])
+            if remaining > 0:
+                report['errors'].extend(result['errors'][:remaining])
+            if result['errors']:
+                report['valid'] = False
+
+        checkpoints_by_end = {cp['end_seq']: cp for cp in checkpoints}
+        segment_ends = iter(sorted(checkpoints_by_end))
+        segment_end = next(segment_ends, None)
+        use_pool = self.max_workers > 1 and len(checkpoints) > 1
+        executor = ProcessPoolExecutor(max_workers=self.max_workers) if use_pool else None
+        in_flight = deque()
+
+        def submit(rows: List[tuple], checkpoint: Optional[Dict[str, Any]]):
+            if executor is None:
+                collect(_verify_audit_segment(rows, previous_hash, checkpoint))
+                return
+            in_flight.append(executor.submit(_verify_audit_segment, rows, previous_hash, checkpoint))
+            while len(in_flight) > self.max_workers * 2:
+                collect(in_flight.popleft().result())
+
+        try:
+            cursor.execute('''
+                SELECT seq, id, timestamp, user_id, action, resource, details, ip_address,
+                       user_agent, previous_hash, hash_signature
+                FROM audit_trail WHERE seq BETWEEN ? AND ? ORDER BY seq
+            ''', (start, end))
+
+            segment: List[tuple] = []
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    while segment_end is not None and row[0] > segment_end:
+                        # Segment de checkpoint terminé (éventuellement tronqué)
+                        submit(segment, checkpoints_by_end[segment_end])
+                        previous_hash = segment[-1][10] if segment else None
+                        segment = []
+                        segment_end = next(segment_ends, None)
+                    segment.append(row)
+
+            while segment_end is not None:
+                submit(segment, checkpoints_by_end[segment_end])
+                previous_hash = segment[-1][10] if segment else None
+                segment = []
+                segment_end = next(segment_ends, None)
+            if segment:
+                # Segment ouvert (après le dernier checkpoint): chaînage et hash seulement
+                submit(segment, None)
+
+            while in_flight:
+                collect(in_flight.popleft().result())
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+            conn.close()
+
+        if report['errors']:
+            report['valid'] = False
+        report['duration_seconds'] = time.time() - started
+
+        if report['valid']:
+            logger.info(f"🔒 Audit trail intègre: {report['entries_verified']} entrées, "
+                        f"{report['checkpoints_verified']} checkpoints ({report['duration_seconds']:.2f}s)")
+        else:
+            logger.warning(f"🚨 Audit trail compromis: {len(report['errors'])} anomalies "
+                           f"sur seq {start}-{end}")
+        return report
     
     def get_audit_logs(self, start_date: datetime = None, end_date: datetime = None, 
                        user_id: str = None, action: str = None) -> List[AuditTrailEntry]:
         """Récupérer logs d'audit avec filtres"""
+        self.flush()
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
@@ -445,8 +836,13 @@ class ReportGenerator:
         self.template_dir.mkdir(exist_ok=True)
     
     def generate_compliance_report(self, framework: ComplianceFramework, 
-                                 controls: List[ComplianceControl]) -> ComplianceReport:
-        """Générer rapport de conformité complet"""
+                                 controls: List[ComplianceControl],
+                                 audit_verification: Optional[Dict[str, Any]] = None) -> ComplianceReport:
+        """Générer rapport de conformité complet
+
+        audit_verification: résultat de AuditTrailManager.verify_range sur
+        l'audit trail complet; une rupture d'intégrité rend le rapport non conforme.
+        """
         
         # Calculer métriques
         total_controls = len(controls)
@@ -486,6 +882,21 @@ class ReportGenerator:
                     "remediation": control.remediation_plan or "Plan de remédiation requis"
                 })
         
+        # Intégrité de l'audit trail (vérification complète, pas d'échantillonnage)
+        if audit_verification is not None and not audit_verification['valid']:
+            overall_status = ComplianceStatus.NON_COMPLIANT
+            first_error = audit_verification['errors'][0] if audit_verification['errors'] else {}
+            findings.append({
+                "control_id": "AUDIT-TRAIL",
+                "title": "Intégrité de l'audit trail",
+                "status": ComplianceStatus.NON_COMPLIANT.value,
+                "risk_level": "high",
+                "description": (f"{len(audit_verification['errors'])} anomalies sur "
+                                f"{audit_verification['entries_verified']} entrées "
+                                f"(première: seq {first_error.get('seq')} - {first_error.get('error')})"),
+                "remediation": "Investiguer l'altération de l'audit trail et restaurer depuis une sauvegarde"
+            })
+        
         # Générer recommandations
         recommendations = self._generate_recommendations(framework, controls, compliance_score)
         
@@ -669,12 +1080,16 @@ class ComplianceDashboard:
         self.audit_manager = AuditTrailManager()
         self.assessor = ComplianceAssessor()
         self.report_generator = ReportGenerator()
+        self.store = AsyncSQLiteStore.for_database(db_path)
         self._setup_database()
         self._setup_monitoring()
     
     def _setup_database(self):
         """Initialiser base de données compliance"""
-        conn = sqlite3.connect(self.db_path)
+        self.store.run_sync(self._create_schema)
+    
+    def _create_schema(self, conn: sqlite3.Connection):
+        """Créer le schéma (exécuté par le thread écrivain du store)"""
         cursor = conn.cursor()
         
         # Table contrôles
@@ -727,9 +1142,6 @@ class ComplianceDashboard:
                 assigned_to TEXT
             )
         ''')
-        
-        conn.commit()
-        conn.close()
     
     def _setup_monitoring(self):
         """Configuration monitoring conformité automatique"""
@@ -744,7 +1156,7 @@ class ComplianceDashboard:
             system_context = await self._gather_system_context()
         
         # Log action
-        self.audit_manager.log_action(
+        await self.audit_manager.log_action_async(
             "compliance_system", "assessment_started", f"framework_{framework.name}",
             {"framework": framework.value, "context_keys": list(system_context.keys())}
         )
@@ -781,8 +1193,14 @@ class ComplianceDashboard:
                 )
                 controls.append(error_control)
         
+        # Vérifier l'intégrité de tout l'audit trail (hors boucle événementielle)
+        self.audit_manager.flush()
+        audit_verification = await asyncio.get_running_loop().run_in_executor(
+            None, self.audit_manager.verify_range
+        )
+        
         # Générer rapport
-        report = self.report_generator.generate_compliance_report(framework, controls)
+        report = self.report_generator.generate_compliance_report(framework, controls, audit_verification)
         
         # Sauvegarder rapport
         await self._save_report(report)
@@ -791,9 +1209,11 @@ class ComplianceDashboard:
         await self._check_for_compliance_violations(controls, framework)
         
         # Log fin
-        self.audit_manager.log_action(
+        await self.audit_manager.log_action_async(
             "compliance_system", "assessment_completed", f"framework_{framework.name}",
-            {"report_id": report.id, "score": report.compliance_score, "status": report.overall_status.value}
+            {"report_id": report.id, "score": report.compliance_score, "status": report.overall_status.value,
+             "audit_trail_valid": audit_verification['valid'],
+             "audit_trail_entries_verified": audit_verification['entries_verified']}
         )
         
         logger.info(f"🎯 Évaluation {framework.value} terminée: {report.compliance_score:.1f}% - {report.overall_status.value}")
@@ -853,10 +1273,7 @@ class ComplianceDashboard:
     
     async def _save_control(self, control: ComplianceControl):
         """Sauvegarder contrôle en base"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        await self.store.execute('''
             INSERT OR REPLACE INTO compliance_controls
             (id, framework, control_id, title, description, status, last_assessment,
              risk_level, responsible_person, due_date, metadata)
@@ -867,16 +1284,10 @@ class ComplianceDashboard:
             control.risk_level, control.responsible_person, control.due_date,
             json.dumps(control.metadata)
         ))
-        
-        conn.commit()
-        conn.close()
     
     async def _save_report(self, report: ComplianceReport):
         """Sauvegarder rapport en base"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        await self.store.execute('''
             INSERT INTO compliance_reports
             (id, framework, generation_date, overall_status, compliance_score,
              controls_summary, findings, recommendations, report_path, next_assessment_due)
@@ -887,9 +1298,6 @@ class ComplianceDashboard:
             json.dumps(report.controls_summary), json.dumps(report.findings),
             json.dumps(report.recommendations), report.report_path, report.next_assessment_due
         ))
-        
-        conn.commit()
-        conn.close()
     
     async def _check_for_compliance_violations(self, controls: List[ComplianceControl], 
                                              framework: ComplianceFramework):
@@ -900,10 +1308,7 @@ class ComplianceDashboard:
                 # Créer alerte critique
                 alert_id = str(uuid.uuid4())
                 
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                
-                cursor.execute('''
+                await self.store.execute('''
                     INSERT INTO compliance_alerts
                     (id, alert_type, severity, title, description, control_id, framework, assigned_to)
                     VALUES (?, ?, ?, ?, ?, ?, ?, ?)
@@ -914,9 +1319,6 @@ class ComplianceDashboard:
                     control.control_id, framework.value, control.responsible_person
                 ))
                 
-                conn.commit()
-                conn.close()
-                
                 logger.warning(f"🚨 Alerte générée pour violation {control.control_id}")
     
     def _weekly_compliance_check(self):
@@ -958,6 +1360,7 @@ class ComplianceDashboard:
         
         # Audit trail (table dans une autre base)
         try:
+            self.audit_manager.flush()
             audit_conn = sqlite3.connect(self.audit_manager.db_path)
             audit_cursor = audit_conn.cursor()
             audit_cursor.execute('SELECT COUNT(*) FROM audit_trail WHERE timestamp >= datetime("now", "-24 hours")')
@@ -985,7 +1388,7 @@ async def demo_compliance_dashboard():
     print("=" * 60)
     
     # Test audit trail
-    dashboard.audit_manager.log_action(
+    await dashboard.audit_manager.log_action_async(
         "admin", "system_config", "compliance_dashboard",
         {"action": "demo_started", "timestamp": datetime.now().isoformat()}
     )
@@ -1013,15 +1416,19 @@ async def demo_compliance_dashboard():
     print(f"   Alertes ouvertes: {metrics['open_compliance_alerts']}")
     print(f"   Entrées audit 24h: {metrics['audit_trail_entries_24h']}")
     
-    # Exemple d'intégrité audit trail
+    # Intégrité de l'audit trail complet
     audit_logs = dashboard.audit_manager.get_audit_logs(
         start_date=datetime.now() - timedelta(hours=1)
     )
+    verification = dashboard.audit_manager.verify_range()
     print(f"\n🔒 AUDIT TRAIL:")
+    print(f"   Entrées vérifiées: {verification['entries_verified']} "
+          f"({verification['checkpoints_verified']} checkpoints Merkle) - "
+          f"Intégrité: {'✅' if verification['valid'] else '❌'}")
     for log in audit_logs[:3]:
-        integrity = dashboard.audit_manager.verify_integrity(log.id)
-        print(f"   {log.timestamp.strftime('%H:%M:%S')} - {log.action} par {log.user_id} - Intégrité: {'✅' if integrity else '❌'}")
+        print(f"   {log.timestamp.strftime('%H:%M:%S')} - {log.action} par {log.user_id}")
     
+    dashboard.audit_manager.close()
     return reports
 
 if __name__ == "__main__":
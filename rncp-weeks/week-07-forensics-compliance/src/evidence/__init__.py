@@ -0,0 +1 @@
+"""Gestion des preuves numériques et chaîne de custody"""
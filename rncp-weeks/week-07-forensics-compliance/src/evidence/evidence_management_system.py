@@ -17,19 +17,26 @@ import sqlite3
 import hashlib
 import hmac
 import os
+import mmap
+import stat
 import shutil
+import struct
 import zipfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple, BinaryIO
 from dataclasses import dataclass, asdict
 from pathlib import Path
 import uuid
 import logging
-from collections import defaultdict
+from collections import defaultdict, OrderedDict, deque
 from enum import Enum
 import base64
 import mimetypes
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.exceptions import InvalidTag
 from cryptography.hazmat.primitives import hashes, serialization, padding as sym_padding
 from cryptography.hazmat.primitives.asymmetric import rsa, padding
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
@@ -43,6 +50,8 @@ import tempfile
 # from reportlab.lib.styles import getSampleStyleSheet
 # from reportlab.lib import colors
 
+from ..storage import AsyncSQLiteStore
+
 logger = logging.getLogger('EvidenceManagementSystem')
 
 class EvidenceType(Enum):
@@ -166,11 +175,30 @@ class LegalExportPackage:
     expiry_date: Optional[datetime]
 
 class EncryptionManager:
-    """Gestionnaire de chiffrement pour les preuves"""
+    """Gestionnaire de chiffrement pour les preuves
+    
+    Format streaming authentifié (AES-256-GCM par trames): en-tête
+    MAGIC | version | taille de trame | salt | préfixe de nonce, puis trames
+    chiffré || tag. Le nonce de chaque trame est préfixe || index || drapeau de
+    dernière trame (construction STREAM): trames réordonnées, tronquées ou
+    modifiées échouent à l'authentification. Mémoire constante (tampons
+    réutilisés), mode parallèle par trames indépendantes. Les anciens fichiers
+    AES-256-CBC restent déchiffrables.
+    """
+    
+    STREAM_MAGIC = b'EVDGCM01'
+    STREAM_VERSION = 1
+    STREAM_HEADER = struct.Struct('>8sBI16s7s')
+    FRAME_SIZE = 1024 * 1024
+    TAG_SIZE = 16
+    PARALLEL_THRESHOLD = 64 * 1024 * 1024
     
-    def __init__(self, master_key: Optional[bytes] = None):
+    def __init__(self, master_key: Optional[bytes] = None, frame_size: int = FRAME_SIZE,
+                 max_workers: Optional[int] = None):
         self.master_key = master_key or self._generate_master_key()
         self.backend = default_backend()
+        self.frame_size = frame_size
+        self.max_workers = max_workers or os.cpu_count() or 1
     
     def _generate_master_key(self) -> bytes:
         """Générer clé maître pour chiffrement"""
@@ -187,94 +215,248 @@ class EncryptionManager:
         )
         return kdf.derive(password.encode())
     
-    def encrypt_file(self, file_path: str, output_path: str, password: str = None) -> Dict[str, str]:
-        """Chiffrer un fichier avec AES-256"""
-        # Générer salt et IV
+    @staticmethod
+    def _frame_nonce(nonce_prefix: bytes, index: int, last: bool) -> bytes:
+        return nonce_prefix + struct.pack('>IB', index, 1 if last else 0)
+    
+    @staticmethod
+    def _read_full(stream: BinaryIO, buffer: bytearray) -> int:
+        """Remplir le tampon (lectures courtes possibles sur pipes/périphériques)"""
+        view = memoryview(buffer)
+        filled = 0
+        while filled < len(buffer):
+            count = stream.readinto(view[filled:])
+            if not count:
+                break
+            filled += count
+        return filled
+    
+    def _use_parallel(self, parallel: Optional[bool], file_path: str) -> bool:
+        if parallel is not None:
+            return parallel and self.max_workers > 1
+        try:
+            return self.max_workers > 1 and os.path.getsize(file_path) >= self.PARALLEL_THRESHOLD
+        except OSError:
+            return False
+    
+    def encrypt_file(self, file_path: str, output_path: str, password: str = None,
+                     parallel: Optional[bool] = None) -> Dict[str, str]:
+        """Chiffrer un fichier avec AES-256-GCM par trames (mémoire constante)
+        
+        parallel=None active le mode parallèle pour les fichiers volumineux.
+        """
+        # Générer salt et préfixe de nonce
         salt = os.urandom(16)
-        iv = os.urandom(16)
+        nonce_prefix = os.urandom(7)
         
         # Dériver clé
         key = self.derive_key(password or "default_evidence_key", salt) if password else self.master_key
         
-        # Chiffrer
-        cipher = Cipher(algorithms.AES(key), modes.CBC(iv), backend=self.backend)
-        encryptor = cipher.encryptor()
-        
-        # Padding pour AES
-        padder = sym_padding.PKCS7(128).padder()
+        header = self.STREAM_HEADER.pack(self.STREAM_MAGIC, self.STREAM_VERSION, self.frame_size, salt, nonce_prefix)
         
         with open(file_path, 'rb') as infile, open(output_path, 'wb') as outfile:
-            # Écrire salt et IV en début de fichier
-            outfile.write(salt + iv)
-            
-            # Chiffrer données par blocs
-            while True:
-                chunk = infile.read(8192)
-                if not chunk:
-                    # Finaliser padding
-                    padded_data = padder.finalize()
-                    if padded_data:
-                        outfile.write(encryptor.update(padded_data))
-                    break
-                
-                if len(chunk) < 8192:
-                    # Dernier bloc - ajouter padding
-                    padded_data = padder.update(chunk) + padder.finalize()
-                    outfile.write(encryptor.update(padded_data))
-                    break
-                else:
-                    padded_data = padder.update(chunk)
-                    outfile.write(encryptor.update(padded_data))
-            
-            # Finaliser chiffrement
-            outfile.write(encryptor.finalize())
+            outfile.write(header)
+            if self._use_parallel(parallel, file_path):
+                frames = self._encrypt_frames_parallel(infile, outfile, key, header, nonce_prefix)
+            else:
+                frames = self._encrypt_frames(infile, outfile, key, header, nonce_prefix)
         
         return {
             "encrypted_path": output_path,
             "salt": base64.b64encode(salt).decode(),
-            "iv": base64.b64encode(iv).decode(),
-            "algorithm": "AES-256-CBC"
+            "nonce_prefix": base64.b64encode(nonce_prefix).decode(),
+            "frame_size": str(self.frame_size),
+            "frames": str(frames),
+            "algorithm": "AES-256-GCM-STREAM"
         }
     
-    def decrypt_file(self, encrypted_path: str, output_path: str, password: str = None) -> bool:
-        """Déchiffrer un fichier"""
+    def _encrypt_frames(self, infile: BinaryIO, outfile: BinaryIO, key: bytes,
+                        header: bytes, nonce_prefix: bytes) -> int:
+        """Chiffrement séquentiel, lecture anticipée d'une trame pour marquer la dernière"""
+        frame_size = self.frame_size
+        current, following = bytearray(frame_size), bytearray(frame_size)
+        output = bytearray(frame_size + 15)
+        current_length = self._read_full(infile, current)
+        index = 0
+        
+        while True:
+            following_length = self._read_full(infile, following) if current_length == frame_size else 0
+            last = following_length == 0
+            
+            encryptor = Cipher(algorithms.AES(key), modes.GCM(self._frame_nonce(nonce_prefix, index, last)),
+                               backend=self.backend).encryptor()
+            encryptor.authenticate_additional_data(header)
+            written = encryptor.update_into(memoryview(current)[:current_length], output)
+            encryptor.finalize()
+            outfile.write(memoryview(output)[:written])
+            outfile.write(encryptor.tag)
+            
+            if last:
+                return index + 1
+            current, following = following, current
+            current_length = following_length
+            index += 1
+    
+    def _encrypt_frames_parallel(self, infile: BinaryIO, outfile: BinaryIO, key: bytes,
+                                 header: bytes, nonce_prefix: bytes) -> int:
+        """Chiffrement parallèle des trames, écrites dans l'ordre (fenêtre bornée)"""
+        aead = AESGCM(key)
+        frame_size = self.frame_size
+        window = deque()
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            current = infile.read(frame_size)
+            index = 0
+            while True:
+                following = infile.read(frame_size) if len(current) == frame_size else b''
+                last = not following
+                window.append(pool.submit(aead.encrypt, self._frame_nonce(nonce_prefix, index, last), current, header))
+                if len(window) >= 2 * self.max_workers:
+                    outfile.write(window.popleft().result())
+                if last:
+                    break
+                current = following
+                index += 1
+            
+            while window:
+                outfile.write(window.popleft().result())
+        
+        return index + 1
+    
+    def decrypt_file(self, encrypted_path: str, output_path: str, password: str = None,
+                     parallel: Optional[bool] = None) -> bool:
+        """Déchiffrer un fichier (format GCM par trames ou ancien format CBC)
+        
+        Chaque trame n'est écrite qu'après vérification de son tag; en cas d'échec,
+        la sortie partielle est supprimée.
+        """
         try:
-            with open(encrypted_path, 'rb') as infile:
-                # Lire salt et IV
-                salt = infile.read(16)
-                iv = infile.read(16)
-                
-                # Dériver clé
-                key = self.derive_key(password or "default_evidence_key", salt) if password else self.master_key
-                
-                # Déchiffrer
-                cipher = Cipher(algorithms.AES(key), modes.CBC(iv), backend=self.backend)
-                decryptor = cipher.decryptor()
+            with open(encrypted_path, 'rb') as infile, open(output_path, 'wb') as outfile:
+                prefix = infile.read(self.STREAM_HEADER.size)
                 
-                # Unpadding
-                unpadder = sym_padding.PKCS7(128).unpadder()
-                
-                with open(output_path, 'wb') as outfile:
-                    decrypted_data = b""
+                if prefix[:len(self.STREAM_MAGIC)] == self.STREAM_MAGIC and len(prefix) == self.STREAM_HEADER.size:
+                    _, version, frame_size, salt, nonce_prefix = self.STREAM_HEADER.unpack(prefix)
+                    if version != self.STREAM_VERSION:
+                        raise ValueError(f"Version de format non supportée: {version}")
                     
-                    while True:
-                        chunk = infile.read(8192)
-                        if not chunk:
-                            break
-                        decrypted_data += decryptor.update(chunk)
+                    # Dériver clé
+                    key = self.derive_key(password or "default_evidence_key", salt) if password else self.master_key
                     
-                    # Finaliser et enlever padding
-                    decrypted_data += decryptor.finalize()
-                    unpadded_data = unpadder.update(decrypted_data) + unpadder.finalize()
-                    outfile.write(unpadded_data)
+                    if self._use_parallel(parallel, encrypted_path):
+                        self._decrypt_frames_parallel(infile, outfile, key, prefix, nonce_prefix, frame_size)
+                    else:
+                        self._decrypt_frames(infile, outfile, key, prefix, nonce_prefix, frame_size)
+                else:
+                    self._decrypt_legacy_cbc(prefix, infile, outfile, password)
             
             return True
+        except InvalidTag:
+            logger.error(f"Erreur déchiffrement: authentification échouée pour {encrypted_path} (preuve altérée ou clé invalide)")
+            if os.path.exists(output_path):
+                os.unlink(output_path)
+            return False
         except Exception as e:
             logger.error(f"Erreur déchiffrement: {e}")
+            if os.path.exists(output_path):
+                os.unlink(output_path)
             return False
+    
+    def _decrypt_frames(self, infile: BinaryIO, outfile: BinaryIO, key: bytes, header: bytes,
+                        nonce_prefix: bytes, frame_size: int):
+        """Déchiffrement séquentiel en mémoire constante"""
+        record_size = frame_size + self.TAG_SIZE
+        current, following = bytearray(record_size), bytearray(record_size)
+        output = bytearray(frame_size + 15)
+        current_length = self._read_full(infile, current)
+        index = 0
+        
+        while True:
+            if current_length < self.TAG_SIZE:
+                raise InvalidTag("Trame tronquée")
+            following_length = self._read_full(infile, following) if current_length == record_size else 0
+            last = following_length == 0
+            
+            view = memoryview(current)
+            tag = bytes(view[current_length - self.TAG_SIZE:current_length])
+            decryptor = Cipher(algorithms.AES(key), modes.GCM(self._frame_nonce(nonce_prefix, index, last), tag),
+                               backend=self.backend).decryptor()
+            decryptor.authenticate_additional_data(header)
+            written = decryptor.update_into(view[:current_length - self.TAG_SIZE], output)
+            decryptor.finalize()  # InvalidTag si trame altérée
+            outfile.write(memoryview(output)[:written])
+            
+            if last:
+                return
+            current, following = following, current
+            current_length = following_length
+            index += 1
+    
+    def _decrypt_frames_parallel(self, infile: BinaryIO, outfile: BinaryIO, key: bytes, header: bytes,
+                                 nonce_prefix: bytes, frame_size: int):
+        """Déchiffrement parallèle des trames, écrites dans l'ordre (fenêtre bornée)"""
+        aead = AESGCM(key)
+        record_size = frame_size + self.TAG_SIZE
+        window = deque()
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            current = infile.read(record_size)
+            index = 0
+            while True:
+                following = infile.read(record_size) if len(current) == record_size else b''
+                last = not following
+                window.append(pool.submit(aead.decrypt, self._frame_nonce(nonce_prefix, index, last), current, header))
+                if len(window) >= 2 * self.max_workers:
+                    outfile.write(window.popleft().result())
+                if last:
+                    break
+                current = following
+                index += 1
+            
+            while window:
+                outfile.write(window.popleft().result())
+    
+    def _decrypt_legacy_cbc(self, prefix: bytes, infile: BinaryIO, outfile: BinaryIO, password: str = None):
+        """Ancien format salt | IV | AES-256-CBC, déchiffré en flux"""
+        salt, iv = prefix[:16], prefix[16:32]
+        remainder = prefix[32:]
+        
+        # Dériver clé
+        key = self.derive_key(password or "default_evidence_key", salt) if password else self.master_key
+        
+        decryptor = Cipher(algorithms.AES(key), modes.CBC(iv), backend=self.backend).decryptor()
+        unpadder = sym_padding.PKCS7(128).unpadder()
+        
+        outfile.write(unpadder.update(decryptor.update(remainder)))
+        while chunk := infile.read(self.frame_size):
+            outfile.write(unpadder.update(decryptor.update(chunk)))
+        outfile.write(unpadder.update(decryptor.finalize()) + unpadder.finalize())
 
 class HashManager:
-    """Gestionnaire de vérification d'intégrité"""
+    """Gestionnaire de vérification d'intégrité
+    
+    Service de hachage pour l'ingestion de preuves volumineuses: lecture par mmap
+    (ou gros blocs pour les fichiers non mappables), chaque digest alimenté par son
+    propre thread (hashlib relâche le GIL), vérification de lots de fichiers sur un
+    pool borné et cache des empreintes par (espace, device, inode, taille, mtime).
+    L'espace sépare les empreintes des octets du fichier ("file") de celles d'un
+    contenu dérivé, comme le clair d'un conteneur chiffré ("plaintext").
+    """
+    
+    ALGORITHMS = ("sha256", "md5", "sha1")
+    FILE_NAMESPACE = "file"
+    PLAINTEXT_NAMESPACE = "plaintext"
+    CHUNK_SIZE = 4 * 1024 * 1024
+    PARALLEL_THRESHOLD = 16 * 1024 * 1024  # En dessous, un seul thread suffit
+    
+    def __init__(self, max_workers: int = 4, cache_size: int = 10000):
+        self.max_workers = max_workers
+        self.cache_size = cache_size
+        self.file_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="evidence-hash")
+        self.digest_executor = ThreadPoolExecutor(max_workers=max_workers * len(self.ALGORITHMS),
+                                                  thread_name_prefix="evidence-digest")
+        self._cache: "OrderedDict[tuple, Dict[str, str]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.stats = {'files_hashed': 0, 'bytes_hashed': 0, 'cache_hits': 0}
     
     @staticmethod
     def calculate_hash(file_path: str, algorithm: str = "sha256") -> str:
@@ -282,41 +464,153 @@ class HashManager:
         hash_func = getattr(hashlib, algorithm.lower())()
         
         with open(file_path, 'rb') as f:
-            while chunk := f.read(8192):
+            while chunk := f.read(HashManager.CHUNK_SIZE):
                 hash_func.update(chunk)
         
         return hash_func.hexdigest()
     
     @staticmethod
-    def calculate_multiple_hashes(file_path: str) -> Dict[str, str]:
-        """Calculer plusieurs hashs simultanément"""
-        sha256_hash = hashlib.sha256()
-        md5_hash = hashlib.md5()
-        sha1_hash = hashlib.sha1()
+    def stat_key(file_path: str) -> Optional[tuple]:
+        """Clé de cache: un fichier inchangé garde device, inode, taille et mtime
         
-        with open(file_path, 'rb') as f:
-            while chunk := f.read(8192):
-                sha256_hash.update(chunk)
-                md5_hash.update(chunk)
-                sha1_hash.update(chunk)
+        None pour les fichiers non réguliers (périphériques), jamais mis en cache.
+        """
+        try:
+            file_stat = os.stat(file_path)
+        except OSError:
+            return None
+        if not stat.S_ISREG(file_stat.st_mode):
+            return None
+        return (file_stat.st_dev, file_stat.st_ino, file_stat.st_size, file_stat.st_mtime_ns)
+    
+    def get_cached_hashes(self, file_path: str, namespace: str = FILE_NAMESPACE) -> Optional[Dict[str, str]]:
+        """Empreintes déjà vérifiées pour ce fichier, s'il n'a pas changé"""
+        key = self.stat_key(file_path)
+        if key is None:
+            return None
+        key = (namespace,) + key
+        with self._cache_lock:
+            hashes = self._cache.get(key)
+            if hashes is not None:
+                self._cache.move_to_end(key)
+                self.stats['cache_hits'] += 1
+                return dict(hashes)
+        return None
+    
+    def remember_hashes(self, file_path: str, hashes: Dict[str, str], key: tuple = None,
+                        namespace: str = FILE_NAMESPACE):
+        """Mémoriser les empreintes d'un fichier (clé capturée avant lecture si fournie)"""
+        current_key = self.stat_key(file_path)
+        if current_key is None or (key is not None and key != current_key):
+            # Fichier modifié pendant le calcul: ne rien mettre en cache
+            return
+        current_key = (namespace,) + current_key
+        with self._cache_lock:
+            self._cache[current_key] = dict(hashes)
+            self._cache.move_to_end(current_key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+    
+    def calculate_multiple_hashes(self, file_path: str, use_cache: bool = True) -> Dict[str, str]:
+        """Calculer plusieurs hashs simultanément (un thread par algorithme)
         
-        return {
-            "sha256": sha256_hash.hexdigest(),
-            "md5": md5_hash.hexdigest(),
-            "sha1": sha1_hash.hexdigest()
-        }
+        use_cache=False ignore et n'alimente pas le cache (fichiers temporaires).
+        """
+        if use_cache:
+            cached = self.get_cached_hashes(file_path)
+            if cached is not None:
+                return cached
+        
+        key = self.stat_key(file_path)
+        digests = {algorithm: hashlib.new(algorithm) for algorithm in self.ALGORITHMS}
+        
+        with open(file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+            except (OSError, ValueError):
+                mapped = None  # Périphérique bloc, pipe...: lecture par gros blocs
+            
+            if mapped is not None:
+                with mapped:
+                    view = memoryview(mapped)
+                    try:
+                        self._hash_view(view, digests)
+                    finally:
+                        view.release()
+            else:
+                size = self._hash_stream(f, digests)
+        
+        hashes = {algorithm: digest.hexdigest() for algorithm, digest in digests.items()}
+        with self._cache_lock:
+            self.stats['files_hashed'] += 1
+            self.stats['bytes_hashed'] += size
+        if use_cache:
+            self.remember_hashes(file_path, hashes, key)
+        return hashes
     
-    @staticmethod
-    def verify_integrity(file_path: str, expected_hashes: Dict[str, str]) -> Dict[str, bool]:
+    def _hash_view(self, view: memoryview, digests: Dict[str, Any]):
+        """Chaque digest parcourt la projection mémoire dans son propre thread"""
+        def feed(digest):
+            for offset in range(0, len(view), self.CHUNK_SIZE):
+                digest.update(view[offset:offset + self.CHUNK_SIZE])
+        
+        if len(view) < self.PARALLEL_THRESHOLD:
+            for digest in digests.values():
+                feed(digest)
+            return
+        
+        futures = [self.digest_executor.submit(feed, digest) for digest in digests.values()]
+        for future in futures:
+            future.result()
+    
+    def _hash_stream(self, f: BinaryIO, digests: Dict[str, Any]) -> int:
+        """Lecture par gros blocs: le bloc suivant est lu pendant le hachage du précédent"""
+        total = 0
+        pending = []
+        while chunk := f.read(self.CHUNK_SIZE):
+            total += len(chunk)
+            for future in pending:
+                future.result()
+            pending = [self.digest_executor.submit(digest.update, chunk) for digest in digests.values()]
+        for future in pending:
+            future.result()
+        return total
+    
+    def verify_integrity(self, file_path: str, expected_hashes: Dict[str, str],
+                         use_cache: bool = True) -> Dict[str, bool]:
         """Vérifier intégrité avec plusieurs algorithmes"""
-        current_hashes = HashManager.calculate_multiple_hashes(file_path)
-        
+        current_hashes = self.calculate_multiple_hashes(file_path, use_cache)
+        return self.compare_hashes(current_hashes, expected_hashes)
+    
+    @staticmethod
+    def compare_hashes(current_hashes: Dict[str, str], expected_hashes: Dict[str, str]) -> Dict[str, bool]:
         verification_results = {}
         for algorithm, expected_hash in expected_hashes.items():
             current_hash = current_hashes.get(algorithm.lower())
             verification_results[algorithm] = (current_hash == expected_hash) if current_hash else False
         
         return verification_results
+    
+    def verify_many(self, expected_by_path: Dict[str, Dict[str, str]],
+                    use_cache: bool = True) -> Dict[str, Dict[str, bool]]:
+        """Vérifier plusieurs fichiers en parallèle sur le pool borné"""
+        futures = {
+            file_path: self.file_executor.submit(self.verify_integrity, file_path, expected, use_cache)
+            for file_path, expected in expected_by_path.items()
+        }
+        results = {}
+        for file_path, future in futures.items():
+            try:
+                results[file_path] = future.result()
+            except OSError as e:
+                logger.error(f"Erreur vérification {file_path}: {e}")
+                results[file_path] = {algorithm: False for algorithm in expected_by_path[file_path]}
+        return results
+    
+    def shutdown(self):
+        self.file_executor.shutdown(wait=True)
+        self.digest_executor.shutdown(wait=True)
 
 class MetadataExtractor:
     """Extracteur de métadonnées forensics"""
@@ -748,11 +1042,15 @@ class EvidenceManagementSystem:
         self.custody_manager = CustodyChainManager()
         self.legal_exporter = LegalExporter()
         self.metadata_extractor = MetadataExtractor()
+        self.store = AsyncSQLiteStore.for_database(db_path)
         self._setup_database()
     
     def _setup_database(self):
         """Initialiser base de données des preuves"""
-        conn = sqlite3.connect(self.db_path)
+        self.store.run_sync(self._create_schema)
+    
+    def _create_schema(self, conn: sqlite3.Connection):
+        """Créer le schéma (exécuté par le thread écrivain du store)"""
         cursor = conn.cursor()
         
         # Table preuves principales
@@ -843,8 +1141,15 @@ class EvidenceManagementSystem:
             )
         ''')
         
-        conn.commit()
-        conn.close()
+        # Index pour les filtres de recherche et la pagination (collected_at, id)
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_evidence_case_collected ON digital_evidence (case_id, collected_at, id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_evidence_type_collected ON digital_evidence (evidence_type, collected_at, id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_evidence_status_collected ON digital_evidence (status, collected_at, id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_evidence_collected ON digital_evidence (collected_at, id)')
+        
+        # Index des tables liées, chargées par evidence_id
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_hash_verifications_evidence ON hash_verifications (evidence_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_custody_chain_evidence ON custody_chain (evidence_id, timestamp)')
     
     async def collect_evidence(self, case_id: str, title: str, description: str,
                              evidence_type: EvidenceType, file_path: str,
@@ -918,11 +1223,19 @@ class EvidenceManagementSystem:
         logger.info(f"🔒 Preuve collectée: {evidence_id} ({evidence_number})")
         return evidence
     
-    async def verify_evidence_integrity(self, evidence_id: str, verifier: str) -> Dict[str, bool]:
-        """Vérifier intégrité d'une preuve"""
-        evidence = await self._load_evidence(evidence_id)
-        if not evidence or not evidence.file_path:
-            return {}
+    def _hash_evidence_content(self, evidence: DigitalEvidence,
+                               use_cache: bool = True) -> Tuple[Optional[Dict[str, str]], Optional[tuple], bool]:
+        """Empreintes du contenu déchiffré d'une preuve (bloquant, exécuté hors boucle)
+        
+        Retourne (empreintes, clé du conteneur chiffré, issu du cache). Un conteneur
+        chiffré inchangé depuis une vérification réussie n'est ni déchiffré ni rehaché.
+        """
+        if use_cache:
+            cached = self.hash_manager.get_cached_hashes(evidence.file_path, HashManager.PLAINTEXT_NAMESPACE)
+            if cached is not None:
+                return cached, None, True
+        
+        container_key = self.hash_manager.stat_key(evidence.file_path)
         
         # Déchiffrer temporairement pour vérification
         temp_file = None
@@ -932,49 +1245,90 @@ class EvidenceManagementSystem:
             
             # Déchiffrer
             decrypted = self.encryption_manager.decrypt_file(
-                evidence.file_path, temp_file, f"evidence_{evidence_id}"
+                evidence.file_path, temp_file, f"evidence_{evidence.id}"
             )
             
             if not decrypted:
-                logger.error(f"Impossible de déchiffrer {evidence_id} pour vérification")
-                return {}
-            
-            # Vérifier hashs
-            expected_hashes = {
-                hv.algorithm: hv.hash_value for hv in evidence.hash_verifications
-            }
-            verification_results = self.hash_manager.verify_integrity(temp_file, expected_hashes)
-            
-            # Mettre à jour statut des vérifications
-            for hv in evidence.hash_verifications:
-                if hv.algorithm in verification_results:
-                    hv.status = verification_results[hv.algorithm]
-                    hv.calculated_at = datetime.now()
-                    hv.verified_by = verifier
-            
-            # Ajouter entrée custody
-            status_text = "verified" if all(verification_results.values()) else "integrity_warning"
-            custody_entry = self.custody_manager.create_custody_entry(
-                evidence_id, status_text, verifier, "Evidence Storage",
-                f"Integrity verification: {verification_results}",
-                evidence.custody_chain[-1].entry_hash if evidence.custody_chain else None
-            )
-            evidence.custody_chain.append(custody_entry)
+                return None, container_key, False
             
-            # Mettre à jour statut
-            if all(verification_results.values()):
-                evidence.status = EvidenceStatus.VERIFIED
-            
-            evidence.updated_at = datetime.now()
-            await self._save_evidence(evidence)
-            
-            logger.info(f"✅ Vérification intégrité {evidence_id}: {verification_results}")
-            return verification_results
+            return self.hash_manager.calculate_multiple_hashes(temp_file, use_cache=False), container_key, False
         
         finally:
             if temp_file and os.path.exists(temp_file):
                 os.unlink(temp_file)
     
+    async def verify_evidence_integrity(self, evidence_id: str, verifier: str,
+                                        use_cache: bool = True) -> Dict[str, bool]:
+        """Vérifier intégrité d'une preuve"""
+        evidence = await self._load_evidence(evidence_id)
+        if not evidence or not evidence.file_path:
+            return {}
+        
+        # Déchiffrement et hachage sur le pool borné du HashManager
+        loop = asyncio.get_running_loop()
+        current_hashes, container_key, from_cache = await loop.run_in_executor(
+            self.hash_manager.file_executor, self._hash_evidence_content, evidence, use_cache
+        )
+        
+        if current_hashes is None:
+            logger.error(f"Impossible de déchiffrer {evidence_id} pour vérification")
+            return {}
+        
+        # Vérifier hashs
+        expected_hashes = {
+            hv.algorithm: hv.hash_value for hv in evidence.hash_verifications
+        }
+        verification_results = self.hash_manager.compare_hashes(current_hashes, expected_hashes)
+        
+        # Seules les empreintes vérifiées sont mises en cache, sur la clé du conteneur chiffré,
+        # dans un espace distinct des empreintes du conteneur lui-même
+        if use_cache and not from_cache and all(verification_results.values()):
+            self.hash_manager.remember_hashes(evidence.file_path, current_hashes, container_key,
+                                              HashManager.PLAINTEXT_NAMESPACE)
+        
+        # Mettre à jour statut des vérifications
+        for hv in evidence.hash_verifications:
+            if hv.algorithm in verification_results:
+                hv.status = verification_results[hv.algorithm]
+                hv.calculated_at = datetime.now()
+                hv.verified_by = verifier
+        
+        # Ajouter entrée custody
+        status_text = "verified" if all(verification_results.values()) else "integrity_warning"
+        cache_note = " (conteneur inchangé, empreintes en cache)" if from_cache else ""
+        custody_entry = self.custody_manager.create_custody_entry(
+            evidence_id, status_text, verifier, "Evidence Storage",
+            f"Integrity verification: {verification_results}{cache_note}",
+            evidence.custody_chain[-1].entry_hash if evidence.custody_chain else None
+        )
+        evidence.custody_chain.append(custody_entry)
+        
+        # Mettre à jour statut
+        if all(verification_results.values()):
+            evidence.status = EvidenceStatus.VERIFIED
+        
+        evidence.updated_at = datetime.now()
+        await self._save_evidence(evidence)
+        
+        logger.info(f"✅ Vérification intégrité {evidence_id}: {verification_results}")
+        return verification_results
+    
+    async def verify_evidence_batch(self, evidence_ids: List[str], verifier: str,
+                                    use_cache: bool = True) -> Dict[str, Dict[str, bool]]:
+        """Vérifier l'intégrité de plusieurs preuves en parallèle (concurrence bornée)"""
+        semaphore = asyncio.Semaphore(self.hash_manager.max_workers)
+        
+        async def verify(evidence_id: str) -> Dict[str, bool]:
+            async with semaphore:
+                try:
+                    return await self.verify_evidence_integrity(evidence_id, verifier, use_cache)
+                except Exception as e:
+                    logger.error(f"Erreur vérification {evidence_id}: {e}")
+                    return {}
+        
+        results = await asyncio.gather(*(verify(evidence_id) for evidence_id in evidence_ids))
+        return dict(zip(evidence_ids, results))
+    
     async def add_custody_entry(self, evidence_id: str, action: str, officer: str, 
                               location: str, notes: str) -> bool:
         """Ajouter entrée à la chaîne de possession"""
@@ -1002,12 +1356,8 @@ class EvidenceManagementSystem:
                                        authority: str, format: ExportFormat = ExportFormat.ZIP_ARCHIVE) -> LegalExportPackage:
         """Exporter preuves pour autorité judiciaire"""
         
-        # Charger preuves
-        evidence_list = []
-        for evidence_id in evidence_ids:
-            evidence = await self._load_evidence(evidence_id)
-            if evidence:
-                evidence_list.append(evidence)
+        # Charger preuves (en lot)
+        evidence_list = await self._load_evidence_many(evidence_ids)
         
         if not evidence_list:
             raise ValueError("Aucune preuve trouvée pour export")
@@ -1032,11 +1382,22 @@ class EvidenceManagementSystem:
     
     async def search_evidence(self, case_id: str = None, evidence_type: EvidenceType = None,
                             status: EvidenceStatus = None, collected_by: str = None,
-                            date_from: datetime = None, date_to: datetime = None) -> List[DigitalEvidence]:
-        """Rechercher preuves avec filtres"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+                            date_from: datetime = None, date_to: datetime = None,
+                            limit: int = None, after: Tuple[str, str] = None) -> List[DigitalEvidence]:
+        """Rechercher preuves avec filtres
+        
+        limit/after: pagination par clé (collected_at, id) décroissante, voir
+        search_evidence_page pour obtenir le curseur de la page suivante.
+        """
+        page = await self.search_evidence_page(case_id, evidence_type, status, collected_by,
+                                               date_from, date_to, limit, after)
+        return page['evidence']
+    
+    async def search_evidence_page(self, case_id: str = None, evidence_type: EvidenceType = None,
+                                   status: EvidenceStatus = None, collected_by: str = None,
+                                   date_from: datetime = None, date_to: datetime = None,
+                                   page_size: int = None, after: Tuple[str, str] = None) -> Dict[str, Any]:
+        """Page de résultats de recherche et curseur (collected_at, id) de la page suivante"""
         query = "SELECT * FROM digital_evidence WHERE 1=1"
         params = []
         
@@ -1064,39 +1425,45 @@ class EvidenceManagementSystem:
             query += " AND collected_at <= ?"
             params.append(date_to)
         
-        query += " ORDER BY collected_at DESC"
+        if after:
+            # Pagination par clé: pas d'OFFSET, la page suivante part du dernier élément vu
+            query += " AND (collected_at < ? OR (collected_at = ? AND id < ?))"
+            params.extend([after[0], after[0], after[1]])
         
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        conn.close()
+        query += " ORDER BY collected_at DESC, id DESC"
         
-        # Charger preuves complètes
-        evidence_list = []
-        for row in rows:
-            evidence = await self._load_evidence(row[0])  # row[0] = id
-            if evidence:
-                evidence_list.append(evidence)
+        if page_size:
+            query += " LIMIT ?"
+            params.append(page_size)
+        
+        def run_search(conn: sqlite3.Connection):
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            # Charger preuves complètes en lot (requêtes IN, une par table liée)
+            return rows, self._build_evidence_batch(cursor, rows)
+        
+        rows, evidence_list = await self.store.read(run_search)
+        
+        next_cursor = None
+        if page_size and len(rows) == page_size:
+            next_cursor = (rows[-1][10], rows[-1][0])  # (collected_at brut, id)
         
-        return evidence_list
+        return {'evidence': evidence_list, 'next_cursor': next_cursor}
     
     async def _generate_evidence_number(self, case_id: str) -> str:
         """Générer numéro séquentiel de preuve pour une affaire"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT COUNT(*) FROM digital_evidence WHERE case_id = ?', (case_id,))
-        count = cursor.fetchone()[0]
-        conn.close()
+        row = await self.store.fetchone('SELECT COUNT(*) FROM digital_evidence WHERE case_id = ?', (case_id,))
+        count = row[0]
         
         return f"{case_id}-EVD-{count + 1:04d}"
     
     async def _save_evidence(self, evidence: DigitalEvidence):
-        """Sauvegarder preuve complète en base"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        """Sauvegarder preuve complète en base (une transaction via le store)"""
+        statements = []
         
         # Sauvegarder preuve principale
-        cursor.execute('''
+        statements.append(('''
             INSERT OR REPLACE INTO digital_evidence
             (id, case_id, evidence_number, title, description, evidence_type, status,
              file_path, original_filename, collected_by, collected_at, location_collected,
@@ -1108,24 +1475,24 @@ class EvidenceManagementSystem:
             evidence.file_path, evidence.original_filename, evidence.collected_by,
             evidence.collected_at, evidence.location_collected, evidence.legal_hold,
             evidence.retention_date, evidence.created_at, evidence.updated_at
-        ))
+        )))
         
         # Sauvegarder vérifications hash
-        cursor.execute('DELETE FROM hash_verifications WHERE evidence_id = ?', (evidence.id,))
+        statements.append(('DELETE FROM hash_verifications WHERE evidence_id = ?', (evidence.id,)))
         for hv in evidence.hash_verifications:
-            cursor.execute('''
+            statements.append(('''
                 INSERT INTO hash_verifications
                 (id, evidence_id, algorithm, hash_value, calculated_at, verified_by, status)
                 VALUES (?, ?, ?, ?, ?, ?, ?)
             ''', (
                 str(uuid.uuid4()), evidence.id, hv.algorithm, hv.hash_value,
                 hv.calculated_at, hv.verified_by, hv.status
-            ))
+            )))
         
         # Sauvegarder chaîne de possession
-        cursor.execute('DELETE FROM custody_chain WHERE evidence_id = ?', (evidence.id,))
+        statements.append(('DELETE FROM custody_chain WHERE evidence_id = ?', (evidence.id,)))
         for ce in evidence.custody_chain:
-            cursor.execute('''
+            statements.append(('''
                 INSERT INTO custody_chain
                 (id, evidence_id, timestamp, action, officer, location, notes,
                  digital_signature, previous_hash, entry_hash)
@@ -1133,11 +1500,11 @@ class EvidenceManagementSystem:
             ''', (
                 ce.id, evidence.id, ce.timestamp, ce.action, ce.officer, ce.location,
                 ce.notes, ce.digital_signature, ce.previous_hash, ce.entry_hash
-            ))
+            )))
         
         # Sauvegarder métadonnées
         if evidence.metadata:
-            cursor.execute('''
+            statements.append(('''
                 INSERT OR REPLACE INTO evidence_metadata
                 (evidence_id, file_size, mime_type, creation_date, modification_date,
                  exif_data, geolocation, device_info, network_info, user_context,
@@ -1152,91 +1519,111 @@ class EvidenceManagementSystem:
                 json.dumps(evidence.metadata.network_info) if evidence.metadata.network_info else None,
                 evidence.metadata.user_context, evidence.metadata.application_context,
                 json.dumps(evidence.metadata.tags), evidence.metadata.classification.value
-            ))
+            )))
         
-        conn.commit()
-        conn.close()
+        await self.store.transaction(statements)
     
     async def _load_evidence(self, evidence_id: str) -> Optional[DigitalEvidence]:
         """Charger preuve complète depuis base"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Charger preuve principale
-        cursor.execute('SELECT * FROM digital_evidence WHERE id = ?', (evidence_id,))
-        row = cursor.fetchone()
-        
-        if not row:
-            conn.close()
-            return None
-        
-        # Charger vérifications hash
-        cursor.execute('SELECT * FROM hash_verifications WHERE evidence_id = ?', (evidence_id,))
-        hash_rows = cursor.fetchall()
-        hash_verifications = [
-            HashVerification(
-                algorithm=hr[2], hash_value=hr[3],
-                calculated_at=datetime.fromisoformat(hr[4]),
-                verified_by=hr[5], status=bool(hr[6])
-            ) for hr in hash_rows
-        ]
-        
-        # Charger chaîne de possession
-        cursor.execute('SELECT * FROM custody_chain WHERE evidence_id = ? ORDER BY timestamp', (evidence_id,))
-        custody_rows = cursor.fetchall()
-        custody_chain = [
-            CustodyEntry(
-                id=cr[0], evidence_id=cr[1],
-                timestamp=datetime.fromisoformat(cr[2]),
-                action=cr[3], officer=cr[4], location=cr[5], notes=cr[6],
-                digital_signature=cr[7], previous_hash=cr[8], entry_hash=cr[9]
-            ) for cr in custody_rows
-        ]
-        
-        # Charger métadonnées
-        cursor.execute('SELECT * FROM evidence_metadata WHERE evidence_id = ?', (evidence_id,))
-        metadata_row = cursor.fetchone()
-        
-        metadata = None
-        if metadata_row:
-            metadata = EvidenceMetadata(
-                file_size=metadata_row[1],
-                mime_type=metadata_row[2],
-                creation_date=datetime.fromisoformat(metadata_row[3]) if metadata_row[3] else None,
-                modification_date=datetime.fromisoformat(metadata_row[4]) if metadata_row[4] else None,
-                exif_data=json.loads(metadata_row[5]) if metadata_row[5] else None,
-                geolocation=json.loads(metadata_row[6]) if metadata_row[6] else None,
-                device_info=json.loads(metadata_row[7]) if metadata_row[7] else None,
-                network_info=json.loads(metadata_row[8]) if metadata_row[8] else None,
-                user_context=metadata_row[9],
-                application_context=metadata_row[10],
-                tags=json.loads(metadata_row[11]) if metadata_row[11] else [],
-                classification=AccessLevel(metadata_row[12]) if metadata_row[12] else AccessLevel.INTERNAL
+        evidence_list = await self._load_evidence_many([evidence_id])
+        return evidence_list[0] if evidence_list else None
+    
+    async def _load_evidence_many(self, evidence_ids: List[str]) -> List[DigitalEvidence]:
+        """Charger plusieurs preuves complètes (ordre des IDs conservé, IDs inconnus ignorés)"""
+        def run_load(conn: sqlite3.Connection) -> List[DigitalEvidence]:
+            cursor = conn.cursor()
+            rows = []
+            for id_chunk in self._chunked(list(dict.fromkeys(evidence_ids))):
+                placeholders = ','.join('?' * len(id_chunk))
+                cursor.execute(f'SELECT * FROM digital_evidence WHERE id IN ({placeholders})', id_chunk)
+                rows.extend(cursor.fetchall())
+            return self._build_evidence_batch(cursor, rows)
+        
+        loaded = {evidence.id: evidence for evidence in await self.store.read(run_load)}
+        
+        return [loaded[evidence_id] for evidence_id in dict.fromkeys(evidence_ids) if evidence_id in loaded]
+    
+    @staticmethod
+    def _chunked(items: List[Any], size: int = 500) -> List[List[Any]]:
+        """Découper une liste d'IDs (limite de paramètres SQLite)"""
+        return [items[start:start + size] for start in range(0, len(items), size)]
+    
+    def _build_evidence_batch(self, cursor: sqlite3.Cursor, rows: List[tuple]) -> List[DigitalEvidence]:
+        """Construire les preuves d'un lot de lignes digital_evidence
+        
+        Hashs, chaînes de possession et métadonnées sont chargés par requêtes IN
+        sur tout le lot, au lieu de trois requêtes par preuve.
+        """
+        if not rows:
+            return []
+        
+        evidence_ids = [row[0] for row in rows]
+        hash_verifications = defaultdict(list)
+        custody_chains = defaultdict(list)
+        metadata_by_id = {}
+        
+        for id_chunk in self._chunked(evidence_ids):
+            placeholders = ','.join('?' * len(id_chunk))
+            
+            # Charger vérifications hash
+            cursor.execute(f'SELECT * FROM hash_verifications WHERE evidence_id IN ({placeholders})', id_chunk)
+            for hr in cursor.fetchall():
+                hash_verifications[hr[1]].append(HashVerification(
+                    algorithm=hr[2], hash_value=hr[3],
+                    calculated_at=datetime.fromisoformat(hr[4]),
+                    verified_by=hr[5], status=bool(hr[6])
+                ))
+            
+            # Charger chaînes de possession
+            cursor.execute(f'''
+                SELECT * FROM custody_chain WHERE evidence_id IN ({placeholders})
+                ORDER BY evidence_id, timestamp
+            ''', id_chunk)
+            for cr in cursor.fetchall():
+                custody_chains[cr[1]].append(CustodyEntry(
+                    id=cr[0], evidence_id=cr[1],
+                    timestamp=datetime.fromisoformat(cr[2]),
+                    action=cr[3], officer=cr[4], location=cr[5], notes=cr[6],
+                    digital_signature=cr[7], previous_hash=cr[8], entry_hash=cr[9]
+                ))
+            
+            # Charger métadonnées
+            cursor.execute(f'SELECT * FROM evidence_metadata WHERE evidence_id IN ({placeholders})', id_chunk)
+            for metadata_row in cursor.fetchall():
+                metadata_by_id[metadata_row[0]] = EvidenceMetadata(
+                    file_size=metadata_row[1],
+                    mime_type=metadata_row[2],
+                    creation_date=datetime.fromisoformat(metadata_row[3]) if metadata_row[3] else None,
+                    modification_date=datetime.fromisoformat(metadata_row[4]) if metadata_row[4] else None,
+                    exif_data=json.loads(metadata_row[5]) if metadata_row[5] else None,
+                    geolocation=json.loads(metadata_row[6]) if metadata_row[6] else None,
+                    device_info=json.loads(metadata_row[7]) if metadata_row[7] else None,
+                    network_info=json.loads(metadata_row[8]) if metadata_row[8] else None,
+                    user_context=metadata_row[9],
+                    application_context=metadata_row[10],
+                    tags=json.loads(metadata_row[11]) if metadata_row[11] else [],
+                    classification=AccessLevel(metadata_row[12]) if metadata_row[12] else AccessLevel.INTERNAL
+                )
+        
+        # Construire objets evidence
+        return [
+            DigitalEvidence(
+                id=row[0], case_id=row[1], evidence_number=row[2], title=row[3],
+                description=row[4], evidence_type=EvidenceType(row[5]),
+                status=EvidenceStatus(row[6]), file_path=row[7], original_filename=row[8],
+                collected_by=row[9], collected_at=datetime.fromisoformat(row[10]),
+                location_collected=row[11], hash_verifications=hash_verifications[row[0]],
+                metadata=metadata_by_id.get(row[0]), custody_chain=custody_chains[row[0]], related_evidence=[],
+                legal_hold=bool(row[12]), retention_date=datetime.fromisoformat(row[13]) if row[13] else None,
+                export_restrictions=[], created_at=datetime.fromisoformat(row[14]),
+                updated_at=datetime.fromisoformat(row[15])
             )
-        
-        conn.close()
-        
-        # Construire objet evidence
-        evidence = DigitalEvidence(
-            id=row[0], case_id=row[1], evidence_number=row[2], title=row[3],
-            description=row[4], evidence_type=EvidenceType(row[5]),
-            status=EvidenceStatus(row[6]), file_path=row[7], original_filename=row[8],
-            collected_by=row[9], collected_at=datetime.fromisoformat(row[10]),
-            location_collected=row[11], hash_verifications=hash_verifications,
-            metadata=metadata, custody_chain=custody_chain, related_evidence=[],
-            legal_hold=bool(row[12]), retention_date=datetime.fromisoformat(row[13]) if row[13] else None,
-            export_restrictions=[], created_at=datetime.fromisoformat(row[14]),
-            updated_at=datetime.fromisoformat(row[15])
-        )
-        
-        return evidence
+            for row in rows
+        ]
     
     async def _save_export_package(self, package: LegalExportPackage):
         """Sauvegarder package d'export"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        await self.store.execute('''
             INSERT INTO legal_exports
             (package_id, case_id, evidence_list, requester, authority,
              export_date, format, integrity_seal, expiry_date)
@@ -1246,9 +1633,6 @@ class EvidenceManagementSystem:
             package.requester, package.authority, package.export_date,
             package.format.value, package.integrity_seal, package.expiry_date
         ))
-        
-        conn.commit()
-        conn.close()
     
     def get_system_metrics(self) -> Dict[str, Any]:
         """Métriques du système de gestion des preuves"""
@@ -0,0 +1 @@
+"""Forensics IA - reconstruction de timeline et analyse d'artifacts"""
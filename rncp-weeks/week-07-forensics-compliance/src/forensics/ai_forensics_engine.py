@@ -14,19 +14,35 @@ import asyncio
 import json
 import sqlite3
 import hashlib
+import os
+import mmap
+import heapq
+import shutil
+import tempfile
+import itertools
+import contextlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
 import networkx as nx
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Tuple
 from dataclasses import dataclass, asdict
 from pathlib import Path
 import uuid
 import logging
 from collections import defaultdict
 import re
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import rsa, padding
 
+from ..storage import AsyncSQLiteStore
+
 logger = logging.getLogger('AIForensicsEngine')
 
 @dataclass
@@ -162,22 +178,336 @@ class ChainOfCustodyManager:
         logger.info(f"✅ Intégrité custody vérifiée pour {evidence_id}")
         return True
 
+class CorrelationUnionFind:
+    """Union-find (chemin compressé, union par taille) pour regrouper les événements corrélés
+    
+    Tableaux compacts (array 'q') pour tenir des millions d'événements en mémoire.
+    """
+    
+    def __init__(self, size: int):
+        self.parent = array('q', range(size))
+        self.size = array('q', [1]) * size
+    
+    def find(self, item: int) -> int:
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+    
+    def union(self, item1: int, item2: int):
+        root1, root2 = self.find(item1), self.find(item2)
+        if root1 == root2:
+            return
+        if self.size[root1] < self.size[root2]:
+            root1, root2 = root2, root1
+        self.parent[root2] = root1
+        self.size[root1] += self.size[root2]
+
+class SpoolRunReader:
+    """Lecture memory-mapped d'un run trié du spool colonnaire"""
+    
+    def __init__(self, run_dir: Path):
+        self.run_dir = run_dir
+        self.timestamps = np.load(run_dir / 'timestamp.npy', mmap_mode='r')
+        self.confidence = np.load(run_dir / 'confidence.npy', mmap_mode='r')
+        self.offsets = {}
+        self.blobs = {}
+        self._files = []
+        
+        for name in ColumnarEventSpool.STRING_COLUMNS:
+            self.offsets[name] = np.load(run_dir / f'{name}.offsets.npy', mmap_mode='r')
+            handle = open(run_dir / f'{name}.data', 'rb')
+            self._files.append(handle)
+            if os.fstat(handle.fileno()).st_size:
+                self.blobs[name] = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self.blobs[name] = b''
+    
+    def __len__(self) -> int:
+        return len(self.timestamps)
+    
+    def raw(self, column: str, row: int) -> bytes:
+        offsets = self.offsets[column]
+        return self.blobs[column][int(offsets[row]):int(offsets[row + 1])]
+    
+    def text(self, column: str, row: int) -> str:
+        return self.raw(column, row).decode('utf-8')
+    
+    def iter_sort_keys(self, run_index: int, block_size: int = 65536) -> Iterator[tuple]:
+        """Clés de fusion (timestamp_ns, run, ligne), lues par blocs depuis le memmap"""
+        for start in range(0, len(self), block_size):
+            block = self.timestamps[start:start + block_size].tolist()
+            for offset, timestamp in enumerate(block, start):
+                yield (timestamp, run_index, offset)
+    
+    def event(self, row: int, timestamp: int = None) -> TimelineEvent:
+        """Matérialiser un événement du run"""
+        if timestamp is None:
+            timestamp = int(self.timestamps[row])
+        return TimelineEvent(
+            timestamp=pd.Timestamp(timestamp),
+            event_type=self.text('event_type', row),
+            source=self.text('source', row),
+            description=self.text('description', row),
+            evidence_refs=[],
+            confidence_score=float(self.confidence[row]),
+            correlation_ids=[]
+        )
+    
+    def close(self):
+        for blob in self.blobs.values():
+            if isinstance(blob, mmap.mmap):
+                blob.close()
+        for handle in self._files:
+            handle.close()
+        self.blobs = {}
+        self._files = []
+        self.timestamps = self.confidence = None
+        self.offsets = {}
+
+class ColumnarEventSpool:
+    """Spool disque colonnaire des événements de timeline
+    
+    Chaque lot ingéré est trié puis écrit comme un run: timestamps (int64 ns UTC) et
+    confiances en .npy, colonnes texte en blob UTF-8 + offsets. Les runs sont relus en
+    memory-map et fusionnés (tri externe k-voies) sans charger la timeline en mémoire;
+    au-delà de max_runs, les runs sont compactés en un seul pour borner les fichiers ouverts.
+    """
+    
+    STRING_COLUMNS = ('event_type', 'source', 'description')
+    
+    def __init__(self, spool_dir: str = None, max_runs: int = 64):
+        self.owns_dir = spool_dir is None
+        self.spool_dir = Path(spool_dir) if spool_dir else Path(tempfile.mkdtemp(prefix='timeline_spool_'))
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self.max_runs = max_runs
+        self.readers: List[SpoolRunReader] = []
+        self.total_events = 0
+        self._run_counter = itertools.count()
+    
+    def _next_run_dir(self) -> Path:
+        while True:
+            run_dir = self.spool_dir / f'run_{next(self._run_counter):06d}'
+            if not run_dir.exists():
+                run_dir.mkdir()
+                return run_dir
+    
+    def write_run(self, timestamps: np.ndarray, columns: Dict[str, List[str]], confidence: np.ndarray):
+        """Écrire un lot, trié par timestamp, comme nouveau run"""
+        count = len(timestamps)
+        if count == 0:
+            return
+        
+        order = np.argsort(timestamps, kind='stable')
+        run_dir = self._next_run_dir()
+        np.save(run_dir / 'timestamp.npy', np.asarray(timestamps, dtype=np.int64)[order])
+        np.save(run_dir / 'confidence.npy', np.asarray(confidence, dtype=np.float64)[order])
+        
+        order_list = order.tolist()
+        for name in self.STRING_COLUMNS:
+            values = columns[name]
+            encoded = [values[index].encode('utf-8', 'replace') for index in order_list]
+            offsets = np.zeros(count + 1, dtype=np.int64)
+            np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=count), out=offsets[1:])
+            np.save(run_dir / f'{name}.offsets.npy', offsets)
+            with open(run_dir / f'{name}.data', 'wb') as handle:
+                handle.write(b''.join(encoded))
+        
+        self.readers.append(SpoolRunReader(run_dir))
+        self.total_events += count
+        
+        if len(self.readers) > self.max_runs:
+            self._compact()
+    
+    def merged(self) -> Iterator[tuple]:
+        """Fusion k-voies des runs triés: (timestamp_ns, run, ligne) en ordre chronologique"""
+        return heapq.merge(*(reader.iter_sort_keys(run_index)
+                             for run_index, reader in enumerate(self.readers)))
+    
+    def _compact(self, block_size: int = 65536):
+        """Fusionner tous les runs en un seul run trié, écrit en flux"""
+        readers = self.readers
+        count = sum(len(reader) for reader in readers)
+        run_dir = self._next_run_dir()
+        
+        timestamps_out = np.lib.format.open_memmap(run_dir / 'timestamp.npy', mode='w+', dtype=np.int64, shape=(count,))
+        confidence_out = np.lib.format.open_memmap(run_dir / 'confidence.npy', mode='w+', dtype=np.float64, shape=(count,))
+        offsets_out = {
+            name: np.lib.format.open_memmap(run_dir / f'{name}.offsets.npy', mode='w+', dtype=np.int64, shape=(count + 1,))
+            for name in self.STRING_COLUMNS
+        }
+        blob_files = {name: open(run_dir / f'{name}.data', 'wb') for name in self.STRING_COLUMNS}
+        written = dict.fromkeys(self.STRING_COLUMNS, 0)
+        
+        try:
+            for name in self.STRING_COLUMNS:
+                offsets_out[name][0] = 0
+            merged = self.merged()
+            position = 0
+            while True:
+                block = list(itertools.islice(merged, block_size))
+                if not block:
+                    break
+                end = position + len(block)
+                timestamps_out[position:end] = [timestamp for timestamp, _, _ in block]
+                confidence_out[position:end] = [readers[run_index].confidence[row] for _, run_index, row in block]
+                for name in self.STRING_COLUMNS:
+                    chunks = [readers[run_index].raw(name, row) for _, run_index, row in block]
+                    blob_files[name].write(b''.join(chunks))
+                    ends = np.cumsum(np.fromiter(map(len, chunks), dtype=np.int64, count=len(chunks))) + written[name]
+                    offsets_out[name][position + 1:end + 1] = ends
+                    written[name] = int(ends[-1])
+                position = end
+        finally:
+            for handle in blob_files.values():
+                handle.close()
+        
+        for array_out in (timestamps_out, confidence_out, *offsets_out.values()):
+            array_out.flush()
+        del timestamps_out, confidence_out, offsets_out
+        
+        for reader in readers:
+            reader.close()
+            shutil.rmtree(reader.run_dir, ignore_errors=True)
+        self.readers = [SpoolRunReader(run_dir)]
+        logger.info(f"🗜️ Spool compacté: {len(readers)} runs fusionnés ({count} événements)")
+    
+    def clear(self):
+        """Supprimer tous les runs du spool"""
+        for reader in self.readers:
+            reader.close()
+            shutil.rmtree(reader.run_dir, ignore_errors=True)
+        self.readers = []
+        self.total_events = 0
+    
+    def close(self):
+        self.clear()
+        if self.owns_dir:
+            shutil.rmtree(self.spool_dir, ignore_errors=True)
+
 class TimelineReconstructor:
-    """Reconstructeur de timeline automatique"""
+    """Reconstructeur de timeline automatique
+    
+    Les clés d'entités (IP, catégorie sécurité, motifs additionnels) sont extraites une
+    seule fois à l'ingestion. La corrélation balaie les événements triés en gardant, par
+    clé, le dernier événement vu dans la fenêtre: deux événements partageant une clé à
+    moins de time_window secondes sont fusionnés dans le même groupe (union-find), qui
+    reçoit un unique ID de corrélation.
+    
+    En mode streaming (enable_streaming / ingest_file), les événements sont parsés par
+    lots vectorisés et écrits dans un ColumnarEventSpool; la timeline est alors produite
+    par tri externe des runs (iter_timeline) sans matérialiser tous les événements.
+    """
     
-    def __init__(self):
+    IP_PATTERN = re.compile(r'\d+\.\d+\.\d+\.\d+')
+    SECURITY_EVENT_TERMS = ('alert', 'warning', 'error', 'attack', 'intrusion')
+    SECURITY_KEY = ('category', 'security')
+    EPOCH = datetime(1970, 1, 1)
+    SYSLOG_PATTERN = (r'^(?:<\d+>\d?\s?)?'
+                      r'(?P<timestamp>[A-Z][a-z]{2}\s+\d{1,2}\s\d{2}:\d{2}:\d{2}|\d{4}-\d{2}-\d{2}[T ]\S+)\s+'
+                      r'(?P<host>\S+)\s+(?P<tag>[^:\[\s]+)(?:\[\d+\])?:\s?(?P<message>.*)$')
+    FILE_FORMATS = {'.jsonl': 'jsonl', '.ndjson': 'jsonl', '.json': 'jsonl', '.csv': 'csv'}
+    
+    def __init__(self, entity_patterns: Dict[str, str] = None):
         self.events = []
+        self.event_keys = []  # (epoch_seconds, clés d'entités) aligné sur self.events
         self.correlations = defaultdict(list)
+        self.entity_patterns = {
+            name: re.compile(pattern) for name, pattern in (entity_patterns or {}).items()
+        }
+        self._security_types: Dict[str, bool] = {}
+        
+        # Mode streaming
+        self.spool: Optional[ColumnarEventSpool] = None
+        self.chunk_size = 100000
+        self._pending: Dict[str, Dict[str, list]] = {}
+    
+    def enable_streaming(self, spool_dir: str = None, chunk_size: int = 100000):
+        """Basculer en ingestion streaming vers un spool disque colonnaire"""
+        if self.spool is None:
+            self.spool = ColumnarEventSpool(spool_dir)
+        self.chunk_size = chunk_size
+    
+    def reset(self):
+        """Vider la timeline et les index de corrélation"""
+        self.events = []
+        self.event_keys = []
+        self.correlations = defaultdict(list)
+        self._pending = {}
+        if self.spool is not None:
+            self.spool.clear()
+    
+    def close(self):
+        """Libérer le spool disque"""
+        self._pending = {}
+        if self.spool is not None:
+            self.spool.close()
+            self.spool = None
+    
+    @staticmethod
+    def _parse_timestamp(value: Any) -> datetime:
+        """Parser un timestamp (chemin rapide ISO 8601, repli pandas)"""
+        if not isinstance(value, str):
+            return value
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return pd.to_datetime(value)
+    
+    @staticmethod
+    def _parse_timestamps(values: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+        """Parser un lot de timestamps en int64 ns UTC (vectorisé): (valeurs, masque valides)"""
+        parsed = pd.to_datetime(values, errors='coerce', utc=True, format='ISO8601')
+        retry = parsed.isna() & values.notna()
+        if retry.any():
+            # Formats hétérogènes: repli élément par élément sur les seules lignes en échec
+            parsed[retry] = pd.to_datetime(values[retry], errors='coerce', utc=True, format='mixed')
+        valid = parsed.notna().to_numpy()
+        nanos = parsed.dt.tz_convert(None).dt.as_unit('ns').to_numpy(dtype='datetime64[ns]').view(np.int64)
+        return nanos, valid
+    
+    @classmethod
+    def _epoch_seconds(cls, timestamp: datetime) -> float:
+        """Convertir en secondes (naïf interprété comme UTC, comme pour les différences)"""
+        if timestamp.tzinfo is None:
+            return (timestamp - cls.EPOCH).total_seconds()
+        return timestamp.timestamp()
+    
+    def _extract_keys(self, description: str, event_type: str, ips: tuple = None) -> tuple:
+        """Extraire les clés d'entités d'un événement (une seule fois, à l'ingestion)"""
+        if ips is None:
+            ips = self.IP_PATTERN.findall(description)
+        keys = {('ip', ip) for ip in ips if ip}
+        
+        for name, pattern in self.entity_patterns.items():
+            keys.update((name, match) for match in pattern.findall(description))
+        
+        is_security = self._security_types.get(event_type)
+        if is_security is None:
+            is_security = any(term in event_type.lower() for term in self.SECURITY_EVENT_TERMS)
+            self._security_types[event_type] = is_security
+        if is_security:
+            keys.add(self.SECURITY_KEY)
+        
+        return tuple(keys)
+    
+    def _index_event(self, event: TimelineEvent, ips: tuple = None):
+        indexed = (self._epoch_seconds(event.timestamp),
+                   self._extract_keys(event.description, event.event_type, ips))
+        self.events.append(event)
+        self.event_keys.append(indexed)
     
     def add_log_source(self, logs: List[Dict[str, Any]], source_name: str):
         """Ajouter source de logs pour reconstruction timeline"""
+        if self.spool is not None:
+            self._spool_records(logs, source_name)
+            return
+        
         for log_entry in logs:
             try:
                 # Parser timestamp
-                if isinstance(log_entry.get('timestamp'), str):
-                    timestamp = pd.to_datetime(log_entry['timestamp'])
-                else:
-                    timestamp = log_entry['timestamp']
+                timestamp = self._parse_timestamp(log_entry['timestamp'])
                 
                 event = TimelineEvent(
                     timestamp=timestamp,
@@ -189,17 +519,21 @@ class TimelineReconstructor:
                     correlation_ids=[]
                 )
                 
-                self.events.append(event)
+                self._index_event(event)
                 
             except Exception as e:
                 logger.warning(f"⚠️ Erreur parsing log entry: {e}")
     
     def add_network_traffic(self, network_data: List[Dict[str, Any]]):
         """Ajouter données trafic réseau"""
+        if self.spool is not None:
+            self._spool_records(network_data, 'network_monitor', network=True)
+            return
+        
         for packet in network_data:
             try:
                 event = TimelineEvent(
-                    timestamp=pd.to_datetime(packet['timestamp']),
+                    timestamp=self._parse_timestamp(packet['timestamp']),
                     event_type='network_traffic',
                     source='network_monitor',
                     description=f"Connection {packet.get('src_ip')} -> {packet.get('dst_ip')}:{packet.get('dst_port')}",
@@ -207,59 +541,270 @@ class TimelineReconstructor:
                     confidence_score=0.9,
                     correlation_ids=[]
                 )
-                self.events.append(event)
+                # IPs connues directement depuis le paquet: pas de regex sur la description
+                self._index_event(event, (packet.get('src_ip'), packet.get('dst_ip')))
             except Exception as e:
                 logger.warning(f"⚠️ Erreur parsing network data: {e}")
     
-    def correlate_events(self, time_window_seconds: int = 300) -> List[List[TimelineEvent]]:
-        """Corréler événements dans fenêtre temporelle"""
-        correlations = []
-        sorted_events = sorted(self.events, key=lambda e: e.timestamp)
+    def ingest_file(self, file_path: str, source_name: str = None, file_format: str = None,
+                    network: bool = False, syslog_year: int = None) -> int:
+        """Ingérer un export de logs (JSONL, CSV, syslog) en streaming par lots
+        
+        Retourne le nombre d'événements spoolés.
+        """
+        if self.spool is None:
+            self.enable_streaming()
+        
+        path = Path(file_path)
+        source_name = source_name or ('network_monitor' if network else path.stem)
+        file_format = file_format or self.FILE_FORMATS.get(path.suffix.lower(), 'syslog')
+        
+        if file_format == 'jsonl':
+            reader = pd.read_json(path, lines=True, chunksize=self.chunk_size, dtype=False, convert_dates=False)
+        elif file_format == 'csv':
+            reader = pd.read_csv(path, chunksize=self.chunk_size, dtype=str)
+        elif file_format == 'syslog':
+            reader = self._read_syslog_chunks(path, syslog_year or datetime.now().year)
+        else:
+            raise ValueError(f"Format de log non supporté: {file_format}")
         
-        for i, event in enumerate(sorted_events):
-            correlation_group = [event]
-            
-            # Chercher événements liés dans fenêtre temporelle
-            for j, other_event in enumerate(sorted_events[i+1:], i+1):
-                time_diff = (other_event.timestamp - event.timestamp).total_seconds()
-                
-                if time_diff > time_window_seconds:
+        ingested = 0
+        with contextlib.closing(reader) as chunks:
+            for frame in chunks:
+                ingested += self._spool_frame(frame, source_name, network)
+        
+        logger.info(f"📥 {path.name}: {ingested} événements spoolés ({file_format})")
+        return ingested
+    
+    def _read_syslog_chunks(self, path: Path, year: int) -> Iterator[pd.DataFrame]:
+        """Lire un fichier syslog (RFC 3164 / 5424) par lots, parsing regex vectorisé"""
+        with open(path, 'r', encoding='utf-8', errors='replace') as handle:
+            while True:
+                lines = list(itertools.islice(handle, self.chunk_size))
+                if not lines:
                     break
                 
-                # Critères de corrélation
-                if self._events_related(event, other_event):
-                    correlation_group.append(other_event)
-                    # Assigner ID corrélation commun
-                    correlation_id = str(uuid.uuid4())
-                    event.correlation_ids.append(correlation_id)
-                    other_event.correlation_ids.append(correlation_id)
+                lines = pd.Series(lines, dtype=object).str.rstrip('\r\n')
+                fields = lines.str.extract(self.SYSLOG_PATTERN)
+                raw_timestamps = fields['timestamp']
+                
+                # RFC 3164 sans année: parsing explicite sur les seules lignes concernées
+                bsd = raw_timestamps.str.match(r'[A-Z]').fillna(False).astype(bool)
+                timestamps = pd.Series(pd.NaT, index=lines.index, dtype='datetime64[ns, UTC]')
+                if bsd.any():
+                    timestamps[bsd] = pd.to_datetime(
+                        f'{year} ' + raw_timestamps[bsd].str.replace(r'\s+', ' ', regex=True),
+                        format='%Y %b %d %H:%M:%S', errors='coerce', utc=True
+                    )
+                if (~bsd).any():
+                    timestamps[~bsd] = pd.to_datetime(raw_timestamps[~bsd], format='ISO8601',
+                                                      errors='coerce', utc=True)
+                
+                yield pd.DataFrame({
+                    'timestamp': timestamps,
+                    'event_type': fields['tag'],
+                    'description': lines
+                })
+    
+    def _spool_records(self, records: Iterable[Dict[str, Any]], source_name: str, network: bool = False):
+        """Spooler des enregistrements en mémoire (liste ou générateur) par lots"""
+        records = iter(records)
+        while True:
+            chunk = list(itertools.islice(records, self.chunk_size))
+            if not chunk:
+                break
+            self._spool_frame(pd.DataFrame.from_records(chunk), source_name, network)
+    
+    @staticmethod
+    def _text_column(frame: pd.DataFrame, name: str) -> pd.Series:
+        """Colonne texte, valeurs absentes rendues comme dict.get (None)"""
+        if name not in frame:
+            return pd.Series('None', index=frame.index, dtype=object)
+        column = frame[name].astype(object)
+        return column.where(column.notna(), None).astype(str)
+    
+    def _spool_frame(self, frame: pd.DataFrame, source_name: str, network: bool = False) -> int:
+        """Normaliser un lot (colonnes vectorisées) et le mettre en attente d'écriture"""
+        count = len(frame)
+        if count == 0:
+            return 0
+        if 'timestamp' not in frame:
+            logger.warning(f"⚠️ Lot de {count} entrées ignoré: colonne timestamp absente")
+            return 0
+        
+        timestamps, valid = self._parse_timestamps(frame['timestamp'])
+        
+        if network:
+            event_types = ['network_traffic'] * count
+            descriptions = ('Connection ' + self._text_column(frame, 'src_ip') + ' -> ' +
+                            self._text_column(frame, 'dst_ip') + ':' +
+                            self._text_column(frame, 'dst_port')).tolist()
+            confidence = np.full(count, 0.9)
+        else:
+            if 'event_type' in frame:
+                event_types = frame['event_type'].fillna('generic').astype(str).tolist()
+            else:
+                event_types = ['generic'] * count
             
-            if len(correlation_group) > 1:
-                correlations.append(correlation_group)
-        
-        return correlations
+            description = frame['description'] if 'description' in frame else pd.Series(None, index=frame.index, dtype=object)
+            missing = description.isna()
+            description = description.astype(object)
+            if missing.any():
+                # Même repli que le mode mémoire: l'entrée complète comme description
+                description[missing] = [str({key: value for key, value in record.items() if not pd.isna(value)})
+                                        for record in frame[missing].to_dict('records')]
+            descriptions = description.astype(str).tolist()
+            
+            if 'confidence' in frame:
+                confidence = pd.to_numeric(frame['confidence'], errors='coerce').fillna(0.8).to_numpy(dtype=np.float64)
+            else:
+                confidence = np.full(count, 0.8)
+        
+        if not valid.all():
+            logger.warning(f"⚠️ {int((~valid).sum())} entrées ignorées: timestamp invalide")
+            kept = np.flatnonzero(valid).tolist()
+            timestamps = timestamps[valid]
+            confidence = confidence[valid]
+            event_types = [event_types[index] for index in kept]
+            descriptions = [descriptions[index] for index in kept]
+        
+        pending = self._pending.setdefault(source_name, {
+            'timestamp': [], 'confidence': [], 'event_type': [], 'description': [], 'count': 0
+        })
+        pending['timestamp'].append(timestamps)
+        pending['confidence'].append(confidence)
+        pending['event_type'].extend(event_types)
+        pending['description'].extend(descriptions)
+        pending['count'] += len(timestamps)
+        
+        if pending['count'] >= self.chunk_size:
+            self._flush_source(source_name)
+        return len(timestamps)
     
-    def _events_related(self, event1: TimelineEvent, event2: TimelineEvent) -> bool:
-        """Déterminer si deux événements sont liés"""
-        # Règles de corrélation simples
+    def _flush_source(self, source_name: str):
+        """Écrire le lot en attente d'une source comme run trié"""
+        pending = self._pending.pop(source_name, None)
+        if not pending or not pending['count']:
+            return
+        self.spool.write_run(
+            np.concatenate(pending['timestamp']),
+            {
+                'event_type': pending['event_type'],
+                'source': [source_name] * pending['count'],
+                'description': pending['description']
+            },
+            np.concatenate(pending['confidence'])
+        )
+    
+    def flush(self):
+        """Écrire tous les lots en attente dans le spool"""
+        for source_name in list(self._pending):
+            self._flush_source(source_name)
+    
+    def _sync_event_keys(self):
+        """Indexer les événements ajoutés directement dans self.events"""
+        if len(self.event_keys) > len(self.events):
+            self.event_keys = self.event_keys[:len(self.events)]
+        for event in self.events[len(self.event_keys):]:
+            self.event_keys.append((self._epoch_seconds(event.timestamp),
+                                    self._extract_keys(event.description, event.event_type)))
+    
+    @staticmethod
+    def _sweep(keyed_events: Iterable[tuple], groups: CorrelationUnionFind, time_window_seconds: int):
+        """Balayage chronologique (position, epoch, clés): union avec le dernier événement par clé"""
+        # Relier au plus récent suffit: la chaîne de liens donne les mêmes
+        # composantes que toutes les paires de la fenêtre
+        last_seen: Dict[tuple, tuple] = {}
+        prune_threshold = 100000
+        
+        for position, epoch, keys in keyed_events:
+            for key in keys:
+                previous = last_seen.get(key)
+                if previous is not None and epoch - previous[1] <= time_window_seconds:
+                    groups.union(previous[0], position)
+                last_seen[key] = (position, epoch)
+            
+            if len(last_seen) > prune_threshold:
+                # Fenêtre glissante: oublier les clés sorties de la fenêtre
+                last_seen = {key: seen for key, seen in last_seen.items()
+                             if epoch - seen[1] <= time_window_seconds}
+                prune_threshold = max(100000, 2 * len(last_seen))
+    
+    def correlate_events(self, time_window_seconds: int = 300) -> List[List[TimelineEvent]]:
+        """Corréler événements dans fenêtre temporelle (balayage trié + union-find)"""
+        self._sync_event_keys()
+        event_keys = self.event_keys
+        order = sorted(range(len(self.events)), key=lambda index: event_keys[index][0])
+        groups = CorrelationUnionFind(len(self.events))
         
-        # Même adresse IP
-        ip_pattern = r'\d+\.\d+\.\d+\.\d+'
-        ips1 = re.findall(ip_pattern, event1.description)
-        ips2 = re.findall(ip_pattern, event2.description)
-        if set(ips1) & set(ips2):
-            return True
+        self._sweep(((index, *event_keys[index]) for index in order), groups, time_window_seconds)
         
-        # Événements de sécurité consécutifs
-        security_events = ['alert', 'warning', 'error', 'attack', 'intrusion']
-        if any(term in event1.event_type.lower() for term in security_events) and \
-           any(term in event2.event_type.lower() for term in security_events):
-            return True
+        members = defaultdict(list)
+        for index in order:
+            members[groups.find(index)].append(self.events[index])
         
-        return False
+        self.correlations = defaultdict(list)
+        correlations = []
+        for group in members.values():
+            if len(group) < 2:
+                for event in group:
+                    event.correlation_ids = []
+                continue
+            # Un seul ID de corrélation par groupe
+            correlation_id = str(uuid.uuid4())
+            for event in group:
+                event.correlation_ids = [correlation_id]
+            self.correlations[correlation_id] = group
+            correlations.append(group)
+        
+        return correlations
+    
+    def iter_timeline(self, time_window_seconds: int = 300) -> Iterator[TimelineEvent]:
+        """Timeline chronologique corrélée, en flux depuis le spool (tri externe des runs)
+        
+        Deux passes de fusion: balayage de corrélation, puis matérialisation des
+        événements un par un. self.correlations n'est pas alimenté dans ce mode.
+        """
+        if self.spool is None:
+            yield from self.generate_timeline()
+            return
+        
+        self.flush()
+        spool = self.spool
+        readers = spool.readers
+        groups = CorrelationUnionFind(spool.total_events)
+        
+        keyed_events = (
+            (position, timestamp / 1e9,
+             self._extract_keys(readers[run_index].text('description', row),
+                                readers[run_index].text('event_type', row)))
+            for position, (timestamp, run_index, row) in enumerate(spool.merged())
+        )
+        self._sweep(keyed_events, groups, time_window_seconds)
+        
+        correlation_ids = {}
+        for position, (timestamp, run_index, row) in enumerate(spool.merged()):
+            event = readers[run_index].event(row, timestamp)
+            root = groups.find(position)
+            if groups.size[root] > 1:
+                if root not in correlation_ids:
+                    correlation_ids[root] = str(uuid.uuid4())
+                event.correlation_ids = [correlation_ids[root]]
+            yield event
+    
+    def _events_related(self, event1: TimelineEvent, event2: TimelineEvent) -> bool:
+        """Déterminer si deux événements sont liés (clé d'entité commune)"""
+        keys1 = self._extract_keys(event1.description, event1.event_type)
+        keys2 = self._extract_keys(event2.description, event2.event_type)
+        return bool(set(keys1) & set(keys2))
     
     def generate_timeline(self) -> List[TimelineEvent]:
         """Générer timeline ordonnée avec corrélations"""
+        if self.spool is not None:
+            timeline = list(self.iter_timeline())
+            logger.info(f"📅 Timeline générée: {len(timeline)} événements")
+            return timeline
+        
         # Corréler événements
         self.correlate_events()
         
@@ -269,11 +814,218 @@ class TimelineReconstructor:
         logger.info(f"📅 Timeline générée: {len(timeline)} événements")
         return timeline
 
+class ArtifactScanner:
+    """Moteur de scan multi-motifs précompilé
+    
+    Une seule passe repère, par une alternation en lookahead (sans consommer de
+    caractères), chaque position où commence un mot-clé d'une règle littérale ou le
+    littéral de tête d'une regex de confirmation. À chaque position, les règles
+    littérales dont un mot-clé commence par ce caractère sont testées avec leur propre
+    alternation et leur propre position de reprise: les comptes sont ceux de findall
+    règle par règle, y compris quand des mots-clés de règles différentes se
+    chevauchent ("scanomaly" compte scan et anomaly). Les regex de confirmation ne
+    sont exécutées que si leur littéral de tête a été vu (toujours si elles n'en ont
+    pas). L'alternation, sans IGNORECASE, est appliquée au bloc passé en minuscules
+    pour conserver le préfiltrage par premier caractère du moteur re. Les fichiers
+    sont lus par blocs; chaque bloc est rescanné avec un
+    recouvrement égal à la longueur maximale d'un match (plafonnée à max_overlap pour
+    les règles non bornées), et chaque passe reprend après son dernier match compté:
+    un match à cheval sur deux blocs est trouvé entier et compté une seule fois.
+    """
+    
+    LITERAL_RULE = re.compile(r'^\w+(?:\|\w+)*$')
+    INLINE_FLAGS = re.compile(r'^\(\?[aiLmsux]+\)')
+    LEADING_LITERAL = re.compile(r'^[A-Za-z]{3,}')
+    MAX_SAMPLES = 10
+    
+    def __init__(self, rules: Dict[str, List[str]], chunk_size: int = 8 * 1024 * 1024,
+                 max_overlap: int = 4096):
+        self.rules = [(category, pattern) for category, patterns in rules.items() for pattern in patterns]
+        self.chunk_size = chunk_size
+        self.overlap = max([self._max_match_length(pattern, max_overlap) for _, pattern in self.rules] + [1])
+        self.literal_rules = []  # (index règle, regex sur texte en minuscules, regex IGNORECASE)
+        self.literal_starts: Dict[str, List[int]] = {}  # premier caractère -> positions de reprise des règles littérales
+        self.literal_triggers: Dict[str, List[int]] = {}  # littéral de tête -> règles de confirmation
+        self.trigger_starts: Dict[str, List[str]] = {}  # premier caractère -> littéraux de tête
+        self.confirmations = []  # (index règle, regex compilée, déclenchée par un littéral)
+        
+        for index, (category, pattern) in enumerate(self.rules):
+            body = self.INLINE_FLAGS.sub('', pattern)
+            if self.LITERAL_RULE.match(body):
+                keywords = body.lower().split('|')
+                # Ordre des mots-clés conservé: même alternative retenue que findall
+                alternation = '|'.join(re.escape(keyword) for keyword in keywords)
+                self.literal_rules.append((index, re.compile(alternation),
+                                           re.compile(alternation, re.IGNORECASE)))
+                for first in dict.fromkeys(keyword[0] for keyword in keywords):
+                    self.literal_starts.setdefault(first, []).append(len(self.literal_rules))
+                continue
+            
+            literal = self._required_literal(body)
+            if literal:
+                literal = literal.lower()
+                if literal not in self.literal_triggers:
+                    self.trigger_starts.setdefault(literal[0], []).append(literal)
+                self.literal_triggers.setdefault(literal, []).append(index)
+            self.confirmations.append((index, re.compile(pattern, re.IGNORECASE | re.MULTILINE), bool(literal)))
+        
+        # Lookahead: une position par début de mot-clé, même si un autre mot-clé la recouvre
+        keywords = list(dict.fromkeys(
+            [keyword for _, folded, _ in self.literal_rules for keyword in folded.pattern.split('|')]
+            + list(self.literal_triggers)
+        ))
+        alternation = '(?=' + '|'.join(keywords) + ')'
+        self.combined = re.compile(alternation, re.IGNORECASE) if keywords else None
+        self.combined_folded = re.compile(alternation) if keywords else None
+    
+    @staticmethod
+    def _max_match_length(pattern: str, max_overlap: int) -> int:
+        """Longueur maximale d'un match de la règle (max_overlap si non bornée)"""
+        try:
+            return min(sre_parse.parse(pattern).getwidth()[1], max_overlap)
+        except Exception:
+            return max_overlap
+    
+    @classmethod
+    def _required_literal(cls, body: str) -> Optional[str]:
+        """Littéral de tête obligatoire d'une regex (None si optionnel ou alternation globale)"""
+        literal = cls.LEADING_LITERAL.match(body)
+        if not literal or body[literal.end():literal.end() + 1] in ('?', '*', '{', '+'):
+            return None
+        
+        depth, escaped, in_class = 0, False, False
+        for char in body:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif in_class:
+                in_class = char != ']'
+            elif char == '[':
+                in_class = True
+            elif char == '(':
+                depth += 1
+            elif char == ')':
+                depth -= 1
+            elif char == '|' and depth == 0:
+                return None
+        return literal.group()
+    
+    def _new_state(self) -> List[list]:
+        return [[0, []] for _ in self.rules]
+    
+    def _new_resume(self) -> List[int]:
+        return [0] * (1 + len(self.literal_rules) + len(self.confirmations))
+    
+    def _record(self, state: List[list], index: int, value: str):
+        entry = state[index]
+        entry[0] += 1
+        if len(entry[1]) < self.MAX_SAMPLES:
+            entry[1].append(value)
+    
+    def _scan(self, text: str, limit: int, state: List[list], resume: List[int]):
+        """Scanner text: passe combinée puis confirmations déclenchées
+        
+        Seuls les matches commençant avant limit sont comptés. resume contient la
+        position de reprise de la passe combinée, de chaque règle littérale puis de
+        chaque confirmation, mise à jour à la fin du dernier match compté.
+        """
+        triggered = set()
+        if self.combined is not None:
+            folded = text.lower()
+            if len(folded) == len(text):
+                subject, rule_variant = folded, 1
+                candidates = self.combined_folded.finditer(folded, resume[0])
+            else:
+                # Minuscules de longueur différente (certains caractères Unicode)
+                subject, rule_variant = text, 2
+                candidates = self.combined.finditer(text, resume[0])
+            for candidate in candidates:
+                position = candidate.start()
+                if position >= limit:
+                    break
+                first = subject[position].lower()
+                for slot in self.literal_starts.get(first, ()):
+                    if resume[slot] > position:
+                        continue  # Dans un match déjà compté pour cette règle
+                    rule = self.literal_rules[slot - 1]
+                    match = rule[rule_variant].match(subject, position)
+                    if match:
+                        self._record(state, rule[0], text[position:match.end()])
+                        resume[slot] = match.end()
+                for literal in self.trigger_starts.get(first, ()):
+                    if subject[position:position + len(literal)].lower() == literal:
+                        triggered.update(self.literal_triggers[literal])
+                resume[0] = position + 1
+        
+        first_confirmation = 1 + len(self.literal_rules)
+        for slot, (index, compiled, has_trigger) in enumerate(self.confirmations, start=first_confirmation):
+            if has_trigger and index not in triggered:
+                continue
+            for match in compiled.finditer(text, resume[slot]):
+                if match.start() >= limit:
+                    break
+                self._record(state, index, match.group())
+                resume[slot] = match.end()
+    
+    def scan(self, content: str) -> List[list]:
+        """Scanner un contenu en mémoire: [compte, échantillons] par règle"""
+        state = self._new_state()
+        self._scan(content, len(content), state, self._new_resume())
+        return state
+    
+    def scan_chunks(self, chunks: Iterable[str]) -> List[list]:
+        """Scanner un flux de blocs avec recouvrement de self.overlap caractères
+        
+        Les matches commençant dans les overlap derniers caractères d'un bloc sont
+        laissés au bloc suivant, qui reprend ce recouvrement (plus un caractère de
+        contexte pour \\b et ^) et chaque passe après son dernier match compté.
+        """
+        state = self._new_state()
+        resume = self._new_resume()
+        carry = ''
+        for chunk in chunks:
+            buffer = carry + chunk if carry else chunk
+            limit = len(buffer) - self.overlap
+            if limit <= 0:
+                carry = buffer  # Pas encore assez de texte au-delà du recouvrement
+                continue
+            self._scan(buffer, limit, state, resume)
+            carry_start = limit - 1
+            carry = buffer[carry_start:]
+            resume = [max(position, limit) - carry_start for position in resume]
+        if carry:
+            self._scan(carry, len(carry), state, resume)
+        return state
+    
+    def scan_file(self, file_path: str) -> List[list]:
+        """Scanner un fichier volumineux en streaming"""
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as handle:
+            return self.scan_chunks(iter(lambda: handle.read(self.chunk_size), ''))
+
+_PROCESS_SCANNERS: Dict[str, ArtifactScanner] = {}
+
+def _scan_artifact_file(rules: Dict[str, List[str]], file_path: str, chunk_size: int) -> List[list]:
+    """Tâche du pool de processus: scanner compilé une fois par processus"""
+    cache_key = json.dumps(rules, sort_keys=True)
+    scanner = _PROCESS_SCANNERS.get(cache_key)
+    if scanner is None:
+        scanner = _PROCESS_SCANNERS[cache_key] = ArtifactScanner(rules, chunk_size)
+    return scanner.scan_file(file_path)
+
 class ArtifactAnalyzer:
     """Analyseur d'artifacts automatisé"""
     
-    def __init__(self):
+    CATEGORY_RISK = {
+        'malware_indicators': 0.4,
+        'network_anomalies': 0.3,
+        'data_exfiltration': 0.5
+    }
+    
+    def __init__(self, max_workers: int = None):
         self.analysis_rules = self._load_analysis_rules()
+        self.scanner = ArtifactScanner(self.analysis_rules)
+        self.max_workers = max_workers
     
     def _load_analysis_rules(self) -> Dict[str, Any]:
         """Charger règles d'analyse YARA-like"""
@@ -297,6 +1049,36 @@ class ArtifactAnalyzer:
     
     def analyze_text_artifact(self, content: str, artifact_type: str) -> Dict[str, Any]:
         """Analyser artifact textuel (logs, etc.)"""
+        return self._build_findings(artifact_type, self.scanner.scan(content))
+    
+    def analyze_artifact_file(self, file_path: str, artifact_type: str = 'log') -> Dict[str, Any]:
+        """Analyser un artifact volumineux sur disque (lecture streaming par blocs)"""
+        return self._build_findings(artifact_type, self.scanner.scan_file(file_path))
+    
+    def analyze_artifact_files(self, file_paths: List[str], artifact_type: str = 'log') -> Dict[str, Dict[str, Any]]:
+        """Triage d'un ensemble de fichiers de preuve en parallèle (pool de processus)"""
+        if len(file_paths) <= 1:
+            return {path: self.analyze_artifact_file(path, artifact_type) for path in file_paths}
+        
+        results = {}
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {
+                path: pool.submit(_scan_artifact_file, self.analysis_rules, path, self.scanner.chunk_size)
+                for path in file_paths
+            }
+            for path, future in futures.items():
+                try:
+                    results[path] = self._build_findings(artifact_type, future.result())
+                except Exception as e:
+                    logger.error(f"❌ Erreur analyse artifact {path}: {e}")
+                    results[path] = {'artifact_type': artifact_type, 'error': str(e),
+                                     'indicators_found': [], 'risk_score': 0.0}
+        
+        logger.info(f"🔎 Triage artifacts: {len(results)} fichiers analysés")
+        return results
+    
+    def _build_findings(self, artifact_type: str, scan_state: List[list]) -> Dict[str, Any]:
+        """Construire le rapport d'analyse depuis les comptes du scanner"""
         findings = {
             'artifact_type': artifact_type,
             'analysis_timestamp': datetime.now().isoformat(),
@@ -305,26 +1087,19 @@ class ArtifactAnalyzer:
             'recommendations': []
         }
         
-        # Appliquer règles d'analyse
-        for category, patterns in self.analysis_rules.items():
-            for pattern in patterns:
-                matches = re.findall(pattern, content, re.IGNORECASE | re.MULTILINE)
-                if matches:
-                    indicator = {
-                        'category': category,
-                        'pattern': pattern,
-                        'matches': matches[:10],  # Limiter à 10 premiers matches
-                        'match_count': len(matches)
-                    }
-                    findings['indicators_found'].append(indicator)
-                    
-                    # Augmenter score de risque
-                    if category == 'malware_indicators':
-                        findings['risk_score'] += 0.4
-                    elif category == 'network_anomalies':
-                        findings['risk_score'] += 0.3
-                    elif category == 'data_exfiltration':
-                        findings['risk_score'] += 0.5
+        # Indicateurs dans l'ordre des règles
+        for (category, pattern), (match_count, samples) in zip(self.scanner.rules, scan_state):
+            if match_count:
+                indicator = {
+                    'category': category,
+                    'pattern': pattern,
+                    'matches': samples,  # 10 premiers matches conservés pendant le scan
+                    'match_count': match_count
+                }
+                findings['indicators_found'].append(indicator)
+                
+                # Augmenter score de risque
+                findings['risk_score'] += self.CATEGORY_RISK.get(category, 0.0)
         
         # Normaliser score
         findings['risk_score'] = min(1.0, findings['risk_score'])
@@ -476,11 +1251,15 @@ class AIForensicsEngine:
         self.timeline_reconstructor = TimelineReconstructor()
         self.artifact_analyzer = ArtifactAnalyzer()
         self.report_generator = LegalReportGenerator()
+        self.store = AsyncSQLiteStore.for_database(db_path)
         self._setup_database()
     
     def _setup_database(self):
         """Initialiser base de données forensics"""
-        conn = sqlite3.connect(self.db_path)
+        self.store.run_sync(self._create_schema)
+    
+    def _create_schema(self, conn: sqlite3.Connection):
+        """Créer le schéma (exécuté par le thread écrivain du store)"""
         cursor = conn.cursor()
         
         # Table investigations
@@ -527,9 +1306,6 @@ class AIForensicsEngine:
                 FOREIGN KEY (investigation_id) REFERENCES investigations (id)
             )
         ''')
-        
-        conn.commit()
-        conn.close()
     
     async def start_investigation(self, incident_id: str, investigator: str) -> str:
         """Démarrer nouvelle investigation forensics"""
@@ -550,10 +1326,7 @@ class AIForensicsEngine:
         )
         
         # Sauvegarder en DB
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        await self.store.execute('''
             INSERT INTO investigations 
             (id, incident_id, start_time, status, lead_investigator, chain_integrity_verified)
             VALUES (?, ?, ?, ?, ?, ?)
@@ -562,9 +1335,6 @@ class AIForensicsEngine:
             investigation.status, investigator, False
         ))
         
-        conn.commit()
-        conn.close()
-        
         logger.info(f"🔍 Investigation forensics démarrée: {investigation_id} pour incident {incident_id}")
         return investigation_id
     
@@ -607,10 +1377,7 @@ class AIForensicsEngine:
         evidence.metadata['analysis'] = analysis
         
         # Sauvegarder en DB
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        await self.store.execute('''
             INSERT INTO evidence 
             (id, investigation_id, timestamp, source, artifact_type, content, 
              hash_sha256, legal_status, metadata)
@@ -621,9 +1388,6 @@ class AIForensicsEngine:
             json.dumps(evidence.metadata)
         ))
         
-        conn.commit()
-        conn.close()
-        
         logger.info(f"🔒 Evidence collectée: {evidence.id} (hash: {hash_sha256[:16]}...)")
         return evidence
     
@@ -631,20 +1395,14 @@ class AIForensicsEngine:
         """Reconstituer timeline investigation"""
         
         # Récupérer evidence de l'investigation
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        evidence_data = await self.store.fetchall('''
             SELECT content, artifact_type, source, timestamp 
             FROM evidence 
             WHERE investigation_id = ?
         ''', (investigation_id,))
         
-        evidence_data = cursor.fetchall()
-        conn.close()
-        
         # Reset timeline reconstructor
-        self.timeline_reconstructor.events = []
+        self.timeline_reconstructor.reset()
         
         # Traiter chaque evidence
         for content, artifact_type, source, timestamp in evidence_data:
@@ -666,26 +1424,71 @@ class AIForensicsEngine:
         timeline = self.timeline_reconstructor.generate_timeline()
         
         # Sauvegarder timeline en DB
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        for event in timeline:
-            cursor.execute('''
-                INSERT INTO timeline_events 
-                (id, investigation_id, timestamp, event_type, source, description, 
-                 confidence_score, correlation_ids)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                str(uuid.uuid4()), investigation_id, event.timestamp,
-                event.event_type, event.source, event.description,
-                event.confidence_score, json.dumps(event.correlation_ids)
-            ))
-        
-        conn.commit()
-        conn.close()
+        await self.store.executemany('''
+            INSERT INTO timeline_events 
+            (id, investigation_id, timestamp, event_type, source, description, 
+             confidence_score, correlation_ids)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [(
+            str(uuid.uuid4()), investigation_id, event.timestamp,
+            event.event_type, event.source, event.description,
+            event.confidence_score, json.dumps(event.correlation_ids)
+        ) for event in timeline])
         
         return timeline
     
+    async def reconstruct_timeline_from_exports(self, investigation_id: str, log_paths: List[str],
+                                                network_paths: List[str] = None,
+                                                spool_dir: str = None) -> int:
+        """Reconstituer la timeline depuis des exports volumineux (logs, trafic réseau)
+        
+        Ingestion streaming vers un spool disque puis écriture en base par lots, sans
+        charger la timeline en mémoire. L'ingestion et la fusion s'exécutent hors de
+        la boucle asyncio; chaque lot est validé séparément par le store.
+        Retourne le nombre d'événements enregistrés.
+        """
+        reconstructor = TimelineReconstructor()
+        reconstructor.enable_streaming(spool_dir)
+        
+        insert_sql = '''
+            INSERT INTO timeline_events 
+            (id, investigation_id, timestamp, event_type, source, description, 
+             confidence_score, correlation_ids)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        '''
+        loop = asyncio.get_running_loop()
+        saved = 0
+        
+        def ingest():
+            for path in log_paths:
+                reconstructor.ingest_file(path)
+            for path in network_paths or []:
+                reconstructor.ingest_file(path, network=True)
+        
+        try:
+            await loop.run_in_executor(None, ingest)
+            
+            events = reconstructor.iter_timeline()
+            
+            def next_batch() -> List[tuple]:
+                return [(
+                    str(uuid.uuid4()), investigation_id, event.timestamp.isoformat(),
+                    event.event_type, event.source, event.description,
+                    event.confidence_score, json.dumps(event.correlation_ids)
+                ) for event in itertools.islice(events, 10000)]
+            
+            while True:
+                batch = await loop.run_in_executor(None, next_batch)
+                if not batch:
+                    break
+                await self.store.executemany(insert_sql, batch)
+                saved += len(batch)
+        finally:
+            await loop.run_in_executor(None, reconstructor.close)
+        
+        logger.info(f"📅 Timeline streaming enregistrée: {saved} événements")
+        return saved
+    
     async def complete_investigation(self, investigation_id: str) -> str:
         """Finaliser investigation avec génération rapport"""
         
@@ -708,36 +1511,28 @@ class AIForensicsEngine:
         investigation.legal_report_path = report_path
         
         # Mettre à jour DB
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        await self.store.execute('''
             UPDATE investigations 
             SET status = ?, chain_integrity_verified = ?, report_path = ?
             WHERE id = ?
         ''', ('completed', chain_verified, report_path, investigation_id))
         
-        conn.commit()
-        conn.close()
-        
         logger.info(f"✅ Investigation {investigation_id} finalisée - Rapport: {report_path}")
         return report_path
     
     async def _load_investigation(self, investigation_id: str) -> ForensicsInvestigation:
         """Charger investigation complète depuis DB"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         # Charger investigation
-        cursor.execute('SELECT * FROM investigations WHERE id = ?', (investigation_id,))
-        inv_row = cursor.fetchone()
+        inv_row = await self.store.fetchone('SELECT * FROM investigations WHERE id = ?', (investigation_id,))
         
         if not inv_row:
             raise ValueError(f"Investigation {investigation_id} not found")
         
-        # Charger evidence
-        cursor.execute('SELECT * FROM evidence WHERE investigation_id = ?', (investigation_id,))
-        evidence_rows = cursor.fetchall()
+        # Charger evidence et timeline (lectures concurrentes sur le pool)
+        evidence_rows, timeline_rows = await asyncio.gather(
+            self.store.fetchall('SELECT * FROM evidence WHERE investigation_id = ?', (investigation_id,)),
+            self.store.fetchall('SELECT * FROM timeline_events WHERE investigation_id = ?', (investigation_id,))
+        )
         
         evidence_items = []
         for row in evidence_rows:
@@ -754,10 +1549,7 @@ class AIForensicsEngine:
             )
             evidence_items.append(evidence)
         
-        # Charger timeline
-        cursor.execute('SELECT * FROM timeline_events WHERE investigation_id = ?', (investigation_id,))
-        timeline_rows = cursor.fetchall()
-        
+        # Construire timeline
         timeline = []
         for row in timeline_rows:
             event = TimelineEvent(
@@ -771,8 +1563,6 @@ class AIForensicsEngine:
             )
             timeline.append(event)
         
-        conn.close()
-        
         # Construire investigation
         investigation = ForensicsInvestigation(
             id=inv_row[0],
@@ -825,6 +1615,18 @@ async def demo_forensics_engine():
     print("🔍 DEMO AI FORENSICS ENGINE - Station Traffeyère")
     print("=" * 60)
     
+    # Scanner multi-motifs: mêmes comptes que findall règle par règle, même quand
+    # des mots-clés de règles différentes se chevauchent
+    analyzer = engine.artifact_analyzer
+    overlapping = "scanomaly alertransfer virusecret uploadatabase " * 3
+    expected = [len(re.findall(pattern, overlapping, re.IGNORECASE | re.MULTILINE))
+                for _, pattern in analyzer.scanner.rules]
+    assert [count for count, _ in analyzer.scanner.scan(overlapping)] == expected
+    chunked = ArtifactScanner(analyzer.analysis_rules, chunk_size=7)
+    chunks = [overlapping[i:i + 7] for i in range(0, len(overlapping), 7)]
+    assert [count for count, _ in chunked.scan_chunks(chunks)] == expected
+    print(f"🔎 Scanner d'artifacts: {sum(expected)} indicateurs sur mots-clés chevauchants")
+    
     # Démarrer investigation
     investigation_id = await engine.start_investigation("INC-DEMO-001", "Agent Forensics IA")
     print(f"📋 Investigation démarrée: {investigation_id}")
@@ -0,0 +1,5 @@
+"""Persistance partagée des moteurs semaine 7"""
+
+from .async_sqlite import AsyncSQLiteStore
+
+__all__ = ['AsyncSQLiteStore']
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+💾 ASYNC SQLITE STORE
+Station Traffeyère IoT AI Platform - RNCP 39394 Semaine 7
+
+Persistance SQLite non bloquante partagée par les moteurs de la semaine 7
+(threat hunting, forensics, evidence, compliance) avec:
+- Un thread écrivain par base, connexion longue durée en mode WAL
+- Commits groupés (une transaction pour toutes les écritures en attente)
+- Isolation des erreurs par écriture (SAVEPOINT), sans annuler le lot
+- Pool de connexions de lecture (lectures concurrentes aux écritures)
+"""
+
+import asyncio
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger('AsyncSQLiteStore')
+
+_STOP = object()
+
+class _WriteOperation:
+    """Écriture en attente dans la file du thread écrivain"""
+    __slots__ = ('statements', 'many', 'future')
+
+    def __init__(self, statements: List[Tuple[str, Any]], many: bool):
+        self.statements = statements
+        self.many = many
+        self.future: Future = Future()
+
+class AsyncSQLiteStore:
+    """Accès SQLite asynchrone: écritures sérialisées, lectures en pool
+
+    Les coroutines attendent la validation (commit) de leurs écritures sans
+    bloquer la boucle événementielle; les écritures concurrentes sont
+    regroupées dans une même transaction par le thread écrivain.
+    Une instance par fichier de base: utiliser AsyncSQLiteStore.for_database.
+    """
+
+    _instances: Dict[str, 'AsyncSQLiteStore'] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, db_path: str, batch_size: int = 256, batch_wait: float = 0.005,
+                 read_pool_size: int = 4, busy_timeout: float = 30.0):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.busy_timeout = busy_timeout
+        self.stats = {'writes': 0, 'commits': 0, 'failed_writes': 0, 'reads': 0}
+
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._queue: 'queue.Queue' = queue.Queue()
+        self._closed = False
+        self._ready = threading.Event()
+        self._writer = threading.Thread(target=self._writer_loop, name=f"sqlite-writer-{Path(db_path).name}",
+                                        daemon=True)
+        self._writer.start()
+        self._ready.wait()
+
+        self._local = threading.local()
+        self._read_connections: List[sqlite3.Connection] = []
+        self._read_lock = threading.Lock()
+        self._readers = ThreadPoolExecutor(max_workers=read_pool_size,
+                                           thread_name_prefix=f"sqlite-reader-{Path(db_path).name}")
+
+    @classmethod
+    def for_database(cls, db_path: str, **kwargs) -> 'AsyncSQLiteStore':
+        """Instance partagée pour un fichier de base (une connexion écrivain par base)"""
+        key = str(Path(db_path).resolve())
+        with cls._instances_lock:
+            store = cls._instances.get(key)
+            if store is None or store._closed:
+                store = cls._instances[key] = cls(db_path, **kwargs)
+            return store
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    # ------------------------------------------------------------------
+    # Écritures
+    # ------------------------------------------------------------------
+
+    def _writer_loop(self):
+        """Boucle du thread écrivain: regroupe les écritures en transactions"""
+        conn = self._connect()
+        conn.isolation_level = None  # Transactions gérées explicitement
+        self._ready.set()
+
+        while True:
+            operation = self._queue.get()
+            if operation is _STOP:
+                break
+
+            batch = [operation]
+            deadline = time.monotonic() + self.batch_wait
+            stop_requested = False
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    operation = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if operation is _STOP:
+                    stop_requested = True
+                    break
+                batch.append(operation)
+
+            self._commit_batch(conn, batch)
+            if stop_requested:
+                break
+
+        conn.close()
+
+    def _commit_batch(self, conn: sqlite3.Connection, batch: List[_WriteOperation]):
+        """Exécuter un lot d'écritures dans une seule transaction"""
+        results: List[Tuple[_WriteOperation, Any, Optional[BaseException]]] = []
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            for operation in batch:
+                if callable(operation.statements):
+                    # Fonction exécutée dans le thread écrivain (schéma, migrations)
+                    conn.execute('SAVEPOINT write_op')
+                    try:
+                        value = operation.statements(conn)
+                        conn.execute('RELEASE write_op')
+                        results.append((operation, value, None))
+                    except Exception as e:
+                        conn.execute('ROLLBACK TO write_op')
+                        conn.execute('RELEASE write_op')
+                        results.append((operation, None, e))
+                    continue
+
+                conn.execute('SAVEPOINT write_op')
+                try:
+                    rowcount = 0
+                    for sql, params in operation.statements:
+                        cursor = conn.executemany(sql, params) if operation.many else conn.execute(sql, params)
+                        rowcount += max(cursor.rowcount, 0)
+                    conn.execute('RELEASE write_op')
+                    results.append((operation, rowcount, None))
+                except Exception as e:
+                    conn.execute('ROLLBACK TO write_op')
+                    conn.execute('RELEASE write_op')
+                    results.append((operation, None, e))
+            conn.execute('COMMIT')
+            self.stats['commits'] += 1
+        except Exception as e:
+            # Échec du commit lui-même: tout le lot est perdu
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            logger.error(f"❌ Commit SQLite échoué ({self.db_path}, {len(batch)} écritures): {e}")
+            results = [(operation, None, e) for operation in batch]
+
+        for operation, value, error in results:
+            if error is None:
+                self.stats['writes'] += 1
+                operation.future.set_result(value)
+            else:
+                self.stats['failed_writes'] += 1
+                operation.future.set_exception(error)
+
+    def _enqueue(self, statements: Any, many: bool = False) -> Future:
+        if self._closed:
+            raise RuntimeError(f"Store SQLite fermé: {self.db_path}")
+        operation = _WriteOperation(statements, many)
+        self._queue.put(operation)
+        return operation.future
+
+    def submit(self, sql: str, params: Sequence[Any] = ()) -> Future:
+        """Mettre en file une écriture (utilisable hors boucle asyncio)"""
+        return self._enqueue([(sql, params)])
+
+    async def execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        """Écrire et attendre la validation; retourne le nombre de lignes affectées"""
+        return await asyncio.wrap_future(self._enqueue([(sql, params)]))
+
+    async def executemany(self, sql: str, seq_of_params: Iterable[Sequence[Any]]) -> int:
+        """Écriture multiple atomique"""
+        return await asyncio.wrap_future(self._enqueue([(sql, list(seq_of_params))], many=True))
+
+    async def transaction(self, statements: List[Tuple[str, Sequence[Any]]]) -> int:
+        """Plusieurs instructions appliquées ensemble ou pas du tout"""
+        return await asyncio.wrap_future(self._enqueue(list(statements)))
+
+    def run_sync(self, function: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Exécuter une fonction sur la connexion écrivain et attendre (initialisation)"""
+        return self._enqueue(function).result()
+
+    async def flush(self):
+        """Attendre la validation de toutes les écritures déjà en file"""
+        await asyncio.wrap_future(self._enqueue([]))
+
+    # ------------------------------------------------------------------
+    # Lectures
+    # ------------------------------------------------------------------
+
+    def _reader_connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            conn.execute('PRAGMA query_only=ON')
+            with self._read_lock:
+                self._read_connections.append(conn)
+        return conn
+
+    def _read(self, sql: str, params: Sequence[Any], mode: str):
+        cursor = self._reader_connection().execute(sql, params)
+        try:
+            if mode == 'one':
+                return cursor.fetchone()
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+            self.stats['reads'] += 1
+
+    async def fetchone(self, sql: str, params: Sequence[Any] = ()) -> Optional[tuple]:
+        """Lire une ligne depuis le pool de lecture"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, self._read, sql, params, 'one')
+
+    async def fetchall(self, sql: str, params: Sequence[Any] = ()) -> List[tuple]:
+        """Lire toutes les lignes depuis le pool de lecture"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, self._read, sql, params, 'all')
+
+    async def read(self, function: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Exécuter une fonction de lecture sur une connexion du pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, lambda: function(self._reader_connection()))
+
+    def close(self):
+        """Valider les écritures en attente puis fermer les connexions"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._writer.join()
+        self._readers.shutdown(wait=True)
+        with self._read_lock:
+            for conn in self._read_connections:
+                conn.close()
+            self._read_connections.clear()
+        logger.info(f"💾 Store SQLite fermé: {self.db_path} ({self.stats['writes']} écritures, "
+                    f"{self.stats['commits']} commits)")
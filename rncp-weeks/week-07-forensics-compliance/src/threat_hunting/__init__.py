@@ -0,0 +1 @@
+"""Threat hunting avancé - moteur de chasse aux menaces"""
@@ -25,12 +25,20 @@ from collections import defaultdict, Counter
 import hashlib
 from enum import Enum
 import re
+import zlib
+import struct
+import heapq
+import itertools
 import statistics
+import threading
+from array import array
 from sklearn.ensemble import IsolationForest
 from sklearn.cluster import DBSCAN
 from sklearn.preprocessing import StandardScaler
 import networkx as nx
 
+from ..storage import AsyncSQLiteStore
+
 logger = logging.getLogger('AdvancedThreatHunter')
 
 class ThreatLevel(Enum):
@@ -243,20 +251,516 @@ class MITREAttackMapping:
         tactic = self.techniques[technique_id]["tactic"]
         return [t for t in self.tactics_map.get(tactic, []) if t != technique_id]
 
+def _sketch_hashes(item: Any) -> Tuple[int, int]:
+    """Deux hash 64 bits stables entre processus (pour sketches persistés)"""
+    digest = hashlib.blake2b(str(item).encode(), digest_size=16).digest()
+    return int.from_bytes(digest[:8], 'big'), int.from_bytes(digest[8:], 'big') | 1
+
+class CountMinSketch:
+    """Count-min sketch: fréquences approchées (jamais sous-estimées) en mémoire fixe"""
+
+    def __init__(self, width: int = 128, depth: int = 4, table: Optional[array] = None):
+        self.width = width
+        self.depth = depth
+        self.table = table if table is not None else array('I', bytes(4 * width * depth))
+
+    def add_hashes(self, h1: int, h2: int, count: int = 1):
+        width = self.width
+        for row in range(self.depth):
+            self.table[row * width + (h1 + row * h2) % width] += count
+
+    def estimate_hashes(self, h1: int, h2: int) -> int:
+        width = self.width
+        return min(self.table[row * width + (h1 + row * h2) % width] for row in range(self.depth))
+
+    def add(self, item: Any, count: int = 1):
+        self.add_hashes(*_sketch_hashes(item), count)
+
+    def estimate(self, item: Any) -> int:
+        return self.estimate_hashes(*_sketch_hashes(item))
+
+    def merge(self, other: 'CountMinSketch'):
+        merged = np.frombuffer(self.table, dtype=np.uint32) + np.frombuffer(other.table, dtype=np.uint32)
+        self.table = array('I', merged.tobytes())
+
+    def to_bytes(self) -> bytes:
+        return self.table.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes, width: int, depth: int) -> 'CountMinSketch':
+        table = array('I')
+        table.frombytes(data)
+        return cls(width, depth, table)
+
+class HyperLogLog:
+    """HyperLogLog: cardinalité approchée (2^precision registres d'un octet)"""
+
+    def __init__(self, precision: int = 10, registers: Optional[bytearray] = None):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = registers if registers is not None else bytearray(self.size)
+
+    def add_hash(self, h1: int):
+        remaining_bits = 64 - self.precision
+        index = h1 >> remaining_bits
+        rank = remaining_bits - (h1 & ((1 << remaining_bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def add(self, item: Any):
+        self.add_hash(_sketch_hashes(item)[0])
+
+    def count(self) -> int:
+        registers = np.frombuffer(self.registers, dtype=np.uint8)
+        size = self.size
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size * size / float(np.sum(np.ldexp(1.0, -registers.astype(np.int32))))
+        zeros = int(np.count_nonzero(registers == 0))
+        if estimate <= 2.5 * size and zeros:
+            # Petites cardinalités: comptage linéaire
+            estimate = size * np.log(size / zeros)
+        return int(round(estimate))
+
+    def merge(self, other: 'HyperLogLog'):
+        merged = np.maximum(np.frombuffer(self.registers, dtype=np.uint8),
+                            np.frombuffer(other.registers, dtype=np.uint8))
+        self.registers = bytearray(merged.tobytes())
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.registers)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, precision: int) -> 'HyperLogLog':
+        return cls(precision, bytearray(data))
+
+class EWMAStat:
+    """Moyenne et variance à pondération exponentielle (mise à jour O(1))"""
+
+    def __init__(self, alpha: float = 0.2, count: int = 0, mean: float = 0.0, variance: float = 0.0):
+        self.alpha = alpha
+        self.count = count
+        self.mean = mean
+        self.variance = variance
+
+    def update(self, value: float):
+        if self.count == 0:
+            self.mean = float(value)
+            self.variance = 0.0
+        else:
+            diff = value - self.mean
+            increment = self.alpha * diff
+            self.mean += increment
+            self.variance = (1 - self.alpha) * (self.variance + diff * increment)
+        self.count += 1
+
+    @property
+    def stddev(self) -> float:
+        return self.variance ** 0.5
+
+class RunningStat:
+    """Moyenne et écart-type d'échantillon incrémentaux (Welford)"""
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def add(self, value: float):
+        self.count += 1
+        diff = value - self.mean
+        self.mean += diff / self.count
+        self.m2 += diff * (value - self.mean)
+
+    @property
+    def stddev(self) -> float:
+        return (self.m2 / (self.count - 1)) ** 0.5 if self.count > 1 else 0.0
+
+class EntityBaseline:
+    """Baseline comportementale en streaming d'une entité
+
+    La fenêtre courante accumule les événements depuis le dernier profil
+    (O(1) par événement). Lorsqu'un profil est jugé normal, la fenêtre est
+    intégrée à la baseline: EWMA des métriques, fusion des sketches.
+    """
+
+    NUMERIC_FIELDS = {
+        "user": ("login_hour",),
+        "host": ("process_count", "network_connections", "cpu_usage"),
+        "ip": ("bytes",)
+    }
+    # Champs à forte cardinalité: count-min sketch (fréquences) + HyperLogLog (valeurs distinctes)
+    SKETCH_FIELDS = {
+        "user": ("country",),
+        "host": ("processes",),
+        "ip": ("dst_ports",)
+    }
+    SUSPICIOUS_PROCESSES = ('cmd.exe', 'powershell.exe', 'wscript.exe', 'cscript.exe')
+    FORMAT_VERSION = 1
+
+    def __init__(self, entity_id: str, entity_type: str, alpha: float = 0.2,
+                 cms_width: int = 128, cms_depth: int = 4, hll_precision: int = 10):
+        self.entity_id = entity_id
+        self.entity_type = entity_type
+        self.alpha = alpha
+        self.cms_width = cms_width
+        self.cms_depth = cms_depth
+        self.hll_precision = hll_precision
+
+        self.baseline_stats: Dict[str, EWMAStat] = {}
+        self.baseline_frequencies: Dict[str, CountMinSketch] = {}
+        self.baseline_uniques: Dict[str, HyperLogLog] = {}
+        self.windows_folded = 0
+        self.events_seen = 0
+        self.last_seen: Optional[datetime] = None
+        self.reset_window()
+
+    def reset_window(self):
+        """Vider la fenêtre courante"""
+        self.window_stats: Dict[str, RunningStat] = {}
+        self.window_counts: Dict[str, int] = defaultdict(int)
+        self.window_frequencies: Dict[str, CountMinSketch] = {}
+        self.window_uniques: Dict[str, HyperLogLog] = {}
+
+    @property
+    def window_events(self) -> int:
+        return self.window_counts['events']
+
+    def update(self, event: Dict[str, Any]):
+        """Intégrer un événement à la fenêtre courante"""
+        counts = self.window_counts
+        counts['events'] += 1
+        self.events_seen += 1
+
+        for field in self.NUMERIC_FIELDS.get(self.entity_type, ()):
+            if field in event:
+                stat = self.window_stats.get(field)
+                if stat is None:
+                    stat = self.window_stats[field] = RunningStat()
+                stat.add(event[field])
+
+        if self.entity_type == "user":
+            if event.get('auth_result') == 'failed':
+                counts['failed'] += 1
+            if event.get('is_weekend', False):
+                counts['weekend_flagged'] += 1
+        elif self.entity_type == "host":
+            for process in event.get('processes', ()):
+                if any(sus in process.lower() for sus in self.SUSPICIOUS_PROCESSES):
+                    counts['suspicious_processes'] += 1
+        elif self.entity_type == "ip":
+            if 'connections' in event:
+                counts['connections'] += event['connections']
+
+        timestamp = event.get('timestamp', datetime.now())
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp)
+        if timestamp:
+            counts['timed'] += 1
+            if timestamp.hour < 6 or timestamp.hour > 22:
+                counts['night'] += 1
+            if timestamp.weekday() >= 5:
+                counts['weekend'] += 1
+            if self.last_seen is None or timestamp > self.last_seen:
+                self.last_seen = timestamp
+
+        for field in self.SKETCH_FIELDS.get(self.entity_type, ()):
+            if field not in event:
+                continue
+            values = event[field]
+            if not isinstance(values, (list, tuple, set)):
+                values = (values,)
+            frequencies = self.window_frequencies.get(field)
+            if frequencies is None:
+                frequencies = self.window_frequencies[field] = CountMinSketch(self.cms_width, self.cms_depth)
+                self.window_uniques[field] = HyperLogLog(self.hll_precision)
+            uniques = self.window_uniques[field]
+            known = self.baseline_frequencies.get(field)
+            for value in values:
+                h1, h2 = _sketch_hashes(value)
+                counts[f'{field}_items'] += 1
+                if known is not None and known.estimate_hashes(h1, h2) == 0:
+                    counts[f'{field}_novel'] += 1
+                frequencies.add_hashes(h1, h2)
+                uniques.add_hash(h1)
+
+    def _window_mean(self, field: str, default: float) -> float:
+        stat = self.window_stats.get(field)
+        return stat.mean if stat is not None and stat.count else default
+
+    def _window_stddev(self, field: str) -> float:
+        stat = self.window_stats.get(field)
+        return stat.stddev if stat is not None else 0
+
+    def _window_unique(self, field: str) -> int:
+        uniques = self.window_uniques.get(field)
+        return uniques.count() if uniques is not None else 0
+
+    def window_metrics(self) -> Dict[str, float]:
+        """Métriques comportementales de la fenêtre courante"""
+        counts = self.window_counts
+        events = counts['events']
+        if not events:
+            return {}
+
+        if self.entity_type == "user":
+            return {
+                'avg_login_hour': self._window_mean('login_hour', 9),
+                'login_hour_stddev': self._window_stddev('login_hour'),
+                'unique_countries': self._window_unique('country'),
+                'failed_login_rate': counts['failed'] / events,
+                'total_sessions': events,
+                'weekend_activity_rate': counts['weekend_flagged'] / events
+            }
+        if self.entity_type == "host":
+            return {
+                'avg_process_count': self._window_mean('process_count', 50),
+                'process_count_stddev': self._window_stddev('process_count'),
+                'avg_network_connections': self._window_mean('network_connections', 10),
+                'avg_cpu_usage': self._window_mean('cpu_usage', 20),
+                'total_events': events
+            }
+        if self.entity_type == "ip":
+            unique_ports = self._window_unique('dst_ports')
+            port_items = counts['dst_ports_items']
+            return {
+                'unique_ports_contacted': unique_ports,
+                'avg_bytes_transferred': self._window_mean('bytes', 0),
+                'total_connections': counts['connections'],
+                'port_diversity': unique_ports / port_items if port_items else 0
+            }
+        return {}
+
+    def window_patterns(self) -> List[str]:
+        """Patterns comportementaux de la fenêtre courante"""
+        counts = self.window_counts
+        patterns = []
+        if not counts['events']:
+            return patterns
+
+        # Patterns temporels
+        if counts['timed']:
+            if counts['night'] / counts['timed'] > 0.3:
+                patterns.append("high_night_activity")
+            if counts['weekend'] / counts['timed'] > 0.4:
+                patterns.append("high_weekend_activity")
+
+        # Patterns spécifiques par type
+        if self.entity_type == "user":
+            if self._window_unique('country') > 3:
+                patterns.append("multi_country_access")
+            if counts['failed'] / counts['events'] > 0.2:
+                patterns.append("high_auth_failure_rate")
+        elif self.entity_type == "host":
+            if counts['suspicious_processes'] > counts['processes_items'] * 0.1:
+                patterns.append("suspicious_process_activity")
+
+        return patterns
+
+    def novelty_indicators(self) -> List[str]:
+        """Valeurs jamais observées dans la baseline (pays, ports, processus)"""
+        if not self.windows_folded:
+            return []
+        return [f"new_{field}_observed" for field in self.SKETCH_FIELDS.get(self.entity_type, ())
+                if self.window_counts[f'{field}_novel']]
+
+    def baseline_metrics(self) -> Dict[str, float]:
+        """Moyennes EWMA des métriques des fenêtres normales"""
+        return {metric: stat.mean for metric, stat in self.baseline_stats.items()}
+
+    def baseline_stddevs(self) -> Dict[str, float]:
+        """Écarts-types EWMA des métriques des fenêtres normales"""
+        return {metric: stat.stddev for metric, stat in self.baseline_stats.items()}
+
+    def fold_window(self, metrics: Dict[str, float]):
+        """Intégrer la fenêtre courante (jugée normale) à la baseline"""
+        for metric, value in metrics.items():
+            stat = self.baseline_stats.get(metric)
+            if stat is None:
+                stat = self.baseline_stats[metric] = EWMAStat(self.alpha)
+            stat.update(value)
+        for field, frequencies in self.window_frequencies.items():
+            if field in self.baseline_frequencies:
+                self.baseline_frequencies[field].merge(frequencies)
+                self.baseline_uniques[field].merge(self.window_uniques[field])
+            else:
+                self.baseline_frequencies[field] = frequencies
+                self.baseline_uniques[field] = self.window_uniques[field]
+        self.windows_folded += 1
+
+    def estimate_frequency(self, field: str, value: Any) -> int:
+        """Fréquence historique approchée d'une valeur (ex: pays d'un utilisateur)"""
+        frequencies = self.baseline_frequencies.get(field)
+        return frequencies.estimate(value) if frequencies is not None else 0
+
+    def historical_uniques(self, field: str) -> int:
+        """Nombre approché de valeurs distinctes observées dans la baseline"""
+        uniques = self.baseline_uniques.get(field)
+        return uniques.count() if uniques is not None else 0
+
+    def to_bytes(self) -> bytes:
+        """Sérialisation compacte (en-tête JSON + sketches bruts, compressés)"""
+        sketches = []
+        blobs = []
+        for scope, frequencies, uniques in (("baseline", self.baseline_frequencies, self.baseline_uniques),
+                                            ("window", self.window_frequencies, self.window_uniques)):
+            for field in frequencies:
+                sketches.append([scope, field])
+                blobs.append(frequencies[field].to_bytes())
+                blobs.append(uniques[field].to_bytes())
+        header = json.dumps({
+            'version': self.FORMAT_VERSION,
+            'entity_type': self.entity_type,
+            'params': [self.alpha, self.cms_width, self.cms_depth, self.hll_precision],
+            'baseline_stats': {m: [s.count, s.mean, s.variance] for m, s in self.baseline_stats.items()},
+            'window_stats': {f: [s.count, s.mean, s.m2] for f, s in self.window_stats.items()},
+            'window_counts': dict(self.window_counts),
+            'windows_folded': self.windows_folded,
+            'events_seen': self.events_seen,
+            'last_seen': self.last_seen.isoformat() if self.last_seen else None,
+            'sketches': sketches
+        }, separators=(',', ':')).encode()
+        return zlib.compress(struct.pack('>I', len(header)) + header + b''.join(blobs))
+
+    @classmethod
+    def from_bytes(cls, entity_id: str, data: bytes) -> 'EntityBaseline':
+        """Restaurer une baseline sérialisée par to_bytes"""
+        raw = zlib.decompress(data)
+        header_size = struct.unpack_from('>I', raw)[0]
+        state = json.loads(raw[4:4 + header_size])
+        if state['version'] != cls.FORMAT_VERSION:
+            raise ValueError(f"Version de baseline non supportée: {state['version']}")
+
+        alpha, cms_width, cms_depth, hll_precision = state['params']
+        baseline = cls(entity_id, state['entity_type'], alpha, cms_width, cms_depth, hll_precision)
+        baseline.baseline_stats = {m: EWMAStat(alpha, *values) for m, values in state['baseline_stats'].items()}
+        baseline.window_stats = {f: RunningStat(*values) for f, values in state['window_stats'].items()}
+        baseline.window_counts.update(state['window_counts'])
+        baseline.windows_folded = state['windows_folded']
+        baseline.events_seen = state['events_seen']
+        baseline.last_seen = datetime.fromisoformat(state['last_seen']) if state['last_seen'] else None
+
+        cms_size = 4 * cms_width * cms_depth
+        hll_size = 1 << hll_precision
+        offset = 4 + header_size
+        for scope, field in state['sketches']:
+            frequencies = CountMinSketch.from_bytes(raw[offset:offset + cms_size], cms_width, cms_depth)
+            offset += cms_size
+            uniques = HyperLogLog.from_bytes(raw[offset:offset + hll_size], hll_precision)
+            offset += hll_size
+            if scope == "baseline":
+                baseline.baseline_frequencies[field] = frequencies
+                baseline.baseline_uniques[field] = uniques
+            else:
+                baseline.window_frequencies[field] = frequencies
+                baseline.window_uniques[field] = uniques
+        return baseline
+
+class BehaviorBaselineStore:
+    """Baselines en streaming par entité (utilisateurs, hosts, IPs)
+
+    Partagée entre les threads de l'exécuteur (intégration d'événements) et
+    la boucle asyncio: toute lecture ou modification des baselines, de leurs
+    sketches et de l'ensemble des entités modifiées se fait sous lock
+    (réentrant, pour grouper plusieurs opérations en une section critique).
+    """
+
+    # Champ d'événement -> type d'entité
+    ENTITY_FIELDS = (("user", "user"), ("hostname", "host"), ("src_ip", "ip"))
+
+    def __init__(self, alpha: float = 0.2, cms_width: int = 128, cms_depth: int = 4,
+                 hll_precision: int = 10):
+        self.alpha = alpha
+        self.cms_width = cms_width
+        self.cms_depth = cms_depth
+        self.hll_precision = hll_precision
+        self.entities: Dict[str, EntityBaseline] = {}
+        self._dirty = set()
+        self.lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    def get(self, entity_id: str, entity_type: Optional[str] = None) -> Optional[EntityBaseline]:
+        """Baseline d'une entité (créée si entity_type est fourni)"""
+        with self.lock:
+            baseline = self.entities.get(entity_id)
+            if baseline is None and entity_type is not None:
+                baseline = self.entities[entity_id] = EntityBaseline(
+                    entity_id, entity_type, self.alpha, self.cms_width, self.cms_depth, self.hll_precision
+                )
+            return baseline
+
+    def observe(self, event: Dict[str, Any]):
+        """Router un événement vers les baselines des entités concernées"""
+        with self.lock:
+            for field, entity_type in self.ENTITY_FIELDS:
+                if field in event:
+                    entity_id = f"{entity_type}:{event[field]}"
+                    self.get(entity_id, entity_type).update(event)
+                    self._dirty.add(entity_id)
+
+    def observe_many(self, events: List[Dict[str, Any]]) -> int:
+        """Intégrer un lot d'événements (lock pris une fois pour le lot)"""
+        with self.lock:
+            for event in events:
+                self.observe(event)
+        return len(events)
+
+    def mark_dirty(self, entity_id: str):
+        with self.lock:
+            self._dirty.add(entity_id)
+
+    def ready(self, min_events: int) -> List[str]:
+        """Entités dont la fenêtre courante contient assez d'événements pour un profil"""
+        with self.lock:
+            return [entity_id for entity_id, baseline in self.entities.items()
+                    if baseline.window_events >= min_events]
+
+    def dirty_states(self) -> List[Tuple[str, str, bytes, Optional[str]]]:
+        """États sérialisés des baselines modifiées depuis le dernier appel"""
+        with self.lock:
+            states = []
+            for entity_id in self._dirty:
+                baseline = self.entities.get(entity_id)
+                if baseline is not None:
+                    states.append((entity_id, baseline.entity_type, baseline.to_bytes(),
+                                   baseline.last_seen.isoformat() if baseline.last_seen else None))
+            self._dirty.clear()
+            return states
+
+    def load_state(self, entity_id: str, data: bytes):
+        """Restaurer une baseline persistée"""
+        baseline = EntityBaseline.from_bytes(entity_id, data)
+        with self.lock:
+            self.entities[entity_id] = baseline
+
 class BehaviorAnalytics:
     """Moteur d'analyse comportementale"""
-    
-    def __init__(self):
+
+    def __init__(self, baseline_store: Optional[BehaviorBaselineStore] = None):
         self.scaler = StandardScaler()
         self.isolation_forest = IsolationForest(contamination=0.1, random_state=42)
         self.clustering = DBSCAN(eps=0.5, min_samples=5)
-        self.baselines = {}
+        self.baseline_store = baseline_store or BehaviorBaselineStore()
         self.trained = False
-    
-    def build_behavior_profile(self, entity_data: List[Dict[str, Any]], 
+
+    def observe_event(self, event: Dict[str, Any]):
+        """Mettre à jour les baselines des entités d'un événement (O(1))"""
+        self.baseline_store.observe(event)
+
+    def observe_events(self, data_sources: Dict[str, List[Dict[str, Any]]]) -> int:
+        """Intégrer toutes les sources de données aux baselines (une section critique par source)"""
+        return sum(self.baseline_store.observe_many(events) for events in data_sources.values())
+
+    def build_behavior_profile(self, entity_data: List[Dict[str, Any]],
                              entity_id: str, entity_type: str) -> BehaviorProfile:
-        """Construire profil comportemental d'une entité"""
-        
+        """Construire profil comportemental d'une entité
+
+        Effets de bord: les événements sont intégrés à la baseline persistante
+        de l'entité, puis la fenêtre courante est close (intégrée à la baseline
+        si normale) et réinitialisée, comme pour snapshot_profile.
+        """
+
         if not entity_data:
             return BehaviorProfile(
                 entity_id=entity_id,
@@ -269,25 +773,46 @@ class BehaviorAnalytics:
                 last_updated=datetime.now(),
                 observation_period=timedelta(days=30)
             )
-        
-        # Calculer métriques comportementales
-        current_metrics = self._calculate_behavioral_metrics(entity_data, entity_type)
-        
-        # Récupérer baseline si disponible
-        baseline_metrics = self.baselines.get(entity_id, current_metrics.copy())
-        
+
+        with self.baseline_store.lock:
+            baseline = self.baseline_store.get(entity_id, entity_type)
+            for event in entity_data:
+                baseline.update(event)
+            self.baseline_store.mark_dirty(entity_id)
+
+            return self.snapshot_profile(entity_id)
+
+    def snapshot_profile(self, entity_id: str) -> Optional[BehaviorProfile]:
+        """Profil d'une entité à partir de sa baseline (sans relecture de l'historique)
+
+        Clôt la fenêtre courante: intégrée à la baseline si le comportement est
+        normal, puis réinitialisée (sous le lock du store).
+        """
+        with self.baseline_store.lock:
+            return self._snapshot_profile(entity_id)
+
+    def _snapshot_profile(self, entity_id: str) -> Optional[BehaviorProfile]:
+        baseline = self.baseline_store.get(entity_id)
+        if baseline is None:
+            return None
+
+        # Métriques de la fenêtre courante et baseline EWMA (première fenêtre: elle-même)
+        current_metrics = baseline.window_metrics()
+        baseline_metrics = baseline.baseline_metrics() or current_metrics.copy()
+
         # Calculer score d'anomalie
         anomaly_score = self._calculate_anomaly_score(current_metrics, baseline_metrics)
-        
+
         # Identifier patterns comportementaux
-        patterns = self._identify_behavioral_patterns(entity_data, entity_type)
-        
+        patterns = baseline.window_patterns()
+
         # Déterminer indicateurs de risque
         risk_indicators = self._assess_risk_indicators(current_metrics, baseline_metrics, patterns)
-        
+        risk_indicators.extend(baseline.novelty_indicators())
+
         profile = BehaviorProfile(
             entity_id=entity_id,
-            entity_type=entity_type,
+            entity_type=baseline.entity_type,
             baseline_metrics=baseline_metrics,
             current_metrics=current_metrics,
             anomaly_score=anomaly_score,
@@ -296,72 +821,27 @@ class BehaviorAnalytics:
             last_updated=datetime.now(),
             observation_period=timedelta(days=30)
         )
-        
+
         # Mettre à jour baseline si nécessaire
         if anomaly_score < 0.3:  # Comportement "normal"
-            self.baselines[entity_id] = current_metrics.copy()
-        
+            baseline.fold_window(current_metrics)
+        baseline.reset_window()
+        self.baseline_store.mark_dirty(entity_id)
+
         return profile
-    
+
+    def snapshot_ready_profiles(self, min_events: int = 5) -> List[BehaviorProfile]:
+        """Profils de toutes les entités ayant assez d'événements dans leur fenêtre"""
+        with self.baseline_store.lock:
+            return [self._snapshot_profile(entity_id) for entity_id in self.baseline_store.ready(min_events)]
+
     def _calculate_behavioral_metrics(self, data: List[Dict[str, Any]], entity_type: str) -> Dict[str, float]:
-        """Calculer métriques comportementales"""
-        if not data:
-            return {}
-        
-        metrics = {}
-        
-        if entity_type == "user":
-            # Métriques utilisateur
-            login_times = [d.get('login_hour', 9) for d in data if 'login_hour' in d]
-            login_countries = [d.get('country', 'US') for d in data if 'country' in d]
-            failed_logins = [d for d in data if d.get('auth_result') == 'failed']
-            
-            metrics.update({
-                'avg_login_hour': statistics.mean(login_times) if login_times else 9,
-                'login_hour_stddev': statistics.stdev(login_times) if len(login_times) > 1 else 0,
-                'unique_countries': len(set(login_countries)),
-                'failed_login_rate': len(failed_logins) / len(data) if data else 0,
-                'total_sessions': len(data),
-                'weekend_activity_rate': len([d for d in data if d.get('is_weekend', False)]) / len(data)
-            })
-            
-        elif entity_type == "host":
-            # Métriques host
-            processes = [d.get('process_count', 50) for d in data if 'process_count' in d]
-            network_connections = [d.get('network_connections', 10) for d in data if 'network_connections' in d]
-            cpu_usage = [d.get('cpu_usage', 20) for d in data if 'cpu_usage' in d]
-            
-            metrics.update({
-                'avg_process_count': statistics.mean(processes) if processes else 50,
-                'process_count_stddev': statistics.stdev(processes) if len(processes) > 1 else 0,
-                'avg_network_connections': statistics.mean(network_connections) if network_connections else 10,
-                'avg_cpu_usage': statistics.mean(cpu_usage) if cpu_usage else 20,
-                'total_events': len(data)
-            })
-            
-        elif entity_type == "ip":
-            # Métriques IP
-            ports_contacted = []
-            bytes_transferred = []
-            connection_counts = []
-            
-            for d in data:
-                if 'dst_ports' in d:
-                    ports_contacted.extend(d['dst_ports'])
-                if 'bytes' in d:
-                    bytes_transferred.append(d['bytes'])
-                if 'connections' in d:
-                    connection_counts.append(d['connections'])
-            
-            metrics.update({
-                'unique_ports_contacted': len(set(ports_contacted)),
-                'avg_bytes_transferred': statistics.mean(bytes_transferred) if bytes_transferred else 0,
-                'total_connections': sum(connection_counts) if connection_counts else 0,
-                'port_diversity': len(set(ports_contacted)) / len(ports_contacted) if ports_contacted else 0
-            })
-        
-        return metrics
-    
+        """Calculer métriques comportementales (lot ponctuel, hors baseline)"""
+        window = EntityBaseline("adhoc", entity_type)
+        for event in data:
+            window.update(event)
+        return window.window_metrics()
+
     def _calculate_anomaly_score(self, current: Dict[str, float], baseline: Dict[str, float]) -> float:
         """Calculer score d'anomalie basé sur déviation de la baseline"""
         if not current or not baseline:
@@ -376,52 +856,11 @@ class BehaviorAnalytics:
         return statistics.mean(deviations) if deviations else 0.0
     
     def _identify_behavioral_patterns(self, data: List[Dict[str, Any]], entity_type: str) -> List[str]:
-        """Identifier patterns comportementaux"""
-        patterns = []
-        
-        if not data:
-            return patterns
-        
-        # Patterns temporels
-        timestamps = [datetime.fromisoformat(d['timestamp']) if isinstance(d.get('timestamp'), str) 
-                     else d.get('timestamp', datetime.now()) for d in data]
-        
-        hours = [ts.hour for ts in timestamps if ts]
-        if hours:
-            night_activity = len([h for h in hours if h < 6 or h > 22]) / len(hours)
-            if night_activity > 0.3:
-                patterns.append("high_night_activity")
-            
-            weekend_activity = len([ts for ts in timestamps if ts.weekday() >= 5]) / len(timestamps)
-            if weekend_activity > 0.4:
-                patterns.append("high_weekend_activity")
-        
-        # Patterns spécifiques par type
-        if entity_type == "user":
-            # Pattern de connexion
-            countries = [d.get('country', 'US') for d in data if 'country' in d]
-            if len(set(countries)) > 3:
-                patterns.append("multi_country_access")
-            
-            # Pattern de échecs d'authentification
-            failed_rate = len([d for d in data if d.get('auth_result') == 'failed']) / len(data)
-            if failed_rate > 0.2:
-                patterns.append("high_auth_failure_rate")
-                
-        elif entity_type == "host":
-            # Pattern de processus
-            process_names = []
-            for d in data:
-                if 'processes' in d:
-                    process_names.extend(d['processes'])
-            
-            suspicious_processes = ['cmd.exe', 'powershell.exe', 'wscript.exe', 'cscript.exe']
-            suspicious_count = len([p for p in process_names if any(sus in p.lower() for sus in suspicious_processes)])
-            
-            if suspicious_count > len(process_names) * 0.1:
-                patterns.append("suspicious_process_activity")
-        
-        return patterns
+        """Identifier patterns comportementaux (lot ponctuel, hors baseline)"""
+        window = EntityBaseline("adhoc", entity_type)
+        for event in data:
+            window.update(event)
+        return window.window_patterns()
     
     def _assess_risk_indicators(self, current: Dict[str, float], baseline: Dict[str, float], 
                               patterns: List[str]) -> List[str]:
@@ -695,6 +1134,190 @@ class APTAttributionEngine:
         # En réalité, analyserait la séquence et timing des attaques
         return 0.7  # Score exemple
 
+@dataclass(frozen=True)
+class HuntPredicate:
+    """Prédicat compilé d'une requête de chasse"""
+    field: str  # Champ indexé, "*" pour l'événement complet
+    operator: str  # "contains", "in", "min_length"
+    values: Tuple[Any, ...]
+
+class HuntQueryCompiler:
+    """Compilation des requêtes de chasse en prédicats sur index
+
+    Les règles reprennent, dans le même ordre de priorité, le matching par
+    mots-clés historique de ThreatHuntingEngine._query_matches_event.
+    """
+
+    KEYWORD_RULES = [
+        (("powershell",), HuntPredicate("process_name", "contains", ("powershell",))),
+        (("cmd.exe",), HuntPredicate("process_name", "contains", ("cmd",))),
+        (("auth",), HuntPredicate("event_type", "in", ("authentication",))),
+        (("network",), HuntPredicate("event_type", "in", ("network_connection",))),
+        (("rdp", "ssh"), HuntPredicate("protocol", "in", ("RDP", "SSH"))),
+    ]
+    # Match par défaut: événements "substantiels"
+    DEFAULT_PREDICATE = HuntPredicate("*", "min_length", (50,))
+
+    def __init__(self):
+        self._cache: Dict[str, HuntPredicate] = {}
+
+    def compile(self, query: str) -> HuntPredicate:
+        """Compiler une requête (résultat mémorisé par texte de requête)"""
+        predicate = self._cache.get(query)
+        if predicate is None:
+            query_lower = query.lower()
+            predicate = self.DEFAULT_PREDICATE
+            for keywords, candidate in self.KEYWORD_RULES:
+                if any(keyword in query_lower for keyword in keywords):
+                    predicate = candidate
+                    break
+            self._cache[query] = predicate
+        return predicate
+
+    @staticmethod
+    def matches(predicate: HuntPredicate, event: Dict[str, Any]) -> bool:
+        """Évaluer un prédicat sur un événement isolé"""
+        if predicate.operator == "min_length":
+            return len(str(event)) > predicate.values[0]
+        if predicate.operator == "contains":
+            value = str(event.get(predicate.field, "")).lower()
+            return any(term in value for term in predicate.values)
+        return event.get(predicate.field) in predicate.values
+
+class HuntEventIndex:
+    """Index inversé des sources de données d'une campagne
+
+    Chaque événement reçoit une position globale (ordre des sources puis des
+    événements); les listes de positions par valeur de champ sont donc triées
+    et l'ordre des résultats reste celui d'un parcours séquentiel.
+    """
+
+    INDEXED_FIELDS = ("process_name", "event_type", "protocol", "src_ip", "dst_ip", "user")
+    # Champs comparés en texte minuscule (recherche de sous-chaîne sur valeurs distinctes)
+    TEXT_FIELDS = ("process_name",)
+
+    def __init__(self, data_sources: Dict[str, List[Dict[str, Any]]]):
+        self.source_names: List[str] = []
+        self.events: List[Dict[str, Any]] = []
+        self.event_sources: List[int] = []
+        self.postings: Dict[str, Dict[Any, List[int]]] = {field: defaultdict(list) for field in self.INDEXED_FIELDS}
+
+        for source_id, (source_name, events) in enumerate(data_sources.items()):
+            self.source_names.append(source_name)
+            for event in events:
+                position = len(self.events)
+                self.events.append(event)
+                self.event_sources.append(source_id)
+                for field in self.INDEXED_FIELDS:
+                    if field in self.TEXT_FIELDS:
+                        key = str(event.get(field, "")).lower()
+                    elif field in event:
+                        key = event[field]
+                    else:
+                        continue
+                    try:
+                        self.postings[field][key].append(position)
+                    except TypeError:
+                        # Valeur non hashable: jamais égale à une valeur de requête
+                        continue
+
+        logger.info(f"🗂️ Index de chasse: {len(self.events)} événements, "
+                    f"{len(self.source_names)} sources, "
+                    f"{sum(len(p) for p in self.postings.values())} valeurs distinctes")
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def lookup(self, field: str, value: Any) -> List[int]:
+        """Positions des événements dont le champ vaut value (pivot IP/utilisateur)"""
+        if field in self.TEXT_FIELDS:
+            value = str(value).lower()
+        return self.postings[field].get(value, [])
+
+    def select(self, predicate: HuntPredicate, limit: int) -> Optional[List[int]]:
+        """Positions satisfaisant un prédicat indexable (None si balayage requis)"""
+        postings = self.postings.get(predicate.field)
+        if postings is None:
+            return None
+        if (predicate.operator == "contains") != (predicate.field in self.TEXT_FIELDS):
+            return None
+        if predicate.operator == "contains":
+            lists = [positions for value, positions in postings.items()
+                     if any(term in value for term in predicate.values)]
+        else:
+            lists = [postings[value] for value in predicate.values if value in postings]
+        if len(lists) == 1:
+            return lists[0][:limit]
+        return list(itertools.islice(heapq.merge(*lists), limit))
+
+    def scan(self, predicates: List[HuntPredicate], limit: int) -> Dict[HuntPredicate, List[int]]:
+        """Évaluer les prédicats non indexables en un seul parcours des événements
+
+        Le parcours s'arrête dès que tous les prédicats ont atteint la limite.
+        """
+        results = {predicate: [] for predicate in predicates}
+        pending = list(predicates)
+        for position, event in enumerate(self.events):
+            if not pending:
+                break
+            for predicate in pending:
+                if HuntQueryCompiler.matches(predicate, event):
+                    results[predicate].append(position)
+            pending = [p for p in pending if len(results[p]) < limit]
+        return results
+
+    def materialize(self, positions: List[int], query: str) -> List[Dict[str, Any]]:
+        """Construire les matches (copie de l'événement annotée) pour des positions"""
+        matches = []
+        for position in positions:
+            match = self.events[position].copy()
+            match["source"] = self.source_names[self.event_sources[position]]
+            match["matched_query"] = query
+            matches.append(match)
+        return matches
+
+class HuntExecutionEngine:
+    """Exécution groupée des requêtes de chasse d'une campagne
+
+    Les sources sont indexées une fois; les requêtes distinctes de toutes les
+    hypothèses sont compilées puis évaluées ensemble: prédicats indexés par
+    listes de positions, prédicats restants en un seul balayage commun.
+    """
+
+    def __init__(self, data_sources: Dict[str, List[Dict[str, Any]]],
+                 compiler: Optional[HuntQueryCompiler] = None, result_limit: int = 100):
+        self.index = HuntEventIndex(data_sources)
+        self.compiler = compiler or HuntQueryCompiler()
+        self.result_limit = result_limit
+        self._results: Dict[str, List[Dict[str, Any]]] = {}
+
+    def execute(self, queries: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Exécuter un ensemble de requêtes; retourne les matches par requête"""
+        pending = [q for q in dict.fromkeys(queries) if q not in self._results]
+        compiled = {query: self.compiler.compile(query) for query in pending}
+
+        positions: Dict[HuntPredicate, List[int]] = {}
+        to_scan = []
+        for predicate in dict.fromkeys(compiled.values()):
+            selected = self.index.select(predicate, self.result_limit)
+            if selected is None:
+                to_scan.append(predicate)
+            else:
+                positions[predicate] = selected
+        if to_scan:
+            positions.update(self.index.scan(to_scan, self.result_limit))
+
+        for query, predicate in compiled.items():
+            self._results[query] = self.index.materialize(positions[predicate], query)
+
+        return {query: self._results[query] for query in queries}
+
+    def matches_for(self, query: str) -> List[Dict[str, Any]]:
+        """Matches d'une requête (exécutée à la demande si nécessaire)"""
+        if query not in self._results:
+            self.execute([query])
+        return self._results[query]
+
 class ThreatHuntingEngine:
     """Moteur principal de threat hunting"""
     
@@ -703,12 +1326,19 @@ class ThreatHuntingEngine:
         self.mitre_mapping = MITREAttackMapping()
         self.behavior_analytics = BehaviorAnalytics()
         self.attribution_engine = APTAttributionEngine()
+        self.query_compiler = HuntQueryCompiler()
+        self.result_limit = 100
         self.active_campaigns = {}
+        self.store = AsyncSQLiteStore.for_database(db_path)
         self._setup_database()
+        self._load_behavior_baselines()
     
     def _setup_database(self):
         """Initialiser base de données threat hunting"""
-        conn = sqlite3.connect(self.db_path)
+        self.store.run_sync(self._create_schema)
+    
+    def _create_schema(self, conn: sqlite3.Connection):
+        """Créer le schéma (exécuté par le thread écrivain du store)"""
         cursor = conn.cursor()
         
         # Table hypothèses
@@ -786,8 +1416,16 @@ class ThreatHuntingEngine:
             )
         ''')
         
-        conn.commit()
-        conn.close()
+        # Table baselines en streaming (état sérialisé compact par entité)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS behavior_baselines (
+                entity_id TEXT PRIMARY KEY,
+                entity_type TEXT,
+                state BLOB,
+                last_seen TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
     
     async def create_threat_hypothesis(self, title: str, description: str, 
                                      mitre_tactics: List[str], threat_actors: List[str],
@@ -878,18 +1516,23 @@ class ThreatHuntingEngine:
         findings = []
         
         # Charger hypothèses de la campagne
-        hypotheses = []
-        for hypo_id in campaign.hypotheses:
-            hypothesis = await self._load_hypothesis(hypo_id)
-            if hypothesis:
-                hypotheses.append(hypothesis)
+        loaded = await asyncio.gather(*(self._load_hypothesis(hypo_id) for hypo_id in campaign.hypotheses))
+        hypotheses = [hypothesis for hypothesis in loaded if hypothesis]
+        
+        # Indexer les sources une fois puis évaluer toutes les requêtes en une passe
+        loop = asyncio.get_running_loop()
+        execution_engine = await loop.run_in_executor(
+            None, HuntExecutionEngine, data_sources, self.query_compiler, self.result_limit
+        )
+        all_queries = [q["query"] for hypothesis in hypotheses for q in hypothesis.hunt_queries]
+        await loop.run_in_executor(None, execution_engine.execute, all_queries)
         
-        # Exécuter requêtes pour chaque hypothèse
+        # Exploiter les résultats pour chaque hypothèse
         for hypothesis in hypotheses:
             logger.info(f"🔍 Test hypothèse: {hypothesis.title}")
             
             hypothesis_findings = await self._test_hypothesis(
-                hypothesis, data_sources, campaign_id
+                hypothesis, data_sources, campaign_id, execution_engine
             )
             findings.extend(hypothesis_findings)
             
@@ -905,16 +1548,19 @@ class ThreatHuntingEngine:
     
     async def _test_hypothesis(self, hypothesis: ThreatHypothesis, 
                              data_sources: Dict[str, List[Dict[str, Any]]],
-                             campaign_id: str) -> List[HuntFindings]:
-        """Tester une hypothèse sur les données"""
+                             campaign_id: str,
+                             execution_engine: Optional[HuntExecutionEngine] = None) -> List[HuntFindings]:
+        """Tester une hypothèse sur les données (index de campagne réutilisé si fourni)"""
         findings = []
         
         for query_info in hypothesis.hunt_queries:
             query = query_info["query"]
             technique = query_info.get("technique", "unknown")
             
-            # Simuler exécution de requête sur sources
-            matches = await self._execute_hunt_query(query, data_sources)
+            if execution_engine is not None:
+                matches = execution_engine.matches_for(query)
+            else:
+                matches = await self._execute_hunt_query(query, data_sources)
             
             if matches:
                 # Créer finding
@@ -938,7 +1584,9 @@ class ThreatHuntingEngine:
                 )
                 
                 findings.append(finding)
-                await self._save_finding(finding)
+        
+        # Écritures groupées par le store (une transaction pour tous les findings)
+        await asyncio.gather(*(self._save_finding(finding) for finding in findings))
         
         # Mettre à jour statistiques hypothèse
         if findings:
@@ -950,42 +1598,16 @@ class ThreatHuntingEngine:
     
     async def _execute_hunt_query(self, query: str, 
                                 data_sources: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
-        """Exécuter requête de chasse (simulation)"""
-        matches = []
-        
+        """Exécuter requête de chasse isolée (simulation)"""
         # Simulation d'exécution de requête SQL/KQL
         # En réalité, exécuterait sur SIEM, EDR, etc.
-        
-        for source_name, events in data_sources.items():
-            for event in events:
-                # Simulation de matching basique
-                if self._query_matches_event(query, event):
-                    match = event.copy()
-                    match["source"] = source_name
-                    match["matched_query"] = query
-                    matches.append(match)
-        
-        return matches[:100]  # Limiter résultats
+        # Pour plusieurs requêtes, préférer un HuntExecutionEngine partagé (index construit une fois)
+        execution_engine = HuntExecutionEngine(data_sources, self.query_compiler, self.result_limit)
+        return execution_engine.matches_for(query)
     
     def _query_matches_event(self, query: str, event: Dict[str, Any]) -> bool:
         """Vérifier si requête matche un événement (simulation)"""
-        # Simulation très basique de matching
-        query_lower = query.lower()
-        
-        # Recherche de mots-clés dans l'événement
-        if "powershell" in query_lower:
-            return "powershell" in str(event.get("process_name", "")).lower()
-        elif "cmd.exe" in query_lower:
-            return "cmd" in str(event.get("process_name", "")).lower()
-        elif "auth" in query_lower:
-            return event.get("event_type") == "authentication"
-        elif "network" in query_lower:
-            return event.get("event_type") == "network_connection"
-        elif "rdp" in query_lower or "ssh" in query_lower:
-            return event.get("protocol") in ["RDP", "SSH"]
-        
-        # Match par défaut pour démonstration
-        return len(str(event)) > 50  # Événements "substantiels"
+        return HuntQueryCompiler.matches(self.query_compiler.compile(query), event)
     
     def _extract_entities_from_matches(self, matches: List[Dict[str, Any]]) -> List[str]:
         """Extraire entités affectées des matches"""
@@ -1074,42 +1696,32 @@ class ThreatHuntingEngine:
         return recommendations
     
     async def analyze_behavioral_anomalies(self, data_sources: Dict[str, List[Dict[str, Any]]]) -> List[BehaviorProfile]:
-        """Analyser anomalies comportementales"""
-        profiles = []
-        
-        # Grouper données par entité
-        entity_data = defaultdict(list)
-        
-        for source_name, events in data_sources.items():
-            for event in events:
-                # Grouper par utilisateur
-                if "user" in event:
-                    entity_data[f"user:{event['user']}"].append(event)
-                
-                # Grouper par host
-                if "hostname" in event:
-                    entity_data[f"host:{event['hostname']}"].append(event)
-                
-                # Grouper par IP
-                if "src_ip" in event:
-                    entity_data[f"ip:{event['src_ip']}"].append(event)
+        """Analyser anomalies comportementales
+
+        Les événements mettent à jour les baselines en streaming (O(1) par
+        événement); les profils sont ensuite lus directement depuis les
+        baselines des entités ayant au moins 5 événements dans leur fenêtre.
+        Intégration, profils et export des baselines s'exécutent dans
+        l'exécuteur, sous le lock du BehaviorBaselineStore: la boucle n'attend
+        jamais ce lock et les analyses concurrentes restent cohérentes.
+        """
+        loop = asyncio.get_running_loop()
+        
+        # Intégrer les événements aux baselines par entité (user, host, IP)
+        observed = await loop.run_in_executor(None, self.behavior_analytics.observe_events, data_sources)
         
         # Construire profils comportementaux
-        for entity_id, events in entity_data.items():
-            if len(events) >= 5:  # Minimum d'événements pour profil
-                entity_type = entity_id.split(":")[0]
-                profile = self.behavior_analytics.build_behavior_profile(
-                    events, entity_id, entity_type
-                )
-                profiles.append(profile)
-                
-                # Sauvegarder profil
-                await self._save_behavior_profile(profile)
+        profiles = await loop.run_in_executor(None, self.behavior_analytics.snapshot_ready_profiles, 5)
+        
+        # Sauvegarder profils et baselines
+        await self._save_behavior_profiles(profiles)
+        await self._save_behavior_baselines()
         
         # Trier par score d'anomalie
         profiles.sort(key=lambda x: x.anomaly_score, reverse=True)
         
-        logger.info(f"🧠 {len(profiles)} profils comportementaux analysés")
+        logger.info(f"🧠 {len(profiles)} profils comportementaux analysés "
+                    f"({observed} événements, {len(self.behavior_analytics.baseline_store)} baselines)")
         return profiles
     
     async def perform_apt_attribution(self, campaign_id: str) -> List[APTSignature]:
@@ -1120,12 +1732,9 @@ class ThreatHuntingEngine:
         
         campaign = self.active_campaigns[campaign_id]
         
-        # Charger findings de la campagne
-        findings = []
-        for finding_id in campaign.findings:
-            finding = await self._load_finding(finding_id)
-            if finding:
-                findings.append(finding)
+        # Charger findings de la campagne (lectures concurrentes sur le pool)
+        loaded = await asyncio.gather(*(self._load_finding(finding_id) for finding_id in campaign.findings))
+        findings = [finding for finding in loaded if finding]
         
         # Charger profils comportementaux récents
         behavior_profiles = await self._load_recent_behavior_profiles()
@@ -1136,20 +1745,17 @@ class ThreatHuntingEngine:
         # Mettre à jour findings avec attribution
         for signature in signatures:
             if signature.confidence > 0.5:
-                for finding in findings:
-                    if not finding.apt_attribution:
-                        finding.apt_attribution = signature
-                        await self._save_finding(finding)
+                attributed = [finding for finding in findings if not finding.apt_attribution]
+                for finding in attributed:
+                    finding.apt_attribution = signature
+                await asyncio.gather(*(self._save_finding(finding) for finding in attributed))
         
         logger.info(f"🎯 Attribution APT: {len(signatures)} candidats identifiés")
         return signatures
     
     async def _save_hypothesis(self, hypothesis: ThreatHypothesis):
         """Sauvegarder hypothèse en DB"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        await self.store.execute('''
             INSERT OR REPLACE INTO hunt_hypotheses
             (id, title, description, mitre_tactics, threat_actors, confidence_score,
              priority, hunt_queries, expected_indicators, created_by, created_at,
@@ -1163,16 +1769,10 @@ class ThreatHuntingEngine:
             hypothesis.created_by, hypothesis.created_at, hypothesis.last_tested,
             hypothesis.success_rate
         ))
-        
-        conn.commit()
-        conn.close()
     
     async def _save_campaign(self, campaign: HuntCampaign):
         """Sauvegarder campagne en DB"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        await self.store.execute('''
             INSERT OR REPLACE INTO hunt_campaigns
             (id, name, description, hypotheses, status, start_date, end_date,
              lead_hunter, team_members, scope, findings, metrics, created_at)
@@ -1185,15 +1785,9 @@ class ThreatHuntingEngine:
             json.dumps(campaign.findings), json.dumps(campaign.metrics),
             campaign.created_at
         ))
-        
-        conn.commit()
-        conn.close()
     
     async def _save_finding(self, finding: HuntFindings):
         """Sauvegarder finding en DB"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         apt_attribution_json = None
         if finding.apt_attribution:
             # Convertir datetime en string pour sérialisation JSON
@@ -1202,7 +1796,7 @@ class ThreatHuntingEngine:
                 apt_dict['last_seen'] = apt_dict['last_seen'].isoformat()
             apt_attribution_json = json.dumps(apt_dict)
         
-        cursor.execute('''
+        await self.store.execute('''
             INSERT OR REPLACE INTO hunt_findings
             (finding_id, hunt_campaign_id, hypothesis_id, threat_level, title,
              description, affected_entities, iocs_discovered, ttps_observed,
@@ -1218,40 +1812,64 @@ class ThreatHuntingEngine:
             apt_attribution_json, json.dumps(finding.recommendations),
             finding.discovered_at, finding.analyst
         ))
-        
-        conn.commit()
-        conn.close()
     
     async def _save_behavior_profile(self, profile: BehaviorProfile):
         """Sauvegarder profil comportemental"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        await self._save_behavior_profiles([profile])
+    
+    async def _save_behavior_profiles(self, profiles: List[BehaviorProfile]):
+        """Sauvegarder profils comportementaux en une transaction"""
+        if not profiles:
+            return
         
-        cursor.execute('''
+        await self.store.executemany('''
             INSERT OR REPLACE INTO behavior_profiles
             (entity_id, entity_type, baseline_metrics, current_metrics,
              anomaly_score, behavioral_patterns, risk_indicators,
              last_updated, observation_period)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        ''', [(
             profile.entity_id, profile.entity_type,
             json.dumps(profile.baseline_metrics), json.dumps(profile.current_metrics),
             profile.anomaly_score, json.dumps(profile.behavioral_patterns),
             json.dumps(profile.risk_indicators), profile.last_updated,
             str(profile.observation_period)
-        ))
+        ) for profile in profiles])
+    
+    async def _save_behavior_baselines(self):
+        """Persister les baselines modifiées depuis la dernière sauvegarde"""
+        loop = asyncio.get_running_loop()
+        states = await loop.run_in_executor(None, self.behavior_analytics.baseline_store.dirty_states)
+        if not states:
+            return
+        
+        await self.store.executemany('''
+            INSERT OR REPLACE INTO behavior_baselines
+            (entity_id, entity_type, state, last_seen, updated_at)
+            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ''', states)
+        
+        logger.info(f"💾 {len(states)} baselines comportementales sauvegardées")
+    
+    def _load_behavior_baselines(self):
+        """Restaurer les baselines comportementales persistées"""
+        rows = self.store.run_sync(
+            lambda conn: conn.execute('SELECT entity_id, state FROM behavior_baselines').fetchall()
+        )
+        loaded = 0
+        for entity_id, state in rows:
+            try:
+                self.behavior_analytics.baseline_store.load_state(entity_id, state)
+                loaded += 1
+            except (ValueError, zlib.error, struct.error, KeyError) as e:
+                logger.warning(f"⚠️ Baseline {entity_id} illisible, ignorée: {e}")
         
-        conn.commit()
-        conn.close()
+        if loaded:
+            logger.info(f"🧠 {loaded} baselines comportementales restaurées")
     
     async def _load_hypothesis(self, hypothesis_id: str) -> Optional[ThreatHypothesis]:
         """Charger hypothèse depuis DB"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM hunt_hypotheses WHERE id = ?', (hypothesis_id,))
-        row = cursor.fetchone()
-        conn.close()
+        row = await self.store.fetchone('SELECT * FROM hunt_hypotheses WHERE id = ?', (hypothesis_id,))
         
         if not row:
             return None
@@ -1268,12 +1886,7 @@ class ThreatHuntingEngine:
     
     async def _load_finding(self, finding_id: str) -> Optional[HuntFindings]:
         """Charger finding depuis DB"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM hunt_findings WHERE finding_id = ?', (finding_id,))
-        row = cursor.fetchone()
-        conn.close()
+        row = await self.store.fetchone('SELECT * FROM hunt_findings WHERE finding_id = ?', (finding_id,))
         
         if not row:
             return None
@@ -1295,16 +1908,11 @@ class ThreatHuntingEngine:
     
     async def _load_recent_behavior_profiles(self) -> List[BehaviorProfile]:
         """Charger profils comportementaux récents"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        rows = await self.store.fetchall('''
             SELECT * FROM behavior_profiles 
             WHERE last_updated >= datetime('now', '-7 days')
             ORDER BY anomaly_score DESC
         ''')
-        rows = cursor.fetchall()
-        conn.close()
         
         profiles = []
         for row in rows:
@@ -27,6 +27,8 @@ import hashlib
 import struct
 from cryptography.fernet import Fernet
 import math
+from collections import deque
+import numpy as np
 
 # Configuration logging
 logging.basicConfig(
@@ -282,6 +284,175 @@ class SensorDataSimulator:
             'noise_level': abs(noise),
             'drift_detected': abs(drift) > profile['drift_rate'] * 10
         }
+    
+    def build_fleet_arrays(self, sensors: List[IoTSensor]) -> 'FleetSimulationArrays':
+        """Paramètres de simulation de la flotte en colonnes (un élément par capteur)"""
+        profiled_types = list(self.simulation_profiles)
+        type_order = profiled_types + [t for t in SensorType if t not in self.simulation_profiles]
+        type_codes = np.array([type_order.index(sensor.sensor_type) for sensor in sensors], dtype=np.int16)
+        
+        # Tables par type de profil (capteurs non profilés: ligne neutre, masque dédié)
+        def profile_column(key: str, transform=lambda v: v) -> np.ndarray:
+            table = np.array([transform(self.simulation_profiles[t][key]) for t in profiled_types]
+                             + [0.0] * (len(type_order) - len(profiled_types)), dtype=np.float64)
+            return table[type_codes]
+        
+        return FleetSimulationArrays(
+            sensor_ids=[sensor.sensor_id for sensor in sensors],
+            type_names=[t.value for t in type_order],
+            type_codes=type_codes,
+            profiled=type_codes < len(profiled_types),
+            base_value=profile_column('base_value'),
+            variation_range=profile_column('variation_range'),
+            noise_factor=profile_column('noise_factor'),
+            drift_rate=profile_column('drift_rate'),
+            clip_low=profile_column('typical_range', lambda r: r[0] * 0.8),
+            clip_high=profile_column('typical_range', lambda r: r[1] * 1.2),
+            alarm_low=profile_column('alarm_low'),
+            alarm_high=profile_column('alarm_high')
+        )
+    
+    def simulate_fleet_interval(self, fleet: 'FleetSimulationArrays', time_offset_hours: float = 0,
+                                rng: Optional[np.random.Generator] = None) -> Dict[str, np.ndarray]:
+        """Simulation vectorisée d'un intervalle de lecture pour toute la flotte
+
+        Même modèle que simulate_sensor_reading (cycle journalier, bruit, dérive,
+        qualité dégradée, pannes à 0.1%), calculé en colonnes NumPy.
+        """
+        rng = rng or np.random.default_rng()
+        size = len(fleet.sensor_ids)
+        
+        time_factor = math.sin(time_offset_hours * 2 * math.pi / 24)
+        noise = rng.normal(0.0, 1.0, size) * fleet.noise_factor
+        values = (fleet.base_value + fleet.variation_range * (time_factor * 0.3)
+                  + noise + fleet.drift_rate * time_offset_hours)
+        np.clip(values, fleet.clip_low, fleet.clip_high, out=values)
+        
+        # Qualité signal: 98% nominal, dégradée hors alarme ou si bruit élevé
+        quality = np.full(size, 98.0)
+        out_of_alarm = (values < fleet.alarm_low) | (values > fleet.alarm_high)
+        high_noise = ~out_of_alarm & (np.abs(noise) > fleet.noise_factor * 2)
+        quality[out_of_alarm] = rng.uniform(70, 85, int(out_of_alarm.sum()))
+        quality[high_noise] = rng.uniform(90, 95, int(high_noise.sum()))
+        
+        # Capteurs non profilés: valeur uniforme, qualité fixe, pas de panne simulée
+        unprofiled = ~fleet.profiled
+        if unprofiled.any():
+            values[unprofiled] = rng.uniform(0, 100, int(unprofiled.sum()))
+            quality[unprofiled] = 95.0
+        
+        status = np.full(size, SENSOR_STATUS_CODES[SensorStatus.ONLINE], dtype=np.uint8)
+        failed = fleet.profiled & (rng.random(size) < 0.001)
+        status[failed] = SENSOR_STATUS_CODES[SensorStatus.ERROR]
+        quality[failed] = 0.0
+        values[failed] = np.nan
+        
+        return {
+            'value': np.round(values, 3),
+            'quality': np.round(quality, 1),
+            'status': status
+        }
+
+# Codes de statut pour le stockage en colonnes (uint8)
+SENSOR_STATUSES = list(SensorStatus)
+SENSOR_STATUS_CODES = {status: code for code, status in enumerate(SENSOR_STATUSES)}
+
+@dataclass
+class FleetSimulationArrays:
+    """Paramètres de simulation d'une flotte, en colonnes alignées sur sensor_ids"""
+    sensor_ids: List[str]
+    type_names: List[str]
+    type_codes: np.ndarray
+    profiled: np.ndarray
+    base_value: np.ndarray
+    variation_range: np.ndarray
+    noise_factor: np.ndarray
+    drift_rate: np.ndarray
+    clip_low: np.ndarray
+    clip_high: np.ndarray
+    alarm_low: np.ndarray
+    alarm_high: np.ndarray
+
+class FleetReadingHistory:
+    """Historique des lectures en anneau columnaire de taille fixe
+
+    Mémoire constante (~21 octets par lecture): au-delà de capacity, les
+    lectures les plus anciennes sont écrasées.
+    """
+    
+    def __init__(self, capacity: int = 1_000_000):
+        self.capacity = capacity
+        self.timestamp = np.zeros(capacity, dtype=np.float64)
+        self.sensor_index = np.zeros(capacity, dtype=np.int32)
+        self.value = np.zeros(capacity, dtype=np.float32)
+        self.quality = np.zeros(capacity, dtype=np.float32)
+        self.status = np.zeros(capacity, dtype=np.uint8)
+        self.position = 0  # Prochaine ligne à écrire
+        self.total_appended = 0
+    
+    def __len__(self) -> int:
+        return min(self.total_appended, self.capacity)
+    
+    def append(self, timestamp: float, values: np.ndarray, quality: np.ndarray, status: np.ndarray,
+               sensor_index: Optional[np.ndarray] = None):
+        """Ajouter un intervalle (une ligne par capteur)"""
+        count = len(values)
+        if sensor_index is None:
+            sensor_index = np.arange(count, dtype=np.int32)
+        if count > self.capacity:
+            # Seules les dernières lignes tiennent dans l'anneau
+            skip = count - self.capacity
+            self.total_appended += skip
+            self.position = (self.position + skip) % self.capacity
+            values, quality, status, sensor_index = (values[skip:], quality[skip:], status[skip:],
+                                                     sensor_index[skip:])
+            count = self.capacity
+        
+        first = min(count, self.capacity - self.position)
+        for start, end, source in ((self.position, self.position + first, slice(0, first)),
+                                   (0, count - first, slice(first, count))):
+            if end > start:
+                self.timestamp[start:end] = timestamp
+                self.sensor_index[start:end] = sensor_index[source]
+                self.value[start:end] = values[source]
+                self.quality[start:end] = quality[source]
+                self.status[start:end] = status[source]
+        self.position = (self.position + count) % self.capacity
+        self.total_appended += count
+    
+    def latest(self, count: int) -> Dict[str, np.ndarray]:
+        """Les count dernières lectures, dans l'ordre chronologique"""
+        count = min(count, len(self))
+        rows = (np.arange(self.position - count, self.position)) % self.capacity
+        return {
+            'timestamp': self.timestamp[rows],
+            'sensor_index': self.sensor_index[rows],
+            'value': self.value[rows],
+            'quality': self.quality[rows],
+            'status': self.status[rows]
+        }
+
+class FleetMonitoringMetrics:
+    """Agrégats de monitoring mis à jour à chaque intervalle (par type de capteur)"""
+    
+    def __init__(self, type_names: List[str]):
+        self.type_names = type_names
+        type_count = len(type_names)
+        self.readings_by_type = np.zeros(type_count, dtype=np.int64)
+        self.quality_sum_by_type = np.zeros(type_count, dtype=np.float64)
+        self.online_by_type = np.zeros(type_count, dtype=np.int64)
+        self.total_alerts = 0
+        self.alerts_by_type = {'STATUS_CHANGE': 0, 'QUALITY_DEGRADATION': 0}
+    
+    def update(self, type_codes: np.ndarray, quality: np.ndarray, online: np.ndarray,
+               status_alerts: int, quality_alerts: int):
+        type_count = len(self.type_names)
+        self.readings_by_type += np.bincount(type_codes, minlength=type_count)
+        self.quality_sum_by_type += np.bincount(type_codes, weights=quality, minlength=type_count)
+        self.online_by_type += np.bincount(type_codes, weights=online, minlength=type_count).astype(np.int64)
+        self.alerts_by_type['STATUS_CHANGE'] += status_alerts
+        self.alerts_by_type['QUALITY_DEGRADATION'] += quality_alerts
+        self.total_alerts += status_alerts + quality_alerts
 
 class IoTSensorDeploymentManager:
     """Gestionnaire de déploiement des capteurs IoT"""
@@ -954,118 +1125,128 @@ class IoTSensorDeploymentManager:
         
         return topology
     
-    async def monitor_sensor_fleet(self, duration_minutes: int = 10) -> Dict[str, Any]:
-        """Monitoring temps réel de la flotte"""
+    async def monitor_sensor_fleet(self, duration_minutes: int = 10, interval_seconds: float = 30,
+                                   history_capacity: int = 1_000_000,
+                                   max_recent_alerts: int = 1000) -> Dict[str, Any]:
+        """Monitoring temps réel de la flotte
+
+        Chaque intervalle est simulé pour toute la flotte en colonnes NumPy; les
+        alertes sont détectées par masques, l'historique va dans un anneau
+        columnaire borné et les métriques sont agrégées au fil de l'eau.
+        """
         logger.info(f"📊 Démarrage monitoring flotte pendant {duration_minutes} minutes")
         
+        fleet = self.data_simulator.build_fleet_arrays(list(self.deployed_sensors.values()))
+        history = FleetReadingHistory(history_capacity)
+        metrics = FleetMonitoringMetrics(fleet.type_names)
+        recent_alerts: deque = deque(maxlen=max_recent_alerts)
+        rng = np.random.default_rng()
+        online_code = SENSOR_STATUS_CODES[SensorStatus.ONLINE]
+        
         monitoring_data = {
             'monitoring_start': datetime.now().isoformat(),
             'duration_minutes': duration_minutes,
-            'readings_collected': [],
-            'alerts_generated': [],
+            'reading_history': history,
+            'alerts_generated': recent_alerts,  # Alertes les plus récentes (bornées)
             'performance_metrics': {},
             'status': 'RUNNING'
         }
         
         # Monitoring en continu
-        monitoring_intervals = duration_minutes * 2  # Toutes les 30 secondes
+        monitoring_intervals = max(1, int(duration_minutes * 60 / interval_seconds))
+        log_every = max(1, int(120 / interval_seconds))  # Toutes les 2 minutes
         
         for interval in range(monitoring_intervals):
             interval_start = time.time()
+            elapsed_hours = interval * interval_seconds / 3600
             
             # Collecte données de tous les capteurs
-            interval_readings = []
-            alerts = []
+            readings = self.data_simulator.simulate_fleet_interval(fleet, elapsed_hours, rng)
+            online = readings['status'] == online_code
             
-            for sensor_id, sensor in self.deployed_sensors.items():
-                # Simulation lecture capteur
-                reading = self.data_simulator.simulate_sensor_reading(sensor)
-                reading['sensor_id'] = sensor_id
-                reading['sensor_type'] = sensor.sensor_type.value
-                reading['location'] = sensor.location
-                
-                interval_readings.append(reading)
-                
-                # Détection alertes
-                if reading['status'] != SensorStatus.ONLINE.value:
-                    alerts.append({
-                        'sensor_id': sensor_id,
+            # Détection alertes
+            status_alert_mask = ~online
+            quality_alert_mask = readings['quality'] < 90
+            status_alerts = int(status_alert_mask.sum())
+            quality_alerts = int(quality_alert_mask.sum())
+            
+            history.append(interval_start, readings['value'], readings['quality'], readings['status'])
+            metrics.update(fleet.type_codes, readings['quality'], online, status_alerts, quality_alerts)
+            
+            # Dictionnaires d'alerte uniquement pour les capteurs concernés (au plus maxlen)
+            if status_alerts or quality_alerts:
+                alert_time = datetime.now().isoformat()
+                for index in np.flatnonzero(status_alert_mask)[-max_recent_alerts:]:
+                    recent_alerts.append({
+                        'sensor_id': fleet.sensor_ids[index],
                         'alert_type': 'STATUS_CHANGE',
                         'severity': 'HIGH',
-                        'message': f"Capteur {sensor_id} status: {reading['status']}",
-                        'timestamp': datetime.now().isoformat()
+                        'message': f"Capteur {fleet.sensor_ids[index]} status: "
+                                   f"{SENSOR_STATUSES[readings['status'][index]].value}",
+                        'timestamp': alert_time
                     })
-                
-                if reading['quality'] < 90:
-                    alerts.append({
-                        'sensor_id': sensor_id,
+                for index in np.flatnonzero(quality_alert_mask)[-max_recent_alerts:]:
+                    recent_alerts.append({
+                        'sensor_id': fleet.sensor_ids[index],
                         'alert_type': 'QUALITY_DEGRADATION',
                         'severity': 'MEDIUM',
-                        'message': f"Qualité signal dégradée: {reading['quality']}%",
-                        'timestamp': datetime.now().isoformat()
+                        'message': f"Qualité signal dégradée: {readings['quality'][index]}%",
+                        'timestamp': alert_time
                     })
             
-            monitoring_data['readings_collected'].extend(interval_readings)
-            monitoring_data['alerts_generated'].extend(alerts)
-            
             # Log progression
-            if interval % 4 == 0:  # Toutes les 2 minutes
-                logger.info(f"📈 Interval {interval//2 + 1}: {len(interval_readings)} lectures, {len(alerts)} alertes")
+            if interval % log_every == 0:
+                logger.info(f"📈 Interval {interval + 1}/{monitoring_intervals}: {len(fleet.sensor_ids)} lectures, "
+                            f"{status_alerts + quality_alerts} alertes")
             
             # Attente prochaine interval
             elapsed = time.time() - interval_start
-            sleep_time = max(0, 30 - elapsed)  # 30 secondes entre lectures
+            sleep_time = max(0, interval_seconds - elapsed)
             await asyncio.sleep(sleep_time)
         
         # Calcul métriques finales
         monitoring_data['monitoring_end'] = datetime.now().isoformat()
         monitoring_data['status'] = 'COMPLETED'
-        monitoring_data['performance_metrics'] = self._calculate_monitoring_metrics(monitoring_data)
+        monitoring_data['performance_metrics'] = self._calculate_monitoring_metrics(metrics, duration_minutes)
         
-        logger.info(f"✅ Monitoring terminé: {len(monitoring_data['readings_collected'])} lectures collectées")
+        logger.info(f"✅ Monitoring terminé: {history.total_appended} lectures collectées "
+                    f"({len(history)} en historique)")
         
         return monitoring_data
     
-    def _calculate_monitoring_metrics(self, monitoring_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Calcul métriques de monitoring"""
-        readings = monitoring_data['readings_collected']
-        alerts = monitoring_data['alerts_generated']
+    def _calculate_monitoring_metrics(self, metrics: FleetMonitoringMetrics,
+                                      duration_minutes: float) -> Dict[str, Any]:
+        """Calcul métriques de monitoring (depuis les agrégats incrémentaux)"""
+        total_readings = int(metrics.readings_by_type.sum())
         
-        if not readings:
+        if not total_readings:
             return {}
         
-        # Métriques qualité
-        quality_scores = [r['quality'] for r in readings if r['quality'] is not None]
-        avg_quality = sum(quality_scores) / len(quality_scores) if quality_scores else 0
-        
-        # Métriques disponibilité
-        online_readings = [r for r in readings if r['status'] == SensorStatus.ONLINE.value]
-        availability = (len(online_readings) / len(readings)) * 100 if readings else 0
-        
-        # Métriques alertes
-        alert_rate = (len(alerts) / len(readings)) * 100 if readings else 0
+        avg_quality = float(metrics.quality_sum_by_type.sum()) / total_readings
+        availability = int(metrics.online_by_type.sum()) / total_readings * 100
+        alert_rate = metrics.total_alerts / total_readings * 100
         
         # Métriques par type de capteur
-        sensor_types = set(r['sensor_type'] for r in readings)
         type_metrics = {}
-        
-        for sensor_type in sensor_types:
-            type_readings = [r for r in readings if r['sensor_type'] == sensor_type]
-            type_metrics[sensor_type] = {
-                'total_readings': len(type_readings),
-                'avg_quality': sum(r['quality'] for r in type_readings if r['quality']) / len(type_readings),
-                'availability': (len([r for r in type_readings if r['status'] == SensorStatus.ONLINE.value]) / len(type_readings)) * 100
-            }
+        for code, sensor_type in enumerate(metrics.type_names):
+            type_readings = int(metrics.readings_by_type[code])
+            if type_readings:
+                type_metrics[sensor_type] = {
+                    'total_readings': type_readings,
+                    'avg_quality': float(metrics.quality_sum_by_type[code]) / type_readings,
+                    'availability': int(metrics.online_by_type[code]) / type_readings * 100
+                }
         
         return {
-            'total_readings': len(readings),
+            'total_readings': total_readings,
             'average_quality_score': round(avg_quality, 2),
             'availability_percentage': round(availability, 2),
             'alert_rate_percentage': round(alert_rate, 2),
-            'total_alerts': len(alerts),
-            'sensor_types_monitored': len(sensor_types),
+            'total_alerts': metrics.total_alerts,
+            'alerts_by_type': dict(metrics.alerts_by_type),
+            'sensor_types_monitored': len(type_metrics),
             'metrics_by_type': type_metrics,
-            'data_throughput_per_hour': len(readings) * (60 / monitoring_data['duration_minutes'])
+            'data_throughput_per_hour': total_readings * (60 / duration_minutes)
         }
     
     def get_deployment_summary(self) -> Dict[str, Any]:
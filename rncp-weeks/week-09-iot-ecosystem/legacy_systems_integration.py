@@ -14,12 +14,14 @@ Système d'intégration sécurisé avec les SI existants:
 
 import asyncio
 import json
+import math
 import struct
 import time
 import ssl
 import socket
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Union, Callable, Awaitable
+from collections import OrderedDict
 from dataclasses import dataclass, asdict
 from enum import Enum
 import logging
@@ -84,17 +86,237 @@ class DataMapping:
     unit_conversion: str
     quality_threshold: float
 
+class ModbusException(Exception):
+    """Réponse d'exception Modbus (code d'exception du PDU)"""
+
+    ILLEGAL_DATA_ADDRESS = 0x02
+
+    def __init__(self, function_code: int, exception_code: int):
+        super().__init__(f"Exception Modbus FC{function_code:02d}: code {exception_code}")
+        self.function_code = function_code
+        self.exception_code = exception_code
+
+# Décodage des registres (big-endian, mots de poids fort en premier)
+MODBUS_REGISTER_FORMATS = {
+    'REAL': struct.Struct('>f'), 'FLOAT': struct.Struct('>f'), 'FLOAT32': struct.Struct('>f'),
+    'INT': struct.Struct('>h'), 'INT16': struct.Struct('>h'),
+    'UINT': struct.Struct('>H'), 'UINT16': struct.Struct('>H'), 'WORD': struct.Struct('>H'),
+    'BOOL': struct.Struct('>H'),
+    'DINT': struct.Struct('>i'), 'INT32': struct.Struct('>i'),
+    'UDINT': struct.Struct('>I'), 'UINT32': struct.Struct('>I'), 'DWORD': struct.Struct('>I')
+}
+
+# Limite protocolaire des fonctions de lecture de registres (FC03/FC04)
+MODBUS_MAX_READ_REGISTERS = 125
+
+@dataclass
+class ModbusReadBlock:
+    """Lecture d'une plage contiguë de registres couvrant plusieurs points"""
+    function_code: int
+    start: int
+    count: int
+    points: List[Any]  # (index du point, point, offset dans le bloc, format)
+
+class ModbusReadPlanner:
+    """Planification des lectures Modbus par blocs
+
+    Les points d'une même table (holding 4xxxx -> FC03, input 3xxxx -> FC04)
+    sont triés par adresse puis regroupés tant que l'écart entre registres
+    reste inférieur à max_gap et que le bloc ne dépasse pas 125 registres.
+    """
+
+    def __init__(self, max_block_size: int = MODBUS_MAX_READ_REGISTERS, max_gap: int = 8):
+        self.max_block_size = min(max_block_size, MODBUS_MAX_READ_REGISTERS)
+        self.max_gap = max_gap
+
+    @staticmethod
+    def register_reference(address: int) -> tuple:
+        """(code fonction, offset 0-based) depuis une adresse Modicon 4xxxx/3xxxx"""
+        if 400001 <= address <= 465536:
+            return 3, address - 400001
+        if 300001 <= address <= 365536:
+            return 4, address - 300001
+        if 40001 <= address <= 49999:
+            return 3, address - 40001
+        if 30001 <= address <= 39999:
+            return 4, address - 30001
+        return 3, address
+
+    @staticmethod
+    def register_format(data_point: Dict[str, Any]) -> struct.Struct:
+        return MODBUS_REGISTER_FORMATS.get(str(data_point.get('type', 'UINT')).upper(), MODBUS_REGISTER_FORMATS['UINT'])
+
+    def plan(self, data_points: List[Dict[str, Any]], max_gap: Optional[int] = None) -> List[ModbusReadBlock]:
+        """Regrouper les points en blocs de lecture"""
+        max_gap = self.max_gap if max_gap is None else max_gap
+        by_function: Dict[int, List[tuple]] = {}
+        for index, data_point in enumerate(data_points):
+            function_code, offset = self.register_reference(int(data_point['address']))
+            register_format = self.register_format(data_point)
+            by_function.setdefault(function_code, []).append(
+                (offset, offset + register_format.size // 2, index, data_point, register_format))
+
+        blocks = []
+        for function_code, entries in sorted(by_function.items()):
+            entries.sort(key=lambda entry: entry[0])
+            block_start = block_end = None
+            members: List[tuple] = []
+            for offset, end, index, data_point, register_format in entries:
+                if (members and offset - block_end <= max_gap
+                        and max(end, block_end) - block_start <= self.max_block_size):
+                    block_end = max(block_end, end)
+                else:
+                    if members:
+                        blocks.append(self._make_block(function_code, block_start, block_end, members))
+                    block_start, block_end, members = offset, end, []
+                members.append((index, data_point, offset, register_format))
+            if members:
+                blocks.append(self._make_block(function_code, block_start, block_end, members))
+        return blocks
+
+    @staticmethod
+    def _make_block(function_code: int, start: int, end: int, members: List[tuple]) -> ModbusReadBlock:
+        return ModbusReadBlock(
+            function_code=function_code,
+            start=start,
+            count=end - start,
+            points=[(index, data_point, offset - start, register_format)
+                    for index, data_point, offset, register_format in members]
+        )
+
+    @staticmethod
+    def decode(block: ModbusReadBlock, payload: bytes) -> List[tuple]:
+        """Décodage en bloc: (index, valeur) pour chaque point depuis les octets du bloc"""
+        values = []
+        for index, data_point, relative_offset, register_format in block.points:
+            value = register_format.unpack_from(payload, relative_offset * 2)[0]
+            if str(data_point.get('type', '')).upper() == 'BOOL':
+                value = bool(value)
+            elif 'scale' in data_point:
+                value = value * data_point['scale']
+            values.append((index, value))
+        return values
+
+class ModbusTCPClient:
+    """Client Modbus TCP asyncio avec requêtes pipelinées
+
+    Plusieurs requêtes peuvent être en vol sur la même connexion: les réponses
+    sont associées aux requêtes par identifiant de transaction (en-tête MBAP).
+    """
+
+    def __init__(self, host: str, port: int, unit_id: int = 1, timeout: float = 10.0):
+        self.host = host
+        self.port = port
+        self.unit_id = unit_id
+        self.timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._transaction_id = 0
+
+    async def connect(self):
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout)
+        self._reader_task = asyncio.get_running_loop().create_task(self._read_responses())
+
+    async def _read_responses(self):
+        error: Exception = ConnectionError("Connexion Modbus fermée")
+        try:
+            while True:
+                header = await self._reader.readexactly(7)
+                transaction_id, _, length, _ = struct.unpack('>HHHB', header)
+                pdu = await self._reader.readexactly(length - 1)
+                future = self._pending.pop(transaction_id, None)
+                if future is not None and not future.done():
+                    future.set_result(pdu)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = ConnectionError(f"Connexion Modbus interrompue: {e}")
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self._pending.clear()
+
+    async def read_registers(self, function_code: int, start: int, count: int) -> bytes:
+        """Lire count registres (FC03/FC04); retourne les octets de données"""
+        if self._writer is None or self._reader_task is None or self._reader_task.done():
+            raise ConnectionError(f"Connexion Modbus {self.host}:{self.port} indisponible")
+
+        self._transaction_id = (self._transaction_id + 1) & 0xFFFF
+        transaction_id = self._transaction_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[transaction_id] = future
+        self._writer.write(struct.pack('>HHHBBHH', transaction_id, 0, 6, self.unit_id,
+                                       function_code, start, count))
+        try:
+            await self._writer.drain()
+            pdu = await asyncio.wait_for(future, self.timeout)
+        finally:
+            self._pending.pop(transaction_id, None)
+
+        if pdu[0] & 0x80:
+            raise ModbusException(function_code, pdu[1])
+        payload = pdu[2:2 + pdu[1]]
+        if len(payload) != count * 2:
+            raise ConnectionError(f"Réponse Modbus tronquée: {len(payload)} octets pour {count} registres")
+        return payload
+
+    async def close(self):
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except asyncio.CancelledError:
+                pass
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except Exception:
+                pass
+        self._writer = None
+
 class ModbusSecureConnector:
-    """Connecteur Modbus sécurisé"""
+    """Connecteur Modbus sécurisé
+
+    Les lectures sont planifiées par blocs (ModbusReadPlanner) puis émises
+    concurremment, réparties sur les connexions du device et limitées par un
+    nombre maximal de requêtes en vol par device. En mode live, les blocs sont
+    lus sur de vraies connexions Modbus TCP pipelinées (ModbusTCPClient);
+    sinon la lecture est simulée (une latence réseau par bloc).
+    """
     
-    def __init__(self):
+    def __init__(self, live_mode: bool = False):
         self.active_connections = {}
+        self.live_mode = live_mode
         self.security_config = {
             'max_connections_per_device': 3,
+            'max_inflight_per_device': 4,
             'connection_timeout': 30,
             'read_timeout': 10,
             'max_retries': 3,
-            'security_validation': True
+            'security_validation': True,
+            'block_max_gap': 8,  # Registres non demandés lus pour fusionner deux blocs
+            'simulated_read_latency': 0.1,
+            'authorized_ports': [502, 503, 10502],  # Ports Modbus standards
+            'authorized_ip_ranges': [
+                '192.168.10.',   # Réseau SCADA principal
+                '192.168.11.',   # Réseau SCADA backup
+                '10.0.1.',       # DMZ industrielle
+                '172.16.1.'      # Réseau maintenance
+            ]
+        }
+        self.read_planner = ModbusReadPlanner(max_gap=self.security_config['block_max_gap'])
+        self.device_inflight: Dict[str, asyncio.Semaphore] = {}
+        self.read_stats = {
+            'polls': 0,
+            'points': 0,
+            'blocks': 0,
+            'block_fallbacks': 0,
+            'last_poll_ms': 0.0
         }
         
     async def connect_modbus_device(self, system: LegacySystem) -> Dict[str, Any]:
@@ -117,6 +339,10 @@ class ModbusSecureConnector:
             else:
                 raise Exception(f"Protocole Modbus non supporté: {system.protocol}")
             
+            if system.system_id not in self.device_inflight:
+                self.device_inflight[system.system_id] = asyncio.Semaphore(
+                    self.security_config['max_inflight_per_device'])
+            
             # Test de communication
             test_result = await self._test_modbus_communication(connection, system)
             
@@ -155,7 +381,7 @@ class ModbusSecureConnector:
             }
         
         # Vérification port sécurisé
-        if system.port not in [502, 503, 10502]:  # Ports Modbus standards
+        if system.port not in self.security_config['authorized_ports']:
             return {
                 'valid': False,
                 'error': f"Port {system.port} non standard pour Modbus"
@@ -177,21 +403,13 @@ class ModbusSecureConnector:
     def _is_ip_authorized(self, ip_address: str) -> bool:
         """Vérification IP autorisée"""
         # Plages IP autorisées pour SCADA
-        authorized_ranges = [
-            '192.168.10.',   # Réseau SCADA principal
-            '192.168.11.',   # Réseau SCADA backup
-            '10.0.1.',       # DMZ industrielle
-            '172.16.1.'      # Réseau maintenance
-        ]
+        authorized_ranges = self.security_config['authorized_ip_ranges']
         
         return any(ip_address.startswith(range_ip) for range_ip in authorized_ranges)
     
     async def _connect_modbus_tcp(self, system: LegacySystem) -> Dict[str, Any]:
         """Connexion Modbus TCP"""
         try:
-            # Simulation connexion socket
-            await asyncio.sleep(0.5)  # Latence réseau
-            
             # Configuration connexion
             connection = {
                 'type': 'MODBUS_TCP',
@@ -201,6 +419,19 @@ class ModbusSecureConnector:
                 'last_activity': datetime.now().isoformat()
             }
             
+            if self.live_mode:
+                # Pool de connexions TCP réelles (lectures pipelinées sur chacune)
+                clients = [
+                    ModbusTCPClient(system.ip_address, system.port, unit_id=connection['slave_id'],
+                                    timeout=min(system.timeout, self.security_config['read_timeout']))
+                    for _ in range(self.security_config['max_connections_per_device'])
+                ]
+                await asyncio.gather(*(client.connect() for client in clients))
+                connection['clients'] = clients
+            else:
+                # Simulation connexion socket
+                await asyncio.sleep(0.5)  # Latence réseau
+            
             return connection
             
         except Exception as e:
@@ -231,12 +462,19 @@ class ModbusSecureConnector:
         """Test de communication Modbus"""
         try:
             # Test lecture registre
-            await asyncio.sleep(0.2)
+            start = time.perf_counter()
+            if connection.get('clients') and system.data_points:
+                block = self.read_planner.plan(system.data_points[:1])[0]
+                await connection['clients'][0].read_registers(block.function_code, block.start, block.count)
+                response_time_ms = round((time.perf_counter() - start) * 1000, 1)
+            else:
+                await asyncio.sleep(0.2)
+                response_time_ms = 150
             
             test_result = {
                 'read_test': True,
                 'write_test': False,  # Lecture seule par sécurité
-                'response_time_ms': 150,
+                'response_time_ms': response_time_ms,
                 'data_quality': 'GOOD',
                 'error_count': 0
             }
@@ -251,48 +489,103 @@ class ModbusSecureConnector:
     
     async def read_modbus_data(self, connection_id: str, 
                              data_points: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Lecture données Modbus"""
+        """Lecture données Modbus (blocs planifiés lus concurremment)"""
         if connection_id not in self.active_connections:
             raise Exception(f"Connexion {connection_id} non trouvée")
         
         connection_info = self.active_connections[connection_id]
-        readings = []
+        connection = connection_info['connection_object']
+        inflight = self.device_inflight[connection_info['system_id']]
+        start = time.perf_counter()
+        
+        blocks = self.read_planner.plan(data_points)
+        block_results = await asyncio.gather(
+            *(self._read_block(connection, inflight, block, position) for position, block in enumerate(blocks)),
+            return_exceptions=True
+        )
         
-        for data_point in data_points:
-            try:
-                # Simulation lecture registre Modbus
-                await asyncio.sleep(0.1)
-                
-                # Génération valeur réaliste selon le type
-                value = self._simulate_modbus_value(data_point)
-                
-                reading = {
-                    'address': data_point['address'],
-                    'name': data_point['name'],
-                    'value': value,
-                    'unit': data_point.get('unit', ''),
-                    'quality': 'GOOD',
-                    'timestamp': datetime.now().isoformat(),
-                    'data_type': data_point['type']
-                }
-                
-                readings.append(reading)
-                
-            except Exception as e:
-                readings.append({
-                    'address': data_point['address'],
-                    'name': data_point['name'],
-                    'value': None,
-                    'quality': 'BAD',
-                    'error': str(e),
-                    'timestamp': datetime.now().isoformat()
-                })
+        timestamp = datetime.now().isoformat()
+        readings: List[Optional[Dict[str, Any]]] = [None] * len(data_points)
+        for block, result in zip(blocks, block_results):
+            if isinstance(result, BaseException):
+                result = [(index, result) for index, _, _, _ in block.points]
+            for index, value in result:
+                data_point = data_points[index]
+                if isinstance(value, BaseException):
+                    readings[index] = {
+                        'address': data_point['address'],
+                        'name': data_point['name'],
+                        'value': None,
+                        'quality': 'BAD',
+                        'error': str(value),
+                        'timestamp': timestamp
+                    }
+                else:
+                    readings[index] = {
+                        'address': data_point['address'],
+                        'name': data_point['name'],
+                        'value': value,
+                        'unit': data_point.get('unit', ''),
+                        'quality': 'GOOD',
+                        'timestamp': timestamp,
+                        'data_type': data_point['type']
+                    }
         
         # Mise à jour dernière activité
-        connection_info['last_activity'] = datetime.now().isoformat()
+        connection_info['last_activity'] = timestamp
+        self.read_stats['polls'] += 1
+        self.read_stats['points'] += len(data_points)
+        self.read_stats['blocks'] += len(blocks)
+        self.read_stats['last_poll_ms'] = round((time.perf_counter() - start) * 1000, 1)
         
         return readings
     
+    async def _read_block(self, connection: Dict[str, Any], inflight: asyncio.Semaphore,
+                          block: ModbusReadBlock, position: int) -> List[tuple]:
+        """Lire un bloc; retourne (index, valeur ou exception) par point"""
+        clients = connection.get('clients')
+        if not clients:
+            async with inflight:
+                # Simulation lecture registres Modbus (un aller-retour par bloc)
+                await asyncio.sleep(self.security_config['simulated_read_latency'])
+            return [(index, self._simulate_modbus_value(data_point)) for index, data_point, _, _ in block.points]
+        
+        try:
+            async with inflight:
+                payload = await clients[position % len(clients)].read_registers(
+                    block.function_code, block.start, block.count)
+            return self.read_planner.decode(block, payload)
+        except ModbusException as e:
+            if e.exception_code != ModbusException.ILLEGAL_DATA_ADDRESS or len(block.points) == 1:
+                raise
+        
+        # Bloc couvrant des registres non mappés: relecture point par point
+        self.read_stats['block_fallbacks'] += 1
+        single_blocks = [
+            ModbusReadBlock(block.function_code, block.start + relative_offset, register_format.size // 2,
+                            [(index, data_point, 0, register_format)])
+            for index, data_point, relative_offset, register_format in block.points
+        ]
+        results = await asyncio.gather(
+            *(self._read_block(connection, inflight, single, position + offset)
+              for offset, single in enumerate(single_blocks)),
+            return_exceptions=True
+        )
+        values = []
+        for single, result in zip(single_blocks, results):
+            if isinstance(result, BaseException):
+                values.append((single.points[0][0], result))
+            else:
+                values.extend(result)
+        return values
+    
+    async def disconnect_modbus_device(self, connection_id: str):
+        """Fermeture d'une connexion Modbus (et de ses sockets en mode live)"""
+        connection_info = self.active_connections.pop(connection_id, None)
+        if connection_info:
+            for client in connection_info['connection_object'].get('clients', []):
+                await client.close()
+    
     def _simulate_modbus_value(self, data_point: Dict[str, Any]) -> float:
         """Simulation valeur Modbus réaliste"""
         data_type = data_point['type'].lower()
@@ -309,11 +602,231 @@ class ModbusSecureConnector:
         else:
             return round(time.time() % 100, 2)
 
+@dataclass
+class OPCUAMonitoredItem:
+    """Élément surveillé d'un abonnement OPC-UA (filtre DataChange avec deadband)"""
+    node_id: str
+    client_handle: int
+    sampling_interval: float  # ms
+    deadband_type: str = 'None'  # 'None', 'Absolute', 'Percent'
+    deadband_value: float = 0.0
+    eu_range: Optional[tuple] = None  # (bas, haut) requis pour le deadband Percent
+    last_reported: Any = None
+    next_sample: float = 0.0
+    samples: int = 0
+    suppressed: int = 0
+
+    def passes_filter(self, value: Any) -> bool:
+        """Changement significatif par rapport à la dernière valeur notifiée"""
+        if self.last_reported is None:
+            return True
+        if (isinstance(value, bool) or isinstance(self.last_reported, bool)
+                or not isinstance(value, (int, float)) or not isinstance(self.last_reported, (int, float))):
+            return value != self.last_reported
+        delta = abs(value - self.last_reported)
+        if self.deadband_type == 'Absolute':
+            return delta > self.deadband_value
+        if self.deadband_type == 'Percent' and self.eu_range:
+            return delta > self.deadband_value / 100.0 * (self.eu_range[1] - self.eu_range[0])
+        return delta > 0
+
+class OPCUAServerSubscription:
+    """Abonnement côté serveur: échantillonnage, filtrage et publication groupée
+
+    Chaque élément est échantillonné à son intervalle; seules les valeurs
+    passant le filtre deadband sont mises en file (une par élément, la plus
+    récente). Les notifications sont publiées ensemble à chaque intervalle de
+    publication (un seul message réseau pour tous les éléments modifiés).
+    """
+
+    def __init__(self, server: 'OPCUAStandInServer', subscription_id: int, publishing_interval: float,
+                 callback: Callable[[List[Dict[str, Any]]], Any]):
+        self.server = server
+        self.subscription_id = subscription_id
+        self.publishing_interval = publishing_interval
+        self.callback = callback
+        self.items: Dict[int, OPCUAMonitoredItem] = {}
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {'publish_responses': 0, 'notifications': 0, 'samples': 0, 'suppressed': 0}
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _sample_due_items(self, now: float):
+        for handle, item in self.items.items():
+            if now < item.next_sample:
+                continue
+            item.next_sample = now + item.sampling_interval / 1000.0
+            value = self.server.node_value(item.node_id)
+            self.stats['samples'] += 1
+            if item.passes_filter(value):
+                item.last_reported = value
+                self._pending[handle] = {
+                    'node_id': item.node_id,
+                    'client_handle': handle,
+                    'value': value,
+                    'status_code': 'Good',
+                    'source_timestamp': datetime.now().isoformat()
+                }
+            else:
+                item.suppressed += 1
+                self.stats['suppressed'] += 1
+            item.samples += 1
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        next_publish = loop.time() + self.publishing_interval / 1000.0
+        while True:
+            now = loop.time()
+            self._sample_due_items(now)
+            if now >= next_publish:
+                next_publish = now + self.publishing_interval / 1000.0
+                if self._pending:
+                    notifications, self._pending = list(self._pending.values()), {}
+                    await asyncio.sleep(self.server.request_latency)  # PublishResponse sur le réseau
+                    self.stats['publish_responses'] += 1
+                    self.stats['notifications'] += len(notifications)
+                    self.callback(notifications)
+            wake_up = min([next_publish] + [item.next_sample for item in self.items.values()])
+            await asyncio.sleep(max(wake_up - loop.time(), 0.001))
+
+class OPCUAStandInServer:
+    """Serveur OPC-UA local (espace d'adresses en mémoire) pour tests et simulation
+
+    Les valeurs des nœuds sont statiques (set_value) ou produites par une
+    fonction; chaque service (Read, CreateSubscription, CreateMonitoredItems)
+    coûte un aller-retour simulé de request_latency secondes.
+    """
+
+    def __init__(self, request_latency: float = 0.05,
+                 default_provider: Optional[Callable[[str], Any]] = None):
+        self.request_latency = request_latency
+        self.default_provider = default_provider
+        self.nodes: Dict[str, Any] = {}
+        self.subscriptions: Dict[int, OPCUAServerSubscription] = {}
+        self._next_id = 0
+        self.stats = {'read_requests': 0, 'nodes_read': 0, 'subscription_requests': 0}
+
+    def set_value(self, node_id: str, value: Any):
+        self.nodes[node_id] = value
+
+    def node_value(self, node_id: str) -> Any:
+        value = self.nodes.get(node_id)
+        if callable(value):
+            return value()
+        if value is None and self.default_provider is not None:
+            return self.default_provider(node_id)
+        return value
+
+    async def read(self, node_ids: List[str]) -> List[Dict[str, Any]]:
+        """Service Read: toutes les valeurs en une requête"""
+        await asyncio.sleep(self.request_latency)
+        self.stats['read_requests'] += 1
+        self.stats['nodes_read'] += len(node_ids)
+        timestamp = datetime.now().isoformat()
+        return [{
+            'node_id': node_id,
+            'value': self.node_value(node_id),
+            'status_code': 'Good' if node_id in self.nodes or self.default_provider else 'BadNodeIdUnknown',
+            'source_timestamp': timestamp,
+            'server_timestamp': timestamp
+        } for node_id in node_ids]
+
+    async def create_subscription(self, publishing_interval: float,
+                                  callback: Callable[[List[Dict[str, Any]]], Any]) -> OPCUAServerSubscription:
+        await asyncio.sleep(self.request_latency)
+        self.stats['subscription_requests'] += 1
+        self._next_id += 1
+        subscription = OPCUAServerSubscription(self, self._next_id, publishing_interval, callback)
+        self.subscriptions[subscription.subscription_id] = subscription
+        return subscription
+
+    async def create_monitored_items(self, subscription: OPCUAServerSubscription,
+                                     items: List[OPCUAMonitoredItem]):
+        await asyncio.sleep(self.request_latency)
+        self.stats['subscription_requests'] += 1
+        for item in items:
+            subscription.items[item.client_handle] = item
+        subscription.start()
+
+    async def delete_subscription(self, subscription_id: int):
+        subscription = self.subscriptions.pop(subscription_id, None)
+        if subscription is not None:
+            await subscription.stop()
+
+class OPCUAChangeCache:
+    """Cache local des dernières valeurs notifiées par les abonnements"""
+
+    def __init__(self):
+        self.values: Dict[str, Dict[str, Any]] = {}
+        self.stats = {'updates': 0, 'lookups': 0}
+
+    def update(self, notifications: List[Dict[str, Any]]):
+        received = datetime.now().isoformat()
+        for notification in notifications:
+            entry = dict(notification)
+            entry['received_timestamp'] = received
+            self.values[notification['node_id']] = entry
+        self.stats['updates'] += len(notifications)
+
+    def get(self, node_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        self.stats['lookups'] += len(node_ids)
+        return [self.values.get(node_id) for node_id in node_ids]
+
+async def subscribe_opcua_nodes(server: OPCUAStandInServer, cache: OPCUAChangeCache, node_ids: List[str],
+                                publishing_interval: float, sampling_interval: float,
+                                deadband_type: str = 'None', deadband_value: float = 0.0,
+                                eu_ranges: Optional[Dict[str, tuple]] = None) -> OPCUAServerSubscription:
+    """Créer un abonnement dont les notifications alimentent cache
+
+    Les valeurs initiales sont lues en une requête et mises en cache (comme la
+    première notification d'un élément surveillé), puis servent de référence
+    au filtre deadband.
+    """
+    initial_values = await server.read(node_ids)
+    cache.update(initial_values)
+    
+    subscription = await server.create_subscription(publishing_interval, cache.update)
+    await server.create_monitored_items(subscription, [
+        OPCUAMonitoredItem(
+            node_id=node_id,
+            client_handle=handle,
+            sampling_interval=sampling_interval,
+            deadband_type=deadband_type,
+            deadband_value=deadband_value,
+            eu_range=(eu_ranges or {}).get(node_id),
+            last_reported=initial['value']
+        )
+        for handle, (node_id, initial) in enumerate(zip(node_ids, initial_values), start=1)
+    ])
+    return subscription
+
 class OPCUASecureConnector:
-    """Connecteur OPC-UA sécurisé"""
+    """Connecteur OPC-UA sécurisé
+
+    Deux modes d'accès aux données: lecture ponctuelle (service Read groupé)
+    et abonnement (create_subscription): éléments surveillés échantillonnés
+    côté serveur, filtrés par deadband et notifiés par publication groupée
+    dans un cache local lu sans aller-retour (get_cached_values).
+    Sans serveur fourni, chaque session utilise un OPCUAStandInServer simulé.
+    """
     
-    def __init__(self):
+    def __init__(self, server: Optional[OPCUAStandInServer] = None):
         self.active_sessions = {}
+        self.server = server
+        self.change_caches: Dict[str, OPCUAChangeCache] = {}
+        self.subscriptions: Dict[str, Dict[str, Any]] = {}
         self.security_policies = {
             'None': 'http://opcfoundation.org/UA/SecurityPolicy#None',
             'Basic256Sha256': 'http://opcfoundation.org/UA/SecurityPolicy#Basic256Sha256',
@@ -445,7 +958,8 @@ class OPCUASecureConnector:
                 'session_timeout': config['session_timeout'],
                 'security_configured': True,
                 'last_activity': datetime.now().isoformat(),
-                'namespace_array': ['http://opcfoundation.org/UA/', 'urn:station:traffeyere']
+                'namespace_array': ['http://opcfoundation.org/UA/', 'urn:station:traffeyere'],
+                'server': self.server or OPCUAStandInServer(default_provider=self._simulate_opcua_value)
             }
             
             return session
@@ -480,46 +994,98 @@ class OPCUASecureConnector:
     
     async def read_opcua_nodes(self, session_id: str, 
                              node_list: List[str]) -> List[Dict[str, Any]]:
-        """Lecture nœuds OPC-UA"""
+        """Lecture nœuds OPC-UA (un seul service Read pour tous les nœuds)"""
         if session_id not in self.active_sessions:
             raise Exception(f"Session {session_id} non trouvée")
         
         session_info = self.active_sessions[session_id]
-        readings = []
+        server = session_info['session_object']['server']
         
-        for node_id in node_list:
-            try:
-                # Simulation lecture nœud OPC-UA
-                await asyncio.sleep(0.05)
-                
-                # Génération valeur selon NodeId
-                value = self._simulate_opcua_value(node_id)
-                
-                reading = {
-                    'node_id': node_id,
-                    'value': value,
-                    'status_code': 'Good',
-                    'source_timestamp': datetime.now().isoformat(),
-                    'server_timestamp': datetime.now().isoformat(),
-                    'data_type': self._get_opcua_datatype(node_id)
-                }
-                
-                readings.append(reading)
-                
-            except Exception as e:
+        try:
+            results = await server.read(node_list)
+            readings = [{
+                'node_id': result['node_id'],
+                'value': result['value'],
+                'status_code': result['status_code'],
+                'source_timestamp': result['source_timestamp'],
+                'server_timestamp': result['server_timestamp'],
+                'data_type': self._get_opcua_datatype(result['node_id'])
+            } for result in results]
+        except Exception as e:
+            readings = [{
+                'node_id': node_id,
+                'value': None,
+                'status_code': 'Bad',
+                'error': str(e),
+                'timestamp': datetime.now().isoformat()
+            } for node_id in node_list]
+        
+        # Mise à jour activité
+        session_info['last_activity'] = datetime.now().isoformat()
+        
+        return readings
+    
+    async def create_subscription(self, session_id: str, node_ids: List[str],
+                                  publishing_interval: float = 1000, sampling_interval: float = 250,
+                                  deadband_type: str = 'Absolute', deadband_value: float = 0.0,
+                                  eu_ranges: Optional[Dict[str, tuple]] = None) -> Dict[str, Any]:
+        """Abonnement aux changements de valeur des nœuds (intervalles en ms)"""
+        if session_id not in self.active_sessions:
+            raise Exception(f"Session {session_id} non trouvée")
+        
+        server = self.active_sessions[session_id]['session_object']['server']
+        cache = self.change_caches.setdefault(session_id, OPCUAChangeCache())
+        subscription = await subscribe_opcua_nodes(server, cache, node_ids, publishing_interval, sampling_interval,
+                                                   deadband_type, deadband_value, eu_ranges)
+        
+        subscription_id = f"SUB_{session_id}_{subscription.subscription_id}"
+        self.subscriptions[subscription_id] = {
+            'subscription_id': subscription_id,
+            'session_id': session_id,
+            'server_subscription': subscription,
+            'monitored_items': len(node_ids),
+            'publishing_interval': publishing_interval,
+            'sampling_interval': sampling_interval,
+            'deadband': {'type': deadband_type, 'value': deadband_value}
+        }
+        
+        logger.info(f"📡 Abonnement OPC-UA {subscription_id}: {len(node_ids)} nœuds, "
+                    f"publication {publishing_interval} ms, deadband {deadband_type} {deadband_value}")
+        return self.subscriptions[subscription_id]
+    
+    def get_cached_values(self, session_id: str, node_ids: List[str]) -> List[Dict[str, Any]]:
+        """Dernières valeurs des nœuds abonnés, depuis le cache local (sans aller-retour)"""
+        cache = self.change_caches.get(session_id)
+        if cache is None:
+            raise Exception(f"Aucun abonnement pour la session {session_id}")
+        
+        readings = []
+        for node_id, entry in zip(node_ids, cache.get(node_ids)):
+            if entry is None:
                 readings.append({
                     'node_id': node_id,
                     'value': None,
-                    'status_code': 'Bad',
-                    'error': str(e),
+                    'status_code': 'BadWaitingForInitialData',
                     'timestamp': datetime.now().isoformat()
                 })
-        
-        # Mise à jour activité
-        session_info['last_activity'] = datetime.now().isoformat()
-        
+            else:
+                readings.append({
+                    'node_id': node_id,
+                    'value': entry['value'],
+                    'status_code': entry['status_code'],
+                    'source_timestamp': entry['source_timestamp'],
+                    'received_timestamp': entry['received_timestamp'],
+                    'data_type': self._get_opcua_datatype(node_id)
+                })
         return readings
     
+    async def delete_subscription(self, subscription_id: str):
+        """Suppression d'un abonnement (arrêt de l'échantillonnage serveur)"""
+        subscription_info = self.subscriptions.pop(subscription_id, None)
+        if subscription_info:
+            subscription = subscription_info['server_subscription']
+            await subscription.server.delete_subscription(subscription.subscription_id)
+    
     def _simulate_opcua_value(self, node_id: str) -> Union[float, int, bool, str]:
         """Simulation valeur OPC-UA"""
         # Simulation selon NodeId
@@ -547,12 +1113,143 @@ class OPCUASecureConnector:
         else:
             return 'Variant'
 
+class CollectionCacheEntry:
+    """Résultat de collecte en cache et ses échéances (monotonic)"""
+    __slots__ = ('value', 'fresh_until', 'stale_until')
+
+    def __init__(self, value: Dict[str, Any], fresh_until: float, stale_until: float):
+        self.value = value
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+
+class CollectionCache:
+    """Cache read-through des collectes SCADA (TTL, LRU borné, single-flight)
+
+    - Entrée fraîche (< ttl): servie directement
+    - Entrée périmée (< stale_ttl): servie immédiatement, rafraîchie en tâche de fond
+    - Absente ou expirée: collecte; les appels concurrents pour la même clé
+      attendent la même collecte en cours
+    Seuls les résultats acceptés par cacheable sont conservés.
+    """
+
+    def __init__(self, ttl: float = 5.0, stale_ttl: float = 60.0, max_entries: int = 256):
+        self.ttl = ttl
+        self.stale_ttl = max(stale_ttl, ttl)
+        self.max_entries = max_entries
+        self.entries: 'OrderedDict[Any, CollectionCacheEntry]' = OrderedDict()
+        self.inflight: Dict[Any, asyncio.Task] = {}
+        self.stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'coalesced': 0,
+                      'background_refreshes': 0, 'fetch_failures': 0, 'evictions': 0}
+
+    async def get(self, key: Any, fetch: Callable[[], Awaitable[Dict[str, Any]]],
+                  cacheable: Callable[[Dict[str, Any]], bool] = lambda result: True) -> tuple:
+        """Retourne (résultat, statut cache: HIT / STALE / MISS / COALESCED)"""
+        now = time.monotonic()
+        entry = self.entries.get(key)
+        if entry is not None:
+            if now < entry.fresh_until:
+                self.entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return entry.value, 'HIT'
+            if now < entry.stale_until:
+                self.entries.move_to_end(key)
+                self.stats['stale_hits'] += 1
+                if key not in self.inflight:
+                    self.stats['background_refreshes'] += 1
+                    self._start_fetch(key, fetch, cacheable)
+                return entry.value, 'STALE'
+            del self.entries[key]
+
+        task = self.inflight.get(key)
+        if task is not None:
+            self.stats['coalesced'] += 1
+            status = 'COALESCED'
+        else:
+            self.stats['misses'] += 1
+            task = self._start_fetch(key, fetch, cacheable)
+            status = 'MISS'
+        # shield: l'annulation d'un appelant n'interrompt pas la collecte partagée
+        return await asyncio.shield(task), status
+
+    def _start_fetch(self, key: Any, fetch: Callable[[], Awaitable[Dict[str, Any]]],
+                     cacheable: Callable[[Dict[str, Any]], bool]) -> asyncio.Task:
+        task = asyncio.get_running_loop().create_task(self._fetch(key, fetch, cacheable))
+        self.inflight[key] = task
+        task.add_done_callback(self._fetch_done)
+        return task
+
+    async def _fetch(self, key: Any, fetch: Callable[[], Awaitable[Dict[str, Any]]],
+                     cacheable: Callable[[Dict[str, Any]], bool]) -> Dict[str, Any]:
+        try:
+            result = await fetch()
+            if cacheable(result):
+                self._store(key, result)
+            elif key in self.entries:
+                self.stats['fetch_failures'] += 1  # Entrée périmée conservée jusqu'à stale_ttl
+            return result
+        finally:
+            self.inflight.pop(key, None)
+
+    def _fetch_done(self, task: asyncio.Task):
+        # Rafraîchissements de fond: exception consommée (sinon avertissement asyncio)
+        if not task.cancelled() and task.exception() is not None:
+            self.stats['fetch_failures'] += 1
+            logger.warning(f"Collecte SCADA en échec: {task.exception()}")
+
+    def _store(self, key: Any, value: Dict[str, Any]):
+        now = time.monotonic()
+        self.entries[key] = CollectionCacheEntry(value, now + self.ttl, now + self.stale_ttl)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            # Entrées expirées d'abord, puis les moins récemment utilisées
+            for expired_key in [k for k, e in self.entries.items() if e.stale_until <= now]:
+                del self.entries[expired_key]
+                self.stats['evictions'] += 1
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        lookups = self.stats['hits'] + self.stats['stale_hits'] + self.stats['misses'] + self.stats['coalesced']
+        served_without_collection = self.stats['hits'] + self.stats['stale_hits'] + self.stats['coalesced']
+        return {
+            **self.stats,
+            'entries': len(self.entries),
+            'inflight': len(self.inflight),
+            'hit_ratio': round(served_without_collection / lookups, 4) if lookups else 0.0
+        }
+
+    async def close(self):
+        for task in list(self.inflight.values()):
+            task.cancel()
+        await asyncio.gather(*self.inflight.values(), return_exceptions=True)
+        self.inflight.clear()
+        self.entries.clear()
+
 class ScadaApiGateway:
     """API Gateway pour SCADA Schneider Electric"""
     
-    def __init__(self):
+    # Nœuds OPC-UA typiques SCADA Schneider (plages EU pour le deadband en %)
+    SCADA_OPCUA_NODES = [
+        {'node_id': 'ns=2;s=Station.Process.FlowRate', 'name': 'Debit_Process', 'value': 445.2, 'eu_range': (0, 1000)},
+        {'node_id': 'ns=2;s=Station.Tank.Level', 'name': 'Niveau_Reservoir', 'value': 82.1, 'eu_range': (0, 100)},
+        {'node_id': 'ns=2;s=Station.Pump.Status', 'name': 'Etat_Pompe', 'value': True},
+        {'node_id': 'ns=2;s=Station.Alarm.Count', 'name': 'Nb_Alarmes', 'value': 2},
+        {'node_id': 'ns=2;s=Station.Energy.Consumption', 'name': 'Consommation_kWh', 'value': 156.8, 'eu_range': (0, 500)}
+    ]
+    
+    def __init__(self, opcua_server: Optional[OPCUAStandInServer] = None,
+                 cache_ttl: float = 5.0, cache_stale_ttl: float = 60.0, cache_max_entries: int = 256):
         self.connected_systems = {}
-        self.data_cache = {}
+        self.collection_cache = CollectionCache(cache_ttl, cache_stale_ttl, cache_max_entries)
+        self.opcua_server = opcua_server
+        self.opcua_subscription_config = {
+            'publishing_interval': 500,  # ms
+            'sampling_interval': 250,  # ms
+            'deadband_type': 'Percent',
+            'deadband_value': 0.5  # % de la plage EU
+        }
+        self.opcua_subscriptions: Dict[str, Dict[str, Any]] = {}
         self.api_security = {
             'api_key_required': True,
             'rate_limiting': True,
@@ -661,8 +1358,10 @@ class ScadaApiGateway:
             adapter_config.update({
                 'endpoint_url': protocol_config['endpoint_url'],
                 'security_policy': protocol_config.get('security_policy', 'Basic256Sha256'),
-                'security_mode': protocol_config.get('security_mode', 'SignAndEncrypt')
+                'security_mode': protocol_config.get('security_mode', 'SignAndEncrypt'),
+                'subscription': dict(self.opcua_subscription_config, **protocol_config.get('subscription', {}))
             })
+            await self._subscribe_opcua_adapter(adapter_config, protocol_config.get('nodes', self.SCADA_OPCUA_NODES))
         
         logger.info(f"🔧 Adaptateur {protocol_type} configuré: {adapter_config['adapter_id']}")
         
@@ -670,10 +1369,23 @@ class ScadaApiGateway:
     
     async def collect_scada_data(self, system_id: str, 
                                data_request: Dict[str, Any]) -> Dict[str, Any]:
-        """Collecte données depuis SCADA"""
+        """Collecte données depuis SCADA (via le cache de collectes partagé)"""
         if system_id not in self.connected_systems:
             raise Exception(f"Système SCADA {system_id} non enregistré")
         
+        # Requêtes identiques (dashboards, jumeau numérique, analytics) -> même entrée
+        cache_key = (system_id, json.dumps(data_request, sort_keys=True, default=str))
+        collection_result, cache_status = await self.collection_cache.get(
+            cache_key,
+            lambda: self._collect_from_system(system_id, data_request),
+            lambda result: result['status'] == 'SUCCESS'
+        )
+        
+        # Copie superficielle: le résultat en cache est partagé entre appelants
+        return {**collection_result, 'metadata': {**collection_result['metadata'], 'cache_status': cache_status}}
+    
+    async def _collect_from_system(self, system_id: str, data_request: Dict[str, Any]) -> Dict[str, Any]:
+        """Collecte effective sur tous les adaptateurs du système"""
         system = self.connected_systems[system_id]
         
         logger.info(f"📊 Collecte données SCADA: {system['name']}")
@@ -697,10 +1409,6 @@ class ScadaApiGateway:
                 adapter_data = await self._collect_adapter_data(adapter, data_request)
                 collection_result['data_points'].extend(adapter_data)
             
-            # Mise en cache
-            cache_key = f"{system_id}_{int(time.time() // 60)}"  # Cache par minute
-            self.data_cache[cache_key] = collection_result
-            
             collection_result['metadata']['collection_duration_ms'] = (time.time() - start_time) * 1000
             collection_result['metadata']['points_collected'] = len(collection_result['data_points'])
             
@@ -768,53 +1476,133 @@ class ScadaApiGateway:
         
         return data_points
     
+    @staticmethod
+    def _simulated_node_provider(node: Dict[str, Any]) -> Callable[[], Any]:
+        """Valeur évolutive simulée d'un nœud SCADA"""
+        base_value = node['value']
+        if isinstance(base_value, bool):
+            return lambda: time.time() % 10 < 8  # 80% True
+        if isinstance(base_value, int):
+            return lambda: int(base_value + (time.time() % 10 - 5))
+        return lambda: round(base_value * (1 + (time.time() % 30 - 15) * 0.02), 2)  # ±2% variation
+    
+    async def _subscribe_opcua_adapter(self, adapter: Dict[str, Any], nodes: List[Dict[str, Any]]):
+        """Abonnement OPC-UA de l'adaptateur: les collectes lisent ensuite le cache local"""
+        server = self.opcua_server
+        if server is None:
+            server = OPCUAStandInServer()
+            for node in nodes:
+                server.set_value(node['node_id'], self._simulated_node_provider(node))
+        
+        config = adapter['subscription']
+        cache = OPCUAChangeCache()
+        subscription = await subscribe_opcua_nodes(
+            server, cache, [node['node_id'] for node in nodes],
+            config['publishing_interval'], config['sampling_interval'],
+            config['deadband_type'], config['deadband_value'],
+            {node['node_id']: node['eu_range'] for node in nodes if 'eu_range' in node}
+        )
+        
+        self.opcua_subscriptions[adapter['adapter_id']] = {
+            'server': server,
+            'subscription': subscription,
+            'cache': cache,
+            'nodes': nodes
+        }
+        logger.info(f"📡 Abonnement OPC-UA {adapter['adapter_id']}: {len(nodes)} nœuds surveillés")
+    
     async def _collect_opcua_data(self, adapter: Dict[str, Any], 
                                 data_request: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Collecte données OPC-UA via adaptateur"""
-        await asyncio.sleep(0.3)  # Simulation latence OPC-UA
-        
+        """Collecte données OPC-UA via adaptateur (cache alimenté par abonnement)"""
+        subscription = self.opcua_subscriptions.get(adapter['adapter_id'])
+        if subscription is None:
+            adapter.setdefault('subscription', dict(self.opcua_subscription_config))
+            await self._subscribe_opcua_adapter(adapter, self.SCADA_OPCUA_NODES)
+            subscription = self.opcua_subscriptions[adapter['adapter_id']]
+        
+        nodes = subscription['nodes']
         data_points = []
-        
-        # Simulation nœuds OPC-UA typiques SCADA Schneider
-        opcua_nodes = [
-            {'node_id': 'ns=2;s=Station.Process.FlowRate', 'name': 'Debit_Process', 'value': 445.2},
-            {'node_id': 'ns=2;s=Station.Tank.Level', 'name': 'Niveau_Reservoir', 'value': 82.1},
-            {'node_id': 'ns=2;s=Station.Pump.Status', 'name': 'Etat_Pompe', 'value': True},
-            {'node_id': 'ns=2;s=Station.Alarm.Count', 'name': 'Nb_Alarmes', 'value': 2},
-            {'node_id': 'ns=2;s=Station.Energy.Consumption', 'name': 'Consommation_kWh', 'value': 156.8}
-        ]
-        
-        for node in opcua_nodes:
-            # Simulation valeur évolutive
-            if isinstance(node['value'], bool):
-                value = time.time() % 10 < 8  # 80% True
-            elif isinstance(node['value'], int):
-                value = int(node['value'] + (time.time() % 10 - 5))
-            else:
-                variation = (time.time() % 30 - 15) * 0.02  # ±2% variation
-                value = round(node['value'] * (1 + variation), 2)
-            
-            data_point = {
+        for node, entry in zip(nodes, subscription['cache'].get([node['node_id'] for node in nodes])):
+            if entry is None:
+                continue
+            data_points.append({
                 'source': 'OPC_UA',
                 'adapter_id': adapter['adapter_id'],
                 'node_id': node['node_id'],
                 'name': node['name'],
-                'value': value,
-                'status_code': 'Good',
-                'timestamp': datetime.now().isoformat()
-            }
-            
-            data_points.append(data_point)
+                'value': entry['value'],
+                'status_code': entry['status_code'],
+                'timestamp': entry['source_timestamp']
+            })
         
         return data_points
+    
+    def get_cache_metrics(self) -> Dict[str, Any]:
+        """Compteurs du cache de collectes (hits, misses, collectes partagées...)"""
+        return self.collection_cache.get_metrics()
+    
+    async def close(self):
+        """Arrêt des abonnements OPC-UA et des collectes en cours"""
+        await self.collection_cache.close()
+        for subscription in self.opcua_subscriptions.values():
+            await subscription['server'].delete_subscription(subscription['subscription'].subscription_id)
+        self.opcua_subscriptions.clear()
+
+@dataclass
+class TransformationMapping:
+    """Résultat pré-calculé du mapping d'un point legacy (source, nom, adresse)"""
+    device_id: str
+    measurement_type: str
+    zone: str
+    source_system: str
+    source_address: Any
+    unit: str
+    converter: Optional[Callable[[float], float]]
+    validation_range: Optional[tuple]
+    mqtt_topic: str
 
 class DataTransformationEngine:
-    """Moteur de transformation et mapping des données"""
+    """Moteur de transformation et mapping des données
+
+    Le mapping d'un point (device ID, type de mesure, zone, conversion d'unité,
+    plage de validation) ne dépend que de sa source, de son nom, de son adresse,
+    de son unité et de sa localisation: il est compilé une fois dans une table
+    mémoïsée, puis chaque lot est transformé en une seule passe synchrone.
+    """
     
-    def __init__(self):
+    QUALITY_MAPPING = {
+        'GOOD': 'good',
+        'Good': 'good',
+        'BAD': 'bad',
+        'Bad': 'bad',
+        'UNCERTAIN': 'uncertain',
+        'Uncertain': 'uncertain'
+    }
+    
+    VALIDATION_RANGES = {
+        'flow_rate': (0, 2000),
+        'pressure': (0, 100),
+        'level': (0, 100),
+        'temperature': (-10, 60),
+        'ph': (0, 14),
+        'turbidity': (0, 100),
+        'conductivity': (0, 3000)
+    }
+    
+    def __init__(self, max_mappings: int = 65536):
         self.transformation_rules = self._load_transformation_rules()
         self.unit_conversions = self._load_unit_conversions()
         
+        # Index plat "source_to_cible" -> facteur ou fonction (toutes catégories)
+        self.conversion_index = {
+            conversion_key: conversion
+            for conversions in self.unit_conversions.values()
+            for conversion_key, conversion in conversions.items()
+        }
+        self.max_mappings = max_mappings
+        self.mapping_table: Dict[tuple, TransformationMapping] = {}
+        self.stats = {'points': 0, 'rejected': 0, 'errors': 0, 'mappings_compiled': 0}
+        
     def _load_transformation_rules(self) -> Dict[str, Any]:
         """Règles de transformation par défaut"""
         return {
@@ -865,80 +1653,127 @@ class DataTransformationEngine:
         """Transformation données legacy vers format cible"""
         logger.info(f"🔄 Transformation {len(legacy_data)} points de données legacy")
         
+        transformed_data = self.transform_batch(legacy_data, target_format)
+        
+        logger.info(f"✅ Transformation terminée: {len(transformed_data)}/{len(legacy_data)} points")
+        
+        return transformed_data
+    
+    def transform_batch(self, legacy_data: List[Dict[str, Any]],
+                        target_format: str = 'iot_standard') -> List[Dict[str, Any]]:
+        """Transformation synchrone d'un lot (une passe, mappings mémoïsés)"""
+        transformation_time = datetime.now().isoformat()  # Horodatage commun au lot
+        mapping_table = self.mapping_table
+        quality_mapping = self.QUALITY_MAPPING
+        isfinite = math.isfinite
         transformed_data = []
+        rejected = errors = 0
         
         for data_point in legacy_data:
             try:
-                # Transformation selon le format cible
+                source = data_point.get('source', 'legacy')
+                name = data_point.get('name', 'unknown')
+                address = data_point.get('address', data_point.get('node_id', ''))
+                unit = data_point.get('unit', '')
+                location = data_point.get('location', '')
+                
+                key = (source, name, address, unit, location)
+                mapping = mapping_table.get(key)
+                if mapping is None:
+                    mapping = self._compile_mapping(key)
+                
+                value = data_point['value']
+                if mapping.converter is not None:
+                    value = mapping.converter(value)
+                
+                # Validation (valeur finie, plage du type de mesure)
+                if value is None or (isinstance(value, float) and not isfinite(value)):
+                    rejected += 1
+                    continue
+                if mapping.validation_range is not None:
+                    min_val, max_val = mapping.validation_range
+                    if not (min_val <= float(value) <= max_val):
+                        rejected += 1
+                        continue
+                
+                timestamp = data_point.get('timestamp') or transformation_time
+                quality = quality_mapping.get(data_point.get('quality', data_point.get('status_code', 'unknown')),
+                                              'unknown')
+                
                 if target_format == 'iot_standard':
-                    transformed_point = await self._transform_to_iot_standard(data_point)
+                    transformed_data.append({
+                        'device_id': mapping.device_id,
+                        'timestamp': timestamp,
+                        'measurement_type': mapping.measurement_type,
+                        'value': value,
+                        'unit': mapping.unit,
+                        'quality': quality,
+                        'location': {
+                            'zone': mapping.zone,
+                            'coordinates': None
+                        },
+                        'metadata': {
+                            'source_system': mapping.source_system,
+                            'source_address': mapping.source_address,
+                            'transformation_time': transformation_time
+                        }
+                    })
                 elif target_format == 'mqtt_payload':
-                    transformed_point = await self._transform_to_mqtt_payload(data_point)
+                    transformed_data.append({
+                        'topic': mapping.mqtt_topic,
+                        'payload': {
+                            'value': data_point['value'],
+                            'unit': unit,
+                            'timestamp': timestamp,
+                            'quality': quality
+                        },
+                        'qos': 1,
+                        'retain': False
+                    })
                 else:
-                    transformed_point = data_point  # Pas de transformation
-                
-                # Validation post-transformation
-                if self._validate_transformed_data(transformed_point):
-                    transformed_data.append(transformed_point)
-                else:
-                    logger.warning(f"Point de données invalide après transformation: {data_point}")
+                    transformed_data.append(data_point)  # Pas de transformation
                 
             except Exception as e:
+                errors += 1
                 logger.error(f"Erreur transformation point {data_point}: {e}")
                 continue
         
-        logger.info(f"✅ Transformation terminée: {len(transformed_data)}/{len(legacy_data)} points")
+        if rejected:
+            logger.warning(f"{rejected} points de données invalides après transformation")
         
-        return transformed_data
-    
-    async def _transform_to_iot_standard(self, data_point: Dict[str, Any]) -> Dict[str, Any]:
-        """Transformation vers format IoT standard"""
-        # Format IoT standardisé
-        iot_point = {
-            'device_id': self._generate_device_id(data_point),
-            'timestamp': data_point.get('timestamp', datetime.now().isoformat()),
-            'measurement_type': self._map_measurement_type(data_point),
-            'value': data_point['value'],
-            'unit': data_point.get('unit', ''),
-            'quality': self._map_quality_code(data_point),
-            'location': {
-                'zone': self._extract_zone(data_point),
-                'coordinates': None
-            },
-            'metadata': {
-                'source_system': data_point.get('source', 'legacy'),
-                'source_address': data_point.get('address', data_point.get('node_id', '')),
-                'transformation_time': datetime.now().isoformat()
-            }
-        }
+        self.stats['points'] += len(legacy_data)
+        self.stats['rejected'] += rejected
+        self.stats['errors'] += errors
         
-        # Conversion d'unité si nécessaire
-        if data_point.get('unit') and iot_point['unit']:
-            converted_value = self._convert_unit(
-                data_point['value'], 
-                data_point['unit'], 
-                iot_point['unit']
-            )
-            if converted_value is not None:
-                iot_point['value'] = converted_value
-        
-        return iot_point
+        return transformed_data
     
-    async def _transform_to_mqtt_payload(self, data_point: Dict[str, Any]) -> Dict[str, Any]:
-        """Transformation vers payload MQTT"""
-        mqtt_payload = {
-            'topic': f"station/traffeyere/{self._extract_zone(data_point)}/{self._map_measurement_type(data_point)}",
-            'payload': {
-                'value': data_point['value'],
-                'unit': data_point.get('unit', ''),
-                'timestamp': data_point.get('timestamp', datetime.now().isoformat()),
-                'quality': self._map_quality_code(data_point)
-            },
-            'qos': 1,
-            'retain': False
-        }
+    def _compile_mapping(self, key: tuple) -> TransformationMapping:
+        """Calcul (une fois par point legacy) du mapping et mise en table"""
+        source, name, address, unit, location = key
+        data_point = {'source': source, 'name': name, 'location': location}
+        if address != '':
+            data_point['address'] = address
+        measurement_type = self._map_measurement_type(data_point)
+        zone = self._extract_zone(data_point)
+        
+        # Format IoT standard: unité conservée (conversion identité)
+        mapping = TransformationMapping(
+            device_id=self._generate_device_id(data_point),
+            measurement_type=measurement_type,
+            zone=zone,
+            source_system=source,
+            source_address=address,
+            unit=unit,
+            converter=self._resolve_converter(unit, unit),
+            validation_range=self.VALIDATION_RANGES.get(measurement_type),
+            mqtt_topic=f"station/traffeyere/{zone}/{measurement_type}"
+        )
         
-        return mqtt_payload
+        if len(self.mapping_table) >= self.max_mappings:
+            self.mapping_table.clear()
+        self.mapping_table[key] = mapping
+        self.stats['mappings_compiled'] += 1
+        return mapping
     
     def _generate_device_id(self, data_point: Dict[str, Any]) -> str:
         """Génération ID device IoT"""
@@ -975,21 +1810,6 @@ class DataTransformationEngine:
         else:
             return 'generic_measurement'
     
-    def _map_quality_code(self, data_point: Dict[str, Any]) -> str:
-        """Mapping code qualité"""
-        quality = data_point.get('quality', data_point.get('status_code', 'unknown'))
-        
-        quality_mapping = {
-            'GOOD': 'good',
-            'Good': 'good',
-            'BAD': 'bad',
-            'Bad': 'bad',
-            'UNCERTAIN': 'uncertain',
-            'Uncertain': 'uncertain'
-        }
-        
-        return quality_mapping.get(quality, 'unknown')
-    
     def _extract_zone(self, data_point: Dict[str, Any]) -> str:
         """Extraction zone depuis données"""
         name = data_point.get('name', '').lower()
@@ -1009,57 +1829,86 @@ class DataTransformationEngine:
         else:
             return 'general'
     
-    def _convert_unit(self, value: float, source_unit: str, target_unit: str) -> Optional[float]:
-        """Conversion d'unité"""
-        if source_unit == target_unit:
-            return value
-        
-        conversion_key = f"{source_unit}_to_{target_unit}"
-        
-        # Recherche dans table de conversions
-        for category, conversions in self.unit_conversions.items():
-            if conversion_key in conversions:
-                conversion_factor = conversions[conversion_key]
-                if callable(conversion_factor):
-                    return conversion_factor(value)
-                else:
-                    return value * conversion_factor
-        
-        return None  # Conversion non trouvée
-    
-    def _validate_transformed_data(self, transformed_point: Dict[str, Any]) -> bool:
-        """Validation données transformées"""
-        # Vérifications de base
-        if not transformed_point.get('device_id'):
-            return False
-        
-        if 'value' not in transformed_point:
-            return False
-        
-        value = transformed_point['value']
-        if value is None or (isinstance(value, float) and (math.isnan(value) or math.isinf(value))):
-            return False
-        
-        # Validation plage selon type de mesure
-        measurement_type = transformed_point.get('measurement_type', '')
-        validation_ranges = {
-            'flow_rate': (0, 2000),
-            'pressure': (0, 100),
-            'level': (0, 100),
-            'temperature': (-10, 60),
-            'ph': (0, 14),
-            'turbidity': (0, 100),
-            'conductivity': (0, 3000)
-        }
-        
-        if measurement_type in validation_ranges:
-            min_val, max_val = validation_ranges[measurement_type]
-            if not (min_val <= float(value) <= max_val):
-                return False
-        
-        return True
+    def _resolve_converter(self, source_unit: str, target_unit: str) -> Optional[Callable[[float], float]]:
+        """Fonction de conversion d'unité (None: identité ou conversion inconnue)"""
+        if not source_unit or source_unit == target_unit:
+            return None
+        
+        conversion = self.conversion_index.get(f"{source_unit}_to_{target_unit}")
+        if conversion is None or callable(conversion):
+            return conversion
+        return lambda value, factor=conversion: value * factor
 
 # Tests et démonstration
+class ModbusTCPStandInServer:
+    """Serveur Modbus TCP minimal (FC03/FC04) pour tester le connecteur en local
+
+    Les requêtes d'une connexion sont traitées concurrentiellement (réponses
+    hors ordre possibles), avec un délai de réponse simulé par requête.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, response_delay: float = 0.1):
+        self.host = host
+        self.port = port
+        self.response_delay = response_delay
+        self.holding_registers = bytearray(65536 * 2)
+        self.input_registers = bytearray(65536 * 2)
+        self.mapped_range = (0, 65536)  # Hors plage: exception "adresse illégale"
+        self.stats = {'requests': 0, 'registers_read': 0}
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def set_float(self, offset: int, value: float, input_register: bool = False):
+        table = self.input_registers if input_register else self.holding_registers
+        struct.pack_into('>f', table, offset * 2, value)
+
+    def set_register(self, offset: int, value: int, input_register: bool = False):
+        table = self.input_registers if input_register else self.holding_registers
+        struct.pack_into('>H', table, offset * 2, value & 0xFFFF)
+
+    async def start(self) -> int:
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        tasks = set()
+        try:
+            while True:
+                header = await reader.readexactly(7)
+                transaction_id, _, length, unit_id = struct.unpack('>HHHB', header)
+                pdu = await reader.readexactly(length - 1)
+                task = asyncio.get_running_loop().create_task(
+                    self._respond(writer, transaction_id, unit_id, pdu))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, transaction_id: int, unit_id: int, pdu: bytes):
+        await asyncio.sleep(self.response_delay)
+        function_code, start, count = struct.unpack('>BHH', pdu[:5])
+        self.stats['requests'] += 1
+
+        if function_code not in (3, 4) or not 1 <= count <= MODBUS_MAX_READ_REGISTERS:
+            response = struct.pack('>BB', function_code | 0x80, 0x01 if function_code not in (3, 4) else 0x03)
+        elif start < self.mapped_range[0] or start + count > self.mapped_range[1]:
+            response = struct.pack('>BB', function_code | 0x80, ModbusException.ILLEGAL_DATA_ADDRESS)
+        else:
+            table = self.holding_registers if function_code == 3 else self.input_registers
+            response = struct.pack('>BB', function_code, count * 2) + bytes(table[start * 2:(start + count) * 2])
+            self.stats['registers_read'] += count
+
+        writer.write(struct.pack('>HHHB', transaction_id, 0, len(response) + 1, unit_id) + response)
+
 async def test_legacy_systems_integration():
     """Test complet de l'intégration des systèmes legacy"""
     print("🔗 TEST INTÉGRATION SYSTÈMES LEGACY")
@@ -1110,6 +1959,49 @@ async def test_legacy_systems_integration():
             for reading in readings[:3]:
                 print(f"   • {reading['name']}: {reading['value']} {reading.get('unit', '')}")
         
+        # Lecture par blocs pipelinés contre un serveur Modbus TCP local (100 registres REAL)
+        standin_server = ModbusTCPStandInServer(response_delay=0.1)
+        standin_port = await standin_server.start()
+        live_connector = ModbusSecureConnector(live_mode=True)
+        live_connector.security_config['authorized_ip_ranges'].append('127.0.0.1')
+        
+        live_points = []
+        for i in range(100):
+            offset = i * 2 + (i // 25) * 20  # 4 groupes de registres séparés
+            standin_server.set_float(offset, 400.0 + i)
+            live_points.append({'address': 40001 + offset, 'name': f'Point_{i:03d}', 'type': 'REAL'})
+        
+        live_system = LegacySystem(
+            system_id="MODBUS_LOCAL",
+            name="Serveur Modbus TCP local",
+            manufacturer="Test",
+            model="Stand-in",
+            protocol=LegacyProtocol.MODBUS_TCP,
+            ip_address="127.0.0.1",
+            port=standin_port,
+            security_level=SecurityLevel.BASIC,
+            authentication={'slave_id': 1},
+            data_points=live_points,
+            update_frequency=1,
+            timeout=5,
+            retry_count=1,
+            encryption_enabled=False
+        )
+        live_connector.security_config['authorized_ports'].append(standin_port)
+        live_connection = None
+        try:
+            live_connection = await live_connector.connect_modbus_device(live_system)
+            if live_connection['status'] == 'CONNECTED':
+                live_readings = await live_connector.read_modbus_data(live_connection['connection_id'], live_points)
+                good = sum(1 for reading in live_readings if reading['quality'] == 'GOOD')
+                print(f"✅ Serveur local: {good}/{len(live_readings)} points en "
+                      f"{live_connector.read_stats['last_poll_ms']} ms "
+                      f"({live_connector.read_stats['blocks']} blocs, lectures pipelinées)")
+        finally:
+            if live_connection:
+                await live_connector.disconnect_modbus_device(live_connection['connection_id'])
+            await standin_server.stop()
+        
         # 2. Test connecteurs OPC-UA
         print(f"\n🔌 PHASE 2: CONNECTEURS OPC-UA SÉCURISÉS")
         print("-" * 50)
@@ -1154,6 +2046,34 @@ async def test_legacy_systems_integration():
             for reading in node_readings:
                 print(f"   • {reading['node_id']}: {reading['value']}")
         
+        # Abonnement contre un serveur OPC-UA local: deadband et cache de changements
+        standin_opcua = OPCUAStandInServer(request_latency=0.02)
+        subscribed_nodes = [f'ns=2;s=Station.Sensor{i:03d}.Level' for i in range(200)]
+        for node_id in subscribed_nodes:
+            standin_opcua.set_value(node_id, 50.0)
+        
+        local_connector = OPCUASecureConnector(server=standin_opcua)
+        local_session = await local_connector.connect_opcua_server(opcua_system)
+        if local_session['status'] == 'CONNECTED':
+            subscription_info = await local_connector.create_subscription(
+                local_session['session_id'], subscribed_nodes,
+                publishing_interval=100, sampling_interval=50,
+                deadband_type='Absolute', deadband_value=0.5
+            )
+            for i, node_id in enumerate(subscribed_nodes[:20]):
+                standin_opcua.set_value(node_id, 50.2 if i % 2 else 52.0)  # Moitié sous le deadband
+            await asyncio.sleep(0.3)
+            
+            start = time.perf_counter()
+            cached = local_connector.get_cached_values(local_session['session_id'], subscribed_nodes)
+            cache_ms = (time.perf_counter() - start) * 1000
+            server_subscription = subscription_info['server_subscription']
+            print(f"✅ Abonnement local: {len(cached)} nœuds depuis le cache en {cache_ms:.2f} ms, "
+                  f"{server_subscription.stats['notifications']} notifications "
+                  f"({server_subscription.stats['suppressed']} échantillons filtrés par deadband)")
+            print(f"   • {cached[0]['node_id']}: {cached[0]['value']} / {cached[1]['node_id']}: {cached[1]['value']}")
+            await local_connector.delete_subscription(subscription_info['subscription_id'])
+        
         # 3. Test API Gateway SCADA
         print(f"\n🏭 PHASE 3: API GATEWAY SCADA")
         print("-" * 40)
@@ -1193,6 +2113,18 @@ async def test_legacy_systems_integration():
         print(f"✅ Collecte: {collection_result['status']}")
         print(f"📊 Points collectés: {len(collection_result['data_points'])}")
         
+        # Consommateurs concurrents (dashboards, jumeau numérique, analytics)
+        start = time.perf_counter()
+        concurrent_results = await asyncio.gather(*[
+            scada_gateway.collect_scada_data('SCADA_MAIN_001', data_request) for _ in range(20)
+        ])
+        concurrent_ms = (time.perf_counter() - start) * 1000
+        cache_metrics = scada_gateway.get_cache_metrics()
+        print(f"⚡ {len(concurrent_results)} requêtes concurrentes en {concurrent_ms:.1f} ms "
+              f"(statut cache: {concurrent_results[0]['metadata']['cache_status']}, "
+              f"hits: {cache_metrics['hits']}, misses: {cache_metrics['misses']})")
+        await scada_gateway.close()
+        
         # 4. Test transformation données
         print(f"\n🔄 PHASE 4: TRANSFORMATION DONNÉES")
         print("-" * 40)
@@ -1218,6 +2150,14 @@ async def test_legacy_systems_integration():
             print(f"   Valeur: {sample['value']} {sample['unit']}")
             print(f"   Qualité: {sample['quality']}")
         
+        # Collecte haute fréquence: 500 cycles du même jeu de points
+        high_frequency_batch = legacy_data * 500
+        start = time.perf_counter()
+        batch_result = transformation_engine.transform_batch(high_frequency_batch, 'iot_standard')
+        batch_ms = (time.perf_counter() - start) * 1000
+        print(f"⚡ Lot haute fréquence: {len(batch_result)}/{len(high_frequency_batch)} points en {batch_ms:.1f} ms "
+              f"({transformation_engine.stats['mappings_compiled']} mappings compilés)")
+        
         # 5. Résumé final
         print(f"\n📋 RÉSUMÉ INTÉGRATION SI LEGACY:")
         print("=" * 50)
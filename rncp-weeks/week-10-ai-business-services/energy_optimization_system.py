@@ -18,11 +18,14 @@ import time
 import random
 import math
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Callable
 from dataclasses import dataclass, asdict
 from enum import Enum
 import logging
 from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 
 # Configuration logging
 logging.basicConfig(
@@ -98,64 +101,148 @@ class DigitalTwinState:
     environmental_conditions: Dict[str, float]
     performance_metrics: Dict[str, float]
 
+@dataclass
+class GAProblem:
+    """Problème d'optimisation compilé en tableaux (un élément par paramètre)"""
+    parameter_ids: List[str]
+    min_values: np.ndarray
+    max_values: np.ndarray
+    impact_factors: np.ndarray
+    quality_sensitivities: np.ndarray
+    base_energy_kwh: float  # Σ consommation de base × heures de fonctionnement
+    objective_weights: Dict[str, float]
+
+def evaluate_population_fitness(population: np.ndarray, problem: GAProblem) -> np.ndarray:
+    """Fitness multi-objectifs de toute la population (matrice N × P)
+
+    Fonction de module (sérialisable) pour l'évaluation en processus parallèles.
+    Même modèle que GeneticAlgorithmOptimizer._evaluate_fitness: le facteur de
+    consommation d'un individu est le produit des facteurs de ses paramètres,
+    identique pour tous les profils énergétiques.
+    """
+    normalized = (population - problem.min_values) / (problem.max_values - problem.min_values)
+    centered = np.abs(normalized - 0.5)
+    
+    energy = problem.base_energy_kwh * np.prod(1 + (normalized - 0.5) * problem.impact_factors, axis=1)
+    efficiency = np.maximum(0, 1 - centered).mean(axis=1)
+    quality = np.maximum(0, 1 - centered * problem.quality_sensitivities).mean(axis=1)
+    environmental = np.clip(1 - energy / 1000, 0, 1)
+    
+    weights = problem.objective_weights
+    return (weights['energy'] / (energy + 1) + weights['efficiency'] * efficiency
+            + weights['quality'] * quality + weights['environmental'] * environmental)
+
 class GeneticAlgorithmOptimizer:
-    """Optimiseur par algorithmes génétiques"""
+    """Optimiseur par algorithmes génétiques
+
+    La population est une matrice N × P (valeurs brutes des paramètres):
+    évaluation, sélection par tournoi, croisement uniforme, mutation
+    gaussienne et bornage sont des opérations NumPy sur toute la population.
+    Avec parallel_workers > 0, l'évaluation est répartie sur des processus
+    (utile pour une fonction fitness coûteuse, fitness_function de module).
+    """
     
-    def __init__(self, population_size: int = 100, generations: int = 50):
+    def __init__(self, population_size: int = 100, generations: int = 50,
+                 parallel_workers: int = 0, fitness_function: Optional[Callable] = None,
+                 seed: Optional[int] = None):
         self.population_size = population_size
         self.generations = generations
         self.mutation_rate = 0.1
+        self.gene_mutation_rate = 0.1  # Probabilité de mutation de chaque gène
+        self.mutation_strength = 0.1  # Écart-type, en fraction de la plage du paramètre
         self.crossover_rate = 0.8
         self.elite_size = 10
+        self.tournament_size = 3
+        self.parallel_workers = parallel_workers
+        self.fitness_function = fitness_function or evaluate_population_fitness
+        self.rng = np.random.default_rng(seed)
+        self._executor: Optional[ProcessPoolExecutor] = None
         
     def optimize(self, parameters: List[ProcessParameter], 
                  energy_profiles: List[EnergyProfile],
                  objectives: List[OptimizationObjective]) -> OptimizationSolution:
         """Optimisation par algorithme génétique"""
         logger.info(f"🧬 Lancement optimisation génétique - {self.generations} générations")
+        start_time = time.perf_counter()
+        
+        problem = self._compile_problem(parameters, energy_profiles, objectives)
         
         # Initialisation population
-        population = self._initialize_population(parameters)
+        population = self._initialize_population(problem)
         
-        best_solution = None
+        best_individual = None
         best_fitness = float('-inf')
         
         for generation in range(self.generations):
             # Évaluation fitness de la population
-            fitness_scores = []
-            for individual in population:
-                fitness = self._evaluate_fitness(individual, parameters, energy_profiles, objectives)
-                fitness_scores.append(fitness)
-                
-                if fitness > best_fitness:
-                    best_fitness = fitness
-                    best_solution = individual.copy()
+            fitness_scores = self._evaluate_population(population, problem)
+            
+            generation_best = int(np.argmax(fitness_scores))
+            if fitness_scores[generation_best] > best_fitness:
+                best_fitness = float(fitness_scores[generation_best])
+                best_individual = population[generation_best].copy()
             
             # Sélection et reproduction
-            population = self._evolve_population(population, fitness_scores)
+            population = self._evolve_population(population, fitness_scores, problem)
             
             if generation % 10 == 0:
                 logger.info(f"Génération {generation}: Meilleur fitness = {best_fitness:.3f}")
         
         # Création solution optimale
+        best_solution = dict(zip(problem.parameter_ids, best_individual.tolist()))
         optimized_solution = self._create_solution(best_solution, parameters, energy_profiles, objectives)
         
-        logger.info(f"✅ Optimisation terminée - Fitness: {best_fitness:.3f}")
+        logger.info(f"✅ Optimisation terminée - Fitness: {best_fitness:.3f} "
+                    f"({(time.perf_counter() - start_time) * 1000:.1f} ms)")
         return optimized_solution
     
-    def _initialize_population(self, parameters: List[ProcessParameter]) -> List[Dict[str, float]]:
-        """Initialisation population aléatoire"""
-        population = []
-        
-        for _ in range(self.population_size):
-            individual = {}
-            for param in parameters:
-                # Valeur aléatoire dans la plage autorisée
-                value = random.uniform(param.min_value, param.max_value)
-                individual[param.parameter_id] = value
-            population.append(individual)
-        
-        return population
+    def _compile_problem(self, parameters: List[ProcessParameter],
+                         energy_profiles: List[EnergyProfile],
+                         objectives: List[OptimizationObjective]) -> GAProblem:
+        """Paramètres, profils et objectifs en tableaux / poids"""
+        weights = {'energy': 0.0, 'efficiency': 0.0, 'quality': 0.0, 'environmental': 0.0}
+        for objective in objectives:
+            if objective == OptimizationObjective.ENERGY_COST:
+                weights['energy'] += 0.3
+            elif objective == OptimizationObjective.PROCESS_EFFICIENCY:
+                weights['efficiency'] += 0.25
+            elif objective == OptimizationObjective.WATER_QUALITY:
+                weights['quality'] += 0.25
+            elif objective == OptimizationObjective.ENVIRONMENTAL_IMPACT:
+                weights['environmental'] += 0.2
+        
+        return GAProblem(
+            parameter_ids=[param.parameter_id for param in parameters],
+            min_values=np.array([param.min_value for param in parameters], dtype=np.float64),
+            max_values=np.array([param.max_value for param in parameters], dtype=np.float64),
+            impact_factors=np.array([param.impact_factor for param in parameters], dtype=np.float64),
+            quality_sensitivities=np.array([param.quality_sensitivity for param in parameters], dtype=np.float64),
+            base_energy_kwh=sum(profile.base_consumption_kw * profile.operating_hours_day
+                                for profile in energy_profiles),
+            objective_weights=weights
+        )
+    
+    def _initialize_population(self, problem: GAProblem) -> np.ndarray:
+        """Initialisation population aléatoire (uniforme dans les bornes)"""
+        return self.rng.uniform(problem.min_values, problem.max_values,
+                                (self.population_size, len(problem.parameter_ids)))
+    
+    def _evaluate_population(self, population: np.ndarray, problem: GAProblem) -> np.ndarray:
+        """Fitness de la population, répartie par blocs de lignes en mode parallèle"""
+        if self.parallel_workers <= 0 or len(population) < 2 * self.parallel_workers:
+            return self.fitness_function(population, problem)
+        
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.parallel_workers)
+        chunks = np.array_split(population, self.parallel_workers)
+        return np.concatenate(list(self._executor.map(self.fitness_function, chunks,
+                                                      [problem] * len(chunks))))
+    
+    def close(self):
+        """Arrêt du pool de processus (mode parallèle)"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
     
     def _evaluate_fitness(self, individual: Dict[str, float], 
                           parameters: List[ProcessParameter],
@@ -260,71 +347,50 @@ class GeneticAlgorithmOptimizer:
         environmental_score = max(0, 1 - (energy_consumption / base_consumption))
         return min(1, environmental_score)
     
-    def _evolve_population(self, population: List[Dict[str, float]], 
-                          fitness_scores: List[float]) -> List[Dict[str, float]]:
+    def _evolve_population(self, population: np.ndarray, fitness_scores: np.ndarray,
+                           problem: GAProblem) -> np.ndarray:
         """Évolution de la population"""
-        new_population = []
+        size, gene_count = population.shape
+        elite_size = min(self.elite_size, size)
         
         # Élitisme - conservation des meilleurs individus
-        fitness_with_indices = [(score, idx) for idx, score in enumerate(fitness_scores)]
-        fitness_with_indices.sort(key=lambda x: x[0])
-        elite_indices = [idx for _, idx in fitness_with_indices[-self.elite_size:]]
-        for idx in elite_indices:
-            new_population.append(population[idx].copy())
-        
-        # Génération du reste de la population
-        while len(new_population) < self.population_size:
-            # Sélection des parents
-            parent1 = self._tournament_selection(population, fitness_scores)
-            parent2 = self._tournament_selection(population, fitness_scores)
-            
-            # Croisement
-            if random.random() < self.crossover_rate:
-                child1, child2 = self._crossover(parent1, parent2)
-            else:
-                child1, child2 = parent1.copy(), parent2.copy()
-            
-            # Mutation
-            if random.random() < self.mutation_rate:
-                child1 = self._mutate(child1)
-            if random.random() < self.mutation_rate:
-                child2 = self._mutate(child2)
-            
-            new_population.extend([child1, child2])
+        elite = population[np.argpartition(fitness_scores, size - elite_size)[size - elite_size:]]
         
-        return new_population[:self.population_size]
-    
-    def _tournament_selection(self, population: List[Dict[str, float]], 
-                             fitness_scores: List[float], tournament_size: int = 3) -> Dict[str, float]:
-        """Sélection par tournoi"""
-        tournament_indices = random.sample(range(len(population)), tournament_size)
-        tournament_fitness = [fitness_scores[i] for i in tournament_indices]
-        best_fitness = max(tournament_fitness)
-        winner_idx = tournament_indices[tournament_fitness.index(best_fitness)]
-        return population[winner_idx].copy()
-    
-    def _crossover(self, parent1: Dict[str, float], parent2: Dict[str, float]) -> Tuple[Dict[str, float], Dict[str, float]]:
-        """Croisement uniforme"""
-        child1, child2 = parent1.copy(), parent2.copy()
+        # Génération du reste de la population (par paires de parents)
+        pair_count = (self.population_size - elite_size + 1) // 2
+        parents1 = population[self._tournament_selection(fitness_scores, pair_count)]
+        parents2 = population[self._tournament_selection(fitness_scores, pair_count)]
         
-        for key in parent1.keys():
-            if random.random() < 0.5:
-                child1[key], child2[key] = child2[key], child1[key]
+        children = self._crossover(parents1, parents2)
+        children = self._mutate(children, problem)
         
-        return child1, child2
+        # Bornage des paramètres
+        np.clip(children, problem.min_values, problem.max_values, out=children)
+        
+        return np.concatenate([elite, children])[:self.population_size]
+    
+    def _tournament_selection(self, fitness_scores: np.ndarray, count: int) -> np.ndarray:
+        """Sélection par tournoi: indices des count gagnants"""
+        contenders = self.rng.integers(0, len(fitness_scores), (count, self.tournament_size))
+        winners = np.argmax(fitness_scores[contenders], axis=1)
+        return contenders[np.arange(count), winners]
+    
+    def _crossover(self, parents1: np.ndarray, parents2: np.ndarray) -> np.ndarray:
+        """Croisement uniforme (taux crossover_rate par paire), deux enfants par paire"""
+        pair_count = len(parents1)
+        crossing = self.rng.random(pair_count) < self.crossover_rate
+        swap = (self.rng.random(parents1.shape) < 0.5) & crossing[:, None]
+        child1 = np.where(swap, parents2, parents1)
+        child2 = np.where(swap, parents1, parents2)
+        return np.concatenate([child1, child2])
     
-    def _mutate(self, individual: Dict[str, float]) -> Dict[str, float]:
-        """Mutation gaussienne"""
-        mutated = individual.copy()
-        
-        for key in mutated.keys():
-            if random.random() < 0.1:  # 10% de chance de muter chaque gène
-                mutation_strength = 0.1
-                mutation = random.gauss(0, mutation_strength)
-                mutated[key] += mutation
-                # Pas de vérification des bornes ici, sera fait lors de l'évaluation
-        
-        return mutated
+    def _mutate(self, children: np.ndarray, problem: GAProblem) -> np.ndarray:
+        """Mutation gaussienne (individus au taux mutation_rate, puis par gène)"""
+        mutated_individuals = self.rng.random(len(children)) < self.mutation_rate
+        gene_mask = (self.rng.random(children.shape) < self.gene_mutation_rate) & mutated_individuals[:, None]
+        noise = self.rng.normal(0.0, self.mutation_strength, children.shape) * (problem.max_values - problem.min_values)
+        children += np.where(gene_mask, noise, 0.0)
+        return children
     
     def _create_solution(self, best_individual: Dict[str, float],
                         parameters: List[ProcessParameter],
@@ -0,0 +1,227 @@
+# =============================================================================
+# INSTRUMENTATION PROMETHEUS - Station Traffeyère IoT/AI Platform
+# Métriques HTTP par route, latence boucle asyncio et pauses GC - RNCP 39394
+# =============================================================================
+#
+# Module autonome (prometheus_client; Starlette n'est importé qu'à
+# l'installation sur une application) réutilisable par toutes les
+# applications FastAPI de la plateforme: backend, API du jumeau numérique,
+# dashboard SOC.
+#
+#     instrumentation = AppInstrumentation()
+#     instrumentation.install(app)          # middleware ASGI
+#     await instrumentation.start()         # dans le lifespan
+#     return instrumentation.metrics_response()   # route /metrics
+#
+# Coût par requête minimal: les séries (enfants .labels()) d'une route sont
+# résolues une fois puis mises en cache; une requête ne fait ensuite qu'une
+# recherche de dictionnaire et des mises à jour sur des enfants pré-liés.
+
+import asyncio
+import gc
+import logging
+import time
+from typing import Dict, Optional, Tuple, Any
+
+from prometheus_client import REGISTRY, CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+LOOP_LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+GC_PAUSE_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5)
+
+# Étiquette des requêtes ne correspondant à aucune route (cardinalité bornée)
+UNMATCHED_ROUTE = "<unmatched>"
+
+# =============================================================================
+# INSTRUMENTATION HTTP (ASGI)
+# =============================================================================
+
+class RouteMetrics:
+    """Séries pré-liées d'un couple (méthode, route)"""
+    __slots__ = ("requests", "method", "route", "latency", "in_progress", "_by_status")
+
+    def __init__(self, instrumentation: "HTTPInstrumentation", method: str, route: str):
+        self.requests = instrumentation.requests
+        self.method = method
+        self.route = route
+        self.latency = instrumentation.latency.labels(method, route)
+        self.in_progress = instrumentation.in_progress.labels(method, route)
+        self._by_status: Dict[int, Any] = {}
+
+    def count(self, status: int):
+        child = self._by_status.get(status)
+        if child is None:
+            child = self._by_status[status] = self.requests.labels(self.method, self.route, str(status))
+        child.inc()
+
+class HTTPInstrumentation:
+    """Compteurs, histogrammes de latence et requêtes en cours par route
+
+    Les chemins sont ramenés au gabarit de la route (/items/{id}) via le
+    routeur Starlette; la résolution est mise en cache par (méthode, chemin).
+    """
+
+    def __init__(self, registry: CollectorRegistry, buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+                 max_cached_paths: int = 4096):
+        self.requests = Counter(
+            "http_requests_total", "Requêtes HTTP traitées", ("method", "route", "status"), registry=registry)
+        self.latency = Histogram(
+            "http_request_duration_seconds", "Durée de traitement des requêtes HTTP",
+            ("method", "route"), buckets=buckets, registry=registry)
+        self.in_progress = Gauge(
+            "http_requests_in_progress", "Requêtes HTTP en cours de traitement", ("method", "route"),
+            registry=registry)
+        self.router = None
+        self.max_cached_paths = max_cached_paths
+        self._by_path: Dict[Tuple[str, str], RouteMetrics] = {}
+        self._by_route: Dict[Tuple[str, str], RouteMetrics] = {}
+
+    def _route_template(self, scope: Dict[str, Any]) -> str:
+        if self.router is None:
+            return UNMATCHED_ROUTE
+        from starlette.routing import Match
+        partial = None
+        for route in self.router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(route, "path", UNMATCHED_ROUTE)
+            if match == Match.PARTIAL and partial is None:
+                partial = getattr(route, "path", None)  # Méthode non autorisée (405)
+        return partial or UNMATCHED_ROUTE
+
+    def route_metrics(self, scope: Dict[str, Any]) -> RouteMetrics:
+        """Séries de la route correspondant à une requête"""
+        key = (scope["method"], scope["path"])
+        metrics = self._by_path.get(key)
+        if metrics is None:
+            route_key = (scope["method"], self._route_template(scope))
+            metrics = self._by_route.get(route_key)
+            if metrics is None:
+                metrics = self._by_route[route_key] = RouteMetrics(self, *route_key)
+            if len(self._by_path) < self.max_cached_paths:
+                self._by_path[key] = metrics
+        return metrics
+
+class PrometheusMiddleware:
+    """Middleware ASGI pur (sans BaseHTTPMiddleware) mesurant chaque requête HTTP"""
+
+    def __init__(self, app, instrumentation: HTTPInstrumentation):
+        self.app = app
+        self.instrumentation = instrumentation
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.instrumentation.route_metrics(scope)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        metrics.in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            metrics.latency.observe(time.perf_counter() - start)
+            metrics.in_progress.dec()
+            metrics.count(status)
+
+# =============================================================================
+# MÉTRIQUES RUNTIME - boucle asyncio et ramasse-miettes
+# =============================================================================
+
+class RuntimeInstrumentation:
+    """Retard de la boucle événementielle et pauses du ramasse-miettes
+
+    Le retard de boucle est l'écart entre le réveil prévu et le réveil effectif
+    d'une tâche de sonde; les pauses GC sont mesurées par gc.callbacks (les
+    compteurs de collectes/objets sont déjà fournis par le GCCollector par défaut).
+    """
+
+    def __init__(self, registry: CollectorRegistry, lag_interval: float = 0.5):
+        self.lag_interval = lag_interval
+        self.loop_lag = Histogram(
+            "event_loop_lag_seconds", "Retard de réveil de la boucle asyncio",
+            buckets=LOOP_LAG_BUCKETS, registry=registry)
+        self.loop_lag_last = Gauge(
+            "event_loop_lag_last_seconds", "Dernier retard mesuré de la boucle asyncio", registry=registry)
+        gc_pauses = Histogram(
+            "python_gc_pause_seconds", "Durée des collectes du ramasse-miettes", ("generation",),
+            buckets=GC_PAUSE_BUCKETS, registry=registry)
+        self._gc_pauses = [gc_pauses.labels(str(generation)) for generation in range(3)]
+        self._gc_start = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def _gc_callback(self, phase: str, info: Dict[str, int]):
+        if phase == "start":
+            self._gc_start = time.perf_counter()
+        else:
+            self._gc_pauses[info.get("generation", 0)].observe(time.perf_counter() - self._gc_start)
+
+    async def _probe_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.lag_interval
+            await asyncio.sleep(self.lag_interval)
+            lag = max(loop.time() - expected, 0.0)
+            self.loop_lag.observe(lag)
+            self.loop_lag_last.set(lag)
+
+    def start(self):
+        """Démarrer la sonde de boucle (depuis la boucle) et l'écoute GC"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._probe_loop())
+        if self._gc_callback not in gc.callbacks:
+            gc.callbacks.append(self._gc_callback)
+
+    async def stop(self):
+        if self._gc_callback in gc.callbacks:
+            gc.callbacks.remove(self._gc_callback)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+# =============================================================================
+# POINT D'ENTRÉE APPLICATION
+# =============================================================================
+
+class AppInstrumentation:
+    """Instrumentation complète d'une application FastAPI/Starlette"""
+
+    def __init__(self, registry: CollectorRegistry = REGISTRY,
+                 latency_buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS, lag_interval: float = 0.5):
+        self.registry = registry
+        self.http = HTTPInstrumentation(registry, latency_buckets)
+        self.runtime = RuntimeInstrumentation(registry, lag_interval)
+
+    def install(self, app):
+        """Ajouter le middleware à l'application (à appeler en dernier: middleware le plus externe)"""
+        self.http.router = app.router
+        app.add_middleware(PrometheusMiddleware, instrumentation=self.http)
+
+    async def start(self):
+        self.runtime.start()
+        logger.info("📈 Instrumentation Prometheus active")
+
+    async def stop(self):
+        await self.runtime.stop()
+
+    def render(self) -> bytes:
+        return generate_latest(self.registry)
+
+    def metrics_response(self):
+        """Réponse HTTP au format d'exposition Prometheus"""
+        from starlette.responses import Response
+        return Response(content=self.render(), headers={"Content-Type": CONTENT_TYPE_LATEST})
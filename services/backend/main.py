@@ -3,7 +3,7 @@
 # Backend API pour la gestion IoT, IA et monitoring - RNCP 39394
 # =============================================================================
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
@@ -12,10 +12,13 @@ import uvicorn
 import os
 import logging
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import sys
 import traceback
 
+from instrumentation import AppInstrumentation
+from station_read_model import AnalyticsSubscriber, StationReadModel, cached_json_response
+
 # Configuration du logging
 logging.basicConfig(
     level=logging.INFO,
@@ -30,6 +33,16 @@ RNCP_CODE = os.getenv("RNCP_CODE", "39394")
 ENVIRONMENT = os.getenv("FASTAPI_ENV", "production")
 DEBUG = os.getenv("FASTAPI_DEBUG", "false").lower() == "true"
 
+# Instrumentation Prometheus (requêtes par route, latence, boucle asyncio, GC)
+instrumentation = AppInstrumentation()
+
+# Read model capteurs/anomalies alimenté par les analyses Edge AI (MQTT)
+read_model = StationReadModel(
+    history_size=int(os.getenv("ANOMALY_HISTORY_SIZE", "10000")),
+    cache_ttl=float(os.getenv("READ_MODEL_CACHE_TTL", "1.0"))
+)
+analytics_subscriber = AnalyticsSubscriber(read_model)
+
 # Gestionnaire de contexte pour le cycle de vie de l'app
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -47,6 +60,8 @@ async def lifespan(app: FastAPI):
         # - Initialisation des services externes
         # - Chargement des modèles IA
         # - Configuration des connexions MQTT/InfluxDB
+        await instrumentation.start()
+        analytics_subscriber.start()
         logger.info("✅ Initialisation terminée")
         yield
     except Exception as e:
@@ -55,6 +70,8 @@ async def lifespan(app: FastAPI):
         raise
     finally:
         # Nettoyage
+        analytics_subscriber.stop()
+        await instrumentation.stop()
         logger.info("🛑 Arrêt gracieux de l'application")
 
 # Création de l'application FastAPI
@@ -169,6 +186,9 @@ async def log_requests(request: Request, call_next):
             headers={"X-Process-Time": str(process_time)}
         )
 
+# Middleware de métriques (le plus externe: mesure aussi les autres middlewares)
+instrumentation.install(app)
+
 # =============================================================================
 # ROUTES DE BASE - Health Checks et Information
 # =============================================================================
@@ -280,107 +300,26 @@ async def app_info():
 
 @app.get("/metrics")
 async def metrics():
-    """Métriques pour Prometheus (format basique)"""
-    # À implémenter avec prometheus_client
-    return {
-        "http_requests_total": 0,
-        "http_request_duration_seconds": 0.0,
-        "system_cpu_usage": 0.0,
-        "system_memory_usage": 0.0,
-        "active_connections": 0,
-        "timestamp": datetime.utcnow().isoformat()
-    }
+    """Métriques au format d'exposition Prometheus"""
+    return instrumentation.metrics_response()
 
 # =============================================================================
 # ROUTES IoT ET DONNÉES CAPTEURS (Exemples pour validation)
 # =============================================================================
 
 @app.get("/api/v1/sensors")
-async def get_sensors():
-    """Liste des capteurs de la station"""
-    return {
-        "sensors": [
-            {
-                "id": "PH_001",
-                "name": "pH Mètre Principal",
-                "type": "ph",
-                "unit": "pH",
-                "location": "Bassin d'aération",
-                "status": "active",
-                "last_reading": 7.2,
-                "timestamp": datetime.utcnow().isoformat()
-            },
-            {
-                "id": "O2_001", 
-                "name": "Oxymètre Dissous",
-                "type": "oxygen",
-                "unit": "mg/L",
-                "location": "Bassin d'aération",
-                "status": "active",
-                "last_reading": 4.5,
-                "timestamp": datetime.utcnow().isoformat()
-            },
-            {
-                "id": "TURB_001",
-                "name": "Turbidimètre",
-                "type": "turbidity",
-                "unit": "NTU",
-                "location": "Sortie clarificateur",
-                "status": "active",
-                "last_reading": 15.2,
-                "timestamp": datetime.utcnow().isoformat()
-            },
-            {
-                "id": "FLOW_001",
-                "name": "Débitmètre Principal",
-                "type": "flow",
-                "unit": "m³/h",
-                "location": "Entrée station",
-                "status": "active",
-                "last_reading": 2400,
-                "timestamp": datetime.utcnow().isoformat()
-            }
-        ],
-        "total": 4,
-        "active": 4,
-        "station": {
-            "id": "TRAFFEYERE_001",
-            "name": "Station Traffeyère",
-            "location": "45.764043,4.835659"
-        }
-    }
+async def get_sensors(request: Request):
+    """État courant des capteurs de la station (dernière analyse Edge AI)"""
+    return cached_json_response(request, read_model.sensors_response())
 
 @app.get("/api/v1/anomalies")
-async def get_anomalies():
-    """Détection d'anomalies par IA Edge"""
-    return {
-        "anomalies": [
-            {
-                "id": "ANOM_001",
-                "timestamp": datetime.utcnow().isoformat(),
-                "severity": "medium",
-                "type": "sensor_drift",
-                "sensor_id": "PH_001",
-                "description": "Dérive graduelle du pH détectée",
-                "confidence": 0.87,
-                "ai_model": "IsolationForest",
-                "edge_latency_ms": 0.28,
-                "recommended_action": "Calibration capteur pH recommandée"
-            }
-        ],
-        "summary": {
-            "total_today": 3,
-            "critical": 0,
-            "high": 1,
-            "medium": 2,
-            "low": 0
-        },
-        "ai_performance": {
-            "model_accuracy": 0.976,
-            "avg_latency_ms": 0.32,
-            "false_positive_rate": 0.024
-        }
-    }
+async def get_anomalies(
+    request: Request,
+    limit: int = Query(50, ge=1, le=500, description="Nombre d'anomalies par page"),
+    before: Optional[int] = Query(None, ge=1, description="Curseur: anomalies antérieures à cette séquence")
+):
+    """Historique des anomalies détectées par l'IA Edge (du plus récent au plus ancien)"""
+    return cached_json_response(request, read_model.anomalies_response(limit, before))
 
 # =============================================================================
 # GESTION D'ERREURS GLOBALE
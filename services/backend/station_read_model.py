@@ -0,0 +1,323 @@
+# =============================================================================
+# READ MODEL CAPTEURS / ANOMALIES - Station Traffeyère IoT/AI Platform
+# Vue en mémoire alimentée par les analyses Edge AI (MQTT) - RNCP 39394
+# =============================================================================
+#
+# Le moteur Edge AI publie ses résultats sur station/traffeyere/analytics/...
+# (un topic par capteur + station_health). AnalyticsSubscriber applique ces
+# messages au StationReadModel depuis le thread MQTT; les routes
+# /api/v1/sensors et /api/v1/anomalies servent des réponses JSON
+# pré-sérialisées (ResponseCache) avec ETag / If-None-Match, sans reconstruire
+# le document tant que le TTL court ou que le modèle n'a pas changé.
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+import orjson
+import paho.mqtt.client as mqtt
+from fastapi import Request
+from fastapi.responses import Response
+
+logger = logging.getLogger(__name__)
+
+STATION_INFO = {
+    "id": "TRAFFEYERE_001",
+    "name": "Station Traffeyère",
+    "location": "45.764043,4.835659"
+}
+
+# =============================================================================
+# CACHE DE RÉPONSES PRÉ-SÉRIALISÉES
+# =============================================================================
+
+class CachedResponse:
+    """Corps JSON sérialisé et son ETag"""
+    __slots__ = ("body", "etag", "version", "expires_at")
+
+    def __init__(self, body: bytes, version: int, expires_at: float):
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        self.version = version
+        self.expires_at = expires_at
+
+class ResponseCache:
+    """Cache TTL de réponses JSON, revalidé par numéro de version du modèle
+
+    Une entrée expirée dont la version n'a pas changé est prolongée sans
+    resérialisation; le nombre d'entrées (clés de pagination) est borné.
+    Utilisé uniquement depuis la boucle asyncio.
+    """
+
+    def __init__(self, ttl: float = 1.0, max_entries: int = 512):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, CachedResponse] = {}
+        self.stats = {"hits": 0, "revalidated": 0, "builds": 0}
+
+    def get(self, key: Hashable, version: int, build: Callable[[], Dict[str, Any]]) -> CachedResponse:
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if now < entry.expires_at:
+                self.stats["hits"] += 1
+                return entry
+            if entry.version == version:
+                entry.expires_at = now + self.ttl
+                self.stats["revalidated"] += 1
+                return entry
+
+        entry = CachedResponse(orjson.dumps(build()), version, now + self.ttl)
+        if len(self._entries) >= self.max_entries and key not in self._entries:
+            self._entries.clear()
+        self._entries[key] = entry
+        self.stats["builds"] += 1
+        return entry
+
+def cached_json_response(request: Request, cached: CachedResponse) -> Response:
+    """Réponse 200 avec le corps pré-sérialisé, ou 304 si l'ETag du client est à jour"""
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        if cached.etag in tags or "*" in tags:
+            return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+# =============================================================================
+# READ MODEL
+# =============================================================================
+
+class StationReadModel:
+    """État courant des capteurs et historique borné des anomalies
+
+    Les mises à jour (thread MQTT) et la construction des documents (boucle
+    asyncio, au plus une fois par TTL et par version) sont sérialisées par un
+    verrou; chaque mise à jour incrémente version, ce qui invalide le cache.
+    L'historique est ordonné par numéro de séquence croissant: la pagination
+    par curseur (before=seq) est un simple découpage de liste.
+    """
+
+    def __init__(self, history_size: int = 10000, cache_ttl: float = 1.0):
+        self.history_size = history_size
+        self.cache = ResponseCache(cache_ttl)
+        self.version = 0
+
+        self._lock = threading.Lock()
+        self._sensors: Dict[str, Dict[str, Any]] = {}
+        self._anomalies: List[Dict[str, Any]] = []  # Du plus ancien au plus récent
+        self._anomaly_seq = 0
+        self._severity_counts: Dict[str, int] = {"critical": 0, "high": 0, "medium": 0}
+        self._daily_counts: Dict[str, int] = {}
+        self._station_health: Optional[Dict[str, Any]] = None
+        self._updated_at: Optional[str] = None
+
+        self.stats = {"messages": 0, "invalid_messages": 0, "anomalies_recorded": 0}
+
+    # ------------------------------------------------------------------
+    # Ingestion (thread MQTT)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _severity(score: float, threshold: float) -> str:
+        """Sévérité selon l'écart au seuil (score Isolation Forest: négatif = anormal)"""
+        if -score >= 2 * threshold:
+            return "critical"
+        if -score >= 1.5 * threshold:
+            return "high"
+        return "medium"
+
+    def apply_sensor_analysis(self, sensor_id: str, payload: Dict[str, Any]):
+        """Intégrer un résultat d'analyse capteur du moteur Edge AI"""
+        anomaly = payload.get("anomaly") or {}
+        score = float(anomaly.get("score", 0.0))
+        threshold = float(anomaly.get("threshold", 0.0))
+        is_anomalous = bool(anomaly.get("is_anomalous", False))
+        # Heure locale, comme les horodatages du moteur Edge AI (datetime.now())
+        timestamp = payload.get("timestamp") or datetime.now().isoformat()
+        data_quality = payload.get("data_quality") or {}
+
+        sensor = {
+            "id": sensor_id,
+            "status": "anomaly" if is_anomalous else "active",
+            "anomaly_score": score,
+            "data_quality": {
+                "score": data_quality.get("score"),
+                "status": data_quality.get("status")
+            },
+            "last_readings": {name: prediction.get("current_value")
+                              for name, prediction in (payload.get("predictions") or {}).items()},
+            "timestamp": timestamp
+        }
+
+        with self._lock:
+            self._sensors[sensor_id] = sensor
+            if is_anomalous:
+                self._record_anomaly(sensor_id, score, threshold, timestamp, sensor["data_quality"])
+            self._updated_at = timestamp
+            self.stats["messages"] += 1
+            self.version += 1
+
+    def apply_station_health(self, payload: Dict[str, Any]):
+        """Intégrer l'analyse globale de santé de la station"""
+        with self._lock:
+            self._station_health = {
+                "status": payload.get("status"),
+                "global_health_score": payload.get("global_health_score"),
+                "total_anomalies": payload.get("total_anomalies"),
+                "anomaly_rate": payload.get("anomaly_rate"),
+                "timestamp": payload.get("timestamp")
+            }
+            self.stats["messages"] += 1
+            self.version += 1
+
+    def _record_anomaly(self, sensor_id: str, score: float, threshold: float, timestamp: str,
+                        data_quality: Dict[str, Any]):
+        self._anomaly_seq += 1
+        severity = self._severity(score, threshold)
+        self._anomalies.append({
+            "id": f"ANOM_{self._anomaly_seq:06d}",
+            "seq": self._anomaly_seq,
+            "timestamp": timestamp,
+            "severity": severity,
+            "sensor_id": sensor_id,
+            "description": f"Score d'anomalie {score:.3f} sous le seuil -{threshold}",
+            "score": score,
+            "threshold": threshold,
+            "ai_model": "IsolationForest",
+            "data_quality": data_quality
+        })
+        self._severity_counts[severity] += 1
+        day = timestamp[:10]
+        self._daily_counts[day] = self._daily_counts.get(day, 0) + 1
+        self.stats["anomalies_recorded"] += 1
+
+        # Purge par lots (amortie) au-delà de 125% de la capacité
+        if len(self._anomalies) > self.history_size + self.history_size // 4:
+            excess = len(self._anomalies) - self.history_size
+            for dropped in self._anomalies[:excess]:
+                self._severity_counts[dropped["severity"]] -= 1
+                dropped_day = dropped["timestamp"][:10]
+                self._daily_counts[dropped_day] -= 1
+                if not self._daily_counts[dropped_day]:
+                    del self._daily_counts[dropped_day]
+            del self._anomalies[:excess]
+
+    # ------------------------------------------------------------------
+    # Documents (boucle asyncio, via ResponseCache)
+    # ------------------------------------------------------------------
+
+    def _build_sensors(self) -> Dict[str, Any]:
+        with self._lock:
+            sensors = [self._sensors[sensor_id] for sensor_id in sorted(self._sensors)]
+            return {
+                "sensors": sensors,
+                "total": len(sensors),
+                "active": sum(1 for sensor in sensors if sensor["status"] == "active"),
+                "anomalous": sum(1 for sensor in sensors if sensor["status"] == "anomaly"),
+                "station": STATION_INFO,
+                "station_health": self._station_health,
+                "updated_at": self._updated_at
+            }
+
+    def _build_anomalies(self, limit: int, before: Optional[int], today: str) -> Dict[str, Any]:
+        with self._lock:
+            history = self._anomalies
+            end = len(history)
+            if before is not None and history:
+                end = min(max(before - history[0]["seq"], 0), end)
+            start = max(end - limit, 0)
+            page = history[start:end]
+            page.reverse()
+
+            return {
+                "anomalies": page,
+                "pagination": {
+                    "limit": limit,
+                    "before": before,
+                    "next_before": history[start]["seq"] if start > 0 else None,
+                    "has_more": start > 0,
+                    "total": len(history)
+                },
+                "summary": {
+                    "total_today": self._daily_counts.get(today, 0),
+                    **self._severity_counts
+                },
+                "pipeline": {
+                    "messages": self.stats["messages"],
+                    "updated_at": self._updated_at
+                }
+            }
+
+    def sensors_response(self) -> CachedResponse:
+        return self.cache.get("sensors", self.version, self._build_sensors)
+
+    def anomalies_response(self, limit: int, before: Optional[int] = None) -> CachedResponse:
+        # La date fait partie de la clé: total_today est recalculé au changement de jour,
+        # même si aucune nouvelle analyse n'a incrémenté la version
+        today = datetime.now().date().isoformat()
+        return self.cache.get(("anomalies", limit, before, today), self.version,
+                              lambda: self._build_anomalies(limit, before, today))
+
+# =============================================================================
+# ABONNEMENT MQTT AUX ANALYSES EDGE AI
+# =============================================================================
+
+class AnalyticsSubscriber:
+    """Client MQTT alimentant le read model (boucle réseau paho en arrière-plan)"""
+
+    def __init__(self, read_model: StationReadModel):
+        self.read_model = read_model
+        self.broker_host = os.getenv("MQTT_BROKER_HOST", "localhost")
+        self.broker_port = int(os.getenv("MQTT_BROKER_PORT", "1883"))
+        self.topic_prefix = os.getenv("ANALYTICS_TOPIC_PREFIX", "station/traffeyere/analytics")
+        self.connected = False
+
+        self.client = mqtt.Client(client_id=f"backend-read-model-{os.getpid()}")
+        username = os.getenv("MQTT_USERNAME")
+        if username:
+            self.client.username_pw_set(username, os.getenv("MQTT_PASSWORD"))
+        self.client.on_connect = self._on_connect
+        self.client.on_disconnect = self._on_disconnect
+        self.client.on_message = self._on_message
+
+    def _on_connect(self, client, userdata, flags, rc):
+        if rc == 0:
+            self.connected = True
+            client.subscribe(f"{self.topic_prefix}/+", qos=1)
+            logger.info(f"✅ Read model abonné à {self.topic_prefix}/+")
+        else:
+            logger.error(f"❌ Échec connexion MQTT read model: {rc}")
+
+    def _on_disconnect(self, client, userdata, rc):
+        self.connected = False
+        logger.warning(f"MQTT read model déconnecté: {rc}")
+
+    def _on_message(self, client, userdata, msg):
+        try:
+            payload = orjson.loads(msg.payload)
+            key = msg.topic.rsplit("/", 1)[-1]
+            if key == "station_health":
+                self.read_model.apply_station_health(payload)
+            else:
+                self.read_model.apply_sensor_analysis(key, payload)
+        except Exception as e:
+            self.read_model.stats["invalid_messages"] += 1
+            logger.error(f"Erreur traitement analyse MQTT {msg.topic}: {e}")
+
+    def start(self):
+        """Connexion asynchrone (reconnexion automatique par la boucle paho)"""
+        try:
+            self.client.connect_async(self.broker_host, self.broker_port, 60)
+            self.client.loop_start()
+            logger.info(f"🔌 Connexion MQTT read model {self.broker_host}:{self.broker_port}")
+        except Exception as e:
+            logger.error(f"❌ Erreur connexion MQTT read model: {e}")
+
+    def stop(self):
+        self.client.disconnect()
+        self.client.loop_stop()